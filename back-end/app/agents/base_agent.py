@@ -18,6 +18,7 @@ from datetime import datetime
 from pathlib import Path
 
 from app.services.event_bus import get_event_bus, EventBusInterface
+from app.services.search_index import get_search_index
 from app.utils.workspace_manager import get_workspace_path
 from app.utils.project_structure_analyzer import ProjectStructureAnalyzer
 
@@ -376,6 +377,26 @@ class BaseAgent(ABC):
         
         return context
     
+    def search_context(
+        self, query: str, kinds: Optional[List[str]] = None, limit: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve related proposals, retrospectives and docs (see search_index).
+        
+        Args:
+            query: Free text (e.g. a file path or an issue message)
+            kinds: Only these kinds (proposal, retrospective, doc)
+            limit: Max results
+        
+        Returns:
+            Ranked results with a matching snippet each (empty on error)
+        """
+        try:
+            return get_search_index(self.workspace_path).search(query, kinds=kinds, limit=limit)
+        except Exception as e:
+            logger.warning(f"[{self.agent_id}] Search failed: {e}")
+            return []
+    
     # ========== Utility Methods ==========
     
     def get_workspace_file_path(self, filename: str) -> Path:
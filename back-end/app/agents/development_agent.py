@@ -20,8 +20,10 @@ import json
 
 from app.agents.base_agent import BaseAgent
 from app.services.event_bus import EventTypes, Topics
-from app.agents.diff_generator import generate_unified_diff, read_file_safe
+from app.agents.diff_generator import read_file_safe
 from app.repositories.proposal_repository import get_proposal_repository
+from app.services.proposal_codec import build_overall_diff
+from app.services.diff_service import get_diff_service
 from app.config import get_config
 from app.models.proposal import ChangeProposal, ProposedChange, ProposalDiff
 
@@ -174,15 +176,10 @@ class DevelopmentAgent(BaseAgent):
         self, proposed_changes: List[ProposedChange]
     ) -> ProposalDiff:
         """Generate overall diff from individual changes"""
-        diff_content = ""
+        # Same format proposal_codec uses to rebuild derived overall diffs
+        diff_content = build_overall_diff([change.model_dump() for change in proposed_changes])
 
-        for change in proposed_changes:
-            if change.diff:
-                diff_content += f"--- {change.file_path}\n"
-                diff_content += f"+++ {change.file_path}\n"
-                diff_content += change.diff + "\n\n"
-
-        return ProposalDiff(format="unified", content=diff_content.strip())
+        return ProposalDiff(format="unified", content=diff_content)
 
     async def handle_event(self, event_type: str, data: Dict) -> None:
         """
@@ -2237,20 +2234,21 @@ The implementation was done in a **GitHub Codespace** with:
         else:
             proposal_id = f"dev-{timestamp}"
 
+        # Generate diffs (large files are diffed in parallel off the event loop)
+        diffs = await get_diff_service().diff_many(
+            [
+                (file_path, file_contents.get(file_path) or "", new_content)
+                for file_path, new_content in implementations.items()
+            ]
+        )
+
         # Build proposed changes with diffs
         proposed_changes = []
-        for file_path, new_content in implementations.items():
+        for (file_path, new_content), diff in zip(implementations.items(), diffs):
             old_content = file_contents.get(file_path)
 
             change_type = "create" if old_content is None else "update"
 
-            # Generate diff
-            diff = generate_unified_diff(
-                file_path=file_path,
-                old_content=old_content or "",
-                new_content=new_content,
-            )
-
             proposed_changes.append(
                 ProposedChange(
                     file_path=file_path,
@@ -2265,49 +2263,24 @@ The implementation was done in a **GitHub Codespace** with:
         # Generate overall diff
         overall_diff = self._generate_overall_diff(proposed_changes)
 
-        # Deduplicate by checking existing pending proposals with identical diffs
+        # Deduplicate against pending proposals making the same change
+        # (single fingerprint lookup, see diff_fingerprint)
         duplicate_id: Optional[str] = None
         try:
             repo = get_proposal_repository()
-            existing_pending = repo.list(
-                workspace_id=self.workspace_id, status="pending", limit=100
+            duplicate_id = repo.find_duplicate(
+                {
+                    "workspace_id": self.workspace_id,
+                    "diff": overall_diff.model_dump(),
+                    "proposed_changes": [change.model_dump() for change in proposed_changes],
+                }
             )
-
-            new_diff_content = (overall_diff.content or "").strip()
-            new_files = sorted(change.file_path for change in proposed_changes)
-
-            for existing in existing_pending:
-                if existing.get("agent_id") != "development":
-                    continue
-
-                existing_diff = existing.get("diff")
-                if isinstance(existing_diff, dict):
-                    existing_diff_content = (existing_diff.get("content") or "").strip()
-                elif isinstance(existing_diff, str):
-                    existing_diff_content = existing_diff.strip()
-                else:
-                    existing_diff_content = ""
-
-                existing_changes = existing.get("proposed_changes") or []
-                existing_files = sorted(
-                    change.get("file_path")
-                    for change in existing_changes
-                    if isinstance(change, dict) and change.get("file_path")
+            if duplicate_id:
+                logger.info(
+                    "[DevelopmentAgent] Duplicate proposal detected (id=%s); "
+                    "skipping new proposal creation.",
+                    duplicate_id,
                 )
-
-                if (
-                    new_diff_content
-                    and existing_diff_content
-                    and new_diff_content == existing_diff_content
-                    and new_files == existing_files
-                ):
-                    duplicate_id = existing.get("id")
-                    logger.info(
-                        "[DevelopmentAgent] Duplicate proposal detected (id=%s); "
-                        "skipping new proposal creation.",
-                        duplicate_id,
-                    )
-                    break
         except Exception as e:  # pragma: no cover - defensive logging
             logger.warning(
                 "[DevelopmentAgent] Unable to perform duplicate proposal check: %s", e
@@ -0,0 +1,339 @@
+"""
+Diff Engine
+
+Line diff used by the diff generator in place of difflib.SequenceMatcher,
+which degrades badly on large or repetitive files (lockfiles, generated
+code).
+
+- Lines are interned to integers so comparisons are int compares
+- Common prefix and suffix are trimmed before any real work
+- Lines unique to both sides anchor the alignment (patience diff)
+- Gaps without unique lines use Myers' O(ND) linear-space bisection,
+  bounded by DIFF_MAX_COST edit steps per region
+
+Output uses the exact unified diff format of difflib.unified_diff (same
+headers, hunk ranges and grouping), so callers can switch without changing
+what they emit or parse. The alignment itself can differ from difflib's
+where several minimal diffs exist.
+"""
+
+import os
+from bisect import bisect_left
+from collections import Counter
+from typing import Iterator, List, Sequence, Tuple
+
+# Max D explored by one Myers bisection before falling back to a heuristic split
+DIFF_MAX_COST = int(os.getenv("DIFF_MAX_COST", "2048"))
+
+Opcode = Tuple[str, int, int, int, int]
+Block = Tuple[int, int, int]
+
+
+def _intern(a: Sequence[str], b: Sequence[str]) -> Tuple[List[int], List[int]]:
+    table: dict = {}
+    a_ids = [table.setdefault(line, len(table)) for line in a]
+    b_ids = [table.setdefault(line, len(table)) for line in b]
+    return a_ids, b_ids
+
+
+class _Differ:
+    """Computes matching blocks between two interned line sequences."""
+
+    def __init__(self, a: List[int], b: List[int], max_cost: int = DIFF_MAX_COST):
+        self.a = a
+        self.b = b
+        self.max_cost = max_cost
+        self.blocks: List[Block] = []
+
+    def run(self) -> List[Block]:
+        # Explicit stack (ranges are processed left to right) so deep
+        # splits can't hit the recursion limit
+        stack = [(0, len(self.a), 0, len(self.b))]
+        while stack:
+            item = stack.pop()
+            if len(item) == 3:
+                self.blocks.append(item)
+                continue
+            stack.extend(reversed(self._diff_range(*item)))
+        return _merge_blocks(self.blocks)
+
+    def _diff_range(self, a0: int, a1: int, b0: int, b1: int) -> list:
+        """Return the work items (sub-ranges and blocks) for one range, in order."""
+        a, b = self.a, self.b
+        items: list = []
+
+        prefix = 0
+        while a0 + prefix < a1 and b0 + prefix < b1 and a[a0 + prefix] == b[b0 + prefix]:
+            prefix += 1
+        if prefix:
+            items.append((a0, b0, prefix))
+            a0 += prefix
+            b0 += prefix
+
+        suffix = 0
+        while a1 - suffix > a0 and b1 - suffix > b0 and a[a1 - 1 - suffix] == b[b1 - 1 - suffix]:
+            suffix += 1
+        a1 -= suffix
+        b1 -= suffix
+
+        if a0 < a1 and b0 < b1:
+            anchors = self._patience_anchors(a0, a1, b0, b1)
+            if anchors:
+                i, j = a0, b0
+                for ai, bj in anchors:
+                    if i < ai or j < bj:
+                        items.append((i, ai, j, bj))
+                        items.append((ai, bj, 1))
+                    elif items and len(items[-1]) == 3:
+                        # Consecutive anchors extend the previous block
+                        items[-1] = (items[-1][0], items[-1][1], items[-1][2] + 1)
+                    else:
+                        items.append((ai, bj, 1))
+                    i, j = ai + 1, bj + 1
+                if i < a1 or j < b1:
+                    items.append((i, a1, j, b1))
+            else:
+                split = self._bisect(a0, a1, b0, b1)
+                if split is not None and split not in ((a0, b0), (a1, b1)):
+                    x, y = split
+                    items.append((a0, x, b0, y))
+                    items.append((x, a1, y, b1))
+
+        if suffix:
+            items.append((a1, b1, suffix))
+        return items
+
+    def _patience_anchors(self, a0: int, a1: int, b0: int, b1: int) -> List[Tuple[int, int]]:
+        """Longest increasing run of lines that occur exactly once on each side."""
+        a_slice = self.a[a0:a1]
+        b_slice = self.b[b0:b1]
+        a_counts = Counter(a_slice)
+        b_counts = Counter(b_slice)
+        b_pos = {line: b0 + j for j, line in enumerate(b_slice) if b_counts[line] == 1}
+        unique = [
+            (a0 + i, b_pos[line])
+            for i, line in enumerate(a_slice)
+            if a_counts[line] == 1 and line in b_pos
+        ]
+        if not unique:
+            return []
+
+        # Patience sorting: LIS on b positions, ordered by a positions
+        tails: List[int] = []
+        tail_index: List[int] = []
+        prev: List[int] = [-1] * len(unique)
+        for idx, (_, bj) in enumerate(unique):
+            pos = bisect_left(tails, bj)
+            if pos == len(tails):
+                tails.append(bj)
+                tail_index.append(idx)
+            else:
+                tails[pos] = bj
+                tail_index[pos] = idx
+            prev[idx] = tail_index[pos - 1] if pos else -1
+
+        result = []
+        idx = tail_index[-1]
+        while idx != -1:
+            result.append(unique[idx])
+            idx = prev[idx]
+        result.reverse()
+        return result
+
+    def _bisect(self, a0: int, a1: int, b0: int, b1: int):
+        """
+        Find the middle snake of a[a0:a1] vs b[b0:b1] (Myers 1986, linear space).
+
+        Returns an absolute split point (x, y), or None when the ranges
+        share nothing worth aligning (the whole range is a replace).
+        """
+        a, b = self.a, self.b
+        n = a1 - a0
+        m = b1 - b0
+        max_d = (n + m + 1) // 2
+        offset = max_d
+        size = 2 * max_d + 2
+        v1 = [-1] * size
+        v2 = [-1] * size
+        v1[offset + 1] = 0
+        v2[offset + 1] = 0
+        delta = n - m
+        front = delta % 2 != 0
+        k1start = k1end = k2start = k2end = 0
+
+        for d in range(max_d):
+            if d > self.max_cost:
+                return self._best_forward(v1, offset, d, n, m, a0, b0)
+
+            for k1 in range(-d + k1start, d + 1 - k1end, 2):
+                k1_offset = offset + k1
+                if k1 == -d or (k1 != d and v1[k1_offset - 1] < v1[k1_offset + 1]):
+                    x1 = v1[k1_offset + 1]
+                else:
+                    x1 = v1[k1_offset - 1] + 1
+                y1 = x1 - k1
+                while x1 < n and y1 < m and a[a0 + x1] == b[b0 + y1]:
+                    x1 += 1
+                    y1 += 1
+                v1[k1_offset] = x1
+                if x1 > n:
+                    k1end += 2
+                elif y1 > m:
+                    k1start += 2
+                elif front:
+                    k2_offset = offset + delta - k1
+                    if 0 <= k2_offset < size and v2[k2_offset] != -1:
+                        if x1 >= n - v2[k2_offset]:
+                            return a0 + x1, b0 + y1
+
+            for k2 in range(-d + k2start, d + 1 - k2end, 2):
+                k2_offset = offset + k2
+                if k2 == -d or (k2 != d and v2[k2_offset - 1] < v2[k2_offset + 1]):
+                    x2 = v2[k2_offset + 1]
+                else:
+                    x2 = v2[k2_offset - 1] + 1
+                y2 = x2 - k2
+                while x2 < n and y2 < m and a[a1 - x2 - 1] == b[b1 - y2 - 1]:
+                    x2 += 1
+                    y2 += 1
+                v2[k2_offset] = x2
+                if x2 > n:
+                    k2end += 2
+                elif y2 > m:
+                    k2start += 2
+                elif not front:
+                    k1_offset = offset + delta - k2
+                    if 0 <= k1_offset < size and v1[k1_offset] != -1:
+                        x1 = v1[k1_offset]
+                        y1 = offset + x1 - k1_offset
+                        if x1 >= n - x2:
+                            return a0 + x1, b0 + y1
+
+        return None
+
+    @staticmethod
+    def _best_forward(v1: List[int], offset: int, d: int, n: int, m: int, a0: int, b0: int):
+        """Cost limit reached: split at the furthest forward point found so far."""
+        best = None
+        best_score = 0
+        for k in range(-d, d + 1):
+            x = v1[offset + k]
+            y = x - k
+            if x < 0 or x > n or y < 0 or y > m:
+                continue
+            if 0 < x + y < n + m and x + y > best_score:
+                best, best_score = (a0 + x, b0 + y), x + y
+        return best
+
+
+def _merge_blocks(blocks: List[Block]) -> List[Block]:
+    merged: List[Block] = []
+    for i, j, size in blocks:
+        if merged:
+            pi, pj, psize = merged[-1]
+            if pi + psize == i and pj + psize == j:
+                merged[-1] = (pi, pj, psize + size)
+                continue
+        merged.append((i, j, size))
+    return merged
+
+
+def get_matching_blocks(a: Sequence[str], b: Sequence[str]) -> List[Block]:
+    """Matching blocks (i, j, n) like SequenceMatcher, ending with (len(a), len(b), 0)."""
+    a_ids, b_ids = _intern(a, b)
+    blocks = _Differ(a_ids, b_ids).run()
+    blocks.append((len(a), len(b), 0))
+    return blocks
+
+
+def get_opcodes(a: Sequence[str], b: Sequence[str]) -> List[Opcode]:
+    """Edit opcodes (tag, i1, i2, j1, j2) in SequenceMatcher.get_opcodes format."""
+    i = j = 0
+    opcodes: List[Opcode] = []
+    for ai, bj, size in get_matching_blocks(a, b):
+        tag = ""
+        if i < ai and j < bj:
+            tag = "replace"
+        elif i < ai:
+            tag = "delete"
+        elif j < bj:
+            tag = "insert"
+        if tag:
+            opcodes.append((tag, i, ai, j, bj))
+        i, j = ai + size, bj + size
+        if size:
+            opcodes.append(("equal", ai, i, bj, j))
+    return opcodes
+
+
+def get_grouped_opcodes(a: Sequence[str], b: Sequence[str], n: int = 3) -> Iterator[List[Opcode]]:
+    """Hunks of opcodes with up to `n` lines of context (SequenceMatcher semantics)."""
+    codes = get_opcodes(a, b)
+    if not codes:
+        codes = [("equal", 0, 1, 0, 1)]
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - n), i2, max(j1, j2 - n), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)
+
+    nn = n + n
+    group: List[Opcode] = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == "equal" and i2 - i1 > nn:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def _format_range_unified(start: int, stop: int) -> str:
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def unified_diff(
+    a: Sequence[str],
+    b: Sequence[str],
+    fromfile: str = "",
+    tofile: str = "",
+    fromfiledate: str = "",
+    tofiledate: str = "",
+    n: int = 3,
+    lineterm: str = "\n",
+) -> Iterator[str]:
+    """Drop-in replacement for difflib.unified_diff."""
+    started = False
+    for group in get_grouped_opcodes(a, b, n):
+        if not started:
+            started = True
+            fromdate = f"\t{fromfiledate}" if fromfiledate else ""
+            todate = f"\t{tofiledate}" if tofiledate else ""
+            yield f"--- {fromfile}{fromdate}{lineterm}"
+            yield f"+++ {tofile}{todate}{lineterm}"
+
+        first, last = group[0], group[-1]
+        file1_range = _format_range_unified(first[1], last[2])
+        file2_range = _format_range_unified(first[3], last[4])
+        yield f"@@ -{file1_range} +{file2_range} @@{lineterm}"
+
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                for line in a[i1:i2]:
+                    yield " " + line
+                continue
+            if tag in ("replace", "delete"):
+                for line in a[i1:i2]:
+                    yield "-" + line
+            if tag in ("replace", "insert"):
+                for line in b[j1:j2]:
+                    yield "+" + line
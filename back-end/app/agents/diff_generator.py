@@ -4,11 +4,13 @@ Diff Generator
 Utilities for generating diffs and patches.
 """
 
-import difflib
 import os
 from typing import Optional, Tuple
 from pathlib import Path
 
+from app.agents import diff_engine
+from app.agents.patch_applier import PATCH_FUZZ, apply_file_patch, iter_lines, parse_patch
+
 
 def generate_unified_diff(
     file_path: str,
@@ -26,12 +28,13 @@ def generate_unified_diff(
         context_lines: Number of context lines
     
     Returns:
-        Unified diff string
+        Unified diff string (git's "No newline at end of file" markers included)
     """
-    old_lines = old_content.splitlines(keepends=True)
-    new_lines = new_content.splitlines(keepends=True)
+    # Same line splitting as the patch applier: "\r", form feeds etc. stay inside lines
+    old_lines = list(iter_lines(old_content))
+    new_lines = list(iter_lines(new_content))
     
-    diff = difflib.unified_diff(
+    diff = diff_engine.unified_diff(
         old_lines,
         new_lines,
         fromfile=f"a/{file_path}",
@@ -39,7 +42,44 @@ def generate_unified_diff(
         n=context_lines
     )
     
-    return ''.join(diff)
+    return ''.join(_mark_missing_newlines(diff))
+
+
+def _mark_missing_newlines(diff):
+    """
+    Add "\\ No newline at end of file" after a last line without one.
+
+    difflib (and diff_engine, which matches its output) runs such a line
+    into the next one, so the diff can't be parsed back or applied.
+    """
+    for line in diff:
+        if not line.endswith("\n"):  # Only a file's last line
+            yield line + "\n"
+            yield "\\ No newline at end of file\n"
+        else:
+            yield line
+
+
+def generate_line_diff(file_path: str, old_content: str, new_content: str) -> str:
+    """
+    Generate a unified diff over lines without line endings.
+
+    Args:
+        file_path: Path to file (for diff header)
+        old_content: Current file content
+        new_content: Proposed file content
+
+    Returns:
+        Unified diff string (lines joined with newlines, no trailing newline)
+    """
+    diff = diff_engine.unified_diff(
+        old_content.splitlines(),
+        new_content.splitlines(),
+        fromfile=f"a/{file_path}",
+        tofile=f"b/{file_path}",
+        lineterm="",
+    )
+    return "\n".join(diff)
 
 
 def generate_git_patch(
@@ -73,59 +113,42 @@ index 0000000..1111111 100644
 def apply_patch(
     file_path: str,
     patch: str,
-    workspace_path: str
+    workspace_path: str,
+    fuzz: int = PATCH_FUZZ,
 ) -> Tuple[bool, Optional[str]]:
     """
     Apply patch to file.
     
+    Hunks are applied at their recorded positions (with offset search and
+    up to `fuzz` lines of ignored context); the file is only rewritten if
+    every hunk applies. Use patch_applier.apply_patch_to_workspace for
+    multi-file patches and per-hunk results.
+    
     Args:
         file_path: Path to file (relative to workspace)
         patch: Unified diff or git patch
         workspace_path: Workspace root path
+        fuzz: Max context lines ignored at each end of a hunk
     
     Returns:
         (success, error_message)
     """
-    full_path = Path(workspace_path) / file_path
-    
     try:
-        # Read current content
-        if full_path.exists():
-            with open(full_path, 'r') as f:
-                current_content = f.read()
-        else:
-            current_content = ""
-        
-        # Parse patch and apply
-        # For now, we'll use a simple approach
-        # In production, use `patch` command or library like `unidiff`
-        
-        # Extract new content from patch
-        # This is a simplified version - in production use proper patch library
-        lines = patch.split('\n')
-        new_lines = []
-        in_diff = False
-        
-        for line in lines:
-            if line.startswith('+++'):
-                in_diff = True
-                continue
-            if in_diff:
-                if line.startswith('+'):
-                    new_lines.append(line[1:])
-                elif line.startswith(' '):
-                    new_lines.append(line[1:])
-                elif line.startswith('-'):
-                    continue  # Skip removed lines
-        
-        new_content = '\n'.join(new_lines)
+        file_patches = parse_patch(patch)
+        if not file_patches:
+            return False, "No file changes found in patch"
         
-        # Write new content
-        full_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(full_path, 'w') as f:
-            f.write(new_content)
+        matching = [fp for fp in file_patches if file_path in (fp.new_path, fp.old_path)]
+        if not matching and len(file_patches) == 1:
+            # Single-file patch whose header names the file differently
+            matching = file_patches
+            matching[0].new_path = file_path if matching[0].new_path else None
+            matching[0].old_path = file_path if matching[0].old_path else None
+        if not matching:
+            return False, f"Patch does not touch {file_path}"
         
-        return True, None
+        result = apply_file_patch(matching[0], workspace_path, fuzz=fuzz)
+        return result.applied, result.error
     
     except Exception as e:
         return False, str(e)
@@ -14,11 +14,12 @@ Event-driven architecture: Reacts to changes, doesn't make them directly.
 import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timezone
-from app.git_context_manager import Git_Context_Manager
+from app.git_context_manager import get_git_context_manager
 from app.agents.base_agent import BaseAgent
 from app.services.event_bus import EventTypes, Topics
 from app.agents.diff_generator import apply_patch, read_file_safe
 from app.repositories.proposal_repository import get_proposal_repository
+from app.services.proposal_codec import decode_proposal
 from app.models.proposal import ChangeProposal
 from enum import Enum
 from pathlib import Path
@@ -71,8 +72,8 @@ class GitAgent(BaseAgent):
             workspace_id=workspace_id, agent_id="git", project_id=project_id
         )
 
-        # Git-specific manager
-        self.git_manager = Git_Context_Manager(workspace_id=workspace_id)
+        # Git-specific manager (shared with the API server)
+        self.git_manager = get_git_context_manager(workspace_id)
 
         # Subscribe to events
         self.subscribe_to_event(EventTypes.PROPOSAL_APPROVED)
@@ -297,8 +298,12 @@ class GitAgent(BaseAgent):
                 agent_name="git-agent",
             )
 
-            # Commit locally
-            commit_hash = self._commit(message, agent="git-agent")
+            # Commit locally, staging only the files the proposal touched
+            commit_hash = await self._commit_async(
+                message,
+                agent="git-agent",
+                paths=[str(Path(self.workspace_path) / f) for f in files_changed],
+            )
 
             if commit_hash:
                 # Publish git.commit event
@@ -316,6 +321,82 @@ class GitAgent(BaseAgent):
                     f"[GitAgent] Committed locally: {commit_hash} for proposal {proposal_id}"
                 )
 
+    async def apply_proposals(self, proposal_ids: List[str]) -> Dict[str, Any]:
+        """
+        Apply several approved proposals at once.
+
+        Local mode applies every proposal's changes and makes one commit;
+        Cloud Run mode sends one repository_dispatch for the whole batch.
+
+        Args:
+            proposal_ids: Approved proposal IDs
+
+        Returns:
+            {"commit_hash", "applied": [proposal IDs], "files_changed", "github_triggered"}
+        """
+        result = {"commit_hash": None, "applied": [], "files_changed": [], "github_triggered": False}
+        if not proposal_ids:
+            return result
+
+        if self.is_cloud_run:
+            logger.info(f"[GitAgent] 🚀 Cloud Run mode - one GitHub Action run for {len(proposal_ids)} proposals")
+            github_action_result = await self._trigger_github_action_batch(proposal_ids)
+            result["github_triggered"] = github_action_result.get("status") == "success"
+            return result
+
+        files_changed: List[str] = []
+        applied: List[tuple] = []
+        for proposal_id in proposal_ids:
+            proposal_dict = self._load_proposal(proposal_id)
+            if not proposal_dict:
+                logger.error(f"[GitAgent] Proposal {proposal_id} not found")
+                continue
+            changed = await self._apply_proposal_changes(proposal_dict)
+            files_changed.extend(f for f in changed if f not in files_changed)
+            result["applied"].append(proposal_id)
+            applied.append((proposal_id, proposal_dict))
+        logger.info(f"[GitAgent] Applied {len(applied)} proposals to {len(files_changed)} files")
+        result["files_changed"] = files_changed
+        if not files_changed:
+            return result
+
+        if len(applied) == 1:
+            proposal_id, proposal_dict = applied[0]
+            subject = f"Apply proposal: {proposal_dict.get('title', proposal_id)}"
+            body = f"{proposal_dict.get('description', '')}\n\nProposal-ID: {proposal_id}"
+        else:
+            subject = f"Apply {len(applied)} proposals"
+            body = "\n".join(f"- {p.get('title', pid)} (Proposal-ID: {pid})" for pid, p in applied)
+        message = self._generate_commit_message(
+            commit_type=CommitType.AGENT,
+            scope="proposal",
+            subject=subject,
+            body=body,
+            agent_name="git-agent",
+        )
+        commit_hash = await self._commit_async(
+            message,
+            agent="git-agent",
+            paths=[str(Path(self.workspace_path) / f) for f in files_changed],
+        )
+        result["commit_hash"] = commit_hash
+
+        if commit_hash:
+            await self.publish_event(
+                topic=Topics.GIT_EVENTS,
+                event_type=EventTypes.GIT_COMMIT,
+                data={
+                    "commit_hash": commit_hash,
+                    "workspace_id": self.workspace_id,
+                    "proposal_ids": result["applied"],
+                    "files_changed": files_changed,
+                },
+            )
+            logger.info(
+                f"[GitAgent] Committed locally: {commit_hash} for {len(result['applied'])} proposals"
+            )
+        return result
+
     async def _handle_milestone_v2(self, data: Dict) -> None:
         """Handle milestone.complete.v1 event (new event bus format)"""
         milestone_id = data.get("milestone_id")
@@ -510,6 +591,32 @@ class GitAgent(BaseAgent):
             logger.error(f"[GitAgent] Commit failed: {str(e)}")
             return None
     
+    async def _commit_async(
+        self, message: str, agent: str = "git-agent", paths: Optional[List[str]] = None
+    ) -> Optional[str]:
+        """
+        Like _commit, but runs on the repository's git queue so the event
+        loop is not blocked while git works.
+
+        Args:
+            message: Commit message
+            agent: Agent name for tracking
+            paths: Only stage these paths (None = whole working tree)
+
+        Returns:
+            Commit hash or None if failed
+        """
+        try:
+            logger.info(f"[GitAgent] Queueing commit with message: {message[:50]}...")
+            result = await self.git_manager.commit_changes_async(
+                message=message, agent=agent, paths=paths
+            )
+            logger.info(f"[GitAgent] Commit successful: {result}")
+            return result
+        except Exception as e:
+            logger.error(f"[GitAgent] Commit failed: {str(e)}")
+            return None
+
     async def force_temporal_commit(self, reason: str = "temporal_marker") -> Optional[str]:
         """
         Force a commit to mark the current date/time.
@@ -621,7 +728,8 @@ Generate ONLY the commit message, nothing else."""
             with open(proposal_file, "r") as f:
                 proposal = json.load(f)
             logger.debug(f"[GitAgent] Loaded proposal from local file: {proposal_id}")
-            return proposal
+            # Stored diff-only: rebuild `after` (and read blobs) before applying
+            return decode_proposal(proposal, workspace_path=str(self.workspace_path))
         except Exception as e:
             logger.error(f"[GitAgent] Failed to load proposal: {e}")
             return None
@@ -663,6 +771,14 @@ Generate ONLY the commit message, nothing else."""
 
                         logger.info(f"[GitAgent] {change_type.title()}d: {file_path}")
                         files_changed.append(file_path)
+                    elif change.get("diff"):
+                        # Diff-only change: apply hunks to the current file
+                        success, error = apply_patch(file_path, change["diff"], str(self.workspace_path))
+                        if success:
+                            logger.info(f"[GitAgent] Patched: {file_path}")
+                            files_changed.append(file_path)
+                        else:
+                            logger.error(f"[GitAgent] Failed to patch {file_path}: {error}")
                     else:
                         logger.warning(f"[GitAgent] No 'after' content for {file_path}")
 
@@ -690,6 +806,61 @@ Generate ONLY the commit message, nothing else."""
         Returns:
             dict with status and message, or None if not configured
         """
+        # Extract proposal data (works with both ChangeProposal model and dict)
+        proposal_id = getattr(proposal, "id", None) or proposal.get("id") if isinstance(proposal, dict) else None
+        proposal_workspace_id = getattr(proposal, "workspace_id", None) or proposal.get("workspace_id") if isinstance(proposal, dict) else self.workspace_id
+        proposal_agent_id = getattr(proposal, "agent_id", None) or proposal.get("agent_id") if isinstance(proposal, dict) else None
+        proposal_title = getattr(proposal, "title", None) or proposal.get("title", proposal_id) if isinstance(proposal, dict) else proposal_id
+
+        payload = {
+            "event_type": "proposal-approved",
+            "client_payload": {
+                "proposal_id": proposal_id,
+                "workspace_id": proposal_workspace_id or self.workspace_id,
+                "agent_id": proposal_agent_id,
+                "title": proposal_title,
+            },
+        }
+        return await self._repository_dispatch(
+            payload, f"proposal {proposal_id} (workspace={proposal_workspace_id})"
+        )
+
+    async def _trigger_github_action_batch(self, proposal_ids: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Trigger one GitHub Action run for several approved proposals.
+
+        The workflow applies every proposal of the `proposals-approved` event
+        in one job: one branch, one commit and one PR (see
+        .github/workflows/apply-proposal.yml).
+
+        Args:
+            proposal_ids: Approved proposal IDs
+
+        Returns:
+            dict with status and message
+        """
+        payload = {
+            "event_type": "proposals-approved",
+            "client_payload": {
+                "proposal_ids": list(proposal_ids),
+                "workspace_id": self.workspace_id,
+            },
+        }
+        return await self._repository_dispatch(
+            payload, f"{len(proposal_ids)} proposals (workspace={self.workspace_id})"
+        )
+
+    async def _repository_dispatch(self, payload: Dict[str, Any], target: str) -> Dict[str, Any]:
+        """
+        Send one repository_dispatch event.
+
+        Args:
+            payload: Dispatch body (event_type and client_payload)
+            target: What the event is for (logs and messages)
+
+        Returns:
+            dict with status and message
+        """
         logger.info("[GitAgent] 🔍 Checking GitHub configuration for Action trigger...")
         
         github_token = os.getenv("GITHUB_TOKEN") or os.getenv("PERSONAL_GITHUB_TOKEN")
@@ -720,31 +891,14 @@ Generate ONLY the commit message, nothing else."""
                 "reason": "configuration_missing"
             }
 
-        # Extract proposal data (works with both ChangeProposal model and dict)
-        proposal_id = getattr(proposal, "id", None) or proposal.get("id") if isinstance(proposal, dict) else None
-        proposal_workspace_id = getattr(proposal, "workspace_id", None) or proposal.get("workspace_id") if isinstance(proposal, dict) else self.workspace_id
-        proposal_agent_id = getattr(proposal, "agent_id", None) or proposal.get("agent_id") if isinstance(proposal, dict) else None
-        proposal_title = getattr(proposal, "title", None) or proposal.get("title", proposal_id) if isinstance(proposal, dict) else proposal_id
-
         url = f"https://api.github.com/repos/{github_repo}/dispatches"
         headers = {
             "Accept": "application/vnd.github+json",
             "Authorization": f"Bearer {github_token}",
             "X-GitHub-Api-Version": "2022-11-28",
         }
-        payload = {
-            "event_type": "proposal-approved",
-            "client_payload": {
-                "proposal_id": proposal_id,
-                "workspace_id": proposal_workspace_id or self.workspace_id,
-                "agent_id": proposal_agent_id,
-                "title": proposal_title,
-            },
-        }
 
-        logger.info(
-            f"[GitAgent] 🚀 Triggering GitHub Action for proposal={proposal_id} (workspace={proposal_workspace_id}, repo={github_repo})"
-        )
+        logger.info(f"[GitAgent] 🚀 Triggering GitHub Action for {target} (repo={github_repo})")
 
         try:
             async with httpx.AsyncClient() as client:
@@ -754,11 +908,11 @@ Generate ONLY the commit message, nothing else."""
 
                 if response.status_code == 204:
                     logger.info(
-                        f"[GitAgent] ✅ GitHub Action triggered successfully for proposal: {proposal_id}"
+                        f"[GitAgent] ✅ GitHub Action triggered successfully for {target}"
                     )
                     return {
                         "status": "success",
-                        "message": f"GitHub Action triggered for proposal {proposal_id}",
+                        "message": f"GitHub Action triggered for {target}",
                         "repo": github_repo,
                     }
                 else:
@@ -838,6 +992,7 @@ async def commit_via_agent(
         return agent.git_manager.repo.head.commit.hexsha
     return None
 
+
     def get_git_context_for_proposal(self, proposal_type: str = "general") -> Dict:
         """
         Get rich git context for proposal generation.
@@ -948,3 +1103,16 @@ async def commit_via_agent(
                 "error": str(e),
                 "timestamp": datetime.now().isoformat(),
             }
+
+
+async def commit_batch_via_agent(workspace_id: str, proposal_ids: List[str]) -> Dict[str, Any]:
+    """
+    Apply several approved proposals with one commit (or one GitHub Action
+    dispatch in Cloud Run mode). See GitAgent.apply_proposals.
+
+    Usage:
+        result = await commit_batch_via_agent("contextpilot", ["p-1", "p-2"])
+        result["commit_hash"]
+    """
+    agent = GitAgent(workspace_id=workspace_id)
+    return await agent.apply_proposals(proposal_ids)
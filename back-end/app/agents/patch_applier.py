@@ -0,0 +1,484 @@
+"""
+Patch Applier
+
+Unified diff parser and hunk-based applier.
+
+- Parses multi-file patches (plain unified diffs and `git diff` output,
+  including /dev/null creations/deletions and "\\ No newline at end of file")
+- Applies each hunk at its recorded position, searching up to `max_offset`
+  lines around it when the file has drifted
+- Fuzz: if a hunk doesn't match exactly, up to `fuzz` lines of leading and
+  trailing context are ignored (same meaning as GNU patch's --fuzz)
+- Streams the source file through a bounded window and writes the result to
+  a temporary file that replaces the original only if every hunk applied
+- Reports a result per hunk (applied, offset, fuzz used)
+"""
+
+import io
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple
+
+# Max lines a hunk may have drifted from its recorded position
+PATCH_MAX_OFFSET = int(os.getenv("PATCH_MAX_OFFSET", "1000"))
+# Default number of context lines that may be ignored when matching
+PATCH_FUZZ = int(os.getenv("PATCH_FUZZ", "2"))
+
+DEV_NULL = "/dev/null"
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class PatchError(Exception):
+    """Raised when a patch cannot be parsed."""
+
+
+@dataclass
+class Hunk:
+    old_start: int
+    old_len: int
+    new_start: int
+    new_len: int
+    # (op, text) with op in " ", "-", "+"; text keeps its line ending
+    lines: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def old_lines(self) -> List[str]:
+        return [text for op, text in self.lines if op != "+"]
+
+    @property
+    def new_lines(self) -> List[str]:
+        return [text for op, text in self.lines if op != "-"]
+
+    def reversed(self) -> "Hunk":
+        swap = {"-": "+", "+": "-", " ": " "}
+        return Hunk(
+            self.new_start,
+            self.new_len,
+            self.old_start,
+            self.old_len,
+            [(swap[op], text) for op, text in self.lines],
+        )
+
+
+@dataclass
+class FilePatch:
+    old_path: Optional[str]
+    new_path: Optional[str]
+    hunks: List[Hunk] = field(default_factory=list)
+
+    @property
+    def path(self) -> str:
+        """Workspace-relative path the patch applies to."""
+        return self.new_path or self.old_path or ""
+
+    @property
+    def is_new(self) -> bool:
+        return self.old_path is None
+
+    @property
+    def is_delete(self) -> bool:
+        return self.new_path is None
+
+    def reversed(self) -> "FilePatch":
+        return FilePatch(self.new_path, self.old_path, [h.reversed() for h in self.hunks])
+
+
+@dataclass
+class HunkResult:
+    index: int
+    applied: bool
+    offset: int = 0
+    fuzz: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class FilePatchResult:
+    path: str
+    applied: bool
+    hunks: List[HunkResult] = field(default_factory=list)
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "path": self.path,
+            "applied": self.applied,
+            "error": self.error,
+            "hunks": [vars(h) for h in self.hunks],
+        }
+
+
+# ========== Parsing ==========
+
+def iter_lines(text: str) -> Iterator[str]:
+    """Split on "\\n" only (keeps "\\r" inside lines), keeping line endings."""
+    start = 0
+    length = len(text)
+    while start < length:
+        end = text.find("\n", start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end + 1]
+        start = end + 1
+
+
+def _strip_path(raw: str) -> Optional[str]:
+    path = raw.rstrip("\r\n").split("\t")[0].strip()
+    if path == DEV_NULL:
+        return None
+    if path.startswith(("a/", "b/")):
+        path = path[2:]
+    return path
+
+
+def _strip_newline(hunk: Hunk) -> None:
+    """Apply a "\\ No newline at end of file" marker to the hunk's last line."""
+    if hunk.lines:
+        op, text = hunk.lines[-1]
+        if text.endswith("\n"):
+            hunk.lines[-1] = (op, text[:-1])
+
+
+def parse_patch(patch: str) -> List[FilePatch]:
+    """
+    Parse a unified diff into file patches.
+
+    Args:
+        patch: Patch text (one or more files)
+
+    Returns:
+        List of FilePatch in patch order
+
+    Raises:
+        PatchError: On malformed hunks
+    """
+    files: List[FilePatch] = []
+    current: Optional[FilePatch] = None
+    hunk: Optional[Hunk] = None
+    old_left = new_left = 0
+    pending_old: Optional[str] = None
+
+    for line in iter_lines(patch):
+        if hunk is not None and (old_left > 0 or new_left > 0):
+            op = line[:1]
+            text = line[1:]
+            if op == "\\":
+                _strip_newline(hunk)
+                continue
+            if line in ("\n", "\r\n"):
+                # Some tools strip the space from empty context lines
+                op, text = " ", line
+            if op == " ":
+                old_left -= 1
+                new_left -= 1
+            elif op == "-":
+                old_left -= 1
+            elif op == "+":
+                new_left -= 1
+            else:
+                raise PatchError(f"Unexpected line in hunk: {line.rstrip()!r}")
+            if old_left < 0 or new_left < 0:
+                raise PatchError("Hunk is longer than its header says")
+            hunk.lines.append((op, text))
+            continue
+
+        if line.startswith("\\"):
+            # "\ No newline at end of file" applies to the previous line
+            if hunk is not None:
+                _strip_newline(hunk)
+            continue
+
+        if line.startswith("diff --git "):
+            current, hunk = None, None
+            continue
+        if line.startswith("--- "):
+            pending_old = line[4:]
+            hunk = None
+            continue
+        if line.startswith("+++ ") and pending_old is not None:
+            current = FilePatch(_strip_path(pending_old), _strip_path(line[4:]))
+            files.append(current)
+            pending_old = None
+            continue
+
+        match = _HUNK_HEADER.match(line)
+        if match:
+            if current is None:
+                raise PatchError("Hunk found before file header")
+            old_start, old_len, new_start, new_len = match.groups()
+            hunk = Hunk(
+                int(old_start),
+                1 if old_len is None else int(old_len),
+                int(new_start),
+                1 if new_len is None else int(new_len),
+            )
+            current.hunks.append(hunk)
+            old_left, new_left = hunk.old_len, hunk.new_len
+            continue
+        # Anything else (index lines, mode lines, commit text) is ignored
+
+    if hunk is not None and (old_left > 0 or new_left > 0):
+        raise PatchError("Patch ended in the middle of a hunk")
+    return files
+
+
+# ========== Application ==========
+
+class _Window:
+    """Source lines read lazily; only the unconsumed tail is kept in memory."""
+
+    def __init__(self, lines: Iterable[str]):
+        self._it = iter(lines)
+        self._buf: List[str] = []
+        self._head = 0      # Index in _buf of the first unconsumed line
+        self.base = 0       # Source line number of _buf[0]
+        self.eof = False
+
+    @property
+    def end(self) -> int:
+        """Source line number one past the last buffered line."""
+        return self.base + len(self._buf)
+
+    def fill_to(self, n: Optional[int]) -> None:
+        while not self.eof and (n is None or self.end < n):
+            try:
+                self._buf.append(next(self._it))
+            except StopIteration:
+                self.eof = True
+
+    def matches(self, start: int, expected: List[str]) -> bool:
+        offset = start - self.base
+        if offset < self._head or start + len(expected) > self.end:
+            return False
+        return self._buf[offset:offset + len(expected)] == expected
+
+    def emit_until(self, n: int, out: TextIO) -> None:
+        """Write source lines up to (not including) line n and consume them."""
+        self.fill_to(n)
+        stop = min(n, self.end) - self.base
+        if stop > self._head:
+            out.writelines(self._buf[self._head:stop])
+            self._head = stop
+        self._compact()
+
+    def skip(self, count: int) -> None:
+        self.fill_to(self.base + self._head + count)
+        self._head = min(self._head + count, len(self._buf))
+        self._compact()
+
+    def emit_rest(self, out: TextIO) -> None:
+        out.writelines(self._buf[self._head:])
+        self._buf, self._head = [], 0
+        for line in self._it:
+            out.write(line)
+        self.eof = True
+
+    def _compact(self) -> None:
+        if self._head > 4096:
+            del self._buf[:self._head]
+            self.base += self._head
+            self._head = 0
+
+
+def _fuzzed(hunk: Hunk, fuzz: int) -> Optional[Tuple[List[str], List[str], int]]:
+    """Old/new lines with up to `fuzz` context lines trimmed at each end."""
+    lines = hunk.lines
+    lead = 0
+    while lead < len(lines) and lines[lead][0] == " ":
+        lead += 1
+    trail = 0
+    while trail < len(lines) - lead and lines[len(lines) - 1 - trail][0] == " ":
+        trail += 1
+    cut_lead = min(fuzz, lead)
+    cut_trail = min(fuzz, trail)
+    if fuzz and cut_lead == 0 and cut_trail == 0:
+        return None  # Same as fuzz 0
+    body = lines[cut_lead:len(lines) - cut_trail]
+    old = [text for op, text in body if op != "+"]
+    new = [text for op, text in body if op != "-"]
+    return old, new, cut_lead
+
+
+def apply_hunks(
+    source: Iterable[str],
+    hunks: List[Hunk],
+    out: TextIO,
+    fuzz: int = PATCH_FUZZ,
+    max_offset: Optional[int] = PATCH_MAX_OFFSET,
+) -> List[HunkResult]:
+    """
+    Apply hunks to a stream of source lines, writing the result to `out`.
+
+    Hunks that don't match anywhere in their search window are skipped and
+    reported as failed; the rest of the file is still written.
+
+    Args:
+        source: Source lines with line endings (e.g. an open file)
+        hunks: Hunks in file order
+        out: Writable text stream for the patched file
+        fuzz: Max context lines ignored at each end of a hunk
+        max_offset: Max drift from the recorded position (None = whole file)
+
+    Returns:
+        One HunkResult per hunk
+    """
+    window = _Window(source)
+    results: List[HunkResult] = []
+    pos = 0    # First source line not yet consumed
+    drift = 0  # Offset at which the previous hunk applied
+
+    for index, hunk in enumerate(hunks):
+        expected = hunk.old_start if hunk.old_len == 0 else hunk.old_start - 1
+        found = None
+        for level in range(fuzz + 1):
+            variant = _fuzzed(hunk, level)
+            if variant is None:
+                continue
+            old, new, lead = variant
+            target = expected + drift + lead
+            if max_offset is None:
+                window.fill_to(None)
+                reach = max(window.end, target)
+            else:
+                reach = max_offset
+                window.fill_to(target + max_offset + len(old))
+            for delta in range(reach + 1):
+                for start in ((target + delta, target - delta) if delta else (target,)):
+                    if start < pos:
+                        continue
+                    if window.matches(start, old):
+                        found = (start, old, new, lead, level)
+                        break
+                if found:
+                    break
+                if target - delta < pos and target + delta > window.end:
+                    break
+            if found:
+                break
+
+        if found is None:
+            results.append(HunkResult(index, False, error="Hunk does not match"))
+            continue
+
+        start, old, new, lead, level = found
+        window.emit_until(start, out)
+        window.skip(len(old))
+        out.writelines(new)
+        pos = start + len(old)
+        drift = start - lead - expected
+        results.append(HunkResult(index, True, offset=drift, fuzz=level))
+
+    window.emit_rest(out)
+    return results
+
+
+def apply_to_text(
+    text: str,
+    file_patch: FilePatch,
+    fuzz: int = PATCH_FUZZ,
+    max_offset: Optional[int] = PATCH_MAX_OFFSET,
+) -> Tuple[str, FilePatchResult]:
+    """Apply a file patch to in-memory text."""
+    out = io.StringIO()
+    hunks = apply_hunks(iter_lines(text), file_patch.hunks, out, fuzz, max_offset)
+    applied = all(h.applied for h in hunks)
+    result = FilePatchResult(
+        file_patch.path,
+        applied,
+        hunks,
+        None if applied else f"{sum(not h.applied for h in hunks)} hunk(s) failed",
+    )
+    return out.getvalue(), result
+
+
+def apply_file_patch(
+    file_patch: FilePatch,
+    workspace_path: str,
+    fuzz: int = PATCH_FUZZ,
+    max_offset: Optional[int] = PATCH_MAX_OFFSET,
+    dry_run: bool = False,
+) -> FilePatchResult:
+    """
+    Apply one file patch inside a workspace.
+
+    The file is streamed into a temporary file next to it, which replaces
+    the original only if every hunk applied (nothing is written otherwise).
+    """
+    path = file_patch.path
+    root = Path(workspace_path).resolve()
+    target = (root / path).resolve()
+    if root not in target.parents:
+        return FilePatchResult(path, False, error="Path escapes the workspace")
+
+    if file_patch.is_delete:
+        if not target.exists():
+            return FilePatchResult(path, False, error="File to delete does not exist")
+        with open(target, "r", encoding="utf-8", newline="") as src:
+            results = apply_hunks(src, file_patch.hunks, _NullWriter(), fuzz, max_offset)
+        applied = all(h.applied for h in results)
+        if applied and not dry_run:
+            target.unlink()
+        return FilePatchResult(path, applied, results, None if applied else "Content does not match")
+
+    if not file_patch.is_new and not target.exists():
+        return FilePatchResult(path, False, error="File not found")
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{target.name}.", dir=str(target.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as out:
+            if target.exists():
+                with open(target, "r", encoding="utf-8", newline="") as src:
+                    results = apply_hunks(src, file_patch.hunks, out, fuzz, max_offset)
+            else:
+                results = apply_hunks([], file_patch.hunks, out, fuzz, max_offset)
+        applied = all(h.applied for h in results)
+        if applied and not dry_run:
+            if target.exists():
+                os.chmod(tmp_path, target.stat().st_mode & 0o7777)
+            os.replace(tmp_path, target)
+        return FilePatchResult(
+            path,
+            applied,
+            results,
+            None if applied else f"{sum(not h.applied for h in results)} hunk(s) failed",
+        )
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def apply_patch_to_workspace(
+    patch: str,
+    workspace_path: str,
+    fuzz: int = PATCH_FUZZ,
+    max_offset: Optional[int] = PATCH_MAX_OFFSET,
+    dry_run: bool = False,
+) -> List[FilePatchResult]:
+    """
+    Apply a (multi-file) patch to a workspace.
+
+    Each file is applied independently and atomically; check every
+    result's `applied` flag.
+    """
+    try:
+        file_patches = parse_patch(patch)
+    except PatchError as e:
+        return [FilePatchResult("", False, error=str(e))]
+    return [
+        apply_file_patch(fp, workspace_path, fuzz, max_offset, dry_run)
+        for fp in file_patches
+    ]
+
+
+class _NullWriter:
+    def write(self, _: str) -> None:
+        pass
+
+    def writelines(self, _: Iterable[str]) -> None:
+        pass
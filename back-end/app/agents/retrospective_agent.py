@@ -20,7 +20,10 @@ import json
 from app.agents.base_agent import BaseAgent
 from app.services.event_bus import EventTypes, Topics, get_event_bus
 from app.utils.workspace_manager import get_workspace_path
-from app.agents.diff_generator import generate_unified_diff
+from app.services.diff_service import get_diff_service
+from app.services.local_proposal_store import get_local_proposal_store
+from app.services.local_storage import local_transaction
+from app.services.proposal_codec import encode_proposal
 
 logger = logging.getLogger(__name__)
 
@@ -929,10 +932,10 @@ Implementing these changes will:
                 
                 # Generate diff for the new file
                 file_path = f"docs/agent_improvements_{retrospective['retrospective_id']}.md"
-                diff_content = generate_unified_diff(
-                    file_path=file_path,
-                    old_content="",  # New file - no old content
-                    new_content=proposal_description
+                diff_content = await get_diff_service().diff(
+                    file_path,
+                    "",  # New file - no old content
+                    proposal_description,
                 )
 
                 proposal_data = {
@@ -963,6 +966,13 @@ Implementing these changes will:
                     },
                 }
 
+                duplicate_id = repo.find_duplicate(proposal_data)
+                if duplicate_id:
+                    logger.info(
+                        f"[RetrospectiveAgent] Same changes already proposed in {duplicate_id}"
+                    )
+                    return duplicate_id
+
                 repo.create(proposal_data)
                 logger.info(
                     f"[RetrospectiveAgent] Proposal created in Firestore: {proposal_id}"
@@ -976,10 +986,10 @@ Implementing these changes will:
                 
                 # Generate diff for the new file
                 file_path = f"docs/agent_improvements_{retrospective['retrospective_id']}.md"
-                diff_content = generate_unified_diff(
-                    file_path=file_path,
-                    old_content="",  # New file - no old content
-                    new_content=proposal_description
+                diff_content = await get_diff_service().diff(
+                    file_path,
+                    "",  # New file - no old content
+                    proposal_description,
                 )
 
                 proposal_data = {
@@ -1010,13 +1020,18 @@ Implementing these changes will:
                     },
                 }
 
-                # Save JSON
-                with open(proposals_dir / f"{proposal_id}.json", "w") as f:
-                    json.dump(proposal_data, f, indent=2)
+                duplicate_id = get_local_proposal_store(proposals_dir).find_duplicate(proposal_data)
+                if duplicate_id:
+                    logger.info(
+                        f"[RetrospectiveAgent] Same changes already proposed in {duplicate_id}"
+                    )
+                    return duplicate_id
 
-                # Save MD
-                with open(proposals_dir / f"{proposal_id}.md", "w") as f:
-                    f.write(f"# {proposal_title}\n\n{proposal_description}")
+                # Save JSON (file contents stored as diffs, see proposal_codec) and MD
+                document = encode_proposal(proposal_data, workspace_path=str(self.workspace_path))
+                with local_transaction(proposals_dir) as tx:
+                    tx.write(proposals_dir / f"{proposal_id}.json", json.dumps(document, indent=2))
+                    tx.write(proposals_dir / f"{proposal_id}.md", f"# {proposal_title}\n\n{proposal_description}")
 
                 logger.info(
                     f"[RetrospectiveAgent] Proposal saved locally: {proposal_id}"
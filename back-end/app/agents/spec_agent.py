@@ -1,17 +1,33 @@
 import asyncio
-import difflib
 import json
 import logging
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
+from app.agents.diff_generator import generate_line_diff
 from app.agents.base_agent import BaseAgent
 from app.utils.workspace_manager import get_workspace_path
 from app.services.event_bus import EventTypes
+from app.services.diff_service import get_diff_service
+from app.services.local_proposal_store import get_local_proposal_store
+from app.services.local_storage import local_transaction
 
 logger = logging.getLogger(__name__)
 
+# Documents quoted by generate_context_summary, in order
+CONTEXT_SUMMARY_DOCUMENTS = (
+    ("README.md", "README"),
+    ("ARCHITECTURE.md", "Architecture"),
+    ("STATUS.md", "Status"),
+    ("ROADMAP.md", "Roadmap"),
+    (".contextpilot/workspace.yaml", "Workspace Metadata"),
+)
+
+# Files the context summary depends on (quoted documents plus the
+# required documents checked for issues)
+CONTEXT_SUMMARY_FILES = tuple(path for path, _ in CONTEXT_SUMMARY_DOCUMENTS) + ("PROJECT.md",)
+
 
 class SpecAgent(BaseAgent):
     """Documentation quality agent.
@@ -164,7 +180,9 @@ class SpecAgent(BaseAgent):
                 logger.warning("[SpecAgent] Could not read %s for diff generation: %s", absolute_path, exc)
 
         suggested_text = issue.get("suggested_content", existing_text)
-        diff = self._generate_diff(target_file, existing_text, suggested_text)
+        diff = await get_diff_service().diff(
+            target_file, existing_text, suggested_text, diff_fn=generate_line_diff
+        )
 
         proposal_payload = {
             "id": proposal_id,
@@ -185,33 +203,24 @@ class SpecAgent(BaseAgent):
             },
         }
 
-        # Write JSON artifact
-        json_path = self.proposals_dir / f"{proposal_id}.json"
-        json_path.write_text(json.dumps(proposal_payload, indent=2), encoding="utf-8")
-
-        # Write human-friendly markdown summary
-        markdown_path = self.proposals_dir / f"{proposal_id}.md"
-        markdown_path.write_text(
-            self._format_markdown_summary(proposal_payload, suggested_text),
-            encoding="utf-8",
-        )
+        # Skip changes already proposed (pending proposal with the same diff)
+        duplicate_id = get_local_proposal_store(self.proposals_dir).find_duplicate(proposal_payload)
+        if duplicate_id:
+            logger.info("[SpecAgent] %s already proposed in %s", target_file, duplicate_id)
+            return duplicate_id
+
+        # Write JSON artifact and human-friendly markdown summary (together, atomically)
+        with local_transaction(self.proposals_dir) as tx:
+            tx.write(self.proposals_dir / f"{proposal_id}.json", json.dumps(proposal_payload, indent=2))
+            tx.write(
+                self.proposals_dir / f"{proposal_id}.md",
+                self._format_markdown_summary(proposal_payload, suggested_text),
+            )
 
         logger.info("[SpecAgent] Created proposal %s for %s", proposal_id, target_file)
         self.increment_metric("events_published")
         return proposal_id
 
-    def _generate_diff(self, file_path: str, current: str, proposed: str) -> str:
-        current_lines = current.splitlines()
-        proposed_lines = proposed.splitlines()
-        diff_lines = difflib.unified_diff(
-            current_lines,
-            proposed_lines,
-            fromfile=f"a/{file_path}",
-            tofile=f"b/{file_path}",
-            lineterm="",
-        )
-        return "\n".join(diff_lines)
-
     def _format_markdown_summary(self, proposal: Dict[str, Any], suggested_text: str) -> str:
         issue = proposal.get("issue", {})
         diff_block = proposal.get("diff", {}).get("content", "")
@@ -253,14 +262,9 @@ class SpecAgent(BaseAgent):
             except Exception as exc:  # pragma: no cover - defensive
                 sections.append(f"## {label}\nError reading file: {exc}\n")
 
-        # Core documents
-        _read_file(self.workspace_dir / "README.md", "README")
-        _read_file(self.workspace_dir / "ARCHITECTURE.md", "Architecture")
-        _read_file(self.workspace_dir / "STATUS.md", "Status")
-        _read_file(self.workspace_dir / "ROADMAP.md", "Roadmap")
-
-        # Workspace metadata
-        _read_file(self.workspace_dir / ".contextpilot" / "workspace.yaml", "Workspace Metadata")
+        # Core documents and workspace metadata
+        for relative_path, label in CONTEXT_SUMMARY_DOCUMENTS:
+            _read_file(self.workspace_dir / relative_path, label)
 
         # Outstanding documentation issues
         try:
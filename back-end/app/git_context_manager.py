@@ -9,7 +9,7 @@ It is actively used by:
 Key responsibilities:
 - Git repository initialization and management
 - Commit operations with metadata tracking
-- Workspace context file management (checkpoint.yaml, history.json)
+- Workspace context file management (checkpoint.yaml, history.jsonl)
 - Markdown template initialization (context.md, milestones.md, timeline.md)
 - Push operations to remote repositories
 
@@ -21,18 +21,58 @@ import git
 import yaml
 import json
 import logging
+import threading
 from datetime import datetime
 from openai import OpenAI
 from app.utils.workspace_manager import get_workspace_path, ensure_workspace_exists
+from app.services import git_log_cache, history_store, local_proposal_store, local_storage, search_index
+from app.services.history_store import HistoryStore
+from app.services.git_log_cache import GitLogCache
+from app.services.git_executor import (
+    GIT_COMMAND_TIMEOUT,
+    GIT_JOB_TIMEOUT,
+    get_git_executor,
+)
+from app.services.jobs import Job
+from app.services.prompt_builder import (
+    PROMPT_TOKEN_BUDGET,
+    DiffSummarizer,
+    PromptBuilder,
+    format_history,
+)
+from app.utils.lru_cache import LRUCache
+from app.utils.markdown_document import (
+    CONTEXT_RECENT_MAX_ENTRIES,
+    TASK_HISTORY_MAX_BYTES,
+    TIMELINE_MAX_DAYS,
+    get_document,
+    is_date_section,
+)
 import shutil
 from datetime import datetime, timezone
-from typing import Optional
+from functools import partial
+from typing import Dict, List, Optional
 import httpx
 
 # Use existing logger configuration (don't reconfigure)
 logger = logging.getLogger(__name__)
 
 TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
+RECENT_ACTIVITY_SECTION = "## 🚀 Atividade Recente"
+MARKDOWN_ARCHIVE_DIR = "markdown-archive"
+# Most recent history entries loaded when building LLM prompts
+PROMPT_HISTORY_MAX_ENTRIES = int(os.getenv("LLM_PROMPT_HISTORY_MAX_ENTRIES", "200"))
+# Internal state kept in the workspace (indexes, locks), as .gitignore patterns
+# relative to it: listed in the workspace's .gitignore and never staged
+WORKSPACE_STATE_FILES = [
+    f"/{local_storage.LOCK_FILE}",  # History store lock
+    f"/{history_store.INDEX_FILE}",
+    f"/{history_store.BUCKETS_FILE}",
+    f"/proposals/{local_proposal_store.INDEX_FILE}*",  # With its -wal/-shm files
+    f"/proposals/{local_storage.LOCK_FILE}",
+    f"/proposals/{local_storage.JOURNAL_FILE}",
+    f"/{search_index.SEARCH_INDEX_FILE}*",
+]
 
 
 class Git_Context_Manager:
@@ -61,7 +101,8 @@ class Git_Context_Manager:
         logger.info(f"Context directory path: {self.context_dir}")
 
         self.checkpoint_path = os.path.join(self.context_dir, "checkpoint.yaml")
-        self.history_path = os.path.join(self.context_dir, "history.json")
+        self.history = HistoryStore(self.context_dir)
+        self.history_path = self.history.data_path
         logger.info(f"Checkpoint path: {self.checkpoint_path}")
         logger.info(f"History path: {self.history_path}")
 
@@ -74,7 +115,7 @@ class Git_Context_Manager:
             # Check if .git directory exists before trying to create Repo
             git_dir = os.path.join(git_root, ".git")
             if os.path.isdir(git_dir) or os.path.isfile(git_dir):  # .git can be a file (worktree) or dir
-                self.repo = git.Repo(git_root, search_parent_directories=True)
+                self.repo = _open_repo(git_root)
                 self.project_root = self.repo.working_tree_dir
                 logger.info(f"Git repository initialized. Project root: {self.project_root}")
             else:
@@ -88,7 +129,7 @@ class Git_Context_Manager:
                 else:
                     # In local mode, try anyway (might be a bare repo or submodule)
                     try:
-                        self.repo = git.Repo(git_root, search_parent_directories=True)
+                        self.repo = _open_repo(git_root)
                         self.project_root = self.repo.working_tree_dir if self.repo.working_tree_dir else git_root
                         logger.info(f"Git repository initialized (bare or submodule). Project root: {self.project_root}")
                     except Exception as e:
@@ -110,13 +151,7 @@ class Git_Context_Manager:
 
         logger.info(f"Creating context directory: {self.context_dir}")
         os.makedirs(self.context_dir, exist_ok=True)
-
-        if not os.path.exists(self.history_path):
-            logger.info(f"Creating new history file: {self.history_path}")
-            with open(self.history_path, "w") as f:
-                json.dump([], f)
-        else:
-            logger.info(f"History file already exists: {self.history_path}")
+        self._ensure_gitignore()
 
         # Initialize markdown files from templates (always check)
         logger.info("Checking and initializing markdown files from templates...")
@@ -124,6 +159,37 @@ class Git_Context_Manager:
 
         logger.info("Git_Context_Manager initialization completed")
 
+    def _ensure_gitignore(self):
+        """Add missing WORKSPACE_STATE_FILES patterns to the workspace's .gitignore."""
+        gitignore_path = os.path.join(self.context_dir, ".gitignore")
+        try:
+            with open(gitignore_path, "r", encoding="utf-8") as f:
+                content = f.read()
+        except FileNotFoundError:
+            content = ""
+        except OSError as e:
+            logger.warning(f"Could not read {gitignore_path}: {e}")
+            return
+        existing = set(content.splitlines())
+        missing = [pattern for pattern in WORKSPACE_STATE_FILES if pattern not in existing]
+        if not missing:
+            return
+        if content and not content.endswith("\n"):
+            content += "\n"
+        try:
+            with open(gitignore_path, "w", encoding="utf-8") as f:
+                f.write(content + "\n".join(missing) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not update {gitignore_path}: {e}")
+
+    def is_valid(self) -> bool:
+        """Cheap check that a cached manager still points at live paths."""
+        if not os.path.isdir(self.context_dir) or not os.path.exists(self.checkpoint_path):
+            return False
+        if self.repo is not None and not os.path.exists(self.repo.git_dir):
+            return False
+        return True
+
     def find_git_root(self):
         """Find git root directory, or return workspace path if git is not available (Cloud Run mode)."""
         logger.info("Starting git root search...")
@@ -163,9 +229,8 @@ class Git_Context_Manager:
         )
 
         try:
-            # Get current context to personalize templates
-            context = self.get_project_context()
-            checkpoint = context.get("checkpoint", {})
+            # Get current checkpoint to personalize templates
+            checkpoint = self._load_checkpoint()
             project_name = checkpoint.get("project_name", "Unknown Project")
             goal = checkpoint.get("goal", "No goal defined")
             current_status = checkpoint.get("current_status", "No status")
@@ -275,84 +340,108 @@ class Git_Context_Manager:
         logger.info(f"Template {filename} personalized successfully")
         return personalized
 
-    def _update_context_file(self, context_path: str, entry: dict):
+    def _update_task_history_file(self, task_history_path: str, entries: list):
+        """Append entries to task_history.md, rotating it once it gets too large."""
+        doc = get_document(task_history_path)
+        if not doc.exists():
+            logger.info("Creating new task_history.md file")
+            doc.append(self._task_history_header())
+
+        with doc.batch():
+            for entry in entries:
+                doc.append(
+                    f"\n### {entry['timestamp']}\n"
+                    f"- **Agent**: {entry['agent']}\n"
+                    f"- **Message**: {entry['message']}\n"
+                    f"- **Commit**: {entry['commit']}\n"
+                )
+
+        if 0 < TASK_HISTORY_MAX_BYTES < os.path.getsize(task_history_path):
+            doc.rotate_if_larger(
+                TASK_HISTORY_MAX_BYTES,
+                os.path.join(self.context_dir, MARKDOWN_ARCHIVE_DIR),
+                header=self._task_history_header(),
+            )
+        logger.info("Task history updated successfully")
+
+    def _task_history_header(self) -> str:
+        # Get checkpoint for project name
+        checkpoint = self._load_checkpoint()
+        return f"# 📝 {checkpoint.get('project_name', 'Project')} — Task History\n\n"
+
+    def _update_context_file(self, context_path: str, entries: list):
         """Update context.md with latest status and recent activity."""
         try:
-            # Read current content
-            with open(context_path, "r", encoding="utf-8") as f:
-                content = f.read()
-
-            # Add recent activity section if not present
-            if "## 🚀 Atividade Recente" not in content:
-                content += "\n\n## 🚀 Atividade Recente\n"
-
-            # Add new entry to recent activity
-            activity_entry = f"\n### {entry['timestamp'][:10]}\n"
-            activity_entry += f"- **{entry['agent']}**: {entry['message']}\n"
-
-            # Insert at the end of recent activity section
-            if "## 🚀 Atividade Recente" in content:
-                lines = content.split("\n")
-                for i, line in enumerate(lines):
-                    if line.strip() == "## 🚀 Atividade Recente":
-                        # Find the end of this section
-                        j = i + 1
-                        while j < len(lines) and not lines[j].startswith("## "):
-                            j += 1
-                        lines.insert(j, activity_entry)
-                        break
-                content = "\n".join(lines)
-
-            # Write updated content
-            with open(context_path, "w", encoding="utf-8") as f:
-                f.write(content)
+            doc = get_document(context_path)
+            with doc.batch():
+                for entry in entries:
+                    doc.append_to_section(
+                        RECENT_ACTIVITY_SECTION,
+                        f"\n### {entry['timestamp'][:10]}\n"
+                        f"- **{entry['agent']}**: {entry['message']}\n",
+                    )
+            # Keep only the most recent activity entries
+            doc.trim_section(RECENT_ACTIVITY_SECTION, CONTEXT_RECENT_MAX_ENTRIES)
 
             logger.info("Context.md updated successfully")
         except Exception as e:
             logger.error(f"Error updating context.md: {str(e)}")
 
-    def _update_timeline_file(self, timeline_path: str, entry: dict):
-        """Update timeline.md with new timeline entry."""
+    def _update_timeline_file(self, timeline_path: str, entries: list):
+        """Update timeline.md with new timeline entries."""
         try:
-            # Read current content
-            with open(timeline_path, "r", encoding="utf-8") as f:
-                content = f.read()
-
-            # Extract date from timestamp
-            date = entry["timestamp"][:10]
-
-            # Check if date section already exists
-            if f"## {date}" in content:
-                # Add to existing date section
-                lines = content.split("\n")
-                for i, line in enumerate(lines):
-                    if line.strip() == f"## {date}":
-                        # Find the end of this section
-                        j = i + 1
-                        while j < len(lines) and not lines[j].startswith("## "):
-                            j += 1
-                        lines.insert(j, f"- {entry['agent']}: {entry['message']}")
-                        break
-                content = "\n".join(lines)
-            else:
-                # Add new date section
-                content += f"\n\n## {date}\n"
-                content += f"- {entry['agent']}: {entry['message']}\n"
-
-            # Write updated content
-            with open(timeline_path, "w", encoding="utf-8") as f:
-                f.write(content)
+            doc = get_document(timeline_path)
+            with doc.batch():
+                for entry in entries:
+                    # Date sections are keyed by the entry's date
+                    doc.append_to_section(
+                        f"## {entry['timestamp'][:10]}",
+                        f"- {entry['agent']}: {entry['message']}\n",
+                    )
+            # Move old days out of the live timeline
+            doc.archive_sections(
+                is_date_section,
+                TIMELINE_MAX_DAYS,
+                os.path.join(self.context_dir, MARKDOWN_ARCHIVE_DIR, "timeline-archive.md"),
+            )
 
             logger.info("Timeline.md updated successfully")
         except Exception as e:
             logger.error(f"Error updating timeline.md: {str(e)}")
 
-    def query_llm(self, prompt: str, context: dict) -> str:
-        """Query OpenAI LLM with project context for coaching insights."""
+    def _update_markdown_files(self, entries: list):
+        """Write history entries to task_history.md, context.md and timeline.md."""
+        if not entries:
+            return
+
+        task_history_path = os.path.join(self.context_dir, "task_history.md")
+        logger.info(f"Appending to task history: {task_history_path}")
+        self._update_task_history_file(task_history_path, entries)
+
+        context_path = os.path.join(self.context_dir, "context.md")
+        if os.path.exists(context_path):
+            logger.info(f"Updating context.md with latest status")
+            self._update_context_file(context_path, entries)
+
+        timeline_path = os.path.join(self.context_dir, "timeline.md")
+        if os.path.exists(timeline_path):
+            logger.info(f"Updating timeline.md with new entry")
+            self._update_timeline_file(timeline_path, entries)
+
+    def query_llm(self, prompt: str, context: Optional[dict] = None) -> str:
+        """
+        Query OpenAI LLM with project context for coaching insights.
+
+        The context is rendered under PROMPT_TOKEN_BUDGET (see
+        build_context_prompt). If no context is given, the checkpoint and
+        the most recent history entries are loaded.
+        """
         if not self.client:
             return "OpenAI API not configured. Set OPENAI_API_KEY in .env file"
         try:
-            context_summary = json.dumps(context, indent=2)
+            if context is None:
+                context = self.get_project_context(history_limit=PROMPT_HISTORY_MAX_ENTRIES)
+            context_summary = self.build_context_prompt(context)
             messages = [
                 {
                     "role": "system",
@@ -370,12 +459,75 @@ class Git_Context_Manager:
         except Exception as e:
             return f"Error querying LLM: {str(e)}"
 
-    def get_project_context(self, include_temporal: bool = False):
+    def build_context_prompt(
+        self, context: dict, budget_tokens: int = PROMPT_TOKEN_BUDGET
+    ) -> str:
+        """
+        Render project context for a prompt within a token budget.
+
+        Sections by priority: checkpoint, recent history (older entries
+        rolled up), temporal Git context, anything else. Lower-priority
+        sections are truncated or dropped when the budget runs out.
+
+        Args:
+            context: Dict as returned by get_project_context (history may be a tail)
+            budget_tokens: Max tokens for the rendered context
+
+        Returns:
+            Context text for the prompt
+        """
+        builder = PromptBuilder(budget_tokens)
+        checkpoint = context.get("checkpoint") or {}
+        builder.add(
+            "checkpoint",
+            f"Checkpoint:\n{yaml.dump(checkpoint, allow_unicode=True, sort_keys=False)}",
+            priority=0,
+        )
+
+        history = context.get("history") or []
+        total = max(len(history), len(self.history))
+        first = self.history.get(0) if total > len(history) else None
+        history_budget = max(builder.remaining() // 2, 256)
+        builder.add(
+            "history",
+            "History (newest first):\n"
+            + format_history(
+                history,
+                history_budget,
+                total_count=total,
+                first_timestamp=(first or {}).get("timestamp"),
+            ),
+            priority=1,
+        )
+
+        if context.get("temporal"):
+            builder.add(
+                "temporal",
+                f"Git activity:\n{json.dumps(context['temporal'], indent=2, default=str)}",
+                priority=2,
+            )
+        extra = {k: v for k, v in context.items() if k not in ("checkpoint", "history", "temporal")}
+        if extra:
+            builder.add("extra", json.dumps(extra, indent=2, default=str), priority=3)
+
+        return builder.build()
+
+    def _load_checkpoint(self) -> dict:
+        """Load checkpoint.yaml only (no history)."""
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                return yaml.safe_load(f) or {}
+        return {}
+
+    def get_project_context(
+        self, include_temporal: bool = False, history_limit: Optional[int] = None
+    ):
         """
-        Load project context from checkpoint.yaml and history.json.
+        Load project context from checkpoint.yaml and the history log.
         
         Args:
             include_temporal: If True, include Git log temporal context
+            history_limit: Only include the last N history entries (None = all)
             
         Returns:
             dict with checkpoint, history, and optionally temporal data
@@ -384,9 +536,10 @@ class Git_Context_Manager:
         if os.path.exists(self.checkpoint_path):
             with open(self.checkpoint_path) as f:
                 context["checkpoint"] = yaml.safe_load(f)
-        if os.path.exists(self.history_path):
-            with open(self.history_path) as f:
-                context["history"] = json.load(f)
+        if history_limit is None:
+            context["history"] = self.history.read_all()
+        else:
+            context["history"] = self.history.tail(history_limit)
         
         # Add temporal context from Git if requested
         if include_temporal:
@@ -419,14 +572,82 @@ class Git_Context_Manager:
         except Exception as e:
             logger.error(f"Error tracking reward: {e}")
 
-    def commit_changes(self, message: str, agent: str = "manual", allow_empty: bool = False):
+    @property
+    def repo_key(self) -> str:
+        """Identity used to serialize git work on this manager's repository."""
+        return self.repo.git_dir if self.repo is not None else self.context_dir
+
+    def _repo_paths(self, paths: List[str]) -> List[str]:
+        """Convert paths to repository-relative paths, dropping paths outside the repo."""
+        rel_paths = []
+        for path in paths:
+            abs_path = path if os.path.isabs(path) else os.path.join(self.project_root, path)
+            rel = os.path.relpath(abs_path, self.repo.working_tree_dir)
+            if rel.startswith(".."):
+                logger.debug(f"Skipping path outside repository: {path}")
+                continue
+            rel_paths.append(rel)
+        return rel_paths
+
+    def _state_excludes(self) -> List[str]:
+        """
+        Pathspecs excluding WORKSPACE_STATE_FILES that are already tracked.
+
+        Untracked ones are covered by the workspace's .gitignore (and git
+        rejects exclude pathspecs naming ignored files).
+        """
+        workspace = self._repo_paths([self.context_dir])
+        if not workspace:
+            return []
+        prefix = "" if workspace[0] == "." else workspace[0].replace(os.sep, "/") + "/"
+        tracked = self.repo.git.ls_files(
+            "--",
+            *(f":(glob){prefix}{pattern.lstrip('/')}" for pattern in WORKSPACE_STATE_FILES),
+            kill_after_timeout=GIT_COMMAND_TIMEOUT,
+        )
+        return [f":(exclude,literal){path}" for path in tracked.splitlines()]
+
+    def _stage(self, paths: Optional[List[str]] = None):
+        """Stage `paths` (or everything with `git add -A` when paths is None)."""
+        excludes = self._state_excludes()
+        if paths is None:
+            self.repo.git.add("-A", "--", ".", *excludes, kill_after_timeout=GIT_COMMAND_TIMEOUT)
+            return
+
+        rel_paths = self._repo_paths(paths)
+        existing = [p for p in rel_paths if os.path.exists(os.path.join(self.repo.working_tree_dir, p))]
+        missing = [p for p in rel_paths if p not in existing]
+        if existing:
+            self.repo.git.add("-A", "--", *existing, *excludes, kill_after_timeout=GIT_COMMAND_TIMEOUT)
+        if missing:
+            # Stage deletions of tracked files; untracked missing paths are ignored
+            self.repo.git.rm(
+                "--cached", "--ignore-unmatch", "-r", "-q", "--", *missing,
+                kill_after_timeout=GIT_COMMAND_TIMEOUT,
+            )
+
+    def _has_staged_changes(self) -> bool:
+        return self.repo.is_dirty(index=True, working_tree=False, untracked_files=False)
+
+    def commit_changes(
+        self,
+        message: str,
+        agent: str = "manual",
+        allow_empty: bool = False,
+        paths: Optional[List[str]] = None,
+    ):
         """
         Create git commit with metadata tracking and reward integration.
 
+        Runs under the repository lock shared with the git executor, so it
+        never races other git work on the same repository.
+
         Args:
             message: Commit message
             agent: Agent name for tracking
             allow_empty: If True, allow commit even with no changes (for temporal markers)
+            paths: Only stage these paths (plus the workspace context files).
+                None stages the whole working tree (`git add -A`).
 
         Returns:
             Commit hash or "SKIPPED_NO_CHANGES" if nothing to commit (unless allow_empty=True)
@@ -437,10 +658,19 @@ class Git_Context_Manager:
             logger.info(f"Would commit with message: '{message}' from agent: {agent}")
             # Return a placeholder - actual commits happen via GitHub API in Cloud Run
             return "CLOUD_RUN_MODE"  # Indicates commit should be done via API
-        
+
+        with get_git_executor().repo_lock(self.repo_key):
+            return self._commit_changes_locked(message, agent, allow_empty, paths)
+
+    def _commit_changes_locked(
+        self, message: str, agent: str, allow_empty: bool, paths: Optional[List[str]]
+    ):
         logger.info(f"Starting commit with message: '{message}' from agent: {agent} (allow_empty={allow_empty})")
+        # Workspace context files are rewritten by every commit (history, markdown)
+        if paths is not None:
+            paths = list(paths) + [self.context_dir]
         try:
-            logger.info("Adding all files to git...")
+            logger.info("Staging files..." if paths is not None else "Adding all files to git...")
 
             # For temporal markers, add a small timestamp to context.md to ensure there's something to commit
             if allow_empty:
@@ -458,11 +688,11 @@ class Git_Context_Manager:
                         f.write(f"# Project Context\n\n<!-- Temporal marker: {datetime.now(timezone.utc).isoformat()} -->\n")
                     logger.info(f"Created context.md for temporal marker")
 
-            self.repo.git.add(A=True)
+            self._stage(paths)
             logger.info("Files added successfully.")
 
             # Check if there's anything to commit
-            if not self.repo.is_dirty(untracked_files=True):
+            if not self._has_staged_changes():
                 if allow_empty:
                     logger.info("No changes detected, but allow_empty=True - creating empty commit for temporal marker")
                     # Create empty commit using --allow-empty
@@ -516,11 +746,11 @@ class Git_Context_Manager:
             self.log_history(message=message, agent=agent, commit=commit.hexsha)
 
             # Check for new changes after first commit (safety check)
-            if self.repo is not None and self.repo.is_dirty(untracked_files=True):
+            self._stage(paths)
+            if self._has_staged_changes():
                 logger.info(
                     "Detected new changes after first commit. Adding and committing final changes before push..."
                 )
-                self.repo.git.add(A=True)
                 final_message = f"Final auto-commit before push by {agent}"
                 final_commit = self.repo.index.commit(final_message)
                 logger.info(f"✅ Extra commit created with hash: {final_commit.hexsha}")
@@ -539,10 +769,10 @@ class Git_Context_Manager:
 
     def log_history(self, message: str, agent: str, commit: str = "???????"):
         """
-        Log commit to history.json and update markdown documentation files.
+        Log commit to the history log and update markdown documentation files.
 
         Updates:
-        - history.json: Structured commit log
+        - history.jsonl: Append-only structured commit log
         - task_history.md: Full task history
         - context.md: Recent activity section
         - timeline.md: Timeline by date
@@ -566,56 +796,42 @@ class Git_Context_Manager:
         logger.debug(f"History entry: {entry}")
 
         try:
-            if os.path.exists(self.history_path):
-                logger.info(f"Reading existing history from: {self.history_path}")
-                with open(self.history_path) as f:
-                    history = json.load(f)
-                logger.info(f"Loaded {len(history)} existing history entries")
-            else:
-                logger.info("No existing history file found, creating new history")
-                history = []
+            seq = self.history.append(entry)
+            logger.info(f"History entry #{seq} appended to: {self.history_path}")
 
-            history.append(entry)
-            logger.info(
-                f"Writing {len(history)} history entries to: {self.history_path}"
-            )
-            with open(self.history_path, "w") as f:
-                json.dump(history, f, indent=2)
-            logger.info("History file updated successfully")
-
-            # Update task_history.md with new entry
-            task_history_path = os.path.join(self.context_dir, "task_history.md")
-            logger.info(f"Appending to task history: {task_history_path}")
-
-            # Get checkpoint for project name
-            checkpoint = self.get_project_context().get("checkpoint", {})
-
-            if not os.path.exists(task_history_path):
-                logger.info("Creating new task_history.md file")
-                with open(task_history_path, "w", encoding="utf-8") as f:
-                    f.write(
-                        f"# 📝 {checkpoint.get('project_name', 'Project')} — Task History\n\n"
-                    )
+            # Update task_history.md, context.md and timeline.md
+            self._update_markdown_files([entry])
 
-            with open(task_history_path, "a", encoding="utf-8") as f:
-                f.write(f"\n### {entry['timestamp']}\n")
-                f.write(f"- **Agent**: {entry['agent']}\n")
-                f.write(f"- **Message**: {entry['message']}\n")
-                f.write(f"- **Commit**: {entry['commit']}\n")
-            logger.info("Task history updated successfully")
+        except Exception as e:
+            logger.error(f"Error logging history: {str(e)}")
+            raise
 
-            context_path = os.path.join(self.context_dir, "context.md")
-            if os.path.exists(context_path):
-                logger.info(f"Updating context.md with latest status")
-                self._update_context_file(context_path, entry)
+    def log_history_batch(self, records: list):
+        """
+        Log several history entries with a single write per markdown file.
 
-            timeline_path = os.path.join(self.context_dir, "timeline.md")
-            if os.path.exists(timeline_path):
-                logger.info(f"Updating timeline.md with new entry")
-                self._update_timeline_file(timeline_path, entry)
+        Args:
+            records: List of dicts with message, agent and optional commit
+        """
+        timestamp = datetime.now(timezone.utc).isoformat()
+        entries = [
+            {
+                "timestamp": timestamp,
+                "message": record["message"],
+                "agent": record["agent"],
+                "commit": record.get("commit", "???????"),
+                "summary": self._summarize_message(record["message"]),
+            }
+            for record in records
+        ]
+        logger.info(f"Logging {len(entries)} history entries in one batch")
 
+        try:
+            for entry in entries:
+                self.history.append(entry)
+            self._update_markdown_files(entries)
         except Exception as e:
-            logger.error(f"Error logging history: {str(e)}")
+            logger.error(f"Error logging history batch: {str(e)}")
             raise
 
     def _summarize_message(self, msg: str) -> str:
@@ -626,6 +842,22 @@ class Git_Context_Manager:
             return msg.splitlines()[0]
         return msg
 
+    def _get_git_log_cache(self) -> Optional[GitLogCache]:
+        """Return the persistent git log cache (None in Cloud Run mode)."""
+        if self.repo is None:
+            return None
+        if getattr(self, "_git_log_cache", None) is None:
+            self._git_log_cache = GitLogCache(self.repo)
+            # Older versions kept the cache in the workspace, where it got committed
+            legacy_path = os.path.join(self.context_dir, git_log_cache.CACHE_FILE)
+            if os.path.exists(legacy_path):
+                try:
+                    os.remove(legacy_path)
+                    logger.info(f"Removed legacy git log cache {legacy_path}")
+                except OSError as e:
+                    logger.warning(f"Could not remove legacy git log cache {legacy_path}: {e}")
+        return self._git_log_cache
+
     def get_git_log(self, since_days: Optional[int] = None, max_commits: int = 50) -> list:
         """
         Get Git commit history to situate agents in time.
@@ -637,6 +869,9 @@ class Git_Context_Manager:
         - message
         - date (formatted)
         
+        Served from the incremental git log cache: only commits made since
+        the last cached HEAD are read from git.
+        
         Args:
             since_days: Only get commits from last N days (None = all)
             max_commits: Maximum number of commits to return
@@ -644,92 +879,15 @@ class Git_Context_Manager:
         Returns:
             List of commit dicts with temporal context
         """
-        if self.repo is None:
+        cache = self._get_git_log_cache()
+        if cache is None:
             logger.warning("Git repository not available (Cloud Run mode) - cannot get git log")
             return []
         
         try:
-            # Build git log command
-            log_format = "--pretty=format:%H|%an|%ae|%ad|%s"
-            date_format = "--date=iso-strict"
-            cmd = ["log", log_format, date_format]
-            
-            if since_days:
-                cmd.append(f"--since={since_days} days ago")
-            
-            if max_commits:
-                cmd.append(f"-{max_commits}")
-            
-            # Execute git log
-            log_output = self.repo.git.execute(cmd)
-            
-            if not log_output:
-                logger.info("No commits found in git log")
-                return []
-            
-            commits = []
-            for line in log_output.strip().split('\n'):
-                if not line:
-                    continue
-                
-                parts = line.split('|', 4)
-                if len(parts) < 5:
-                    continue
-                
-                commit_hash, author_name, author_email, commit_date, message = parts
-                
-                # Parse date
-                # Git date format: "2025-11-10 15:15:03 -0300"
-                dt = None
-                try:
-                    # Git log with --date=iso-strict gives: "2025-11-10T15:15:03-03:00"
-                    # But sometimes it's: "2025-11-10 15:15:03 -0300"
-                    if 'T' in commit_date:
-                        # ISO format with T separator
-                        dt = datetime.fromisoformat(commit_date)
-                    elif ' ' in commit_date:
-                        # Space-separated format: "2025-11-10 15:15:03 -0300"
-                        parts = commit_date.split(' ')
-                        if len(parts) >= 3:
-                            date_part = parts[0]
-                            time_part = parts[1]
-                            tz_part = parts[2]
-                            # Format timezone: "-0300" -> "-03:00"
-                            if len(tz_part) == 5 and tz_part[0] in ['+', '-']:
-                                tz_formatted = f"{tz_part[:3]}:{tz_part[3:]}"
-                            else:
-                                tz_formatted = tz_part
-                            dt_str = f"{date_part}T{time_part}{tz_formatted}"
-                            dt = datetime.fromisoformat(dt_str)
-                        else:
-                            # Just date and time, no timezone
-                            dt_str = commit_date.replace(' ', 'T')
-                            dt = datetime.fromisoformat(dt_str)
-                    else:
-                        # Try direct ISO format
-                        dt = datetime.fromisoformat(commit_date)
-                    
-                    date_str = dt.strftime('%Y-%m-%d')
-                    time_str = dt.strftime('%H:%M:%S')
-                except Exception as e:
-                    logger.warning(f"Failed to parse commit date: {commit_date}, error: {e}")
-                    date_str = commit_date.split(' ')[0] if ' ' in commit_date else commit_date.split('T')[0] if 'T' in commit_date else commit_date
-                    time_str = ""
-                
-                commits.append({
-                    "commit": commit_hash,
-                    "author": author_name,
-                    "email": author_email,
-                    "date": commit_date,
-                    "date_formatted": date_str,
-                    "time": time_str,
-                    "message": message,
-                    "timestamp": dt.isoformat() if dt else commit_date
-                })
-            
-            logger.info(f"Retrieved {len(commits)} commits from git log")
+            commits = cache.commits_since(since_days=since_days, max_commits=max_commits)
+            logger.info(f"Retrieved {len(commits)} commits from git log cache")
             return commits
-            
         except Exception as e:
             logger.error(f"Error getting git log: {str(e)}")
             return []
@@ -744,43 +902,38 @@ class Git_Context_Manager:
         - Activity timeline
         - Recent changes summary
         
+        Built from the git log cache rollups (per day / per author), so the
+        history is never rescanned.
+        
         Args:
             since_days: How many days back to look (default: 30)
             
         Returns:
             Dict with temporal context information
         """
-        commits = self.get_git_log(since_days=since_days, max_commits=100)
+        no_history = {
+            "has_git_history": False,
+            "message": "No git history available (Cloud Run mode or new repository)"
+        }
+        cache = self._get_git_log_cache()
+        if cache is None:
+            return no_history
         
-        if not commits:
-            return {
-                "has_git_history": False,
-                "message": "No git history available (Cloud Run mode or new repository)"
-            }
+        try:
+            window = cache.window(since_days=since_days, recent=10)
+        except Exception as e:
+            logger.error(f"Error getting temporal context: {str(e)}")
+            return no_history
         
-        # Group commits by date
-        commits_by_date = {}
-        for commit in commits:
-            date = commit.get("date_formatted", "unknown")
-            if date not in commits_by_date:
-                commits_by_date[date] = []
-            commits_by_date[date].append(commit)
+        commits_by_date = window["by_day"]
+        if not commits_by_date:
+            return no_history
         
         # Calculate stats
-        total_commits = len(commits)
+        total_commits = sum(commits_by_date.values())
         unique_days = len(commits_by_date)
         avg_commits_per_day = total_commits / unique_days if unique_days > 0 else 0
-        
-        # Get most recent commit
-        most_recent = commits[0] if commits else None
-        
-        # Get commits by author
-        authors = {}
-        for commit in commits:
-            author = commit.get("author", "unknown")
-            if author not in authors:
-                authors[author] = 0
-            authors[author] += 1
+        recent_commits = window["recent"]
         
         return {
             "has_git_history": True,
@@ -788,20 +941,17 @@ class Git_Context_Manager:
             "period_days": since_days,
             "unique_days_with_commits": unique_days,
             "avg_commits_per_day": round(avg_commits_per_day, 2),
-            "most_recent_commit": most_recent,
-            "commits_by_author": authors,
-            "commits_by_date": {
-                date: len(commits_list) 
-                for date, commits_list in commits_by_date.items()
-            },
-            "recent_commits": commits[:10],  # Last 10 commits
+            "most_recent_commit": recent_commits[0] if recent_commits else None,
+            "commits_by_author": window["by_author"],
+            "commits_by_date": commits_by_date,
+            "recent_commits": recent_commits,  # Last 10 commits
             "timeline": [
                 {
                     "date": date,
-                    "commits": len(commits_list),
-                    "messages": [c["message"] for c in commits_list[:3]]  # Sample messages
+                    "commits": count,
+                    "messages": window["samples_by_day"].get(date, [])  # Sample messages
                 }
-                for date, commits_list in sorted(commits_by_date.items(), reverse=True)[:7]  # Last 7 days
+                for date, count in sorted(commits_by_date.items(), reverse=True)[:7]  # Last 7 days
             ]
         }
     
@@ -810,7 +960,8 @@ class Git_Context_Manager:
         if self.repo is None:
             logger.warning("Git repository not available (Cloud Run mode) - cannot generate diff")
             return ""  # Return empty diff in Cloud Run mode
-        return self.repo.git.diff(None)
+        with get_git_executor().repo_lock(self.repo_key):
+            return self.repo.git.diff(None, kill_after_timeout=GIT_COMMAND_TIMEOUT)
 
     def summarize_diff_for_commit(self, diff: str) -> str:
         """
@@ -828,20 +979,22 @@ class Git_Context_Manager:
             if not diff.strip():
                 return "No changes detected for automatic commit."
 
-            prompt = (
-                "You are an assistant that summarizes code changes into commit messages.\n"
-                "Summarize the following Git diff into a commit message:\n\n"
-                f"{diff}\n\nCommit message:"
-            )
-
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.5,
-                max_tokens=100,
-            )
+            summarizer = DiffSummarizer(self._complete)
+            if summarizer.fits(diff):
+                prompt = (
+                    "You are an assistant that summarizes code changes into commit messages.\n"
+                    "Summarize the following Git diff into a commit message:\n\n"
+                    f"{diff}\n\nCommit message:"
+                )
+            else:
+                # Large diff: summarize chunks first (map-reduce, cached per chunk)
+                prompt = (
+                    "You are an assistant that summarizes code changes into commit messages.\n"
+                    "Write a commit message for a Git diff described by these change summaries:\n\n"
+                    f"{summarizer.condense(diff)}\n\nCommit message:"
+                )
 
-            return response.choices[0].message.content.strip()
+            return self._complete(prompt, max_tokens=100, temperature=0.5)
 
         except Exception as e:
             return f"Error calling OpenAI: {str(e)}"
@@ -868,19 +1021,26 @@ class Git_Context_Manager:
                 "OpenAI API não configurada. Configure OPENAI_API_KEY no arquivo .env"
             )
 
-        state = self.get_project_context()
+        state = self.get_project_context(history_limit=PROMPT_HISTORY_MAX_ENTRIES)
         prompt = (
             "You are a helpful assistant for managing software development projects. "
             "Based on the following checkpoint and history, respond concisely to the user:\n\n"
-            f"Checkpoint:\n{yaml.dump(state.get('checkpoint', {}))}\n"
-            f"History:\n{json.dumps(state.get('history', []), indent=2)}\n\n"
+            f"{self.build_context_prompt(state)}\n\n"
             f"Question: {question}"
         )
 
+        return self._complete(prompt, temperature=0.3)
+
+    def _complete(
+        self, prompt: str, max_tokens: Optional[int] = None, temperature: float = 0.3
+    ) -> str:
+        """Single-message chat completion (raises on API errors)."""
+        kwargs = {"max_tokens": max_tokens} if max_tokens else {}
         response = self.client.chat.completions.create(
             model="gpt-4",
             messages=[{"role": "user", "content": prompt}],
-            temperature=0.3,
+            temperature=temperature,
+            **kwargs,
         )
         return response.choices[0].message.content.strip()
 
@@ -896,7 +1056,8 @@ class Git_Context_Manager:
         )
         try:
             remote = self.repo.remote(remote_name)
-            push_info = remote.push(branch)
+            with get_git_executor().repo_lock(self.repo_key):
+                push_info = remote.push(branch, kill_after_timeout=GIT_COMMAND_TIMEOUT)
             logger.info("✅ Push completed successfully.")
             return {"status": "success", "details": str(push_info)}
         except Exception as e:
@@ -915,17 +1076,19 @@ class Git_Context_Manager:
         """
         logger.info("Starting combined commit and push...")
 
-        # Commit
-        commit_result = self.commit_changes(message=message, agent=agent)
-        if not commit_result:
-            logger.warning("No changes to commit. Skipping push.")
-            return {
-                "status": "error",
-                "message": "No changes to commit, skipping push.",
-            }
+        # Hold the repository lock across both steps
+        with get_git_executor().repo_lock(self.repo_key):
+            # Commit
+            commit_result = self.commit_changes(message=message, agent=agent)
+            if not commit_result:
+                logger.warning("No changes to commit. Skipping push.")
+                return {
+                    "status": "error",
+                    "message": "No changes to commit, skipping push.",
+                }
 
-        # Push
-        push_result = self.push_changes(remote_name=remote_name, branch=branch)
+            # Push
+            push_result = self.push_changes(remote_name=remote_name, branch=branch)
         if push_result["status"] == "success":
             logger.info("✅ Commit and push completed successfully.")
             return {
@@ -937,6 +1100,88 @@ class Git_Context_Manager:
             logger.error(f"❌ Push failed: {push_result['message']}")
             return {"status": "error", "message": push_result["message"]}
 
+    # ========== Non-blocking git operations ==========
+
+    def _run_git_job(self, kind: str, fn, timeout: Optional[float], metadata: Optional[dict] = None):
+        return get_git_executor().run(
+            self.repo_key, fn, kind=kind, workspace_id=self.workspace_id,
+            timeout=timeout, metadata=metadata,
+        )
+
+    def _submit_git_job(self, kind: str, fn, timeout: Optional[float], metadata: Optional[dict] = None) -> Job:
+        return get_git_executor().submit(
+            self.repo_key, fn, kind=kind, workspace_id=self.workspace_id,
+            timeout=timeout, metadata=metadata,
+        )
+
+    async def commit_changes_async(
+        self,
+        message: str,
+        agent: str = "manual",
+        allow_empty: bool = False,
+        paths: Optional[List[str]] = None,
+        timeout: Optional[float] = GIT_JOB_TIMEOUT,
+    ):
+        """commit_changes() on the repository's git queue, awaited without blocking the loop."""
+        return await self._run_git_job(
+            "commit",
+            partial(self.commit_changes, message, agent, allow_empty, paths),
+            timeout,
+            {"message": message[:100], "agent": agent},
+        )
+
+    def submit_commit(
+        self,
+        message: str,
+        agent: str = "manual",
+        allow_empty: bool = False,
+        paths: Optional[List[str]] = None,
+        timeout: Optional[float] = GIT_JOB_TIMEOUT,
+    ) -> Job:
+        """Queue commit_changes() and return the job immediately."""
+        return self._submit_git_job(
+            "commit",
+            partial(self.commit_changes, message, agent, allow_empty, paths),
+            timeout,
+            {"message": message[:100], "agent": agent},
+        )
+
+    async def push_changes_async(
+        self, remote_name: str = "origin", branch: str = "main",
+        timeout: Optional[float] = GIT_JOB_TIMEOUT,
+    ):
+        """push_changes() on the repository's git queue."""
+        return await self._run_git_job(
+            "push", partial(self.push_changes, remote_name, branch), timeout,
+            {"remote": remote_name, "branch": branch},
+        )
+
+    def submit_push(
+        self, remote_name: str = "origin", branch: str = "main",
+        timeout: Optional[float] = GIT_JOB_TIMEOUT,
+    ) -> Job:
+        """Queue push_changes() and return the job immediately."""
+        return self._submit_git_job(
+            "push", partial(self.push_changes, remote_name, branch), timeout,
+            {"remote": remote_name, "branch": branch},
+        )
+
+    def submit_commit_and_push(
+        self, message: str, agent: str, remote_name: str = "origin", branch: str = "main",
+        timeout: Optional[float] = GIT_JOB_TIMEOUT,
+    ) -> Job:
+        """Queue commit_and_push() and return the job immediately."""
+        return self._submit_git_job(
+            "commit_and_push",
+            partial(self.commit_and_push, message, agent, remote_name, branch),
+            timeout,
+            {"message": message[:100], "agent": agent, "remote": remote_name, "branch": branch},
+        )
+
+    async def show_diff_async(self, timeout: Optional[float] = GIT_COMMAND_TIMEOUT) -> str:
+        """show_diff() on the repository's git queue."""
+        return await self._run_git_job("diff", self.show_diff, timeout)
+
     def close_cycle(self):
         logger.info("Closing current cycle...")
         cycle_path = os.path.join(self.context_dir, "cycle.yaml")
@@ -948,3 +1193,63 @@ class Git_Context_Manager:
             yaml.dump(cycle_state, f)
         logger.info("✅ Cycle closed successfully.")
         return True
+
+
+# ========== Manager cache ==========
+
+MANAGER_CACHE_SIZE = int(os.getenv("GIT_CONTEXT_MANAGER_CACHE_SIZE", "32"))
+MANAGER_CACHE_TTL = float(os.getenv("GIT_CONTEXT_MANAGER_CACHE_TTL", "900"))
+
+_manager_cache: LRUCache = LRUCache(maxsize=MANAGER_CACHE_SIZE, ttl=MANAGER_CACHE_TTL)
+
+# GitPython Repo handles shared by every manager working on the same repository
+_repo_cache: Dict[str, git.Repo] = {}
+_repo_lock = threading.Lock()
+
+
+def _open_repo(git_root: str) -> git.Repo:
+    """Return a shared git.Repo for a git root, opening it on first use."""
+    key = os.path.abspath(git_root)
+    with _repo_lock:
+        repo = _repo_cache.get(key)
+        if repo is not None and os.path.exists(repo.git_dir):
+            return repo
+        repo = git.Repo(git_root, search_parent_directories=True)
+        _repo_cache[key] = repo
+        return repo
+
+
+def get_git_context_manager(workspace_id: str = "default") -> Git_Context_Manager:
+    """
+    Return a cached Git_Context_Manager for a workspace.
+
+    Managers are kept in a bounded LRU keyed by workspace_id and revalidated
+    with a couple of stat calls before being reused.
+    """
+    manager = _manager_cache.get(workspace_id)
+    if manager is not None:
+        if manager.is_valid():
+            return manager
+        logger.info(f"Cached Git_Context_Manager for {workspace_id} is stale, rebuilding")
+        _manager_cache.pop(workspace_id)
+
+    return _manager_cache.get_or_set(
+        workspace_id, lambda: Git_Context_Manager(workspace_id=workspace_id)
+    )
+
+
+def invalidate_git_context_manager(workspace_id: Optional[str] = None):
+    """Drop a cached manager (or every manager and shared Repo if workspace_id is None)."""
+    if workspace_id is None:
+        _manager_cache.clear()
+        with _repo_lock:
+            _repo_cache.clear()
+        logger.info("Cleared Git_Context_Manager cache")
+    else:
+        _manager_cache.pop(workspace_id)
+        logger.info(f"Invalidated Git_Context_Manager for workspace: {workspace_id}")
+
+
+def get_manager_cache_stats() -> dict:
+    """Return Git_Context_Manager cache counters."""
+    return _manager_cache.stats()
@@ -114,6 +114,34 @@ class ProposalRejectionRequest(BaseModel):
     reason: str = Field(..., description="Reason for rejection")
 
 
+# 100 status updates plus their counter increments (at most 4 buckets each)
+# fit in one Firestore batch (500 writes)
+MAX_BULK_PROPOSALS = 100
+
+
+class ProposalBulkRequest(BaseModel):
+    """Request to approve or reject several proposals at once"""
+
+    ids: List[str] = Field(
+        ..., min_length=1, max_length=MAX_BULK_PROPOSALS, description="Proposal IDs"
+    )
+    action: Literal["approve", "reject"] = Field(..., description="Action to apply")
+    reason: Optional[str] = Field(None, description="Rejection reason (reject only)")
+
+
+class ProposalBulkResponse(BaseModel):
+    """Per-item results of a bulk action"""
+
+    action: Literal["approve", "reject"]
+    results: dict = Field(
+        ...,
+        description="Proposal ID -> approved, rejected, unchanged (already in that status) or not_found",
+    )
+    job_id: Optional[str] = Field(
+        None, description="Background task applying the approved proposals (one commit / one dispatch)"
+    )
+
+
 class ProposalAIReviewRequest(BaseModel):
     """Request AI review of a proposal"""
 
@@ -124,13 +152,33 @@ class ProposalAIReviewRequest(BaseModel):
     )
 
 
+class ProposalSummary(BaseModel):
+    """Projection of a proposal for list views (no file contents or diffs)"""
+
+    id: str = Field(..., description="Unique proposal ID")
+    agent_id: str = Field(..., description="Agent that created proposal")
+    workspace_id: Optional[str] = Field(None, description="Workspace ID")
+    user_id: Optional[str] = Field(None, description="User ID (optional)")
+    title: str = Field(..., description="Short title")
+    status: Literal["pending", "approved", "rejected"] = Field(default="pending")
+    created_at: Optional[datetime] = None
+
+    # Diff stats
+    file_count: int = Field(default=0, description="Number of changed files")
+    additions: int = Field(default=0, description="Added lines")
+    deletions: int = Field(default=0, description="Deleted lines")
+
+
 class ProposalListResponse(BaseModel):
     """Response with list of proposals"""
 
-    proposals: List[ChangeProposal] = Field(..., description="List of proposals")
+    proposals: List[ProposalSummary] = Field(..., description="List of proposal summaries")
     total: int = Field(..., description="Total number of proposals")
     page: int = Field(default=1, description="Current page")
     page_size: int = Field(default=50, description="Items per page")
+    next_cursor: Optional[str] = Field(
+        default=None, description="Cursor for the next page (None on the last page)"
+    )
 
 
 class ProposalStats(BaseModel):
@@ -140,7 +188,12 @@ class ProposalStats(BaseModel):
     pending: int = Field(..., description="Pending proposals")
     approved: int = Field(..., description="Approved proposals")
     rejected: int = Field(..., description="Rejected proposals")
+    by_status: dict = Field(default={}, description="Proposals by status")
     by_agent: dict = Field(default={}, description="Proposals by agent")
+    approval_rate: float = Field(default=0.0, description="Approved / reviewed")
+    avg_time_to_review_minutes: float = Field(
+        default=0.0, description="Average time from creation to approval/rejection"
+    )
 
 
 class ProposalStatus(BaseModel):
@@ -2,17 +2,164 @@
 Proposal Repository - Firestore persistence for proposals
 
 Handles all database operations for change proposals.
+
+`get` reads through an in-process cache: the same proposal is fetched by
+approve, detail, GitAgent and spec handlers within seconds. Decoded
+proposals are kept for PROPOSAL_CACHE_TTL seconds (LRU, PROPOSAL_CACHE_SIZE
+entries) and misses for PROPOSAL_CACHE_MISS_TTL seconds. Writes through the
+repository invalidate their proposals; `proposal.*` bus events invalidate
+changes made elsewhere, and with PROPOSAL_CACHE_BROADCAST=true the
+repository publishes `proposal.invalidated.v1` for other instances.
+
+`AsyncProposalRepository` serves the request path (reads, reviews, stats)
+through AsyncFirestoreService and shares the cache and change feed of the
+sync repository, which agents keep using.
 """
 
+import asyncio
+import copy
 import logging
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+import os
+import uuid
+import weakref
+from typing import Callable, Dict, List, Optional, Any, Tuple
+from datetime import datetime, timezone
 
-from app.services.firestore_service import get_firestore_service, FirestoreService
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+from app.services.event_bus import EventTypes, Topics
+from app.services.firestore_service import (
+    AsyncFirestoreService,
+    FirestoreService,
+    TransitionPlan,
+    get_async_firestore_service,
+    get_firestore_service,
+)
+from app.services.blob_store import get_blob_store
+from app.services.diff_fingerprint import (
+    BANDS_KEY,
+    FINGERPRINT_KEY,
+    MINHASH_KEY,
+    best_match,
+    fingerprint_fields,
+    with_fingerprint,
+)
+from app.services.proposal_codec import blob_refs, decode_proposal, encode_proposal
+from app.services.proposal_counters import ProposalCounters, batch_deltas, stats_from_totals
+from app.services.proposal_feed import ChangeType, get_proposal_feed
+from app.services.proposal_summary import (
+    SUMMARY_FIELDS,
+    SUMMARY_KEY,
+    compute_summary_stats,
+    to_summary,
+    with_summary,
+)
 from app.models.proposal import ChangeProposal
+from app.utils.lru_cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
+PROPOSAL_CACHE_SIZE = int(os.getenv("PROPOSAL_CACHE_SIZE", "512"))
+PROPOSAL_CACHE_TTL = float(os.getenv("PROPOSAL_CACHE_TTL", "30"))
+PROPOSAL_CACHE_MISS_TTL = float(os.getenv("PROPOSAL_CACHE_MISS_TTL", "5"))
+PROPOSAL_CACHE_BROADCAST = os.getenv("PROPOSAL_CACHE_BROADCAST", "false").lower() == "true"
+
+# Events after which a cached proposal may be stale
+_INVALIDATING_EVENTS = (
+    EventTypes.PROPOSAL_CREATED.value,
+    EventTypes.PROPOSAL_APPROVED.value,
+    EventTypes.PROPOSAL_REJECTED.value,
+    EventTypes.PROPOSAL_INVALIDATED.value,
+)
+
+
+def _new_document(proposal_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a new proposal, fill in defaults and encode it for Firestore."""
+    # Validate required fields
+    required_fields = ['id', 'workspace_id', 'agent_id', 'title']
+    for field in required_fields:
+        if field not in proposal_data:
+            raise ValueError(f"Missing required field: {field}")
+
+    # Set defaults
+    if 'status' not in proposal_data:
+        proposal_data['status'] = 'pending'
+
+    if 'created_at' not in proposal_data:
+        proposal_data['created_at'] = datetime.utcnow().isoformat()
+
+    # File contents stored as diffs, see proposal_codec
+    document = with_summary(encode_proposal(proposal_data), source=proposal_data)
+    return with_fingerprint(document, source=proposal_data)
+
+
+def _status_updates(
+    status: str, commit_hash: Optional[str] = None, reason: Optional[str] = None
+) -> Dict[str, Any]:
+    updates = {'status': status}
+    if commit_hash:
+        updates['commit_hash'] = commit_hash
+        updates['auto_committed'] = True
+    if reason:
+        updates['rejection_reason'] = reason
+    return updates
+
+
+def _plan_bulk(
+    proposal_ids: List[str],
+    documents: Dict[str, Dict[str, Any]],
+    status: str,
+    commit_hash: Optional[str],
+    reason: Optional[str],
+) -> Tuple[Dict[str, str], Dict[str, Dict[str, Any]]]:
+    """Per-item results and the updates of a bulk status change."""
+    results: Dict[str, str] = {}
+    updates: Dict[str, Dict[str, Any]] = {}
+    reviewed_at = datetime.now(timezone.utc).isoformat()
+    for proposal_id in proposal_ids:
+        document = documents.get(proposal_id)
+        if document is None:
+            results[proposal_id] = "not_found"
+        elif document.get("status") == status:
+            results[proposal_id] = "unchanged"
+        else:
+            updates[proposal_id] = {**_status_updates(status, commit_hash, reason), 'reviewed_at': reviewed_at}
+            results[proposal_id] = status
+    return results, updates
+
+
+def review_plan(
+    counters: ProposalCounters,
+    plan_updates: Callable[[Dict[str, Dict[str, Any]]], Dict[str, Optional[Dict[str, Any]]]],
+) -> TransitionPlan:
+    """
+    Transaction plan writing `plan_updates(documents)` and the matching counter
+    changes (see FirestoreService.transition_proposals: None deletes, fields
+    of a missing proposal create it).
+    """
+    def plan(transaction, documents: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[Dict[str, Any]]]:
+        updates = plan_updates(documents)
+        try:
+            counters.add_to_batch(
+                transaction,
+                batch_deltas(
+                    (documents.get(pid), None if u is None else {**documents.get(pid, {}), **u})
+                    for pid, u in updates.items()
+                ),
+            )
+        except Exception as e:
+            # Counters are rebuilt from proposals if they drift (see proposal_counters)
+            logger.warning(f"[ProposalRepository] Could not update counters: {e}")
+        return updates
+    return plan
+
+
+def _publish(proposal: Dict[str, Any], **change: Any) -> None:
+    """Record a write in the change feed (a Firestore listener, if running, records it instead)."""
+    feed = get_proposal_feed()
+    if not feed.watching:
+        feed.record(proposal, **change)
+
 
 class ProposalRepository:
     """
@@ -29,6 +176,11 @@ class ProposalRepository:
             project_id: GCP project ID
         """
         self.firestore: FirestoreService = get_firestore_service(project_id)
+        self.counters = ProposalCounters(self.firestore.db)
+        self._cache: LRUCache = LRUCache(maxsize=PROPOSAL_CACHE_SIZE, ttl=PROPOSAL_CACHE_TTL)
+        self._misses: LRUCache = LRUCache(maxsize=PROPOSAL_CACHE_SIZE, ttl=PROPOSAL_CACHE_MISS_TTL)
+        self._bus = None
+        self.instance_id = uuid.uuid4().hex[:12]
         logger.info("[ProposalRepository] Initialized")
     
     def create(self, proposal_data: Dict[str, Any]) -> str:
@@ -44,28 +196,18 @@ class ProposalRepository:
         Raises:
             ValueError: If proposal data is invalid
         """
-        # Validate required fields
-        required_fields = ['id', 'workspace_id', 'agent_id', 'title']
-        for field in required_fields:
-            if field not in proposal_data:
-                raise ValueError(f"Missing required field: {field}")
-        
-        # Set defaults
-        if 'status' not in proposal_data:
-            proposal_data['status'] = 'pending'
-        
-        if 'created_at' not in proposal_data:
-            proposal_data['created_at'] = datetime.utcnow().isoformat()
-        
-        # Save to Firestore
-        proposal_id = self.firestore.create_proposal(proposal_data)
+        document = _new_document(proposal_data)
+        proposal_id = self.firestore.create_proposal(document)
+        self.invalidate([proposal_id], broadcast=True)
+        self._count(None, proposal_data)
+        _publish(document, previous_status=None)
         
         logger.info(f"[ProposalRepository] Created proposal: {proposal_id}")
         return proposal_id
     
     def get(self, proposal_id: str) -> Optional[Dict[str, Any]]:
         """
-        Get proposal by ID.
+        Get proposal by ID (read through the proposal cache).
         
         Args:
             proposal_id: Proposal ID
@@ -73,14 +215,103 @@ class ProposalRepository:
         Returns:
             Proposal data or None
         """
+        hit, proposal = self.peek(proposal_id)
+        if hit:
+            return proposal
+
         proposal = self.firestore.get_proposal(proposal_id)
         
+        if proposal:
+            proposal = decode_proposal(proposal)
+        self.remember(proposal_id, proposal)
+        return proposal
+
+    def peek(self, proposal_id: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Look a proposal up in the cache only.
+
+        Returns:
+            (hit, proposal); proposal is None on a cached miss
+        """
+        cached = self._cache.get(proposal_id)
+        if cached is not None:
+            # Callers modify the dicts they get
+            return True, copy.deepcopy(cached)
+        if self._misses.get(proposal_id):
+            return True, None
+        return False, None
+
+    def remember(self, proposal_id: str, proposal: Optional[Dict[str, Any]]) -> None:
+        """Cache a decoded proposal just read (None = not found)."""
         if proposal:
             logger.debug(f"[ProposalRepository] Found proposal: {proposal_id}")
+            self._cache.set(proposal_id, copy.deepcopy(proposal))
         else:
             logger.warning(f"[ProposalRepository] Proposal not found: {proposal_id}")
-        
-        return proposal
+            self._misses.set(proposal_id, True)
+
+    def invalidate(self, proposal_ids: Optional[List[str]] = None, broadcast: bool = False) -> None:
+        """
+        Drop proposals from the cache.
+
+        Args:
+            proposal_ids: Proposal IDs (None = everything)
+            broadcast: Also tell other instances (if PROPOSAL_CACHE_BROADCAST)
+        """
+        if proposal_ids is None:
+            self._cache.clear()
+            self._misses.clear()
+        else:
+            for proposal_id in proposal_ids:
+                self._cache.pop(proposal_id)
+                self._misses.pop(proposal_id)
+        if broadcast and proposal_ids and PROPOSAL_CACHE_BROADCAST and self._bus is not None:
+            self._broadcast(list(proposal_ids))
+
+    def _broadcast(self, proposal_ids: List[str]) -> None:
+        publish = self._bus.publish(
+            topic=Topics.PROPOSAL_EVENTS.value,
+            event_type=EventTypes.PROPOSAL_INVALIDATED.value,
+            source="proposal-repository",
+            data={"proposal_ids": proposal_ids, "origin": self.instance_id},
+        )
+        try:
+            asyncio.get_running_loop().create_task(publish)
+        except RuntimeError:
+            # Called from a worker thread
+            try:
+                asyncio.run(publish)
+            except Exception as e:
+                logger.warning(f"[ProposalRepository] Could not broadcast invalidation: {e}")
+
+    async def _on_event(self, event_type: str, data: Dict[str, Any]) -> None:
+        if data.get("origin") == self.instance_id:
+            return
+        proposal_ids = data.get("proposal_ids") or [data.get("proposal_id")]
+        self.invalidate([pid for pid in proposal_ids if pid])
+
+    def attach(self, bus) -> None:
+        """Invalidate on `proposal.*` bus events (and broadcast invalidations on it)."""
+        self._bus = bus
+        for event_type in _INVALIDATING_EVENTS:
+            bus.subscribe(event_type, self._on_event)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit-rate counters of the proposal cache (`negative` = cached misses)."""
+        stats = self._cache.stats()
+        negative = self._misses.stats()
+        # A found proposal is served from one of the two caches, or read
+        hits = stats["hits"] + negative["hits"]
+        lookups = hits + negative["misses"]
+        return {
+            **stats,
+            "hits": hits,
+            "misses": negative["misses"],
+            "negative": negative,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "ttl": PROPOSAL_CACHE_TTL,
+            "miss_ttl": PROPOSAL_CACHE_MISS_TTL,
+        }
     
     def list(
         self,
@@ -106,7 +337,135 @@ class ProposalRepository:
         )
         
         logger.info(f"[ProposalRepository] Listed {len(proposals)} proposals")
-        return proposals
+        # Lists carry diffs only; file contents are rebuilt by get()
+        return [decode_proposal(p, with_contents=False) for p in proposals]
+    
+    def list_page(
+        self,
+        workspace_id: Optional[str] = None,
+        status: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        List one page of proposals, newest first.
+        
+        Args:
+            workspace_id: Filter by workspace
+            status: Filter by status
+            agent_id: Filter by agent
+            user_id: Filter by user
+            limit: Page size
+            cursor: next_cursor of the previous page
+        
+        Returns:
+            (proposals, next_cursor); next_cursor is None on the last page
+        """
+        proposals, next_cursor = self.firestore.list_proposals_page(
+            workspace_id=workspace_id,
+            status=status,
+            agent_id=agent_id,
+            user_id=user_id,
+            limit=limit,
+            cursor=cursor,
+        )
+        return [decode_proposal(p, with_contents=False) for p in proposals], next_cursor
+    
+    def list_summaries(
+        self,
+        workspace_id: Optional[str] = None,
+        status: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        List one page of proposal summaries (see ProposalSummary).
+        
+        Only summary fields are read from Firestore. Proposals stored before
+        summaries existed are summarized from their body once and backfilled.
+        
+        Args:
+            workspace_id: Filter by workspace
+            status: Filter by status
+            agent_id: Filter by agent
+            user_id: Filter by user
+            limit: Page size
+            cursor: next_cursor of the previous page
+        
+        Returns:
+            (summaries, next_cursor); next_cursor is None on the last page
+        """
+        documents, next_cursor = self.firestore.list_proposals_page(
+            workspace_id=workspace_id,
+            status=status,
+            agent_id=agent_id,
+            user_id=user_id,
+            limit=limit,
+            cursor=cursor,
+            fields=SUMMARY_FIELDS,
+        )
+        for document in documents:
+            if SUMMARY_KEY not in document and document.get("id"):
+                document[SUMMARY_KEY] = self._backfill_summary(document["id"])
+        return [to_summary(d) for d in documents], next_cursor
+    
+    def _backfill_summary(self, proposal_id: str) -> Optional[Dict[str, int]]:
+        proposal = self.get(proposal_id)
+        if not proposal:
+            return None
+        stats = compute_summary_stats(proposal)
+        try:
+            self.firestore.set_proposal_summary(proposal_id, stats)
+            self.invalidate([proposal_id])
+        except Exception as e:
+            logger.warning(f"[ProposalRepository] Could not backfill summary for {proposal_id}: {e}")
+        return stats
+    
+    def find_duplicate(
+        self,
+        proposal_data: Dict[str, Any],
+        status: Optional[str] = "pending",
+        near_threshold: Optional[float] = None,
+    ) -> Optional[str]:
+        """
+        Find an existing proposal making the same change (see diff_fingerprint).
+        
+        Args:
+            proposal_data: New proposal (workspace_id and diffs)
+            status: Only match proposals with this status (None = any)
+            near_threshold: Also match near-duplicates with at least this
+                estimated similarity (None = exact matches only)
+        
+        Returns:
+            ID of the existing proposal, or None
+        """
+        fields = fingerprint_fields(proposal_data)
+        if not fields:
+            return None
+        workspace_id = proposal_data.get("workspace_id") or "default"
+        matches = self.firestore.find_proposals_by_fingerprint(
+            workspace_id, fields[FINGERPRINT_KEY], status=status, limit=1, fields=["id"]
+        )
+        if matches:
+            return matches[0].get("id")
+        if near_threshold is None:
+            return None
+        
+        candidates = self.firestore.find_proposals_by_bands(
+            workspace_id, fields[BANDS_KEY], status=status, fields=["id", MINHASH_KEY]
+        )
+        match = best_match(fields[MINHASH_KEY], candidates, near_threshold)
+        if match:
+            logger.info(
+                f"[ProposalRepository] Near-duplicate of {match[0].get('id')} "
+                f"(similarity {match[1]:.2f})"
+            )
+            return match[0].get("id")
+        return None
     
     def update_status(
         self,
@@ -125,13 +484,7 @@ class ProposalRepository:
         Returns:
             True if successful
         """
-        updates = {'status': status}
-        
-        if commit_hash:
-            updates['commit_hash'] = commit_hash
-            updates['auto_committed'] = True
-        
-        return self.firestore.update_proposal(proposal_id, updates)
+        return self._transition(proposal_id, _status_updates(status, commit_hash))
     
     def approve(self, proposal_id: str, commit_hash: Optional[str] = None) -> bool:
         """
@@ -159,13 +512,124 @@ class ProposalRepository:
             True if successful
         """
         logger.info(f"[ProposalRepository] Rejecting proposal: {proposal_id}")
-        
-        updates = {'status': 'rejected'}
-        if reason:
-            updates['rejection_reason'] = reason
-        
-        return self.firestore.update_proposal(proposal_id, updates)
+        return self._transition(proposal_id, _status_updates('rejected', reason=reason))
     
+    def get_many(
+        self, proposal_ids: List[str], fields: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get several proposals with one batched read.
+
+        Args:
+            proposal_ids: Proposal IDs
+            fields: Only read these fields (None = whole proposals)
+
+        Returns:
+            {proposal_id: proposal} for the proposals that exist
+        """
+        documents = self.firestore.get_proposals(proposal_ids, fields=fields)
+        if fields is not None:
+            return documents
+        return {pid: decode_proposal(d) for pid, d in documents.items()}
+
+    def bulk_update_status(
+        self,
+        proposal_ids: List[str],
+        status: str,
+        commit_hash: Optional[str] = None,
+        reason: Optional[str] = None,
+    ) -> Dict[str, str]:
+        """
+        Approve or reject several proposals in one transaction.
+
+        Proposals are read and updated, with their counter changes, in one
+        transaction: the update is applied entirely or not at all, and
+        reviews committed concurrently are seen before counting.
+
+        Args:
+            proposal_ids: Proposal IDs (at most MAX_BULK_PROPOSALS)
+            status: New status (approved or rejected)
+            commit_hash: Git commit applying the proposals (if applicable)
+            reason: Rejection reason (optional)
+
+        Returns:
+            {proposal_id: status, "unchanged" (already in that status) or "not_found"}
+
+        Raises:
+            RuntimeError: If the transaction failed
+        """
+        planned: Dict[str, Any] = {}
+
+        def plan_updates(documents: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+            planned['results'], planned['updates'] = _plan_bulk(
+                proposal_ids, documents, status, commit_hash, reason
+            )
+            return planned['updates']
+
+        documents = self.firestore.transition_proposals(proposal_ids, review_plan(self.counters, plan_updates))
+        if documents is None:
+            raise RuntimeError(f"Bulk update of {len(proposal_ids)} proposals failed")
+        results, updates = planned['results'], planned['updates']
+        if not updates:
+            return results
+        self.invalidate(list(updates), broadcast=True)
+        for pid, fields_update in updates.items():
+            _publish(
+                {'id': pid, **documents[pid], **fields_update},
+                previous_status=documents[pid].get('status') or 'pending',
+            )
+
+        logger.info(f"[ProposalRepository] Set {len(updates)} proposals to {status}")
+        return results
+
+    def record_commit(
+        self, proposal_ids: List[str], commit_hash: str, workspace_id: Optional[str] = None
+    ) -> bool:
+        """
+        Attach the commit that applied already-approved proposals.
+
+        Args:
+            proposal_ids: Proposal IDs
+            commit_hash: Git commit hash
+            workspace_id: Workspace of the proposals (for the change feed)
+
+        Returns:
+            True if successful
+        """
+        recorded = self.firestore.update_proposals(
+            {pid: {'commit_hash': commit_hash, 'auto_committed': True} for pid in proposal_ids}
+        )
+        self.invalidate(proposal_ids, broadcast=True)
+        if recorded:
+            for pid in proposal_ids:
+                _publish(
+                    {'id': pid, 'workspace_id': workspace_id, 'status': 'approved', 'commit_hash': commit_hash},
+                    previous_status='approved',
+                )
+        return recorded
+
+    def _transition(self, proposal_id: str, updates: Dict[str, Any]) -> bool:
+        """Apply a status update and the matching counter changes in one transaction."""
+        if updates['status'] != 'pending':
+            updates['reviewed_at'] = datetime.now(timezone.utc).isoformat()
+        documents = self.firestore.transition_proposals(
+            [proposal_id],
+            review_plan(self.counters, lambda documents: {proposal_id: updates} if proposal_id in documents else {}),
+        )
+        self.invalidate([proposal_id], broadcast=True)
+        before = (documents or {}).get(proposal_id)
+        if before is None:
+            return False
+        _publish({**before, **updates}, previous_status=before.get('status') or 'pending')
+        return True
+    
+    def _count(self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> None:
+        try:
+            self.counters.apply(before, after)
+        except Exception as e:
+            # Counters are rebuilt from proposals if they drift (see proposal_counters)
+            logger.warning(f"[ProposalRepository] Could not update counters: {e}")
+
     def delete(self, proposal_id: str) -> bool:
         """
         Delete proposal.
@@ -177,7 +641,16 @@ class ProposalRepository:
             True if successful
         """
         logger.info(f"[ProposalRepository] Deleting proposal: {proposal_id}")
-        return self.firestore.delete_proposal(proposal_id)
+        document = self.firestore.get_proposal(proposal_id)
+        deleted = self.firestore.delete_proposal(proposal_id)
+        self.invalidate([proposal_id], broadcast=True)
+        if deleted and document:
+            self._count(document, None)
+            _publish(document, change_type=ChangeType.DELETED)
+        refs = blob_refs(document) if deleted else []
+        if refs:
+            get_blob_store().decref_all(refs)
+        return deleted
     
     def count(self, workspace_id: Optional[str] = None, status: Optional[str] = None) -> int:
         """
@@ -190,8 +663,32 @@ class ProposalRepository:
         Returns:
             Count of matching proposals
         """
-        proposals = self.list(workspace_id=workspace_id, status=status, limit=1000)
-        return len(proposals)
+        if workspace_id:
+            totals = self.counters.stats(workspace_id)
+            return totals["by_status"].get(status, 0) if status else totals["total"]
+        query = self.firestore.db.collection("proposals")
+        if status:
+            query = query.where(filter=FieldFilter("status", "==", status))
+        return int(query.count().get()[0][0].value)
+    
+    def stats(
+        self,
+        workspace_id: str,
+        user_id: Optional[str] = None,
+        days: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Proposal statistics from the materialized counters.
+        
+        Args:
+            workspace_id: Workspace ID
+            user_id: Only proposals of this user
+            days: Only proposals created in the last N days (None = all time)
+        
+        Returns:
+            ProposalStats fields
+        """
+        return stats_from_totals(self.counters.stats(workspace_id, user_id=user_id, days=days))
 
 
 # Global repository instance
@@ -216,8 +713,215 @@ def get_proposal_repository(project_id: Optional[str] = None) -> ProposalReposit
     return _proposal_repository
 
 
+class AsyncProposalRepository:
+    """
+    Async counterpart of ProposalRepository for request handlers.
+
+    Covers the operations on the request path (create, get, list, review,
+    stats). The proposal cache, invalidation and change feed are those of
+    the sync repository, so proposals written by agents through it and read
+    by handlers through this one stay consistent.
+    """
+
+    def __init__(
+        self,
+        project_id: Optional[str] = None,
+        repository: Optional[ProposalRepository] = None,
+    ):
+        """
+        Initialize repository (from a coroutine).
+
+        Args:
+            project_id: GCP project ID
+            repository: Sync repository whose cache is shared (defaults to
+                get_proposal_repository())
+        """
+        self.firestore: AsyncFirestoreService = get_async_firestore_service(project_id)
+        self.counters = ProposalCounters(self.firestore.db)
+        self.repository = repository or get_proposal_repository(project_id)
+
+    async def create(self, proposal_data: Dict[str, Any]) -> str:
+        """Create new proposal (see ProposalRepository.create)."""
+        document = await asyncio.to_thread(_new_document, proposal_data)
+        proposal_id = await self.firestore.create_proposal(document)
+        self.repository.invalidate([proposal_id], broadcast=True)
+        await self._count(None, proposal_data)
+        _publish(document, previous_status=None)
+
+        logger.info(f"[ProposalRepository] Created proposal: {proposal_id}")
+        return proposal_id
+
+    async def get(self, proposal_id: str) -> Optional[Dict[str, Any]]:
+        """Get proposal by ID (read through the shared proposal cache)."""
+        hit, proposal = self.repository.peek(proposal_id)
+        if hit:
+            return proposal
+
+        proposal = await self.firestore.get_proposal(proposal_id)
+        if proposal:
+            # Contents may be rebuilt from git or the blob store
+            proposal = await asyncio.to_thread(decode_proposal, proposal)
+        self.repository.remember(proposal_id, proposal)
+        return proposal
+
+    async def get_many(
+        self, proposal_ids: List[str], fields: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get several proposals with batched reads (see ProposalRepository.get_many)."""
+        documents = await self.firestore.get_proposals(proposal_ids, fields=fields)
+        if fields is not None:
+            return documents
+        return await asyncio.to_thread(lambda: {pid: decode_proposal(d) for pid, d in documents.items()})
+
+    async def list_summaries(
+        self,
+        workspace_id: Optional[str] = None,
+        status: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """List one page of proposal summaries (see ProposalRepository.list_summaries)."""
+        documents, next_cursor = await self.firestore.list_proposals_page(
+            workspace_id=workspace_id,
+            status=status,
+            agent_id=agent_id,
+            user_id=user_id,
+            limit=limit,
+            cursor=cursor,
+            fields=SUMMARY_FIELDS,
+        )
+        missing = [d for d in documents if SUMMARY_KEY not in d and d.get("id")]
+        if missing:
+            summaries = await asyncio.gather(*(self._backfill_summary(d["id"]) for d in missing))
+            for document, summary in zip(missing, summaries):
+                document[SUMMARY_KEY] = summary
+        return [to_summary(d) for d in documents], next_cursor
+
+    async def _backfill_summary(self, proposal_id: str) -> Optional[Dict[str, int]]:
+        proposal = await self.get(proposal_id)
+        if not proposal:
+            return None
+        stats = compute_summary_stats(proposal)
+        try:
+            await self.firestore.set_proposal_summary(proposal_id, stats)
+            self.repository.invalidate([proposal_id])
+        except Exception as e:
+            logger.warning(f"[ProposalRepository] Could not backfill summary for {proposal_id}: {e}")
+        return stats
+
+    async def update_status(self, proposal_id: str, status: str, commit_hash: Optional[str] = None) -> bool:
+        """Update proposal status (see ProposalRepository.update_status)."""
+        return await self._transition(proposal_id, _status_updates(status, commit_hash))
+
+    async def approve(self, proposal_id: str, commit_hash: Optional[str] = None) -> bool:
+        """Approve proposal."""
+        logger.info(f"[ProposalRepository] Approving proposal: {proposal_id}")
+        return await self.update_status(proposal_id, 'approved', commit_hash)
+
+    async def reject(self, proposal_id: str, reason: Optional[str] = None) -> bool:
+        """Reject proposal."""
+        logger.info(f"[ProposalRepository] Rejecting proposal: {proposal_id}")
+        return await self._transition(proposal_id, _status_updates('rejected', reason=reason))
+
+    async def bulk_update_status(
+        self,
+        proposal_ids: List[str],
+        status: str,
+        commit_hash: Optional[str] = None,
+        reason: Optional[str] = None,
+    ) -> Dict[str, str]:
+        """
+        Approve or reject several proposals in one transaction.
+
+        Same contract as ProposalRepository.bulk_update_status.
+
+        Raises:
+            RuntimeError: If the transaction failed
+        """
+        planned: Dict[str, Any] = {}
+
+        def plan_updates(documents: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+            planned['results'], planned['updates'] = _plan_bulk(
+                proposal_ids, documents, status, commit_hash, reason
+            )
+            return planned['updates']
+
+        documents = await self.firestore.transition_proposals(proposal_ids, review_plan(self.counters, plan_updates))
+        if documents is None:
+            raise RuntimeError(f"Bulk update of {len(proposal_ids)} proposals failed")
+        results, updates = planned['results'], planned['updates']
+        if not updates:
+            return results
+        self.repository.invalidate(list(updates), broadcast=True)
+        for pid, fields_update in updates.items():
+            _publish(
+                {'id': pid, **documents[pid], **fields_update},
+                previous_status=documents[pid].get('status') or 'pending',
+            )
+
+        logger.info(f"[ProposalRepository] Set {len(updates)} proposals to {status}")
+        return results
+
+    async def _transition(self, proposal_id: str, updates: Dict[str, Any]) -> bool:
+        """Apply a status update and the matching counter changes in one transaction."""
+        if updates['status'] != 'pending':
+            updates['reviewed_at'] = datetime.now(timezone.utc).isoformat()
+        documents = await self.firestore.transition_proposals(
+            [proposal_id],
+            review_plan(self.counters, lambda documents: {proposal_id: updates} if proposal_id in documents else {}),
+        )
+        self.repository.invalidate([proposal_id], broadcast=True)
+        before = (documents or {}).get(proposal_id)
+        if before is None:
+            return False
+        _publish({**before, **updates}, previous_status=before.get('status') or 'pending')
+        return True
+
+    async def _count(self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> None:
+        try:
+            await self.counters.apply_async(before, after)
+        except Exception as e:
+            # Counters are rebuilt from proposals if they drift (see proposal_counters)
+            logger.warning(f"[ProposalRepository] Could not update counters: {e}")
+
+    async def stats(
+        self,
+        workspace_id: str,
+        user_id: Optional[str] = None,
+        days: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Proposal statistics from the materialized counters (see ProposalRepository.stats)."""
+        return stats_from_totals(await self.counters.stats_async(workspace_id, user_id=user_id, days=days))
+
+
+# One async repository per event loop, like its AsyncFirestoreService
+_async_proposal_repositories: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncProposalRepository]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_proposal_repository(project_id: Optional[str] = None) -> AsyncProposalRepository:
+    """
+    Get or create the AsyncProposalRepository of the running event loop.
+
+    Args:
+        project_id: GCP project ID
+
+    Returns:
+        AsyncProposalRepository instance (must be called from a coroutine)
+    """
+    loop = asyncio.get_running_loop()
+    repository = _async_proposal_repositories.get(loop)
+    if repository is None:
+        repository = AsyncProposalRepository(project_id=project_id)
+        _async_proposal_repositories[loop] = repository
+    return repository
+
+
 def reset_proposal_repository():
-    """Reset global repository (for testing)"""
+    """Reset global repositories (for testing)"""
     global _proposal_repository
     _proposal_repository = None
-
+    _async_proposal_repositories.clear()
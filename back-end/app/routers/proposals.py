@@ -18,10 +18,26 @@ from app.models.proposal import (
     ProposalListResponse,
     ProposalStats,
     ProposalStatus,
+    ProposalSummary,
 )
 from google.cloud import firestore
 from app.services.event_bus import get_event_bus
+from app.services.blob_store import get_blob_store
+from app.services.firestore_query import PROPOSAL_ORDER, get_query_planner
+from app.services.firestore_service import get_async_firestore_service
+from app.services.diff_fingerprint import with_fingerprint
+from app.services.proposal_codec import blob_refs, decode_proposal, encode_proposal
+from app.services.proposal_counters import ProposalCounters, stats_from_totals
+from app.services.proposal_summary import (
+    SUMMARY_FIELDS,
+    SUMMARY_KEY,
+    compute_summary_stats,
+    to_summary,
+    with_summary,
+)
 from app.dependencies import get_rewards_adapter
+from app.repositories.proposal_repository import review_plan
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +49,34 @@ router = APIRouter(prefix="/proposals", tags=["proposals"])
 # BUILD_VERSION: 2025-10-21-18-20 (PROPOSALS collection)
 db = firestore.AsyncClient()
 proposals_col = db.collection("proposals")  # Unified collection name - v2
+counters = ProposalCounters(db)
+
+
+async def _write_proposal(proposal_id: str, plan_write) -> dict:
+    """
+    Read a proposal and write it with its counter changes in one transaction.
+
+    Args:
+        proposal_id: Proposal ID
+        plan_write: plan_write(current) -> fields to write (update, or create
+            if missing), None to delete, or {} to leave the proposal as is;
+            `current` is the document read by the transaction (None if missing)
+
+    Returns:
+        {proposal_id: document before the write} ({} if it did not exist)
+    """
+    service = get_async_firestore_service()
+
+    def plan_updates(documents: dict) -> dict:
+        fields = plan_write(documents.get(proposal_id))
+        return {} if fields == {} else {proposal_id: fields}
+
+    documents = await service.transition_proposals(
+        [proposal_id], review_plan(ProposalCounters(service.db), plan_updates)
+    )
+    if documents is None:
+        raise HTTPException(status_code=500, detail=f"Could not write proposal {proposal_id}")
+    return documents
 
 
 async def trigger_github_action(proposal: ChangeProposal) -> dict:
@@ -148,6 +192,25 @@ async def _get_proposal_doc_and_data_by_id(proposal_id: str):
     return doc_ref, data
 
 
+def _if_pending(current: Optional[dict], fields: Optional[dict]) -> Optional[dict]:
+    """Write plan applying `fields` (None = delete) only to a pending proposal."""
+    if current is None or (current.get("status") or "pending") != "pending":
+        return {}
+    return fields
+
+
+def _check_reviewed(proposal_id: str, documents: dict, action: str = "review") -> dict:
+    """The document a pending-only write read; 404/400 if it was missing or no longer pending."""
+    current = documents.get(proposal_id)
+    if current is None:
+        raise HTTPException(status_code=404, detail="Proposal not found")
+    status = current.get("status") or "pending"
+    if status != "pending":
+        detail = "Can only delete pending proposals" if action == "delete" else f"Proposal already {status}"
+        raise HTTPException(status_code=400, detail=detail)
+    return current
+
+
 @router.post("/create", response_model=ChangeProposal)
 async def create_proposal(proposal: ChangeProposal = Body(...)):
     """
@@ -171,7 +234,9 @@ async def create_proposal(proposal: ChangeProposal = Body(...)):
 
     try:
         # Store in Firestore
-        await proposals_col.document(proposal.id).set(proposal.model_dump(mode="json"))
+        data = proposal.model_dump(mode="json")
+        document = with_fingerprint(with_summary(encode_proposal(data), source=data), source=data)
+        await _write_proposal(proposal.id, lambda current: document)
 
         # Publish event
         project_id = os.getenv("GCP_PROJECT_ID") or os.getenv("GOOGLE_CLOUD_PROJECT")
@@ -196,6 +261,24 @@ async def create_proposal(proposal: ChangeProposal = Body(...)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Max documents scanned per page while skipping proposals hidden from the user
+LIST_MAX_SCAN_BATCHES = 5
+
+
+async def _summarize(data: dict) -> ProposalSummary:
+    """Summary of a listed document, backfilling stats of pre-summary documents."""
+    if SUMMARY_KEY not in data and data.get("id"):
+        _, full = await _get_proposal_doc_and_data_by_id(data["id"])
+        if full:
+            stats = compute_summary_stats(decode_proposal(full))
+            data = {**data, SUMMARY_KEY: stats}
+            try:
+                await proposals_col.document(data["id"]).update({SUMMARY_KEY: stats})
+            except Exception as e:
+                logger.warning(f"Could not backfill summary for {data['id']}: {e}")
+    return ProposalSummary(**to_summary(data))
+
+
 @router.get("/list", response_model=ProposalListResponse)
 async def list_proposals(
     workspace_id: str = Query("default"),
@@ -203,15 +286,22 @@ async def list_proposals(
     status: Optional[str] = Query(None),
     agent: Optional[str] = Query(None),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
 ):
     """
-    List proposals for a workspace filtered by user_id.
+    List proposals for a workspace filtered by user_id, newest first.
 
     Filters:
     - workspace_id: Optional (default: "default")
     - user_id: Required (only show proposals for this user)
     - status: Optional (pending, approved, rejected)
     - agent: Optional (strategy, spec, retrospective, etc)
+
+    Pagination: pass the response's `next_cursor` as `cursor` to get the next
+    page (`next_cursor` is null on the last page).
+
+    Returns summaries (no file contents or diffs); fetch a proposal by id for
+    its full body.
     """
     logger.info(f"Listing proposals for workspace: {workspace_id}, user: {user_id}")
 
@@ -225,95 +315,58 @@ async def list_proposals(
             user_id,
         )
 
-    try:
-        # Build query - NO ORDER BY to avoid composite index requirement
-        # We'll sort client-side instead
-        query = proposals_col.where("workspace_id", "==", workspace_id)
-        query = query.limit(
-            200
-        )  # Fetch more docs for client-side filtering and sorting
-
-        # Execute
-        docs = query.stream()
-        proposals = []
-        total_docs = 0
-        filtered_docs = 0
-
-        async for doc in docs:
-            total_docs += 1
-            data = doc.to_dict()
-            logger.info(
-                f"Processing doc {total_docs}: id={data.get('id')}, user_id={data.get('user_id')}, workspace_id={data.get('workspace_id')}"
-            )
+    def _visible(data: dict) -> bool:
+        # Agent-generated proposals are visible to everyone
+        if allow_global_view or (data.get("agent_id") or "").strip():
+            return True
+        return (data.get("user_id") or "").strip() == user_id
 
-            doc_user = (data.get("user_id") or "").strip()
-            agent_id = (data.get("agent_id") or "").strip()
-
-            if not allow_global_view:
-                if agent_id:
-                    logger.info(
-                        f"  Including doc {total_docs}: agent-generated proposal (agent_id={agent_id})"
-                    )
-                elif doc_user != user_id:
-                    logger.info(
-                        f"  Skipping doc {total_docs}: user_id mismatch ({doc_user} != {user_id})"
-                    )
-                    continue
-            elif allow_global_view and not doc_user:
-                logger.info(
-                    f"  Including doc {total_docs}: no user_id stored (global view)"
-                )
-            if status and data.get("status") != status:
-                logger.info(
-                    f"  Skipping doc {total_docs}: status mismatch ({data.get('status')} != {status})"
-                )
-                continue
-            if agent and data.get("agent_id") != agent:
-                logger.info(
-                    f"  Skipping doc {total_docs}: agent mismatch ({data.get('agent_id')} != {agent})"
-                )
-                continue
+    filters = {"workspace_id": workspace_id, "status": status, "agent_id": agent, "user_id": user_id}
+    try:
+        after = decode_cursor(cursor, filters) if cursor else None
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-            filtered_docs += 1
-            logger.info(
-                f"  Adding doc {total_docs} to proposals (filtered doc #{filtered_docs})"
+    try:
+        # Keyset pagination on (created_at, id), filtered and ordered by Firestore
+        planner = get_query_planner()
+        query_filters = {"workspace_id": workspace_id, "status": status, "agent_id": agent}
+
+        proposals: List[ProposalSummary] = []
+        has_more = False
+        scanned = 0
+        for _ in range(LIST_MAX_SCAN_BATCHES):
+            batch = await planner.stream_async(
+                proposals_col,
+                query_filters,
+                PROPOSAL_ORDER,
+                limit=limit + 1,
+                start_after={"created_at": after[0], "id": after[1]} if after else None,
+                select=SUMMARY_FIELDS,
             )
-            proposals.append(ChangeProposal(**data))
+            scanned += len(batch)
+
+            consumed = 0
+            for data in batch[:limit]:
+                consumed += 1
+                after = (data.get("created_at"), data.get("id"))
+                if _visible(data):
+                    proposals.append(await _summarize(data))
+                    if len(proposals) == limit:
+                        break
+            # Documents left in this batch (the extra one fetched is a lookahead)
+            has_more = consumed < len(batch)
+            if len(proposals) == limit or not has_more:
+                break
+
+        next_cursor = None
+        if has_more and after is not None:
+            next_cursor = encode_cursor(after[0], after[1], filters)
 
         logger.info(
-            f"Query completed: {total_docs} total docs, {filtered_docs} passed filters, {len(proposals)} proposals before sorting"
+            f"Returning {len(proposals)} proposals (scanned {scanned} docs, more: {has_more})"
         )
 
-        # Sort client-side by created_at descending (normalize tz-aware)
-        from datetime import datetime, timezone
-
-        def _sort_key(p: ChangeProposal):
-            dt = getattr(p, "created_at", None)
-            try:
-                if isinstance(dt, str):
-                    # Try ISO parsing
-                    try:
-                        parsed = datetime.fromisoformat(dt.replace("Z", "+00:00"))
-                    except Exception:
-                        return datetime.min.replace(tzinfo=timezone.utc)
-                    if parsed.tzinfo is None:
-                        parsed = parsed.replace(tzinfo=timezone.utc)
-                    return parsed
-                if isinstance(dt, datetime):
-                    if dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=timezone.utc)
-                    return dt
-            except Exception:
-                pass
-            return datetime.min.replace(tzinfo=timezone.utc)
-
-        proposals.sort(key=_sort_key, reverse=True)
-
-        # Apply limit after sorting
-        proposals = proposals[:limit]
-
-        logger.info(f"Returning {len(proposals)} proposals after sorting and limit")
-
         # Count by status
         pending = sum(1 for p in proposals if p.status == "pending")
         approved = sum(1 for p in proposals if p.status == "approved")
@@ -322,6 +375,8 @@ async def list_proposals(
         return ProposalListResponse(
             proposals=proposals,
             total=len(proposals),
+            page_size=limit,
+            next_cursor=next_cursor,
             pending=pending,
             approved=approved,
             rejected=rejected,
@@ -332,6 +387,28 @@ async def list_proposals(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/stats", response_model=ProposalStats)
+async def get_proposal_stats(
+    user_id: Optional[str] = Query(None),
+    workspace_id: str = Query("default"),
+    days: int = Query(7, ge=1, le=90),
+):
+    """
+    Get proposal statistics.
+
+    Useful for dashboards and agent retrospectives. Read from the
+    materialized counters (see proposal_counters): cost grows with `days`,
+    not with the number of proposals.
+    """
+    try:
+        totals = await counters.stats_async(workspace_id, user_id=user_id, days=days)
+        return ProposalStats(**stats_from_totals(totals))
+
+    except Exception as e:
+        logger.error(f"Error calculating stats: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{proposal_id}", response_model=ChangeProposal)
 async def get_proposal(proposal_id: str):
     """Get detailed proposal by ID."""
@@ -342,7 +419,7 @@ async def get_proposal(proposal_id: str):
         if not doc_ref:
             raise HTTPException(status_code=404, detail="Proposal not found")
 
-        return ChangeProposal(**data)
+        return ChangeProposal(**decode_proposal(data))
 
     except HTTPException:
         raise
@@ -368,7 +445,7 @@ async def approve_proposal(
         if not doc_ref:
             raise HTTPException(status_code=404, detail="Proposal not found")
 
-        proposal = ChangeProposal(**data)
+        proposal = ChangeProposal(**decode_proposal(data))
 
         # Verify authorization
         # Allow approval if:
@@ -387,25 +464,20 @@ async def approve_proposal(
                 status_code=400, detail=f"Proposal already {proposal.status}"
             )
 
-        # Update proposal
-        await doc_ref.update(
-            {
-                "status": "approved",
-                "approved_by": request.user_id,
-                "approved_at": firestore.SERVER_TIMESTAMP,
-            }
-        )
-
-        # If user edited changes, update them
+        # Update proposal (and the user's edits) if it is still pending
+        updates = {
+            "status": "approved",
+            "approved_by": request.user_id,
+            "approved_at": firestore.SERVER_TIMESTAMP,
+            "reviewed_at": datetime.now(timezone.utc).isoformat(),
+        }
         if request.edited_changes:
-            await doc_ref.update(
-                {
-                    "proposed_changes": [
-                        c.model_dump() for c in request.edited_changes
-                    ],
-                    "edited_by_user": True,
-                }
-            )
+            updates["proposed_changes"] = [c.model_dump() for c in request.edited_changes]
+            updates["edited_by_user"] = True
+        _check_reviewed(
+            proposal_id,
+            await _write_proposal(proposal_id, lambda current: _if_pending(current, updates)),
+        )
 
         # Publish event for Git Agent
         project_id = os.getenv("GCP_PROJECT_ID") or os.getenv("GOOGLE_CLOUD_PROJECT")
@@ -514,7 +586,7 @@ async def reject_proposal(
         if not doc_ref:
             raise HTTPException(status_code=404, detail="Proposal not found")
 
-        proposal = ChangeProposal(**data)
+        proposal = ChangeProposal(**decode_proposal(data))
 
         # Verify authorization (same policy as approval)
         is_owner = proposal.user_id == request.user_id
@@ -525,15 +597,17 @@ async def reject_proposal(
 
         # Update proposal
         feedback_val = getattr(request, "feedback", None)
-        await doc_ref.update(
-            {
-                "status": "rejected",
-                "rejected_by": request.user_id,
-                "rejected_at": firestore.SERVER_TIMESTAMP,
-                "rejection_reason": request.reason,
-                "feedback": feedback_val,
-            }
-        )
+        updates = {
+            "status": "rejected",
+            "rejected_by": request.user_id,
+            "rejected_at": firestore.SERVER_TIMESTAMP,
+            "reviewed_at": datetime.now(timezone.utc).isoformat(),
+            "rejection_reason": request.reason,
+            "feedback": feedback_val,
+        }
+        documents = await _write_proposal(proposal_id, lambda current: updates if current else {})
+        if proposal_id not in documents:
+            raise HTTPException(status_code=404, detail="Proposal not found")
 
         # Publish event (agents can learn from this)
         project_id = os.getenv("GCP_PROJECT_ID") or os.getenv("GOOGLE_CLOUD_PROJECT")
@@ -566,87 +640,6 @@ async def reject_proposal(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/stats", response_model=ProposalStats)
-async def get_proposal_stats(
-    user_id: Optional[str] = Query(None),
-    workspace_id: str = Query("default"),
-    days: int = Query(7, ge=1, le=90),
-):
-    """
-    Get proposal statistics.
-
-    Useful for dashboards and agent retrospectives.
-    """
-    try:
-        # Calculate cutoff date
-        from datetime import timedelta
-
-        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
-
-        # Build query
-        query = proposals_col.where("created_at", ">=", cutoff)
-
-        if user_id:
-            query = query.where("user_id", "==", user_id)
-        if workspace_id:
-            query = query.where("workspace_id", "==", workspace_id)
-
-        # Fetch all
-        docs = query.stream()
-        proposals = [ChangeProposal(**doc.to_dict()) async for doc in docs]
-
-        # Calculate stats
-        by_status = {}
-        by_agent = {}
-        by_type = {}
-        total_review_time = 0
-        reviewed_count = 0
-
-        for p in proposals:
-            # By status
-            by_status[p.status] = by_status.get(p.status, 0) + 1
-
-            # By agent
-            by_agent[p.agent] = by_agent.get(p.agent, 0) + 1
-
-            # By type
-            by_type[p.type] = by_type.get(p.type, 0) + 1
-
-            # Review time
-            if p.approved_at:
-                review_time = (p.approved_at - p.created_at).total_seconds() / 60
-                total_review_time += review_time
-                reviewed_count += 1
-            elif p.rejected_at:
-                review_time = (p.rejected_at - p.created_at).total_seconds() / 60
-                total_review_time += review_time
-                reviewed_count += 1
-
-        # Approval rate
-        approved = by_status.get("approved", 0)
-        rejected = by_status.get("rejected", 0)
-        total_reviewed = approved + rejected
-        approval_rate = approved / total_reviewed if total_reviewed > 0 else 0
-
-        # Avg review time
-        avg_review_time = (
-            total_review_time / reviewed_count if reviewed_count > 0 else 0
-        )
-
-        return ProposalStats(
-            total_proposals=len(proposals),
-            by_status=by_status,
-            by_agent=by_agent,
-            by_type=by_type,
-            approval_rate=approval_rate,
-            avg_time_to_review_minutes=avg_review_time,
-        )
-
-    except Exception as e:
-        logger.error(f"Error calculating stats: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-
 @router.delete("/{proposal_id}")
 async def delete_proposal(proposal_id: str, user_id: str = Query(...)):
     """
@@ -661,7 +654,8 @@ async def delete_proposal(proposal_id: str, user_id: str = Query(...)):
         if not doc.exists:
             raise HTTPException(status_code=404, detail="Proposal not found")
 
-        proposal = ChangeProposal(**doc.to_dict())
+        document = doc.to_dict()
+        proposal = ChangeProposal(**decode_proposal(document, with_contents=False))
 
         # Verify ownership
         if proposal.user_id != user_id:
@@ -673,7 +667,17 @@ async def delete_proposal(proposal_id: str, user_id: str = Query(...)):
                 status_code=400, detail="Can only delete pending proposals"
             )
 
-        await doc_ref.delete()
+        # Delete only if still pending when the transaction reads it
+        document = _check_reviewed(
+            proposal_id,
+            await _write_proposal(proposal_id, lambda current: _if_pending(current, None)),
+            action="delete",
+        )
+
+        # Release file contents held in the blob store
+        refs = blob_refs(document)
+        if refs:
+            get_blob_store().decref_all(refs)
 
         logger.info(f"✅ Proposal deleted: {proposal_id}")
 
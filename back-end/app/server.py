@@ -1,6 +1,11 @@
 from fastapi import FastAPI, Body, Query, HTTPException, Request
 from typing import Optional
-from app.git_context_manager import Git_Context_Manager
+from app.git_context_manager import (
+    PROMPT_HISTORY_MAX_ENTRIES,
+    get_git_context_manager,
+    get_manager_cache_stats,
+    invalidate_git_context_manager,
+)
 from datetime import datetime
 from dotenv import load_dotenv
 import os
@@ -8,11 +13,12 @@ from app.llm_request_model import LLMRequest
 from pydantic import BaseModel
 from typing import List
 import httpx
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from fastapi import Body, Query
 import logging
 from fastapi.middleware.cors import CORSMiddleware
 from collections import defaultdict
+from contextlib import asynccontextmanager
 from time import time
 
 # Temporarily commented - install dependencies later
@@ -20,7 +26,27 @@ from time import time
 from app.agents.spec_agent import SpecAgent
 from app.middleware.abuse_detection import abuse_detector
 from app.utils.workspace_manager import get_workspace_path
-from app.repositories.proposal_repository import get_proposal_repository
+from app.repositories.proposal_repository import get_async_proposal_repository, get_proposal_repository
+from app.services.git_executor import GitJobTimeout, get_git_executor
+from app.services.approval_queue import ApprovalTask, approval_handler, get_approval_queue
+from app.services.blob_store import BLOB_GC_GRACE_SECONDS, get_blob_store
+from app.services.jobs import get_job_registry
+from app.services.local_proposal_store import get_local_proposal_store
+from app.services.local_storage import local_transaction
+from app.services.proposal_feed import (
+    PROPOSAL_FEED_LISTENER,
+    PROPOSAL_FEED_POLL_SECONDS,
+    get_proposal_feed,
+)
+from app.models.proposal import ProposalBulkRequest
+from app.services.proposal_codec import decode_proposal
+from app.services.proposal_counters import stats_from_totals
+from app.services.proposal_summary import to_summary
+from app.services.response_cache import dir_version, file_version, get_response_cache
+from app.services.search_index import KINDS, SEARCH_MAX_RESULTS, attach_search_indexes, get_search_index
+from app.utils.pagination import InvalidCursor, paginate
+from fastapi.responses import StreamingResponse
+import asyncio
 import os
 from typing import List, Dict
 import json
@@ -39,7 +65,43 @@ CONTEXT_PILOT_URL = "http://localhost:8000"
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "..", ".env"))
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Resume approval side effects a previous process left unfinished
+    try:
+        get_approval_queue()
+    except Exception as e:
+        logger.error(f"[API] Could not start the approval queue: {e}")
+
+    # Feed proposal.* events (and Firestore changes) into the change feed
+    feed = get_proposal_feed()
+    try:
+        from app.services.event_bus import get_event_bus
+
+        project_id = os.getenv(
+            "GCP_PROJECT_ID",
+            os.getenv("GOOGLE_CLOUD_PROJECT", os.getenv("GCP_PROJECT", "local")),
+        )
+        bus = get_event_bus(project_id=project_id)
+        feed.attach(bus)
+        # Proposal and retrospective events keep the search indexes current
+        attach_search_indexes(bus)
+        if os.getenv("FIRESTORE_ENABLED", "false").lower() == "true":
+            # proposal.* events invalidate the repository's proposal cache
+            get_proposal_repository().attach(bus)
+            if PROPOSAL_FEED_LISTENER:
+                from app.services.firestore_service import get_firestore_service
+
+                feed.watch_firestore(get_firestore_service())
+    except Exception as e:
+        logger.error(f"[API] Could not start the proposal change feed: {e}")
+    yield
+    feed.close()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="ContextPilot API",
     description="Manage long-term project scope using Git + LLMs + Web3 incentives. Stay aligned and intentional.",
     version="2.0.0",
@@ -130,11 +192,25 @@ app.add_middleware(
 
 
 def get_manager(workspace_id: str = "default"):
-    return Git_Context_Manager(workspace_id=workspace_id)
+    # Reuse one manager per workspace (bounded LRU, revalidated on each hit)
+    return get_git_context_manager(workspace_id)
 
 
 @app.get("/context")
-def get_context(workspace_id: str = Query("default")):
+async def get_context(request: Request, workspace_id: str = Query("default")):
+    """Project context (checkpoint and history), with ETag / If-None-Match support"""
+    try:
+        manager = get_manager(workspace_id)
+        version = file_version(manager.checkpoint_path, manager.history.data_path)
+    except Exception as e:
+        logger.error(f"Error in context endpoint: {str(e)}")
+        return {"error": f"Failed to get context: {str(e)}"}
+    return await get_response_cache().respond(
+        request, version, lambda: asyncio.to_thread(_get_context, workspace_id)
+    )
+
+
+def _get_context(workspace_id: str) -> Dict:
     logger.info(f"GET /context called with workspace_id: {workspace_id}")
 
     try:
@@ -164,32 +240,52 @@ def get_milestones(workspace_id: str = Query("default")):
 
 
 @app.post("/commit")
-def manual_commit(
+async def manual_commit(
     message: str = "Manual context update",
     agent: str = "manual",
     workspace_id: str = Query("default"),
+    paths: Optional[List[str]] = Query(None, description="Only stage these paths"),
+    background: bool = Query(False, description="Return a job id instead of waiting"),
 ):
     manager = get_manager(workspace_id)
-    commit = manager.commit_changes(message=message, agent=agent)
+    if background:
+        job = manager.submit_commit(message=message, agent=agent, paths=paths)
+        return {"status": "queued", "job_id": job.id}
+    try:
+        commit = await manager.commit_changes_async(message=message, agent=agent, paths=paths)
+    except GitJobTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     return {"status": "success", "commit": commit}
 
 
 @app.post("/commit/llm")
-def llm_commit(workspace_id: str = Query("default")):
+async def llm_commit(
+    workspace_id: str = Query("default"),
+    background: bool = Query(False, description="Return a job id instead of waiting"),
+):
     manager = get_manager(workspace_id)
-    diff = manager.show_diff()
+    diff = await manager.show_diff_async()
     try:
-        summary = manager.summarize_diff_for_commit(diff)
+        summary = await asyncio.to_thread(manager.summarize_diff_for_commit, diff)
     except Exception as e:
         summary = f"Error calling OpenAI: {str(e)}"
-    commit = manager.commit_changes(message=summary, agent="llm")
+    if background:
+        job = manager.submit_commit(message=summary, agent="llm")
+        return {"status": "queued", "job_id": job.id, "summary": summary}
+    try:
+        commit = await manager.commit_changes_async(message=summary, agent="llm")
+    except GitJobTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     return {"status": "success", "commit": commit, "summary": summary}
 
 
 @app.get("/log")
-def get_log(workspace_id: str = Query("default")):
+def get_log(
+    workspace_id: str = Query("default"),
+    limit: Optional[int] = Query(None, ge=1, description="Only return the last N entries"),
+):
     manager = get_manager(workspace_id)
-    return manager.get_project_context()["history"]
+    return manager.get_project_context(history_limit=limit)["history"]
 
 
 @app.get("/coach")
@@ -201,9 +297,11 @@ def get_coach_tip(workspace_id: str = Query("default")):
         manager = get_manager(workspace_id)
 
         logger.info("Getting project context...")
-        state = manager.get_project_context()
+        # Only the last entry is needed; avoid loading the full history log
+        state = manager.get_project_context(history_limit=1)
         checkpoint = state.get("checkpoint")
         history = state.get("history", [])
+        history_count = len(manager.history)
 
         if not checkpoint:
             logger.info("No checkpoint data available")
@@ -215,7 +313,7 @@ def get_coach_tip(workspace_id: str = Query("default")):
 
         logger.info(f"Current status: {status}")
         logger.info(f"Number of milestones: {len(milestones)}")
-        logger.info(f"Number of history entries: {len(history)}")
+        logger.info(f"Number of history entries: {history_count}")
 
         if history:
             last_entry = history[-1]
@@ -302,7 +400,8 @@ def update_checkpoint(
 
         logger.info("Committing changes...")
         commit = manager.commit_changes(
-            message="Checkpoint updated via API", agent="update"
+            message="Checkpoint updated via API", agent="update",
+            paths=[manager.context_dir],
         )
         logger.info(f"Commit successful with hash: {commit}")
 
@@ -319,7 +418,7 @@ def update_checkpoint(
 def push_context_to_llm(request: LLMRequest, workspace_id: str = Query("default")):
     manager = get_manager(workspace_id)
     try:
-        context = manager.get_project_context()
+        context = manager.get_project_context(history_limit=PROMPT_HISTORY_MAX_ENTRIES)
         result = manager.query_llm(prompt=request.prompt, context=context)
         return {"response": result}
     except Exception as e:
@@ -351,7 +450,7 @@ def reflect(
     prompt = (
         f"Gere uma reflexão de coaching no estilo '{style}' com base no contexto atual."
     )
-    context = manager.get_project_context()
+    context = manager.get_project_context(history_limit=PROMPT_HISTORY_MAX_ENTRIES)
     try:
         result = manager.query_llm(prompt=prompt, context=context)
         return {"reflection": result}
@@ -363,7 +462,7 @@ def reflect(
 def plan(workspace_id: str = Query("default")):
     manager = get_manager(workspace_id)
     prompt = "Com base no contexto atual e nos marcos definidos, gere um plano de ação prático com etapas claras."
-    context = manager.get_project_context()
+    context = manager.get_project_context(history_limit=PROMPT_HISTORY_MAX_ENTRIES)
     try:
         result = manager.query_llm(prompt=prompt, context=context)
         return {"plan": result}
@@ -384,7 +483,7 @@ def llm_history(workspace_id: str = Query("default")):
 @app.post("/validate-goal")
 def validate_goal(workspace_id: str = Query("default")):
     manager = get_manager(workspace_id)
-    context = manager.get_project_context()
+    context = manager.get_project_context(history_limit=PROMPT_HISTORY_MAX_ENTRIES)
     goal = context.get("checkpoint", {}).get("goal", "")
     if not goal:
         return {
@@ -446,8 +545,9 @@ async def generate_context(payload: ContextPayload, workspace_id: str = "default
             f"Initial context generated for project: {payload.project_name}"
         )
         logger.info(f"Committing changes with message: {commit_message}")
-        commit = manager.commit_changes(
-            message=commit_message, agent="generate-context"
+        commit = await manager.commit_changes_async(
+            message=commit_message, agent="generate-context",
+            paths=[manager.context_dir],
         )
         logger.info(f"Commit successful with hash: {commit}")
 
@@ -493,7 +593,9 @@ def commit_task(
 
         commit_message = f"Agent {agent} updated task: {task_name}"
         logger.info(f"Committing changes with message: {commit_message}")
-        commit = manager.commit_changes(message=commit_message, agent=agent)
+        commit = manager.commit_changes(
+            message=commit_message, agent=agent, paths=[manager.context_dir]
+        )
         logger.info(f"Commit successful with hash: {commit}")
 
         response = {"status": "success", "commit": commit}
@@ -506,37 +608,39 @@ def commit_task(
 
 
 @app.post("/context/push")
-def push_context(
+async def push_context(
     workspace_id: str = Query("default"),
     remote_name: str = Query("origin"),
     branch: str = Query("main"),
     auto_commit: bool = Query(False),
     commit_message: str = Query("Auto final sync"),
     agent: str = Query("manual"),
+    background: bool = Query(False, description="Return a job id instead of waiting"),
 ):
     logger.info(f"POST /context/push called for workspace_id: {workspace_id}")
     try:
         manager = get_manager(workspace_id)
 
+        if background:
+            if auto_commit:
+                job = manager.submit_commit_and_push(
+                    message=commit_message, agent=agent,
+                    remote_name=remote_name, branch=branch,
+                )
+            else:
+                job = manager.submit_push(remote_name=remote_name, branch=branch)
+            return {"status": "queued", "job_id": job.id}
+
+        final_commit_hash = None
         if auto_commit:
-            final_commit_hash = manager.commit_changes(
+            # commit_changes already makes a final safety commit if the
+            # history/markdown updates left the tree dirty
+            final_commit_hash = await manager.commit_changes_async(
                 message=commit_message, agent=agent
             )
             logger.info(f"Final commit hash before push: {final_commit_hash}")
 
-            # 🔒 Safety check extra
-            if manager.repo.is_dirty(untracked_files=True):
-                logger.info(
-                    "Extra changes detected even after final commit. Forcing last safety commit..."
-                )
-                manager.repo.git.add(A=True)
-                extra_message = f"Final safety auto-commit before push by {agent}"
-                extra_commit = manager.repo.index.commit(extra_message)
-                logger.info(
-                    f"✅ Safety commit created with hash: {extra_commit.hexsha}"
-                )
-
-        res = manager.push_changes(remote_name=remote_name, branch=branch)
+        res = await manager.push_changes_async(remote_name=remote_name, branch=branch)
 
         if res["status"] == "success":
             return {
@@ -552,6 +656,58 @@ def push_context(
         return {"status": "error", "message": str(e)}
 
 
+# ===== BACKGROUND JOBS =====
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Get the status (and result, once finished) of a background job"""
+    job = get_job_registry().get(job_id)
+    if job is not None:
+        return job.to_dict()
+    # Approval tasks outlive the in-memory registry
+    task = get_approval_queue().get(job_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return task
+
+
+@app.get("/jobs/{job_id}/stream")
+async def stream_job(job_id: str):
+    """Stream job status changes as Server-Sent Events until the job finishes"""
+    registry = get_job_registry()
+    task = None
+    if registry.get(job_id) is None:
+        task = get_approval_queue().get(job_id)
+        if task is None:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    async def events():
+        if task is not None:
+            # Finished approval task the registry no longer holds
+            yield f"event: {task['status']}\ndata: {json.dumps(task, default=str)}\n\n"
+            return
+        async for snapshot in registry.stream(job_id):
+            yield f"event: {snapshot['status']}\ndata: {json.dumps(snapshot, default=str)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    """Cancel a queued or running background job"""
+    registry = get_job_registry()
+    queue = get_approval_queue()
+    if queue.get(job_id) is not None:
+        # Approval tasks can be cancelled until they start
+        cancelled = queue.cancel(job_id)
+        return {"job_id": job_id, "cancelled": cancelled, "status": queue.get(job_id)["status"]}
+    if registry.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    cancelled = get_git_executor().cancel(job_id)
+    return {"job_id": job_id, "cancelled": cancelled, "status": registry.get(job_id).status}
+
+
 @app.post("/context/close-cycle")
 def close_cycle(workspace_id: str = Query("default")):
     logger.info(f"POST /context/close-cycle called for workspace_id: {workspace_id}")
@@ -592,6 +748,58 @@ def get_abuse_stats():
     return abuse_detector.get_stats()
 
 
+@app.get("/admin/manager-cache")
+def get_manager_cache():
+    """Get Git_Context_Manager cache statistics (admin endpoint)"""
+    logger.info("GET /admin/manager-cache called")
+    return get_manager_cache_stats()
+
+
+@app.post("/admin/manager-cache/invalidate")
+def invalidate_manager_cache(workspace_id: Optional[str] = Query(None)):
+    """Drop cached Git_Context_Manager instances (all if no workspace_id)"""
+    logger.info(f"POST /admin/manager-cache/invalidate called for: {workspace_id or 'all'}")
+    invalidate_git_context_manager(workspace_id)
+    return {"status": "ok", "invalidated": workspace_id or "all"}
+
+
+@app.get("/admin/proposal-cache")
+def get_proposal_cache():
+    """Get ProposalRepository cache statistics (admin endpoint)"""
+    logger.info("GET /admin/proposal-cache called")
+    if os.getenv("FIRESTORE_ENABLED", "false").lower() != "true":
+        return {"enabled": False}
+    return {"enabled": True, **get_proposal_repository().cache_stats()}
+
+
+@app.post("/admin/proposal-cache/invalidate")
+def invalidate_proposal_cache(proposal_id: Optional[str] = Query(None)):
+    """Drop cached proposals (all if no proposal_id)"""
+    logger.info(f"POST /admin/proposal-cache/invalidate called for: {proposal_id or 'all'}")
+    if os.getenv("FIRESTORE_ENABLED", "false").lower() == "true":
+        get_proposal_repository().invalidate([proposal_id] if proposal_id else None)
+    return {"status": "ok", "invalidated": proposal_id or "all"}
+
+
+@app.get("/admin/blob-store")
+def get_blob_store_stats():
+    """Get blob store statistics (admin endpoint)"""
+    logger.info("GET /admin/blob-store called")
+    store = get_blob_store()
+    if not hasattr(store, "stats"):
+        return {"backend": type(store).__name__}
+    return store.stats()
+
+
+@app.post("/admin/blob-store/gc")
+def collect_blobs(grace_seconds: Optional[float] = Query(None, ge=0)):
+    """Delete blobs unreferenced for longer than grace_seconds (default BLOB_GC_GRACE_SECONDS)"""
+    logger.info("POST /admin/blob-store/gc called")
+    if grace_seconds is None:
+        grace_seconds = BLOB_GC_GRACE_SECONDS
+    return {"status": "ok", "removed": get_blob_store().gc(grace_seconds)}
+
+
 @app.get("/agents/status")
 def get_agents_status():
     """Get status of all agents (mock for now)"""
@@ -853,27 +1061,10 @@ def _read_proposals(json_path: Path) -> List[Dict]:
     return []
 
 
-def _read_proposals_from_dir(proposals_dir: Path) -> List[Dict]:
-    """Read all proposals from proposals/ directory (new format with diffs)"""
-    if not proposals_dir.exists():
-        return []
-
-    proposals = []
-    for json_file in proposals_dir.glob("*.json"):
-        try:
-            with open(json_file, "r") as f:
-                proposal = json.load(f)
-                proposals.append(proposal)
-        except Exception as e:
-            logger.error(f"Error reading proposal {json_file}: {e}")
-
-    # Sort by created_at (newest first)
-    proposals.sort(key=lambda p: p.get("created_at", ""), reverse=True)
-    return proposals
-
-
 def _write_proposals(json_path: Path, proposals: List[Dict]):
-    json_path.write_text(json.dumps(proposals, indent=2), encoding="utf-8")
+    """Write proposals.json (legacy), atomically under the workspace lock"""
+    with local_transaction(json_path.parent / "proposals") as tx:
+        tx.write(json_path, json.dumps(proposals, indent=2))
 
 
 def _auto_approve_enabled() -> bool:
@@ -931,46 +1122,369 @@ async def _trigger_github_workflow(proposal_id: str, proposal: Dict) -> bool:
         return False
 
 
+async def _trigger_github_workflow_batch(workspace_id: str, proposal_ids: List[str]) -> bool:
+    """
+    Trigger one GitHub Actions run for several approved proposals.
+
+    Sends a single `proposals-approved` repository_dispatch; the workflow
+    applies all the proposals in one job, on one branch, with one commit
+    and one PR.
+    """
+    github_token = os.getenv("GITHUB_TOKEN")
+    github_repo = os.getenv("GITHUB_REPO", "fsegall/google-context-pilot")
+
+    if not github_token:
+        logger.warning("[API] GITHUB_TOKEN not set, skipping GitHub trigger")
+        return False
+
+    url = f"https://api.github.com/repos/{github_repo}/dispatches"
+    headers = {
+        "Authorization": f"token {github_token}",
+        "Accept": "application/vnd.github.v3+json",
+        "Content-Type": "application/json",
+    }
+    payload = {
+        "event_type": "proposals-approved",
+        "client_payload": {"proposal_ids": proposal_ids, "workspace_id": workspace_id},
+    }
+
+    try:
+        async with httpx.AsyncClient() as client:
+            response = await client.post(url, json=payload, headers=headers, timeout=10.0)
+            response.raise_for_status()
+            logger.info(f"[API] GitHub Actions triggered once for {len(proposal_ids)} proposals")
+            return True
+    except Exception as e:
+        logger.error(f"[API] Failed to trigger GitHub Actions: {e}")
+        return False
+
+
+# ===== APPROVAL SIDE EFFECTS (background tasks, see approval_queue) =====
+
+
+def _enqueue_approval(
+    workspace_id: str, storage: str, proposal_ids: List[str], proposal: Optional[Dict] = None
+) -> Optional[str]:
+    """
+    Queue the git commit / GitHub dispatch of approved proposals.
+
+    Returns:
+        Job id, or None if there is nothing to do in the background
+    """
+    commit = _auto_approve_enabled()
+    dispatch = storage == "firestore" and os.getenv("ENVIRONMENT") == "production"
+    if not proposal_ids or not (commit or dispatch):
+        return None
+    payload = {
+        "proposal_ids": proposal_ids,
+        "storage": storage,
+        "commit": commit,
+        "dispatch": dispatch,
+    }
+    if proposal is not None:
+        payload["proposal"] = {
+            "title": proposal.get("title", ""),
+            "description": proposal.get("description", ""),
+            "workspace_id": proposal.get("workspace_id", workspace_id),
+        }
+    return get_approval_queue().enqueue("proposals.apply", workspace_id, payload).id
+
+
+def _record_commit(workspace_id: str, storage: str, proposal_ids: List[str], commit_hash: str) -> None:
+    """Store the commit that applied approved proposals (JSON/Firestore and MD)."""
+    if storage == "firestore":
+        if not get_proposal_repository().record_commit(proposal_ids, commit_hash, workspace_id):
+            raise RuntimeError("Could not record the commit hash in Firestore")
+        return
+
+    paths = _proposals_paths(workspace_id)
+    store = get_local_proposal_store(paths["dir"])
+    # Read and rewritten under the workspace lock, all files or none
+    with local_transaction(paths["dir"]) as tx:
+        in_dir = []
+        legacy_ids = []
+        for pid in proposal_ids:
+            prop = store.get(pid)
+            if prop is None:
+                legacy_ids.append(pid)
+            else:
+                prop["commit_hash"] = commit_hash
+                in_dir.append(prop)
+        if in_dir:
+            store.save_many(in_dir)
+        if legacy_ids:
+            proposals = _read_proposals(paths["json"])
+            for prop in proposals:
+                if prop.get("id") in legacy_ids:
+                    prop["commit_hash"] = commit_hash
+            _write_proposals(paths["json"], proposals)
+
+        for pid in proposal_ids:
+            tx.append(paths["dir"] / f"{pid}.md", f"**Commit:** {commit_hash}\n")
+
+
+@approval_handler("proposals.apply")
+async def _apply_approved_proposals(task: ApprovalTask) -> Dict:
+    """
+    Background part of an approval: one git commit (auto-approve) and, in
+    production, one GitHub dispatch when nothing was committed.
+
+    Steps are checkpointed, so a retry only redoes what failed.
+    """
+    ids = task.payload["proposal_ids"]
+    state = task.state
+
+    if task.payload.get("commit") and "commit" not in state:
+        from app.agents.git_agent import commit_batch_via_agent
+
+        agent_result = await commit_batch_via_agent(task.workspace_id, ids)
+        state["commit"] = {
+            "commit_hash": agent_result["commit_hash"],
+            "github_triggered": agent_result["github_triggered"],
+        }
+        task.checkpoint("committed")
+    commit = state.get("commit") or {}
+    commit_hash = commit.get("commit_hash")
+
+    if commit_hash and not state.get("recorded"):
+        await asyncio.to_thread(_record_commit, task.workspace_id, task.payload["storage"], ids, commit_hash)
+        state["recorded"] = True
+        task.checkpoint("recorded")
+
+    github_triggered = bool(commit.get("github_triggered") or state.get("dispatched"))
+    if task.payload.get("dispatch") and not commit_hash and not github_triggered:
+        if len(ids) == 1:
+            github_triggered = await _trigger_github_workflow(ids[0], task.payload.get("proposal") or {})
+        else:
+            github_triggered = await _trigger_github_workflow_batch(task.workspace_id, ids)
+        if not github_triggered and os.getenv("GITHUB_TOKEN"):
+            raise RuntimeError("GitHub Actions dispatch failed")
+        state["dispatched"] = github_triggered
+        task.checkpoint("dispatched")
+
+    return {"proposal_ids": ids, "commit_hash": commit_hash, "github_triggered": github_triggered}
+
+
+def _proposals_version(workspace_id: str) -> Optional[str]:
+    """Version of a workspace's proposals for ETags (None = unknown)."""
+    if os.getenv("FIRESTORE_ENABLED", "false").lower() == "true":
+        feed = get_proposal_feed()
+        # Only a snapshot listener sees the writes of every instance
+        return feed.version if feed.watching else None
+    paths = _proposals_paths(workspace_id)
+    return f"{get_local_proposal_store(paths['dir']).version()}:{file_version(paths['json'])}"
+
+
 @app.get("/proposals")
-async def list_proposals(workspace_id: str = Query("default")):
-    """List all proposals with diffs"""
+async def list_proposals(
+    request: Request,
+    workspace_id: str = Query("default"),
+    status: Optional[str] = Query(None),
+    agent_id: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+):
+    """
+    List proposal summaries, newest first.
+
+    Summaries carry titles, statuses and diff stats only; get a proposal by
+    id for its diffs. Without `limit` every proposal is returned. With `limit`, one page is
+    returned along with `next_cursor` (null on the last page); pass it back
+    as `cursor` to get the next page.
+
+    Responses carry an ETag; send it back as If-None-Match to get 304 while
+    no proposal changed.
+    """
+    return await get_response_cache().respond(
+        request,
+        _proposals_version(workspace_id),
+        lambda: _list_proposals(workspace_id, status, agent_id, limit, cursor),
+    )
+
+
+async def _list_proposals(
+    workspace_id: str,
+    status: Optional[str],
+    agent_id: Optional[str],
+    limit: Optional[int],
+    cursor: Optional[str],
+) -> Dict:
+    paginated = limit is not None or cursor is not None
+    page_size = limit or 50
 
     # Try Firestore first (if enabled)
     if os.getenv("FIRESTORE_ENABLED", "false").lower() == "true":
         try:
-            from app.repositories.proposal_repository import get_proposal_repository
-
-            repo = get_proposal_repository()
-            proposals = repo.list(workspace_id=workspace_id)
+            repo = get_async_proposal_repository()
+            if paginated:
+                proposals, next_cursor = await repo.list_summaries(
+                    workspace_id=workspace_id,
+                    status=status,
+                    agent_id=agent_id,
+                    limit=page_size,
+                    cursor=cursor,
+                )
+                logger.info(f"[API] Listed a page of {len(proposals)} proposals from Firestore")
+                return {"proposals": proposals, "count": len(proposals), "next_cursor": next_cursor}
+            proposals, _ = await repo.list_summaries(
+                workspace_id=workspace_id, status=status, agent_id=agent_id
+            )
             logger.info(f"[API] Listed {len(proposals)} proposals from Firestore")
             return {"proposals": proposals, "count": len(proposals)}
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             logger.error(f"[API] Firestore error, falling back to local: {e}")
 
     # Fallback to local file storage
     paths = _proposals_paths(workspace_id)
+    next_cursor = None
 
-    # Try new format first (individual JSON files with diffs)
-    proposals = _read_proposals_from_dir(paths["dir"])
+    try:
+        # Try new format first (individual JSON files with diffs, via the index)
+        store = get_local_proposal_store(paths["dir"])
+        total = store.count(status=status, agent_id=agent_id)
+        if not paginated:
+            proposals = store.summaries(status=status, agent_id=agent_id)
+        elif total:
+            proposals, next_cursor = store.summary_page(
+                page_size, cursor=cursor, status=status, agent_id=agent_id
+            )
 
-    # Fallback to legacy format if no proposals in dir
-    if not proposals:
-        proposals = _read_proposals(paths["json"])
+        # Fallback to legacy format if no proposals in dir
+        if not total:
+            proposals = [
+                to_summary(p)
+                for p in _read_proposals(paths["json"])
+                if (status is None or p.get("status") == status)
+                and (agent_id is None or p.get("agent_id") == agent_id)
+            ]
+            total = len(proposals)
+            if paginated:
+                proposals, next_cursor = paginate(
+                    proposals,
+                    page_size,
+                    cursor,
+                    {"status": status, "agent_id": agent_id, "user_id": None},
+                )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    response = {"proposals": proposals, "count": len(proposals), "total": total}
+    if paginated:
+        response["next_cursor"] = next_cursor
+    return response
+
+
+@app.get("/proposals/stats")
+async def get_proposal_stats(
+    workspace_id: str = Query("default"),
+    user_id: Optional[str] = Query(None),
+    days: Optional[int] = Query(None, ge=1, le=365),
+):
+    """
+    Proposal statistics (totals by status and agent, approval rate, review time).
+
+    Read from materialized counters, so the cost depends on `days` (None =
+    all time), not on the number of proposals.
+    """
+    if os.getenv("FIRESTORE_ENABLED", "false").lower() == "true":
+        try:
+            return await get_async_proposal_repository().stats(workspace_id, user_id=user_id, days=days)
+        except Exception as e:
+            logger.error(f"[API] Firestore error, falling back to local: {e}")
+
+    store = get_local_proposal_store(_proposals_paths(workspace_id)["dir"])
+    since = None
+    if days is not None:
+        since = (datetime.now(timezone.utc) - timedelta(days=days)).date().isoformat()
+    return stats_from_totals(store.stats(user_id=user_id, since=since))
 
-    return {"proposals": proposals, "count": len(proposals)}
+
+def _parse_since(since: Optional[str]) -> Optional[datetime]:
+    if since is None:
+        return None
+    try:
+        return datetime.fromisoformat(since.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid since timestamp: {since}")
+
+
+def _refresh_local_proposals(workspace_id: str) -> None:
+    """Pick up proposal files agents wrote (recorded in the feed by the store)."""
+    if os.getenv("FIRESTORE_ENABLED", "false").lower() != "true":
+        get_local_proposal_store(_proposals_paths(workspace_id)["dir"]).refresh()
+
+
+@app.get("/proposals/changes")
+async def list_proposal_changes(
+    workspace_id: str = Query("default"),
+    seq: Optional[int] = Query(None, ge=0, description="last_seq from the previous call"),
+    since: Optional[str] = Query(None, description="ISO timestamp (used when seq is not given)"),
+    limit: int = Query(500, ge=1, le=1000),
+):
+    """
+    Proposal changes (created, updated, status_changed, deleted) after `seq`
+    or `since`, oldest first.
+
+    Pass `last_seq` back as `seq` to get the next changes. If `reset` is
+    true, changes were missed (too old, or the server restarted): re-list
+    `/proposals` and continue from `last_seq`. For push delivery use
+    `/proposals/changes/stream`.
+    """
+    since_at = _parse_since(since)
+    _refresh_local_proposals(workspace_id)
+    return get_proposal_feed().changes(seq, since_at, workspace_id=workspace_id, limit=limit)
+
+
+@app.get("/proposals/changes/stream")
+async def stream_proposal_changes(
+    request: Request,
+    workspace_id: str = Query("default"),
+    seq: Optional[int] = Query(None, ge=0),
+    since: Optional[str] = Query(None),
+):
+    """
+    Stream proposal changes as Server-Sent Events.
+
+    Each event's `id` is its sequence number, so reconnecting clients
+    resume from the Last-Event-ID header; `seq` or `since` set the starting
+    point of a new connection. A `reset` event means changes were missed and
+    the client should re-list `/proposals`.
+    """
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id and last_event_id.isdigit():
+        seq = int(last_event_id)
+    since_at = _parse_since(since)
+    feed = get_proposal_feed()
+    _refresh_local_proposals(workspace_id)
+
+    async def events():
+        async for change in feed.stream(seq, since_at, workspace_id, timeout=PROPOSAL_FEED_POLL_SECONDS):
+            if change is None:
+                await asyncio.to_thread(_refresh_local_proposals, workspace_id)
+                yield ": keep-alive\n\n"
+            elif change["type"] == "reset":
+                yield f"event: reset\ndata: {json.dumps(change)}\n\n"
+            else:
+                yield f"id: {change['seq']}\nevent: {change['type']}\ndata: {json.dumps(change, default=str)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
 
 
 @app.get("/proposals/{proposal_id}")
-async def get_proposal(proposal_id: str, workspace_id: str = Query("default")):
-    """Get a single proposal by ID with full diff"""
+async def get_proposal(request: Request, proposal_id: str, workspace_id: str = Query("default")):
+    """Get a single proposal by ID with full diff (ETag / If-None-Match as for /proposals)"""
+    return await get_response_cache().respond(
+        request, _proposals_version(workspace_id), lambda: _get_proposal(proposal_id, workspace_id)
+    )
 
+
+async def _get_proposal(proposal_id: str, workspace_id: str) -> Dict:
     # Try Firestore first (if enabled)
     if os.getenv("FIRESTORE_ENABLED", "false").lower() == "true":
         try:
-            from app.repositories.proposal_repository import get_proposal_repository
-
-            repo = get_proposal_repository()
-            proposal = repo.get(proposal_id)
+            proposal = await get_async_proposal_repository().get(proposal_id)
             if proposal:
                 logger.info(f"[API] Found proposal in Firestore: {proposal_id}")
                 return proposal
@@ -981,20 +1495,19 @@ async def get_proposal(proposal_id: str, workspace_id: str = Query("default")):
     paths = _proposals_paths(workspace_id)
 
     # Try to read from individual file
-    proposal_file = paths["dir"] / f"{proposal_id}.json"
-    if proposal_file.exists():
-        try:
-            with open(proposal_file, "r") as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Error reading proposal {proposal_id}: {e}")
-            raise HTTPException(status_code=500, detail=f"Failed to read proposal: {e}")
+    try:
+        proposal = get_local_proposal_store(paths["dir"]).get(proposal_id)
+    except Exception as e:
+        logger.error(f"Error reading proposal {proposal_id}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to read proposal: {e}")
+    if proposal is not None:
+        return decode_proposal(proposal, workspace_path=str(paths["dir"].parent))
 
     # Fallback: search in proposals.json
     proposals = _read_proposals(paths["json"])
     for p in proposals:
         if p.get("id") == proposal_id:
-            return p
+            return decode_proposal(p, workspace_path=str(paths["dir"].parent))
 
     raise HTTPException(status_code=404, detail="Proposal not found")
 
@@ -1026,16 +1539,14 @@ async def create_proposals_from_spec(workspace_id: str = Query("default")):
 
         # Count total proposals in Firestore
         if os.getenv("FIRESTORE_ENABLED", "false").lower() == "true":
-            repo = get_proposal_repository()
-            all_proposals = repo.list(workspace_id=workspace_id)
-            total = len(all_proposals)
+            # From the materialized counters, without listing proposals
+            total = (await get_async_proposal_repository().stats(workspace_id))["total"]
         else:
             # Fallback to local file storage
             paths = _proposals_paths(workspace_id)
-            proposals = _read_proposals_from_dir(paths["dir"])
-            if not proposals:
-                proposals = _read_proposals(paths["json"])
-            total = len(proposals)
+            total = get_local_proposal_store(paths["dir"]).count()
+            if not total:
+                total = len(_read_proposals(paths["json"]))
 
         return {"created": len(new_proposals), "total": total}
     except Exception as e:
@@ -1043,19 +1554,69 @@ async def create_proposals_from_spec(workspace_id: str = Query("default")):
         return {"created": 0, "error": str(e)}
 
 
+@app.get("/search")
+async def search(
+    q: str = Query(..., min_length=1, description="Words to look for"),
+    workspace_id: str = Query("default"),
+    kind: Optional[List[str]] = Query(None, description="proposal, retrospective and/or doc"),
+    limit: int = Query(20, ge=1, le=SEARCH_MAX_RESULTS),
+):
+    """
+    Full-text search over proposals, retrospectives and workspace docs.
+
+    Results are ranked with BM25 (title matches first) from a persistent
+    per-workspace index that only re-reads files changed since the last
+    search (see search_index).
+    """
+    unknown = sorted(set(kind or ()) - set(KINDS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown kind: {', '.join(unknown)}")
+    try:
+        workspace_path = get_workspace_path(workspace_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+
+    start = time()
+    results = await asyncio.to_thread(get_search_index(workspace_path).search, q, kind, limit)
+    return {
+        "query": q,
+        "results": results,
+        "count": len(results),
+        "took_ms": round((time() - start) * 1000, 2),
+    }
+
+
 @app.get("/context/summary")
 async def get_context_summary(
-    proposal_type: str = Query("general"), workspace_id: str = Query("default")
+    request: Request,
+    proposal_type: str = Query("general"),
+    workspace_id: str = Query("default"),
 ):
-    """Generate intelligent context summary for new chat sessions."""
+    """
+    Generate intelligent context summary for new chat sessions.
+
+    The summary is only regenerated when one of the documents it reads
+    changes (ETag / If-None-Match supported); `timestamp` is the time it was
+    generated.
+    """
+    from app.agents.spec_agent import CONTEXT_SUMMARY_FILES
+
+    # Get workspace path
+    workspace_path = get_workspace_path(workspace_id)
+    if not workspace_path:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+    version = file_version(*(Path(workspace_path) / name for name in CONTEXT_SUMMARY_FILES))
+    return await get_response_cache().respond(
+        request,
+        version,
+        lambda: _generate_context_summary(proposal_type, workspace_id, workspace_path),
+    )
+
+
+def _generate_context_summary(proposal_type: str, workspace_id: str, workspace_path) -> Dict:
     try:
         from app.agents.spec_agent import SpecAgent
 
-        # Get workspace path
-        workspace_path = get_workspace_path(workspace_id)
-        if not workspace_path:
-            raise HTTPException(status_code=404, detail="Workspace not found")
-
         # Initialize Spec Agent
         spec_agent = SpecAgent(
             workspace_path=workspace_path,
@@ -1078,122 +1639,168 @@ async def get_context_summary(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/proposals/bulk")
+async def bulk_proposals(request: ProposalBulkRequest, workspace_id: str = Query("default")):
+    """
+    Approve or reject several proposals at once.
+
+    Statuses are written with one batched Firestore write (or one local index
+    transaction). Approved proposals are then applied in the background by a
+    single task (see approval_queue): one git commit when auto-approve is on,
+    and at most one GitHub Actions dispatch.
+
+    Returns:
+        Per-item results (approved/rejected, unchanged or not_found) and the
+        job id of the background task (poll GET /jobs/{job_id})
+    """
+    ids = list(dict.fromkeys(request.ids))
+    status = "approved" if request.action == "approve" else "rejected"
+
+    if os.getenv("FIRESTORE_ENABLED", "false").lower() == "true":
+        try:
+            results = await get_async_proposal_repository().bulk_update_status(ids, status, reason=request.reason)
+        except Exception as e:
+            logger.error(f"[API] Firestore bulk {request.action} error: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+        approved = [pid for pid, result in results.items() if result == "approved"]
+        return {
+            "action": request.action,
+            "results": results,
+            "job_id": _enqueue_approval(workspace_id, "firestore", approved),
+        }
+
+    # Fallback to local file storage
+    paths = _proposals_paths(workspace_id)
+    store = get_local_proposal_store(paths["dir"])
+    try:
+        # Statuses read and written under the workspace lock, all files or none
+        with local_transaction(paths["dir"]) as tx:
+            legacy = None
+            results: Dict[str, str] = {}
+            in_dir: List[Dict] = []
+            in_legacy: List[Dict] = []
+            for pid in ids:
+                prop = store.get(pid)
+                if prop is not None:
+                    target = in_dir
+                else:
+                    if legacy is None:
+                        legacy = _read_proposals(paths["json"])
+                    prop = next((p for p in legacy if p.get("id") == pid), None)
+                    target = in_legacy
+                if prop is None:
+                    results[pid] = "not_found"
+                elif prop.get("status") == status:
+                    results[pid] = "unchanged"
+                else:
+                    target.append(prop)
+                    results[pid] = status
+            changed = in_dir + in_legacy
+
+            reviewed_at = datetime.now(timezone.utc).isoformat()
+            for prop in changed:
+                prop["status"] = status
+                prop["reviewed_at"] = reviewed_at
+                if status == "rejected":
+                    prop["reason"] = request.reason or ""
+
+            if in_dir:
+                store.save_many(in_dir)
+            if in_legacy:
+                _write_proposals(paths["json"], legacy)
+
+            for prop in changed:
+                if status == "approved":
+                    appendix = f"\n\n---\n**Status:** approved\n"
+                else:
+                    appendix = f"\nStatus: rejected\nReason: {request.reason or ''}\n"
+                tx.append(paths["dir"] / f"{prop['id']}.md", appendix)
+    except Exception as e:
+        logger.error(f"Error in bulk {request.action}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    job_id = None
+    if status == "approved":
+        job_id = _enqueue_approval(workspace_id, "local", [p["id"] for p in changed])
+    return {"action": request.action, "results": results, "job_id": job_id}
+
+
 @app.post("/proposals/{proposal_id}/approve")
 async def approve_proposal(proposal_id: str, workspace_id: str = Query("default")):
+    """
+    Approve a proposal.
+
+    The status is stored right away; the git commit (auto-approve) and the
+    GitHub dispatch (production) run in a background task, ordered per
+    workspace and retried on failure. Poll `GET /jobs/{job_id}` or stream
+    `GET /jobs/{job_id}/stream` for their outcome.
+    """
     # Try Firestore first (if enabled)
     if os.getenv("FIRESTORE_ENABLED", "false").lower() == "true":
         try:
-            from app.repositories.proposal_repository import get_proposal_repository
-
-            repo = get_proposal_repository()
-            prop = repo.get(proposal_id)
+            repo = get_async_proposal_repository()
+            prop = await repo.get(proposal_id)
 
             if not prop:
                 return {"status": "not_found"}
 
-            summary = prop.get("description", "")
-            commit_hash = None
-
-            if _auto_approve_enabled():
-                try:
-                    from app.agents.git_agent import commit_via_agent
-
-                    commit_hash = await commit_via_agent(
-                        workspace_id=workspace_id,
-                        event_type="proposal.approved",
-                        data={
-                            "proposal_id": proposal_id,
-                            "workspace_id": workspace_id,
-                            "changes_summary": summary,
-                        },
-                        source="spec-agent",
-                    )
-                except Exception as git_error:
-                    logger.warning(f"[API] Git commit failed (non-fatal): {git_error}")
-                    # Continue with approval even if Git fails
-
-            # Update status in Firestore
-            repo.approve(proposal_id, commit_hash)
-
-            # Trigger GitHub Actions workflow for cloud deployment
-            github_triggered = False
-            if os.getenv("ENVIRONMENT") == "production" and not commit_hash:
-                try:
-                    github_triggered = await _trigger_github_workflow(proposal_id, prop)
-                    logger.info(
-                        f"[API] GitHub Actions triggered for proposal {proposal_id}"
-                    )
-                except Exception as gh_error:
-                    logger.warning(f"[API] GitHub trigger failed: {gh_error}")
+            # Update status in Firestore (deleted meanwhile or transaction failed: nothing to apply)
+            if not await repo.approve(proposal_id):
+                raise HTTPException(
+                    status_code=409, detail=f"Proposal {proposal_id} could not be approved"
+                )
 
             return {
                 "status": "approved",
-                "commit_hash": commit_hash,
-                "auto_committed": bool(commit_hash),
-                "github_triggered": github_triggered,
+                "job_id": _enqueue_approval(workspace_id, "firestore", [proposal_id], prop),
+                "commit_hash": None,
+                "auto_committed": False,
+                "github_triggered": False,
             }
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"[API] Firestore approve error: {e}")
             return {"status": "error", "error": str(e)}
 
     # Fallback to local file storage
     paths = _proposals_paths(workspace_id)
+    store = get_local_proposal_store(paths["dir"])
 
-    # Try to read from individual file first (new format)
-    proposal_file = paths["dir"] / f"{proposal_id}.json"
-    if proposal_file.exists():
-        with open(proposal_file, "r") as f:
-            prop = json.load(f)
-    else:
-        # Fallback to proposals.json (legacy)
-        proposals = _read_proposals(paths["json"])
-        prop = next((p for p in proposals if p.get("id") == proposal_id), None)
-
-    if not prop:
-        return {"status": "not_found"}
-
-    summary = prop.get("description", "")
     try:
-        commit_hash = None
-        if _auto_approve_enabled():
-            try:
-                from app.agents.git_agent import commit_via_agent
+        # Read-modify-write under the workspace lock (JSON and MD together)
+        with local_transaction(paths["dir"]) as tx:
+            # Try to read from individual file first (new format)
+            prop = store.get(proposal_id)
+            in_dir = prop is not None
+            if not in_dir:
+                # Fallback to proposals.json (legacy)
+                proposals = _read_proposals(paths["json"])
+                prop = next((p for p in proposals if p.get("id") == proposal_id), None)
 
-                commit_hash = await commit_via_agent(
-                    workspace_id=workspace_id,
-                    event_type="proposal.approved",
-                    data={"proposal_id": proposal_id, "changes_summary": summary},
-                    source="spec-agent",
-                )
-            except Exception as git_error:
-                logger.warning(f"[API] Git commit failed (non-fatal): {git_error}")
-                # Continue with approval even if Git fails
-        # Update proposal status
-        prop["status"] = "approved"
-        if commit_hash:
-            prop["commit_hash"] = commit_hash
+            if not prop:
+                return {"status": "not_found"}
 
-        # Save to individual file if it exists
-        if proposal_file.exists():
-            with open(proposal_file, "w") as f:
-                json.dump(prop, f, indent=2)
-        else:
-            # Save to proposals.json (legacy)
-            _write_proposals(paths["json"], proposals)
+            # Update proposal status
+            prop["status"] = "approved"
+            prop["reviewed_at"] = datetime.now(timezone.utc).isoformat()
+
+            # Save to individual file if it exists
+            if in_dir:
+                store.save(prop)
+            else:
+                # Save to proposals.json (legacy)
+                _write_proposals(paths["json"], proposals)
 
-        # Update MD file
-        md_path = paths["dir"] / f"{proposal_id}.md"
-        if md_path.exists():
-            md_content = md_path.read_text(encoding="utf-8")
-            md_content += f"\n\n---\n**Status:** approved\n"
-            if commit_hash:
-                md_content += f"**Commit:** {commit_hash}\n"
-            md_path.write_text(md_content, encoding="utf-8")
+            # Update MD file (the commit line is appended once the commit is made)
+            tx.append(paths["dir"] / f"{proposal_id}.md", f"\n\n---\n**Status:** approved\n")
 
         return {
             "status": "approved",
-            "commit_hash": commit_hash,
-            "auto_committed": bool(commit_hash),
+            "job_id": _enqueue_approval(workspace_id, "local", [proposal_id], prop),
+            "commit_hash": None,
+            "auto_committed": False,
         }
     except Exception as e:
         logger.error(f"Error approving proposal: {str(e)}")
@@ -1205,19 +1812,16 @@ async def reject_proposal(
     proposal_id: str, workspace_id: str = Query("default"), reason: str = Body("")
 ):
     paths = _proposals_paths(workspace_id)
-    proposals = _read_proposals(paths["json"])
-    prop = next((p for p in proposals if p.get("id") == proposal_id), None)
-    if not prop:
-        return {"status": "not_found"}
-    prop["status"] = "rejected"
-    prop["reason"] = reason
-    _write_proposals(paths["json"], proposals)
-
-    md_path = paths["dir"] / f"{proposal_id}.md"
-    if md_path.exists():
-        md_content = md_path.read_text(encoding="utf-8")
-        md_content += f"\nStatus: rejected\nReason: {reason}\n"
-        md_path.write_text(md_content, encoding="utf-8")
+    with local_transaction(paths["dir"]) as tx:
+        proposals = _read_proposals(paths["json"])
+        prop = next((p for p in proposals if p.get("id") == proposal_id), None)
+        if not prop:
+            return {"status": "not_found"}
+        prop["status"] = "rejected"
+        prop["reason"] = reason
+        _write_proposals(paths["json"], proposals)
+
+        tx.append(paths["dir"] / f"{proposal_id}.md", f"\nStatus: rejected\nReason: {reason}\n")
     return {"status": "rejected"}
 
 
@@ -1452,13 +2056,27 @@ async def get_development_agent_diagnostic(workspace_id: str = Query("default"))
 
 
 @app.get("/agents/retrospective/list")
-async def list_retrospectives(workspace_id: str = Query("default")):
+async def list_retrospectives(request: Request, workspace_id: str = Query("default")):
     """
     List all retrospectives for a workspace.
 
+    Only re-read when a retrospective file changes (ETag / If-None-Match
+    supported).
+
     Returns:
         List of retrospective summaries
     """
+    try:
+        version = dir_version(Path(get_workspace_path(workspace_id)) / "retrospectives", ".json")
+    except Exception as e:
+        logger.error(f"Error listing retrospectives: {str(e)}")
+        return {"retrospectives": [], "count": 0, "error": str(e)}
+    return await get_response_cache().respond(
+        request, version, lambda: _list_retrospectives(workspace_id)
+    )
+
+
+def _list_retrospectives(workspace_id: str) -> Dict:
     logger.info(f"GET /agents/retrospective/list - workspace: {workspace_id}")
 
     try:
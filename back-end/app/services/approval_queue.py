@@ -0,0 +1,491 @@
+"""
+Approval Queue - Durable background side effects for approvals
+
+Approval endpoints persist the new status and return; the git commit
+(commit_via_agent) and the GitHub dispatch run as a task of this queue:
+
+- Tasks are stored in SQLite (APPROVAL_QUEUE_DB, by default
+  .approval_queue.sqlite3 in the workspaces directory), so they survive
+  restarts: unfinished tasks are resumed when the queue starts. On Cloud Run
+  the file is on the instance's in-memory filesystem, so tasks only survive
+  as long as the instance, and the service needs always-allocated CPU to run
+  them after the response is sent (see terraform/main.tf)
+- Several processes (uvicorn workers) can share the database: a task is
+  claimed atomically (queued -> running, with an owner and a lease renewed
+  while it runs), so it runs in one process at a time. A running task is
+  only taken over once its lease has expired (its process died)
+- Tasks of one workspace run one at a time in enqueue order, so commits
+  never race; different workspaces run concurrently
+- A failed attempt is retried with exponential backoff, up to
+  APPROVAL_MAX_ATTEMPTS attempts; later tasks of the workspace wait for it
+- Handlers persist checkpoints (`ApprovalTask.checkpoint`), so a retry
+  skips the steps that already succeeded
+- Every task is also a job in the job registry (same id): clients poll
+  `GET /jobs/{id}` or stream `GET /jobs/{id}/stream`. Finished tasks stay
+  readable from the queue after the registry forgets them
+
+Handlers are registered per task kind with `@approval_handler(kind)`.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.services.jobs import Job, JobStatus, get_job_registry, new_job_id
+
+logger = logging.getLogger(__name__)
+
+APPROVAL_MAX_ATTEMPTS = int(os.getenv("APPROVAL_MAX_ATTEMPTS", "5"))
+# Seconds before the first retry (doubles on every attempt)
+APPROVAL_RETRY_DELAY = float(os.getenv("APPROVAL_RETRY_DELAY", "2"))
+# Max seconds for one attempt (commit + dispatch)
+APPROVAL_TASK_TIMEOUT = float(os.getenv("APPROVAL_TASK_TIMEOUT", "600"))
+# Seconds a claimed task stays owned without a heartbeat (renewed every third)
+APPROVAL_LEASE_SECONDS = float(os.getenv("APPROVAL_LEASE_SECONDS", "60"))
+# Seconds between checks of a task another process is running
+APPROVAL_POLL_INTERVAL = float(os.getenv("APPROVAL_POLL_INTERVAL", "1"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    workspace_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    run_after REAL NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_until REAL,
+    result TEXT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_unfinished ON tasks(workspace_id, seq)
+    WHERE status IN ('queued', 'running');
+"""
+# Added after the first release (ALTER TABLE on older databases)
+_LEASE_COLUMNS = {"owner": "TEXT", "lease_until": "REAL"}
+
+# Claims a queued task if it is due and the first unfinished task of its workspace
+_CLAIM = """
+UPDATE tasks SET status = ?, owner = ?, lease_until = ?, attempts = attempts + 1,
+    started_at = COALESCE(started_at, ?)
+WHERE id = ? AND status = ? AND run_after <= ? AND NOT EXISTS (
+    SELECT 1 FROM tasks AS earlier
+    WHERE earlier.workspace_id = tasks.workspace_id AND earlier.seq < tasks.seq
+        AND earlier.status IN (?, ?)
+)
+"""
+
+Handler = Callable[["ApprovalTask"], Awaitable[Any]]
+_handlers: Dict[str, Handler] = {}
+
+
+def approval_handler(kind: str) -> Callable[[Handler], Handler]:
+    """Register the coroutine running tasks of `kind`."""
+
+    def register(fn: Handler) -> Handler:
+        _handlers[kind] = fn
+        return fn
+
+    return register
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class ApprovalTask:
+    """A task handed to its handler."""
+
+    def __init__(self, queue: "ApprovalQueue", row: sqlite3.Row, job: Job):
+        self.queue = queue
+        self.id = row["id"]
+        self.kind = row["kind"]
+        self.workspace_id = row["workspace_id"]
+        self.payload: Dict[str, Any] = json.loads(row["payload"])
+        self.state: Dict[str, Any] = json.loads(row["state"])
+        self.attempt = row["attempts"]
+        self.job = job
+
+    def checkpoint(self, step: str) -> None:
+        """Persist `state` (done steps are skipped on retry) and report progress."""
+        self.queue._execute(
+            "UPDATE tasks SET state = ? WHERE id = ? AND owner = ?", (json.dumps(self.state), self.id, self.queue.owner)
+        )
+        self.queue.registry.progress(self.job, step=step)
+
+
+class ApprovalQueue:
+    """Durable queue of approval side effects, ordered per workspace."""
+
+    def __init__(
+        self,
+        db_path: str,
+        max_attempts: int = APPROVAL_MAX_ATTEMPTS,
+        retry_delay: float = APPROVAL_RETRY_DELAY,
+        timeout: Optional[float] = APPROVAL_TASK_TIMEOUT,
+        lease: float = APPROVAL_LEASE_SECONDS,
+        poll_interval: float = APPROVAL_POLL_INTERVAL,
+    ):
+        """
+        Args:
+            db_path: SQLite file holding the tasks
+            max_attempts: Attempts before a task fails
+            retry_delay: Seconds before the first retry
+            timeout: Max seconds for one attempt (None = no limit)
+            lease: Seconds a claimed task stays owned without a heartbeat
+            poll_interval: Seconds between checks of tasks run by other processes
+        """
+        self.db_path = db_path
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self.lease = lease
+        self.poll_interval = poll_interval
+        # Identifies this queue's claims in a database shared by several processes
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.registry = get_job_registry()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+        for name, declaration in _LEASE_COLUMNS.items():
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE tasks ADD COLUMN {name} {declaration}")
+        self._conn.commit()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        # Touched only from the queue loop
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._wakeups: Dict[str, asyncio.Event] = {}
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _execute(self, sql: str, params: tuple = ()) -> int:
+        """Run a write and return the number of rows it changed."""
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            self._conn.commit()
+            return cursor.rowcount
+
+    def _fetch(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        """Task row in the job registry's format (see Job.to_dict)."""
+        return {
+            "job_id": row["id"],
+            "kind": row["kind"],
+            "workspace_id": row["workspace_id"],
+            "status": row["status"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "metadata": {**json.loads(row["payload"]), "attempts": row["attempts"]},
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+        }
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Stored state of a task (None if the id is not a task of this queue)."""
+        rows = self._fetch("SELECT * FROM tasks WHERE id = ?", (task_id,))
+        return self._to_dict(rows[0]) if rows else None
+
+    def _job(self, row: sqlite3.Row) -> Job:
+        job = self.registry.get(row["id"])
+        if job is None:
+            job = self.registry.create(
+                row["kind"],
+                workspace_id=row["workspace_id"],
+                metadata={**json.loads(row["payload"]), "attempts": row["attempts"]},
+                job_id=row["id"],
+            )
+        return job
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def enqueue(self, kind: str, workspace_id: str, payload: Dict[str, Any]) -> Job:
+        """
+        Persist a task and schedule it after the workspace's earlier tasks.
+
+        Args:
+            kind: Task kind (see approval_handler)
+            workspace_id: Workspace the task belongs to (ordering key)
+            payload: JSON-serializable task arguments
+
+        Returns:
+            The task's job (its id is the task id)
+        """
+        task_id = new_job_id()
+        self._execute(
+            "INSERT INTO tasks (id, kind, workspace_id, payload, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (task_id, kind, workspace_id, json.dumps(payload), JobStatus.QUEUED, _now()),
+        )
+        job = self.registry.create(kind, workspace_id=workspace_id, metadata={**payload, "attempts": 0}, job_id=task_id)
+        self._ensure_loop().call_soon_threadsafe(self._wake, workspace_id)
+        logger.info(f"[ApprovalQueue] Queued {kind} task {task_id} for workspace {workspace_id}")
+        return job
+
+    def start(self) -> int:
+        """
+        Resume the tasks a previous process left unfinished.
+
+        Running tasks are only requeued once their lease has expired: they
+        may still be running in another process sharing the database.
+
+        Returns:
+            Number of resumed tasks
+        """
+        self._release_expired()
+        rows = self._fetch("SELECT * FROM tasks WHERE status = ? ORDER BY seq", (JobStatus.QUEUED,))
+        for row in rows:
+            self._job(row)
+        loop = self._ensure_loop()
+        for workspace_id in dict.fromkeys(row["workspace_id"] for row in rows):
+            loop.call_soon_threadsafe(self._wake, workspace_id)
+        if rows:
+            logger.info(f"[ApprovalQueue] Resumed {len(rows)} unfinished tasks")
+        return len(rows)
+
+    def _release_expired(self, task_id: Optional[str] = None) -> int:
+        """Requeue running tasks (all, or `task_id`) whose owner stopped renewing the lease."""
+        sql = (
+            "UPDATE tasks SET status = ?, owner = NULL, lease_until = NULL "
+            "WHERE status = ? AND (lease_until IS NULL OR lease_until < ?)"
+        )
+        params = (JobStatus.QUEUED, JobStatus.RUNNING, time.time())
+        if task_id is not None:
+            sql += " AND id = ?"
+            params += (task_id,)
+        released = self._execute(sql, params)
+        if released:
+            logger.warning(f"[ApprovalQueue] Requeued {released} tasks with an expired lease")
+        return released
+
+    def cancel(self, task_id: str) -> bool:
+        """
+        Cancel a task that has not started yet (or is waiting for a retry).
+
+        Returns:
+            True if the task was cancelled
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE tasks SET status = ?, error = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (JobStatus.CANCELLED, "Cancelled before start", _now(), task_id, JobStatus.QUEUED),
+            )
+            self._conn.commit()
+        if not cursor.rowcount:
+            return False
+        job = self.registry.get(task_id)
+        if job is not None:
+            self.registry.update(job, JobStatus.CANCELLED, error="Cancelled before start")
+            self._ensure_loop().call_soon_threadsafe(self._wake, job.workspace_id)
+        return True
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop the workers (running attempts are resumed on the next start)."""
+        with self._start_lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._cancel_workers(), loop).result(timeout)
+            except Exception as e:
+                logger.warning(f"[ApprovalQueue] Error stopping workers: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            if self._thread is not None:
+                self._thread.join(timeout)
+            loop.close()
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Workers (queue loop)
+    # ------------------------------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="approval-queue-loop", daemon=True)
+                thread.start()
+                self._loop = loop
+                self._thread = thread
+            return self._loop
+
+    async def _cancel_workers(self) -> None:
+        tasks = list(self._workers.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _wake(self, workspace_id: str) -> None:
+        if workspace_id in self._workers:
+            self._wakeups[workspace_id].set()
+            return
+        self._wakeups[workspace_id] = asyncio.Event()
+        self._workers[workspace_id] = self._loop.create_task(self._worker(workspace_id))
+
+    def _next(self, workspace_id: str) -> Optional[sqlite3.Row]:
+        rows = self._fetch(
+            "SELECT * FROM tasks WHERE workspace_id = ? AND status IN (?, ?) ORDER BY seq LIMIT 1",
+            (workspace_id, JobStatus.QUEUED, JobStatus.RUNNING),
+        )
+        return rows[0] if rows else None
+
+    async def _worker(self, workspace_id: str) -> None:
+        wakeup = self._wakeups[workspace_id]
+        while True:
+            row = self._next(workspace_id)
+            if row is None:
+                # No await between the check and the exit: _wake runs on this loop
+                del self._workers[workspace_id]
+                del self._wakeups[workspace_id]
+                return
+            if row["status"] == JobStatus.RUNNING:
+                # Run by another process: wait for it, or take over once its lease expires
+                if not self._release_expired(row["id"]):
+                    await self._wait(wakeup, min(row["lease_until"] - time.time(), self.poll_interval))
+                continue
+            delay = row["run_after"] - time.time()
+            if delay > 0:
+                # Waiting for a retry; re-checked early when a task is cancelled
+                await self._wait(wakeup, delay)
+                continue
+            if self._claim(row["id"]):
+                await self._run(row["id"])
+            # Otherwise another process claimed it first: the next pass waits for it
+
+    @staticmethod
+    async def _wait(wakeup: asyncio.Event, delay: float) -> None:
+        wakeup.clear()
+        try:
+            await asyncio.wait_for(wakeup.wait(), max(delay, 0))
+        except asyncio.TimeoutError:
+            pass
+
+    def _claim(self, task_id: str) -> bool:
+        """Atomically mark a queued task as running in this process."""
+        now = time.time()
+        return bool(
+            self._execute(
+                _CLAIM,
+                (
+                    JobStatus.RUNNING, self.owner, now + self.lease, _now(),
+                    task_id, JobStatus.QUEUED, now, JobStatus.QUEUED, JobStatus.RUNNING,
+                ),
+            )
+        )
+
+    async def _heartbeat(self, task_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            if not self._execute(
+                "UPDATE tasks SET lease_until = ? WHERE id = ? AND owner = ?",
+                (time.time() + self.lease, task_id, self.owner),
+            ):
+                logger.warning(f"[ApprovalQueue] Lost the lease of task {task_id}")
+                return
+
+    def _finish(self, task_id: str, sql: str, params: tuple) -> None:
+        """Record the outcome of an attempt and release the task (if still ours)."""
+        if not self._execute(
+            f"UPDATE tasks SET {sql}, owner = NULL, lease_until = NULL WHERE id = ? AND owner = ?",
+            params + (task_id, self.owner),
+        ):
+            logger.warning(f"[ApprovalQueue] Task {task_id} was taken over by another process")
+
+    async def _run(self, task_id: str) -> None:
+        row = self._fetch("SELECT * FROM tasks WHERE id = ?", (task_id,))[0]
+        job = self._job(row)
+        attempt = row["attempts"]
+        self.registry.progress(job, attempts=attempt)
+        self.registry.update(job, JobStatus.RUNNING)
+
+        handler = _handlers.get(row["kind"])
+        heartbeat = asyncio.get_running_loop().create_task(self._heartbeat(task_id))
+        try:
+            if handler is None:
+                raise LookupError(f"No handler for task kind {row['kind']}")
+            result = await asyncio.wait_for(handler(ApprovalTask(self, row, job)), self.timeout)
+        except asyncio.CancelledError:
+            # Shutting down: release the task so the next start resumes it
+            self._finish(task_id, "status = ?", (JobStatus.QUEUED,))
+            raise
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            if handler is not None and attempt < self.max_attempts:
+                delay = self.retry_delay * 2 ** (attempt - 1)
+                logger.warning(
+                    f"[ApprovalQueue] Task {row['id']} attempt {attempt} failed, retrying in {delay:.0f}s: {error}"
+                )
+                self._finish(
+                    task_id, "status = ?, run_after = ?, error = ?", (JobStatus.QUEUED, time.time() + delay, error)
+                )
+                self.registry.progress(job, last_error=error)
+                self.registry.update(job, JobStatus.QUEUED)
+                return
+            logger.error(f"[ApprovalQueue] Task {row['id']} failed after {attempt} attempts: {error}")
+            self._finish(task_id, "status = ?, error = ?, finished_at = ?", (JobStatus.FAILED, error, _now()))
+            self.registry.update(job, JobStatus.FAILED, error=error)
+            return
+        finally:
+            heartbeat.cancel()
+
+        self._finish(
+            task_id,
+            "status = ?, result = ?, error = NULL, finished_at = ?",
+            (JobStatus.SUCCEEDED, json.dumps(result, default=str), _now()),
+        )
+        self.registry.update(job, JobStatus.SUCCEEDED, result=result)
+
+
+_approval_queue: Optional[ApprovalQueue] = None
+_approval_queue_lock = threading.Lock()
+
+
+def get_approval_queue() -> ApprovalQueue:
+    """Get the process-wide approval queue (unfinished tasks are resumed on creation)."""
+    global _approval_queue
+    with _approval_queue_lock:
+        if _approval_queue is None:
+            db_path = os.getenv("APPROVAL_QUEUE_DB")
+            if not db_path:
+                from app.utils.workspace_manager import get_base_dir
+
+                db_path = os.path.join(get_base_dir(), ".approval_queue.sqlite3")
+            _approval_queue = ApprovalQueue(db_path)
+            _approval_queue.start()
+        return _approval_queue
+
+
+def reset_approval_queue():
+    """Stop and forget the global queue (for testing)"""
+    global _approval_queue
+    with _approval_queue_lock:
+        if _approval_queue is not None:
+            _approval_queue.shutdown()
+        _approval_queue = None
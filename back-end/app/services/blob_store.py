@@ -0,0 +1,349 @@
+"""
+Blob Store - Content-addressed storage for proposal file contents
+
+Proposal bodies often repeat the same file content (repeated development
+attempts on one file, retrospective proposals on the same docs). Contents
+are stored once, keyed by SHA-256 of the raw bytes, zlib-compressed, and
+proposals reference them by digest.
+
+- LocalBlobStore: objects under <root>/objects/ab/cdef..., refcounts in
+  <root>/refcounts.json (updated under the directory's WorkspaceLock, so
+  several processes can share the store)
+- FirestoreBlobStore: one document per blob in the `blobs` collection
+  (payloads over the document size limit are chunked into a subcollection)
+
+Every `put` adds a reference and `decref` drops one; `gc` deletes blobs
+whose count reached zero more than BLOB_GC_GRACE_SECONDS ago (run through
+`POST /admin/blob-store/gc`).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, Optional, Union
+
+from app.services.local_storage import get_workspace_lock
+
+logger = logging.getLogger(__name__)
+
+BLOB_COMPRESSION_LEVEL = int(os.getenv("BLOB_COMPRESSION_LEVEL", "6"))
+# Texts shorter than this stay inline; a blob reference isn't worth it
+BLOB_INLINE_MAX_BYTES = int(os.getenv("BLOB_INLINE_MAX_BYTES", "512"))
+BLOB_GC_GRACE_SECONDS = float(os.getenv("BLOB_GC_GRACE_SECONDS", "3600"))
+
+# Firestore documents are limited to 1 MiB
+FIRESTORE_CHUNK_BYTES = 900 * 1024
+
+
+def blob_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _to_bytes(data: Union[str, bytes]) -> bytes:
+    return data.encode("utf-8") if isinstance(data, str) else data
+
+
+class BlobStore:
+    """Interface shared by blob store backends."""
+
+    def put(self, data: Union[str, bytes]) -> str:
+        """Store `data` (if new), add a reference and return its digest."""
+        raise NotImplementedError
+
+    def get(self, digest: str) -> Optional[bytes]:
+        """Return the raw bytes of a blob, or None if it doesn't exist."""
+        raise NotImplementedError
+
+    def exists(self, digest: str) -> bool:
+        raise NotImplementedError
+
+    def decref(self, digest: str, count: int = 1) -> None:
+        """Drop references to a blob (it becomes collectable at zero)."""
+        raise NotImplementedError
+
+    def gc(self, grace_seconds: float = BLOB_GC_GRACE_SECONDS) -> int:
+        """Delete unreferenced blobs; returns the number removed."""
+        raise NotImplementedError
+
+    def get_text(self, digest: str) -> Optional[str]:
+        data = self.get(digest)
+        return None if data is None else data.decode("utf-8")
+
+    def decref_all(self, digests: Iterable[str]) -> None:
+        for digest in digests:
+            try:
+                self.decref(digest)
+            except Exception as e:
+                logger.warning(f"[BlobStore] Failed to release blob {digest[:12]}: {e}")
+
+
+class LocalBlobStore(BlobStore):
+    """Blob store on local disk."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.refcounts_path = os.path.join(root, "refcounts.json")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        # Threads and processes: refcounts are read-modify-written
+        self._lock = get_workspace_lock(root)
+        # digest -> [refcount, last change (epoch seconds)]
+        self._refs: Dict[str, list] = {}
+        self._refs_version: Optional[tuple] = None
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    # ---- refcounts -------------------------------------------------------
+
+    @staticmethod
+    def _version(st: os.stat_result) -> tuple:
+        # Every save replaces the file (new inode), even within one mtime tick
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _load_refs(self) -> None:
+        try:
+            version = self._version(os.stat(self.refcounts_path))
+        except FileNotFoundError:
+            self._refs, self._refs_version = {}, None
+            return
+        if version != self._refs_version:
+            with open(self.refcounts_path, "r", encoding="utf-8") as f:
+                self._refs = json.load(f)
+            self._refs_version = version
+
+    def _save_refs(self) -> None:
+        fd, tmp_path = tempfile.mkstemp(prefix=".refcounts.", dir=self.root)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._refs, f)
+        os.replace(tmp_path, self.refcounts_path)
+        self._refs_version = self._version(os.stat(self.refcounts_path))
+
+    def refcount(self, digest: str) -> int:
+        with self._lock:
+            self._load_refs()
+            return self._refs.get(digest, [0, 0])[0]
+
+    # ---- blobs -----------------------------------------------------------
+
+    def put(self, data: Union[str, bytes]) -> str:
+        raw = _to_bytes(data)
+        digest = blob_digest(raw)
+        path = self._object_path(digest)
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+                with os.fdopen(fd, "wb") as f:
+                    f.write(zlib.compress(raw, BLOB_COMPRESSION_LEVEL))
+                os.replace(tmp_path, path)
+            self._load_refs()
+            entry = self._refs.setdefault(digest, [0, 0])
+            entry[0] += 1
+            entry[1] = time.time()
+            self._save_refs()
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        try:
+            with open(self._object_path(digest), "rb") as f:
+                raw = zlib.decompress(f.read())
+        except FileNotFoundError:
+            return None
+        if blob_digest(raw) != digest:
+            logger.error(f"[BlobStore] Corrupt blob {digest[:12]}")
+            return None
+        return raw
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self._object_path(digest))
+
+    def decref(self, digest: str, count: int = 1) -> None:
+        with self._lock:
+            self._load_refs()
+            entry = self._refs.get(digest)
+            if entry is None:
+                return
+            entry[0] = max(entry[0] - count, 0)
+            entry[1] = time.time()
+            self._save_refs()
+
+    def gc(self, grace_seconds: float = BLOB_GC_GRACE_SECONDS) -> int:
+        removed = 0
+        cutoff = time.time() - grace_seconds
+        with self._lock:
+            self._load_refs()
+            for digest, (count, changed_at) in list(self._refs.items()):
+                if count > 0 or changed_at > cutoff:
+                    continue
+                try:
+                    os.remove(self._object_path(digest))
+                except FileNotFoundError:
+                    pass
+                del self._refs[digest]
+                removed += 1
+            if removed:
+                self._save_refs()
+        if removed:
+            logger.info(f"[BlobStore] Collected {removed} unreferenced blobs")
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._load_refs()
+            stored = 0
+            for digest in self._refs:
+                try:
+                    stored += os.path.getsize(self._object_path(digest))
+                except OSError:
+                    pass
+            return {
+                "backend": "local",
+                "blobs": len(self._refs),
+                "references": sum(count for count, _ in self._refs.values()),
+                "stored_bytes": stored,
+            }
+
+
+class FirestoreBlobStore(BlobStore):
+    """Blob store in a Firestore collection."""
+
+    def __init__(self, db, collection: str = "blobs"):
+        from google.cloud import firestore
+
+        self._firestore = firestore
+        self.db = db
+        self.collection = db.collection(collection)
+
+    def put(self, data: Union[str, bytes]) -> str:
+        from google.api_core.exceptions import AlreadyExists
+
+        raw = _to_bytes(data)
+        digest = blob_digest(raw)
+        doc_ref = self.collection.document(digest)
+        increment = {
+            "refcount": self._firestore.Increment(1),
+            "updated_at": self._firestore.SERVER_TIMESTAMP,
+        }
+        if doc_ref.get(field_paths=["refcount"]).exists:
+            doc_ref.update(increment)
+            return digest
+
+        compressed = zlib.compress(raw, BLOB_COMPRESSION_LEVEL)
+        chunks = [
+            compressed[i:i + FIRESTORE_CHUNK_BYTES]
+            for i in range(0, len(compressed), FIRESTORE_CHUNK_BYTES)
+        ] or [b""]
+        document = {
+            "size": len(raw),
+            "compressed_size": len(compressed),
+            "chunks": len(chunks),
+            "refcount": 1,
+            "updated_at": self._firestore.SERVER_TIMESTAMP,
+        }
+        if len(chunks) == 1:
+            document["data"] = chunks[0]
+        else:
+            for index, chunk in enumerate(chunks):
+                doc_ref.collection("chunks").document(str(index)).set({"data": chunk})
+        try:
+            doc_ref.create(document)
+        except AlreadyExists:
+            # Created concurrently: just take a reference
+            doc_ref.update(increment)
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        doc_ref = self.collection.document(digest)
+        doc = doc_ref.get()
+        if not doc.exists:
+            return None
+        meta = doc.to_dict()
+        if meta.get("chunks", 1) == 1:
+            compressed = meta.get("data", b"")
+        else:
+            compressed = b"".join(
+                doc_ref.collection("chunks").document(str(i)).get().to_dict()["data"]
+                for i in range(meta["chunks"])
+            )
+        raw = zlib.decompress(compressed)
+        if blob_digest(raw) != digest:
+            logger.error(f"[BlobStore] Corrupt blob {digest[:12]}")
+            return None
+        return raw
+
+    def exists(self, digest: str) -> bool:
+        return self.collection.document(digest).get(field_paths=["refcount"]).exists
+
+    def decref(self, digest: str, count: int = 1) -> None:
+        self.collection.document(digest).update(
+            {
+                "refcount": self._firestore.Increment(-count),
+                "updated_at": self._firestore.SERVER_TIMESTAMP,
+            }
+        )
+
+    def gc(self, grace_seconds: float = BLOB_GC_GRACE_SECONDS) -> int:
+        from datetime import datetime, timedelta, timezone
+        from google.cloud.firestore_v1.base_query import FieldFilter
+
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=grace_seconds)
+        removed = 0
+        query = self.collection.where(filter=FieldFilter("refcount", "<=", 0))
+        for doc in query.stream():
+            meta = doc.to_dict()
+            updated_at = meta.get("updated_at")
+            if updated_at is not None and updated_at > cutoff:
+                continue
+            for index in range(meta.get("chunks", 1) if meta.get("chunks", 1) > 1 else 0):
+                doc.reference.collection("chunks").document(str(index)).delete()
+            doc.reference.delete()
+            removed += 1
+        if removed:
+            logger.info(f"[BlobStore] Collected {removed} unreferenced blobs")
+        return removed
+
+
+# Global blob store instance
+_blob_store: Optional[BlobStore] = None
+_blob_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    """
+    Get the blob store for the configured storage mode.
+
+    STORAGE_MODE=cloud uses Firestore; otherwise blobs live on disk in
+    BLOB_STORE_DIR (default: "blobs" next to the workspaces directory).
+    """
+    global _blob_store
+    with _blob_store_lock:
+        if _blob_store is None:
+            from app.config import get_config
+
+            config = get_config()
+            if config.is_cloud_storage:
+                from app.services.firestore_service import get_firestore_service
+
+                db = get_firestore_service(config.gcp_project_id).db
+                _blob_store = FirestoreBlobStore(db)
+            else:
+                from app.utils.workspace_manager import get_base_dir
+
+                root = os.getenv("BLOB_STORE_DIR") or os.path.join(
+                    os.path.dirname(get_base_dir()), "blobs"
+                )
+                _blob_store = LocalBlobStore(root)
+            logger.info(f"[BlobStore] Using {type(_blob_store).__name__}")
+        return _blob_store
+
+
+def reset_blob_store():
+    """Reset global blob store (for testing)"""
+    global _blob_store
+    _blob_store = None
@@ -0,0 +1,141 @@
+"""
+Compute Pool - Shared process pool for CPU-bound work
+
+Diffing large files, summarizing diffs and similar pure-Python work holds the
+GIL, so running it on the event loop (or in a thread) stalls every other
+request. The compute pool runs such work in worker processes:
+
+- One process-wide pool shared by all CPU-heavy services (diff_service, ...)
+- Async API (`await pool.run(fn, *args)`) plus plain futures for sync callers
+- Work must be a module-level function with picklable arguments
+- If worker processes can't be started (or COMPUTE_POOL_WORKERS=0), work
+  runs in a thread instead, so callers never need a second code path
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Worker processes (0 disables the pool: work runs in threads)
+COMPUTE_POOL_WORKERS = int(os.getenv("COMPUTE_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+# "spawn" doesn't inherit the server's threads/locks (git executor, event loops)
+COMPUTE_POOL_START_METHOD = os.getenv("COMPUTE_POOL_START_METHOD", "spawn")
+
+
+class ComputePool:
+    """Process pool for CPU-bound functions, with a thread fallback."""
+
+    def __init__(
+        self,
+        max_workers: int = COMPUTE_POOL_WORKERS,
+        start_method: str = COMPUTE_POOL_START_METHOD,
+    ):
+        self.max_workers = max_workers
+        self.start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._disabled = max_workers <= 0
+        self._lock = threading.Lock()
+
+    @property
+    def uses_processes(self) -> bool:
+        return not self._disabled
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        with self._lock:
+            if self._executor is None and not self._disabled:
+                try:
+                    context = multiprocessing.get_context(self.start_method)
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers, mp_context=context
+                    )
+                    logger.info(
+                        f"[ComputePool] Started {self.max_workers} {self.start_method} workers"
+                    )
+                except (OSError, ValueError, NotImplementedError) as e:
+                    logger.warning(f"[ComputePool] Process pool unavailable, using threads: {e}")
+                    self._disabled = True
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> concurrent.futures.Future:
+        """
+        Run `fn(*args)` in a worker process.
+
+        Args:
+            fn: Module-level function (must be picklable)
+            *args: Picklable arguments
+
+        Returns:
+            Future with the result
+        """
+        executor = self._get_executor()
+        if executor is None:
+            future: concurrent.futures.Future = concurrent.futures.Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        try:
+            return executor.submit(fn, *args)
+        except (BrokenProcessPool, RuntimeError) as e:
+            # A worker died (or the pool was shut down): start a fresh pool once
+            logger.warning(f"[ComputePool] Restarting pool: {e}")
+            self._discard(executor)
+            executor = self._get_executor()
+            if executor is None:
+                return self.submit(fn, *args)
+            return executor.submit(fn, *args)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Await `fn(*args)` run in a worker process (or a thread as fallback)."""
+        executor = self._get_executor()
+        if executor is None:
+            return await asyncio.to_thread(fn, *args)
+        try:
+            return await asyncio.wrap_future(self.submit(fn, *args))
+        except BrokenProcessPool as e:
+            logger.warning(f"[ComputePool] Worker died, running in a thread: {e}")
+            self._discard(executor)
+            return await asyncio.to_thread(fn, *args)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_compute_pool: Optional[ComputePool] = None
+_compute_pool_lock = threading.Lock()
+
+
+def get_compute_pool() -> ComputePool:
+    """Get the process-wide compute pool."""
+    global _compute_pool
+    with _compute_pool_lock:
+        if _compute_pool is None:
+            _compute_pool = ComputePool()
+        return _compute_pool
+
+
+def reset_compute_pool():
+    """Shut down and reset the global compute pool (for testing)"""
+    global _compute_pool
+    with _compute_pool_lock:
+        pool, _compute_pool = _compute_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False)
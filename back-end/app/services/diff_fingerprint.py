@@ -0,0 +1,232 @@
+"""
+Diff Fingerprint - Exact and near-duplicate detection for proposals
+
+Agents look up duplicate proposals by indexed fields instead of comparing
+diff strings one by one. Each proposal carries:
+
+- `diff_fingerprint`: SHA-256 of its normalized per-file diffs (changed
+  lines only, whitespace removed, files sorted by path). Equal fingerprints
+  mean the same change whatever the context lines, hunk offsets or
+  formatting, so duplicates are a single indexed lookup
+- `minhash`: MinHash signature of the changed-line shingles, and
+  `minhash_bands`: its LSH band keys. Proposals sharing a band are
+  candidates for near-duplicates; `similarity` estimates their Jaccard
+  similarity
+
+Fingerprints are stored by ProposalRepository.create and the proposals
+router, and indexed from the proposal bodies by LocalProposalStore.
+"""
+
+import hashlib
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+FINGERPRINT_KEY = "diff_fingerprint"
+MINHASH_KEY = "minhash"
+BANDS_KEY = "minhash_bands"
+
+MINHASH_PERMUTATIONS = 64
+# 16 bands of 4 rows: pairs above ~0.5 similarity share a band with high probability
+MINHASH_BANDS = 16
+# Default similarity for near-duplicates
+NEAR_DUPLICATE_THRESHOLD = 0.8
+SHINGLE_SIZE = 3
+
+_ROTATION_STEP = (1 << 57) + 1
+_WHITESPACE = re.compile(r"\s+")
+_HUNK_HEADER = re.compile(r"^@@ -\d+(?:,(\d+))? \+\d+(?:,(\d+))? @@")
+_HEADER_PREFIXES = ("+++", "---")
+
+
+def _changed_lines(diff: str) -> Iterable[str]:
+    """
+    "+line"/"-line" of a unified diff, read by hunk state: headers only
+    appear between hunks, and a hunk ends once its line counts are consumed,
+    so changed lines starting with "--" or "++" are kept.
+    """
+    lines = diff.split("\n")
+    if not any(_HUNK_HEADER.match(line) for line in lines):
+        # Bare +/- lines without hunk headers
+        yield from (line for line in lines if line[:1] in ("+", "-") and not line.startswith(_HEADER_PREFIXES))
+        return
+    old_left = new_left = 0
+    for line in lines:
+        if old_left <= 0 and new_left <= 0:
+            match = _HUNK_HEADER.match(line)
+            if match:
+                old_left = int(match.group(1) or 1)
+                new_left = int(match.group(2) or 1)
+            continue
+        tag = line[:1]
+        if tag == "\\":
+            continue  # "\ No newline at end of file"
+        if tag == "-":
+            old_left -= 1
+        elif tag == "+":
+            new_left -= 1
+        else:
+            old_left -= 1
+            new_left -= 1
+            continue
+        yield line
+
+
+def normalize_diff(diff: Optional[str]) -> List[str]:
+    """
+    Changed lines of a unified diff, whitespace-insensitive.
+
+    Headers, hunk markers and context lines are dropped, whitespace is
+    removed and changed lines that only differ in whitespace vanish.
+
+    Returns:
+        ["+line", "-line", ...] in diff order
+    """
+    lines = []
+    for line in _changed_lines(diff or ""):
+        text = _WHITESPACE.sub("", line[1:])
+        if text:
+            lines.append(line[0] + text)
+    return lines
+
+
+def _file_diffs(proposal: Dict[str, Any]) -> List[Tuple[str, List[str]]]:
+    changes = [c for c in proposal.get("proposed_changes") or [] if isinstance(c, dict)]
+    files = [
+        (str(c.get("file_path") or ""), normalize_diff(c.get("diff")))
+        for c in changes
+        if c.get("diff")
+    ]
+    if not files:
+        # Proposals with only an overall diff (e.g. spec agent)
+        overall = proposal.get("diff")
+        content = overall.get("content") if isinstance(overall, dict) else overall
+        paths = ",".join(sorted(str(c.get("file_path") or "") for c in changes))
+        files = [(paths, normalize_diff(content if isinstance(content, str) else None))]
+    return sorted(f for f in files if f[1])
+
+
+def diff_fingerprint(proposal: Dict[str, Any]) -> Optional[str]:
+    """
+    Normalized diff fingerprint of a proposal.
+
+    Args:
+        proposal: Proposal dict with proposed_changes diffs and/or an overall diff
+
+    Returns:
+        Hex SHA-256, or None if the proposal changes nothing
+    """
+    files = _file_diffs(proposal)
+    if not files:
+        return None
+    digest = hashlib.sha256()
+    for path, lines in files:
+        digest.update(path.encode("utf-8") + b"\0")
+        digest.update("\n".join(lines).encode("utf-8") + b"\0\0")
+    return digest.hexdigest()
+
+
+def _shingles(files: Sequence[Tuple[str, List[str]]]) -> set:
+    shingles = set()
+    for path, lines in files:
+        if len(lines) < SHINGLE_SIZE:
+            shingles.add((path,) + tuple(lines))
+        for i in range(len(lines) - SHINGLE_SIZE + 1):
+            shingles.add((path,) + tuple(lines[i : i + SHINGLE_SIZE]))
+    return shingles
+
+
+def minhash_signature(proposal: Dict[str, Any]) -> Optional[List[int]]:
+    """
+    MinHash signature of a proposal's changed-line shingles.
+
+    One-permutation MinHash: each shingle is hashed once and kept as the
+    minimum of one of MINHASH_PERMUTATIONS bins (empty bins borrow the next
+    non-empty one), so signing costs O(shingles) instead of
+    O(shingles x permutations).
+
+    Returns:
+        MINHASH_PERMUTATIONS ints (< 2**63), or None if the proposal changes nothing
+    """
+    shingles = _shingles(_file_diffs(proposal))
+    if not shingles:
+        return None
+    bins = MINHASH_PERMUTATIONS
+    signature: List[Optional[int]] = [None] * bins
+    for shingle in shingles:
+        h = int.from_bytes(
+            hashlib.blake2b("\n".join(shingle).encode("utf-8"), digest_size=8).digest(), "big"
+        )
+        index, value = h % bins, (h // bins) >> 1
+        if signature[index] is None or value < signature[index]:
+            signature[index] = value
+    # Densification (rotation): fill empty bins from the next non-empty bin
+    for i in range(bins):
+        if signature[i] is None:
+            offset = 1
+            while signature[(i + offset) % bins] is None:
+                offset += 1
+            signature[i] = (signature[(i + offset) % bins] + offset * _ROTATION_STEP) % (1 << 63)
+    return signature
+
+
+def lsh_bands(signature: Sequence[int], bands: int = MINHASH_BANDS) -> List[str]:
+    """LSH band keys of a signature ("<band>:<hash>")."""
+    rows = len(signature) // bands
+    keys = []
+    for band in range(bands):
+        chunk = ",".join(str(v) for v in signature[band * rows : (band + 1) * rows])
+        keys.append(f"{band}:{hashlib.blake2b(chunk.encode(), digest_size=8).hexdigest()}")
+    return keys
+
+
+def similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    if not a or not b or len(a) != len(b):
+        return 0.0
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+def fingerprint_fields(proposal: Dict[str, Any]) -> Dict[str, Any]:
+    """Fingerprint fields to store on a proposal (empty if it changes nothing)."""
+    fingerprint = diff_fingerprint(proposal)
+    if fingerprint is None:
+        return {}
+    signature = minhash_signature(proposal) or []
+    return {FINGERPRINT_KEY: fingerprint, MINHASH_KEY: signature, BANDS_KEY: lsh_bands(signature)}
+
+
+def with_fingerprint(document: Dict[str, Any], source: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Return `document` with its fingerprint fields set.
+
+    Args:
+        document: Document about to be stored
+        source: Full proposal the fingerprint is computed from (defaults to `document`)
+    """
+    document = dict(document)
+    document.update(fingerprint_fields(source if source is not None else document))
+    return document
+
+
+def best_match(
+    signature: Sequence[int],
+    candidates: Iterable[Dict[str, Any]],
+    threshold: float = NEAR_DUPLICATE_THRESHOLD,
+) -> Optional[Tuple[Dict[str, Any], float]]:
+    """
+    Most similar candidate at or above the threshold.
+
+    Args:
+        signature: MinHash signature of the new proposal
+        candidates: Proposals with a stored `minhash`
+        threshold: Minimum estimated similarity
+
+    Returns:
+        (candidate, similarity) or None
+    """
+    best = None
+    for candidate in candidates:
+        score = similarity(signature, candidate.get(MINHASH_KEY) or [])
+        if score >= threshold and (best is None or score > best[1]):
+            best = (candidate, score)
+    return best
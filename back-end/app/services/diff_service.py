@@ -0,0 +1,133 @@
+"""
+Diff Service - Async diff generation off the event loop
+
+Proposal builders diff every changed file; for large files that is
+CPU-bound work that must not block the event loop. The service:
+
+- Diffs small files inline (cheaper than shipping them to another process)
+- Sends files over DIFF_OFFLOAD_MIN_BYTES (old + new content) to the shared
+  compute pool, all files of a proposal in parallel
+- Does the same for diff summaries over DIFF_SUMMARY_OFFLOAD_MIN_BYTES
+
+Results are identical to calling diff_generator directly.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from app.agents.diff_generator import generate_diff_summary, generate_unified_diff
+from app.services.compute_pool import ComputePool, get_compute_pool
+
+logger = logging.getLogger(__name__)
+
+# Files whose old + new content is at least this many bytes are diffed in the pool
+DIFF_OFFLOAD_MIN_BYTES = int(os.getenv("DIFF_OFFLOAD_MIN_BYTES", str(128 * 1024)))
+# Diffs at least this long are summarized in the pool
+DIFF_SUMMARY_OFFLOAD_MIN_BYTES = int(
+    os.getenv("DIFF_SUMMARY_OFFLOAD_MIN_BYTES", str(1024 * 1024))
+)
+
+# (file_path, old_content, new_content)
+FileDiff = Tuple[str, str, str]
+# Module-level diff function taking (file_path, old_content, new_content)
+DiffFunction = Callable[[str, str, str], str]
+
+
+class DiffService:
+    """Generates diffs inline or in the compute pool depending on size."""
+
+    def __init__(
+        self,
+        pool: Optional[ComputePool] = None,
+        offload_min_bytes: int = DIFF_OFFLOAD_MIN_BYTES,
+        summary_offload_min_bytes: int = DIFF_SUMMARY_OFFLOAD_MIN_BYTES,
+    ):
+        self._pool = pool
+        self.offload_min_bytes = offload_min_bytes
+        self.summary_offload_min_bytes = summary_offload_min_bytes
+
+    @property
+    def pool(self) -> ComputePool:
+        if self._pool is None:
+            self._pool = get_compute_pool()
+        return self._pool
+
+    async def diff(
+        self,
+        file_path: str,
+        old_content: str,
+        new_content: str,
+        diff_fn: DiffFunction = generate_unified_diff,
+    ) -> str:
+        """
+        Diff one file.
+
+        Args:
+            file_path: Path used in the diff headers
+            old_content: Current content ("" for new files)
+            new_content: Proposed content
+            diff_fn: Module-level diff function (default: generate_unified_diff)
+
+        Returns:
+            Diff string
+        """
+        if len(old_content) + len(new_content) < self.offload_min_bytes:
+            return diff_fn(file_path, old_content, new_content)
+        return await self.pool.run(diff_fn, file_path, old_content, new_content)
+
+    async def diff_many(
+        self,
+        files: Sequence[FileDiff],
+        diff_fn: DiffFunction = generate_unified_diff,
+    ) -> List[str]:
+        """
+        Diff several files; large ones run in parallel in the pool.
+
+        Args:
+            files: (file_path, old_content, new_content) tuples
+            diff_fn: Module-level diff function
+
+        Returns:
+            Diffs in the order of `files`
+        """
+        results: List[Optional[str]] = [None] * len(files)
+        pending = []
+        for index, (file_path, old_content, new_content) in enumerate(files):
+            if len(old_content) + len(new_content) < self.offload_min_bytes:
+                results[index] = diff_fn(file_path, old_content, new_content)
+            else:
+                pending.append(index)
+
+        if pending:
+            logger.debug(f"[DiffService] Offloading {len(pending)}/{len(files)} diffs")
+            offloaded = await asyncio.gather(
+                *(self.pool.run(diff_fn, *files[index]) for index in pending)
+            )
+            for index, diff in zip(pending, offloaded):
+                results[index] = diff
+        return results
+
+    async def summarize(self, diff: str) -> dict:
+        """Summary statistics of a diff (see generate_diff_summary)."""
+        if len(diff) < self.summary_offload_min_bytes:
+            return generate_diff_summary(diff)
+        return await self.pool.run(generate_diff_summary, diff)
+
+
+_diff_service: Optional[DiffService] = None
+
+
+def get_diff_service() -> DiffService:
+    """Get the global diff service."""
+    global _diff_service
+    if _diff_service is None:
+        _diff_service = DiffService()
+    return _diff_service
+
+
+def reset_diff_service():
+    """Reset global diff service (for testing)"""
+    global _diff_service
+    _diff_service = None
@@ -18,6 +18,7 @@ class EventTypes(str, Enum):
     PROPOSAL_CREATED = "proposal.created.v1"
     PROPOSAL_APPROVED = "proposal.approved.v1"
     PROPOSAL_REJECTED = "proposal.rejected.v1"
+    PROPOSAL_INVALIDATED = "proposal.invalidated.v1"
     RETROSPECTIVE_SUMMARY = "retrospective.summary.v1"
     MILESTONE_COMPLETE = "milestone.complete.v1"
     GIT_COMMIT = "git.commit.v1"
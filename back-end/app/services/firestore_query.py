@@ -0,0 +1,327 @@
+"""
+Firestore Query Planner - Server-side filtering and ordering with managed indexes
+
+Equality filters combined with an ordering need a composite index in
+Firestore. The query shapes the app uses are declared here, so they run
+server-side rather than being filtered and sorted in Python:
+
+- `DECLARED_SHAPES` lists every (collection, equality fields, ordering,
+  array-contains fields) combination; `firestore.indexes.json` at the repository root is generated
+  from it (`python -m app.services.firestore_query`) and terraform creates
+  the indexes from that file
+- `FirestoreQueryPlanner` runs a query fully server-side when its shape is
+  declared. If Firestore still reports a missing index (not deployed yet),
+  the shape is remembered and queries fall back to one server-side filter
+  plus client-side filtering, sorting and limiting
+
+Works with both the sync client (FirestoreService) and the async client
+(routers). Against the Firestore emulator (FIRESTORE_EMULATOR_HOST) no
+index is needed, so the planned queries run as-is.
+"""
+
+import itertools
+import json
+import logging
+import os
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+ASCENDING = "ASCENDING"
+DESCENDING = "DESCENDING"
+
+# Max documents read per query when a composite index is missing
+FIRESTORE_FALLBACK_SCAN_LIMIT = int(os.getenv("FIRESTORE_FALLBACK_SCAN_LIMIT", "1000"))
+
+INDEX_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+    "firestore.indexes.json",
+)
+
+Order = Tuple[Tuple[str, str], ...]
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """Equality-filtered fields plus ordering of a query on a collection."""
+
+    collection: str
+    equality: Tuple[str, ...] = ()
+    order: Order = ()
+    # Array fields matched with array-contains(-any)
+    contains: Tuple[str, ...] = ()
+
+    @classmethod
+    def of(cls, collection: str, filters: Dict[str, Any], order: Order) -> "QueryShape":
+        return cls(collection, tuple(sorted(k for k, v in filters.items() if v is not None)), tuple(order))
+
+    @property
+    def needs_composite_index(self) -> bool:
+        # Single-field indexes (automatic) serve one field with its own ordering,
+        # and Firestore merges them for equality-only queries
+        if self.contains:
+            return bool(self.equality or self.order)
+        if not self.order:
+            return False
+        fields = set(self.equality) | {f for f, _ in self.order}
+        return len(fields) > 1
+
+    def index_definition(self) -> Dict[str, Any]:
+        return {
+            "collectionGroup": self.collection,
+            "queryScope": "COLLECTION",
+            "fields": [{"fieldPath": f, "order": ASCENDING} for f in self.equality]
+            + [{"fieldPath": f, "arrayConfig": "CONTAINS"} for f in self.contains]
+            + [{"fieldPath": f, "order": d} for f, d in self.order],
+        }
+
+
+# ========== Declared query shapes ==========
+
+PROPOSAL_ORDER: Order = (("created_at", DESCENDING), ("id", DESCENDING))
+PROPOSAL_FILTER_FIELDS = ("workspace_id", "status", "agent_id", "user_id")
+
+# Near-duplicate candidates: MinHash bands within a workspace (and status)
+BAND_SHAPES: Tuple[QueryShape, ...] = (
+    QueryShape("proposals", ("workspace_id",), contains=("minhash_bands",)),
+    QueryShape("proposals", ("status", "workspace_id"), contains=("minhash_bands",)),
+)
+
+DECLARED_SHAPES: Tuple[QueryShape, ...] = tuple(
+    QueryShape("proposals", tuple(sorted(combo)), PROPOSAL_ORDER)
+    for size in range(len(PROPOSAL_FILTER_FIELDS) + 1)
+    for combo in itertools.combinations(PROPOSAL_FILTER_FIELDS, size)
+) + BAND_SHAPES
+
+
+# Fields never queried: single-field indexing disabled (MinHash signatures
+# would otherwise add one index entry per array value)
+UNINDEXED_FIELDS: Tuple[Tuple[str, str], ...] = (("proposals", "minhash"),)
+
+
+def generate_indexes(shapes: Sequence[QueryShape] = DECLARED_SHAPES) -> Dict[str, Any]:
+    """Index file content (firestore.indexes.json format) for the shapes."""
+    indexes = []
+    for shape in shapes:
+        if shape.needs_composite_index:
+            definition = shape.index_definition()
+            if definition not in indexes:
+                indexes.append(definition)
+    overrides = [
+        {"collectionGroup": collection, "fieldPath": field, "indexes": []}
+        for collection, field in UNINDEXED_FIELDS
+    ]
+    return {"indexes": indexes, "fieldOverrides": overrides}
+
+
+# ========== Planning ==========
+
+
+def _sortable(value: Any) -> str:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    return "" if value is None else str(value)
+
+
+@dataclass
+class QueryPlan:
+    """How a query is split between Firestore and the client."""
+
+    shape: QueryShape
+    server_filters: Dict[str, Any]
+    client_filters: Dict[str, Any] = field(default_factory=dict)
+    server_order: bool = True
+
+    @property
+    def fully_server_side(self) -> bool:
+        return self.server_order and not self.client_filters
+
+
+def _is_missing_index(error: Exception) -> bool:
+    try:
+        from google.api_core.exceptions import FailedPrecondition
+    except ImportError:  # pragma: no cover
+        return False
+    return isinstance(error, FailedPrecondition) and "index" in str(error).lower()
+
+
+class FirestoreQueryPlanner:
+    """Plans and runs filtered, ordered queries (sync and async clients)."""
+
+    def __init__(
+        self,
+        shapes: Sequence[QueryShape] = DECLARED_SHAPES,
+        fallback_scan_limit: int = FIRESTORE_FALLBACK_SCAN_LIMIT,
+    ):
+        self.shapes = frozenset(shapes)
+        self.fallback_scan_limit = fallback_scan_limit
+        self._missing: set = set()
+
+    def plan(self, collection: str, filters: Dict[str, Any], order: Order) -> QueryPlan:
+        """Decide which filters and ordering run in Firestore."""
+        filters = {k: v for k, v in filters.items() if v is not None}
+        shape = QueryShape.of(collection, filters, order)
+        if not shape.needs_composite_index or (shape in self.shapes and shape not in self._missing):
+            return QueryPlan(shape, filters)
+
+        # Fallback: keep the first (most selective) filter server-side
+        server = dict(itertools.islice(filters.items(), 1))
+        client = {k: v for k, v in filters.items() if k not in server}
+        return QueryPlan(shape, server, client, server_order=False)
+
+    def _build(
+        self,
+        collection_ref,
+        plan: QueryPlan,
+        limit: Optional[int],
+        start_after: Optional[Dict[str, Any]],
+        select: Optional[Sequence[str]] = None,
+    ):
+        from google.cloud.firestore_v1.base_query import FieldFilter
+
+        query = collection_ref
+        if select is not None:
+            # Client-side filtering/sorting needs those fields too
+            fields = list(select)
+            for name in list(plan.client_filters) + [f for f, _ in plan.shape.order]:
+                if name not in fields:
+                    fields.append(name)
+            query = query.select(fields)
+        for name, value in plan.server_filters.items():
+            query = query.where(filter=FieldFilter(name, "==", value))
+        if plan.server_order:
+            for name, direction in plan.shape.order:
+                query = query.order_by(name, direction=direction)
+            if start_after:
+                query = query.start_after(start_after)
+            if limit is not None:
+                query = query.limit(limit)
+        else:
+            query = query.limit(self.fallback_scan_limit)
+        return query
+
+    def _finish(
+        self,
+        documents: List[Dict[str, Any]],
+        plan: QueryPlan,
+        limit: Optional[int],
+        start_after: Optional[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        if plan.server_order:
+            return documents
+
+        results = [
+            d for d in documents if all(d.get(k) == v for k, v in plan.client_filters.items())
+        ]
+        order = plan.shape.order
+        if order:
+            descending = order[0][1] == DESCENDING
+
+            def key(d):
+                return tuple(_sortable(d.get(name)) for name, _ in order)
+
+            results.sort(key=key, reverse=descending)
+            if start_after:
+                after = tuple(_sortable(start_after.get(name)) for name, _ in order)
+                results = [d for d in results if (key(d) < after if descending else key(d) > after)]
+        if len(documents) >= self.fallback_scan_limit:
+            logger.warning(
+                f"[FirestoreQuery] Fallback for {plan.shape} hit the scan limit "
+                f"({self.fallback_scan_limit}); results may be incomplete"
+            )
+        return results if limit is None else results[:limit]
+
+    def _mark_missing(self, plan: QueryPlan, error: Exception) -> None:
+        self._missing.add(plan.shape)
+        logger.warning(
+            f"[FirestoreQuery] Missing index for {plan.shape}, filtering client-side "
+            f"until it is deployed (see firestore.indexes.json): {error}"
+        )
+
+    def stream(
+        self,
+        collection_ref,
+        filters: Dict[str, Any],
+        order: Order = PROPOSAL_ORDER,
+        limit: Optional[int] = None,
+        start_after: Optional[Dict[str, Any]] = None,
+        select: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run a query with the sync client.
+
+        Args:
+            collection_ref: Collection reference
+            filters: Equality filters (None values are ignored)
+            order: ((field, ASCENDING|DESCENDING), ...)
+            limit: Max documents returned
+            start_after: Ordering field values to start after (keyset)
+            select: Fields to read (field mask); None reads whole documents
+
+        Returns:
+            Document dicts
+        """
+        plan = self.plan(collection_ref.id, filters, order)
+        try:
+            documents = [d.to_dict() for d in self._build(collection_ref, plan, limit, start_after, select).stream()]
+        except Exception as e:
+            if not (plan.fully_server_side and _is_missing_index(e)):
+                raise
+            self._mark_missing(plan, e)
+            plan = self.plan(collection_ref.id, filters, order)
+            documents = [d.to_dict() for d in self._build(collection_ref, plan, limit, start_after, select).stream()]
+        return self._finish(documents, plan, limit, start_after)
+
+    async def stream_async(
+        self,
+        collection_ref,
+        filters: Dict[str, Any],
+        order: Order = PROPOSAL_ORDER,
+        limit: Optional[int] = None,
+        start_after: Optional[Dict[str, Any]] = None,
+        select: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Run a query with the async client (same arguments as `stream`)."""
+        plan = self.plan(collection_ref.id, filters, order)
+        try:
+            query = self._build(collection_ref, plan, limit, start_after, select)
+            documents = [d.to_dict() async for d in query.stream()]
+        except Exception as e:
+            if not (plan.fully_server_side and _is_missing_index(e)):
+                raise
+            self._mark_missing(plan, e)
+            plan = self.plan(collection_ref.id, filters, order)
+            query = self._build(collection_ref, plan, limit, start_after, select)
+            documents = [d.to_dict() async for d in query.stream()]
+        return self._finish(documents, plan, limit, start_after)
+
+
+_planner: Optional[FirestoreQueryPlanner] = None
+
+
+def get_query_planner() -> FirestoreQueryPlanner:
+    """Get the global query planner."""
+    global _planner
+    if _planner is None:
+        _planner = FirestoreQueryPlanner()
+    return _planner
+
+
+def reset_query_planner():
+    """Reset global query planner (for testing)"""
+    global _planner
+    _planner = None
+
+
+if __name__ == "__main__":
+    # Regenerate the index file: python -m app.services.firestore_query [path]
+    path = sys.argv[1] if len(sys.argv) > 1 else INDEX_FILE
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(generate_indexes(), f, indent=2)
+        f.write("\n")
+    print(f"Wrote {len(generate_indexes()['indexes'])} indexes to {path}")
@@ -2,17 +2,91 @@
 Firestore Service - Database abstraction for ContextPilot
 
 Provides CRUD operations for all Firestore collections.
+
+`FirestoreService` uses the sync client (agents, scripts, worker threads).
+`AsyncFirestoreService` covers the proposal operations on the request path
+with `firestore.AsyncClient`, so handlers do not block the event loop:
+
+- One client per event loop, reused by every request (gRPC channels belong
+  to the loop they were opened on)
+- Multi-document reads go through batched `get_all` calls of at most
+  FIRESTORE_GET_ALL_CHUNK documents, issued concurrently
+- At most FIRESTORE_MAX_CONCURRENCY RPCs in flight per client
 """
 
+import asyncio
 import os
 import logging
-from typing import Dict, List, Optional, Any
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 from google.cloud import firestore
 from google.cloud.firestore_v1.base_query import FieldFilter
 
+from app.services.firestore_query import PROPOSAL_ORDER, get_query_planner
+from app.utils.pagination import decode_cursor, encode_cursor
+
 logger = logging.getLogger(__name__)
 
+FIRESTORE_MAX_CONCURRENCY = int(os.getenv("FIRESTORE_MAX_CONCURRENCY", "16"))
+FIRESTORE_GET_ALL_CHUNK = int(os.getenv("FIRESTORE_GET_ALL_CHUNK", "100"))
+
+# plan(transaction, documents) -> {proposal_id: fields, or None to delete} (see transition_proposals)
+TransitionPlan = Callable[[Any, Dict[str, Dict[str, Any]]], Dict[str, Optional[Dict[str, Any]]]]
+
+
+def _queue_writes(
+    transaction,
+    proposals,
+    documents: Dict[str, Dict[str, Any]],
+    writes: Dict[str, Optional[Dict[str, Any]]],
+) -> None:
+    """Queue the writes of a transition plan: update existing proposals, create missing ones, delete on None."""
+    updated_at = datetime.utcnow().isoformat()
+    for proposal_id, fields in writes.items():
+        ref = proposals.document(proposal_id)
+        if fields is None:
+            if proposal_id in documents:
+                transaction.delete(ref)
+        elif proposal_id in documents:
+            fields["updated_at"] = updated_at
+            transaction.update(ref, fields)
+        else:
+            transaction.set(ref, fields)
+
+
+def _page_filters(
+    workspace_id: Optional[str],
+    status: Optional[str],
+    agent_id: Optional[str],
+    user_id: Optional[str],
+    cursor: Optional[str],
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """Filters and keyset start of a proposals page (see list_proposals_page)."""
+    filters = {
+        "workspace_id": workspace_id,
+        "status": status,
+        "agent_id": agent_id,
+        "user_id": user_id,
+    }
+    start_after = None
+    if cursor:
+        created_at, proposal_id = decode_cursor(cursor, filters)
+        start_after = {"created_at": created_at, "id": proposal_id}
+    return filters, start_after
+
+
+def _page_result(
+    proposals: List[Dict[str, Any]], limit: int, filters: Dict[str, Any]
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Trim the limit + 1 documents read for a page and issue the next cursor."""
+    next_cursor = None
+    if len(proposals) > limit:
+        proposals = proposals[:limit]
+        last = proposals[-1]
+        next_cursor = encode_cursor(last.get("created_at"), last.get("id"), filters)
+    return proposals, next_cursor
+
 
 class FirestoreService:
     """
@@ -96,6 +170,7 @@ class FirestoreService:
         workspace_id: Optional[str] = None,
         status: Optional[str] = None,
         limit: int = 100,
+        fields: Optional[List[str]] = None,
     ) -> List[Dict[str, Any]]:
         """
         List proposals with optional filters.
@@ -104,45 +179,121 @@ class FirestoreService:
             workspace_id: Filter by workspace
             status: Filter by status (pending, approved, rejected)
             limit: Max number of results
+            fields: Fields to read (None = whole documents)
 
         Returns:
             List of proposals
         """
-        query = self.db.collection("proposals")
-
-        # Apply filters (simplified to avoid composite index requirement)
-        if workspace_id:
-            query = query.where(filter=FieldFilter("workspace_id", "==", workspace_id))
+        # Filtered and ordered by Firestore (see firestore_query)
+        proposals = get_query_planner().stream(
+            self.db.collection("proposals"),
+            {"workspace_id": workspace_id, "status": status},
+            PROPOSAL_ORDER,
+            limit=limit,
+            select=fields,
+        )
 
-        if status:
-            query = query.where(filter=FieldFilter("status", "==", status))
+        logger.info(
+            f"[Firestore] Listed {len(proposals)} proposals (workspace: {workspace_id}, status: {status})"
+        )
+        return proposals
 
-        # Don't order by created_at if we're filtering (to avoid index requirement)
-        # Instead, we'll sort in memory
+    def list_proposals_page(
+        self,
+        workspace_id: Optional[str] = None,
+        status: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        List one page of proposals, newest first (keyset on created_at, id).
 
-        # Limit results
-        query = query.limit(limit)
+        Reads at most limit + 1 documents whatever the page position (with
+        the indexes from firestore.indexes.json deployed).
 
-        # Execute query
-        docs = query.stream()
-        proposals = [doc.to_dict() for doc in docs]
+        Args:
+            workspace_id: Filter by workspace
+            status: Filter by status
+            agent_id: Filter by agent
+            user_id: Filter by user
+            limit: Page size
+            cursor: Token from the previous page
+            fields: Fields to read (None = whole documents)
 
-        # Sort in memory by created_at (handle datetime objects properly)
-        def sort_key(proposal):
-            created_at = proposal.get("created_at")
-            if isinstance(created_at, str):
-                return created_at
-            elif hasattr(created_at, "isoformat"):
-                return created_at.isoformat()
-            else:
-                return str(created_at) if created_at else ""
+        Returns:
+            (proposals, next_cursor); next_cursor is None on the last page
 
-        proposals.sort(key=sort_key, reverse=True)
+        Raises:
+            InvalidCursor: If the cursor is malformed or issued for other filters
+        """
+        filters, start_after = _page_filters(workspace_id, status, agent_id, user_id, cursor)
+        proposals, next_cursor = _page_result(
+            get_query_planner().stream(
+                self.db.collection("proposals"),
+                filters,
+                PROPOSAL_ORDER,
+                limit=limit + 1,
+                start_after=start_after,
+                select=fields,
+            ),
+            limit,
+            filters,
+        )
 
         logger.info(
-            f"[Firestore] Listed {len(proposals)} proposals (workspace: {workspace_id}, status: {status})"
+            f"[Firestore] Listed page of {len(proposals)} proposals (workspace: {workspace_id}, status: {status})"
         )
-        return proposals
+        return proposals, next_cursor
+
+    def find_proposals_by_fingerprint(
+        self,
+        workspace_id: str,
+        fingerprint: str,
+        status: Optional[str] = None,
+        limit: int = 5,
+        fields: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Proposals with a given diff fingerprint (see diff_fingerprint).
+
+        Equality-only query served by the automatic single-field indexes.
+        """
+        return get_query_planner().stream(
+            self.db.collection("proposals"),
+            {"workspace_id": workspace_id, "diff_fingerprint": fingerprint, "status": status},
+            order=(),
+            limit=limit,
+            select=fields,
+        )
+
+    def find_proposals_by_bands(
+        self,
+        workspace_id: str,
+        bands: List[str],
+        status: Optional[str] = None,
+        limit: int = 50,
+        fields: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Proposals of a workspace sharing at least one MinHash LSH band
+        (near-duplicate candidates).
+
+        Served by the band indexes declared in firestore_query (BAND_SHAPES).
+        """
+        query = self.db.collection("proposals").where(filter=FieldFilter("workspace_id", "==", workspace_id))
+        if status is not None:
+            query = query.where(filter=FieldFilter("status", "==", status))
+        query = query.where(filter=FieldFilter("minhash_bands", "array_contains_any", bands[:30]))
+        if fields is not None:
+            query = query.select(fields)
+        return [doc.to_dict() for doc in query.limit(limit).stream()]
+
+    def set_proposal_summary(self, proposal_id: str, summary: Dict[str, Any]) -> None:
+        """Store the list-view summary stats of a proposal (see proposal_summary)."""
+        self.db.collection("proposals").document(proposal_id).update({"summary": summary})
 
     def update_proposal(self, proposal_id: str, updates: Dict[str, Any]) -> bool:
         """
@@ -168,6 +319,89 @@ class FirestoreService:
             logger.error(f"[Firestore] Failed to update proposal {proposal_id}: {e}")
             return False
 
+    def get_proposals(
+        self, proposal_ids: List[str], fields: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get several proposals in one batched read.
+
+        Args:
+            proposal_ids: Proposal IDs
+            fields: Only read these fields (None = whole documents)
+
+        Returns:
+            {proposal_id: data} for the proposals that exist
+        """
+        refs = [self.db.collection("proposals").document(pid) for pid in dict.fromkeys(proposal_ids)]
+        if not refs:
+            return {}
+        snapshots = self.db.get_all(refs, field_paths=fields) if fields else self.db.get_all(refs)
+        return {s.id: s.to_dict() for s in snapshots if s.exists}
+
+    def update_proposals(self, updates: Dict[str, Dict[str, Any]], batch=None) -> bool:
+        """
+        Update several proposals with one batched write.
+
+        Args:
+            updates: {proposal_id: fields to update}
+            batch: WriteBatch already holding related writes, committed
+                together with the updates (at most 500 writes in total)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            batch = batch if batch is not None else self.db.batch()
+            updated_at = datetime.utcnow().isoformat()
+            for proposal_id, fields in updates.items():
+                fields["updated_at"] = updated_at
+                batch.update(self.db.collection("proposals").document(proposal_id), fields)
+            batch.commit()
+
+            logger.info(f"[Firestore] Updated {len(updates)} proposals in one batch")
+            return True
+        except Exception as e:
+            logger.error(f"[Firestore] Failed to update proposals {list(updates)}: {e}")
+            return False
+
+    def transition_proposals(
+        self, proposal_ids: List[str], plan: TransitionPlan
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Read proposals and write them in one transaction.
+
+        Writes derived from the documents (status changes, creations and
+        deletions, counter increments) commit only if none of the documents
+        changed since they were read, so concurrent writers cannot apply
+        deltas computed from a stale status.
+
+        Args:
+            proposal_ids: Proposals to read
+            plan: plan(transaction, documents) returning {proposal_id: fields}:
+                fields update an existing proposal or create a missing one,
+                None deletes it. May queue related writes on the transaction.
+                Called again with fresh documents when the transaction is retried.
+
+        Returns:
+            {proposal_id: document before the write} for the proposals that
+            existed (None if the transaction failed)
+        """
+        refs = [self.db.collection("proposals").document(pid) for pid in dict.fromkeys(proposal_ids)]
+
+        @firestore.transactional
+        def run(transaction):
+            documents = {s.id: s.to_dict() for s in transaction.get_all(refs) if s.exists}
+            _queue_writes(transaction, self.db.collection("proposals"), documents, plan(transaction, documents))
+            return documents
+
+        try:
+            documents = run(self.db.transaction())
+            logger.info(f"[Firestore] Wrote proposals {proposal_ids} in one transaction")
+            return documents
+        except Exception as e:
+            logger.error(f"[Firestore] Failed to update proposals {proposal_ids}: {e}")
+            return None
+
     def delete_proposal(self, proposal_id: str) -> bool:
         """
         Delete proposal.
@@ -188,6 +422,19 @@ class FirestoreService:
             logger.error(f"[Firestore] Failed to delete proposal {proposal_id}: {e}")
             return False
 
+    def watch_proposals(self, callback):
+        """
+        Listen for changes to the proposals collection.
+
+        Args:
+            callback: Called as callback(snapshot, changes, read_time) from a
+                background thread; the first call lists every proposal
+
+        Returns:
+            Watch handle (call `unsubscribe()` to stop)
+        """
+        return self.db.collection("proposals").on_snapshot(callback)
+
     # ========== WORKSPACES COLLECTION ==========
 
     def create_workspace(self, workspace_id: str, data: Dict[str, Any]) -> str:
@@ -324,3 +571,199 @@ def reset_firestore_service():
     """Reset global Firestore service (for testing)"""
     global _firestore_service
     _firestore_service = None
+
+
+class AsyncFirestoreService:
+    """
+    Async proposal operations for request handlers (firestore.AsyncClient).
+
+    Agents and worker threads keep using FirestoreService; both clients read
+    and write the same documents.
+    """
+
+    def __init__(self, project_id: Optional[str] = None, max_concurrency: int = FIRESTORE_MAX_CONCURRENCY):
+        """
+        Initialize the async Firestore client.
+
+        Args:
+            project_id: GCP project ID (defaults to env var GCP_PROJECT_ID)
+            max_concurrency: Max RPCs in flight on this client
+        """
+        self.project_id = project_id or os.getenv("GCP_PROJECT_ID")
+
+        if not self.project_id:
+            raise ValueError("GCP_PROJECT_ID not set. Cannot initialize Firestore.")
+
+        try:
+            self.db = firestore.AsyncClient(project=self.project_id)
+            logger.info(f"[Firestore] Async client connected to project: {self.project_id}")
+        except Exception as e:
+            logger.error(f"[Firestore] Failed to connect: {e}")
+            raise
+        self._limit = asyncio.Semaphore(max_concurrency)
+
+    def _proposal_ref(self, proposal_id: str):
+        return self.db.collection("proposals").document(proposal_id)
+
+    async def create_proposal(self, proposal: Dict[str, Any]) -> str:
+        """Create a new proposal (see FirestoreService.create_proposal)."""
+        proposal_id = proposal.get("id")
+        if not proposal_id:
+            raise ValueError("Proposal must have 'id' field")
+
+        if "created_at" not in proposal:
+            proposal["created_at"] = datetime.utcnow().isoformat()
+
+        async with self._limit:
+            await self._proposal_ref(proposal_id).set(proposal)
+
+        logger.info(f"[Firestore] Created proposal: {proposal_id}")
+        return proposal_id
+
+    async def get_proposal(self, proposal_id: str) -> Optional[Dict[str, Any]]:
+        """Get proposal by ID (None if not found)."""
+        async with self._limit:
+            doc = await self._proposal_ref(proposal_id).get()
+
+        if doc.exists:
+            return doc.to_dict()
+        logger.warning(f"[Firestore] Proposal not found: {proposal_id}")
+        return None
+
+    async def get_proposals(
+        self, proposal_ids: List[str], fields: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get several proposals with batched reads.
+
+        Args:
+            proposal_ids: Proposal IDs
+            fields: Only read these fields (None = whole documents)
+
+        Returns:
+            {proposal_id: data} for the proposals that exist
+        """
+        refs = [self._proposal_ref(pid) for pid in dict.fromkeys(proposal_ids)]
+        chunks = [refs[i:i + FIRESTORE_GET_ALL_CHUNK] for i in range(0, len(refs), FIRESTORE_GET_ALL_CHUNK)]
+        found: Dict[str, Dict[str, Any]] = {}
+        for documents in await asyncio.gather(*(self._get_all(chunk, fields) for chunk in chunks)):
+            found.update(documents)
+        return found
+
+    async def _get_all(self, refs: list, fields: Optional[List[str]]) -> Dict[str, Dict[str, Any]]:
+        async with self._limit:
+            snapshots = self.db.get_all(refs, field_paths=fields) if fields else self.db.get_all(refs)
+            return {s.id: s.to_dict() async for s in snapshots if s.exists}
+
+    async def list_proposals_page(
+        self,
+        workspace_id: Optional[str] = None,
+        status: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """List one page of proposals, newest first (see FirestoreService.list_proposals_page)."""
+        filters, start_after = _page_filters(workspace_id, status, agent_id, user_id, cursor)
+        async with self._limit:
+            proposals = await get_query_planner().stream_async(
+                self.db.collection("proposals"),
+                filters,
+                PROPOSAL_ORDER,
+                limit=limit + 1,
+                start_after=start_after,
+                select=fields,
+            )
+        proposals, next_cursor = _page_result(proposals, limit, filters)
+
+        logger.info(
+            f"[Firestore] Listed page of {len(proposals)} proposals (workspace: {workspace_id}, status: {status})"
+        )
+        return proposals, next_cursor
+
+    async def set_proposal_summary(self, proposal_id: str, summary: Dict[str, Any]) -> None:
+        """Store the list-view summary stats of a proposal (see proposal_summary)."""
+        async with self._limit:
+            await self._proposal_ref(proposal_id).update({"summary": summary})
+
+    async def update_proposal(self, proposal_id: str, updates: Dict[str, Any]) -> bool:
+        """Update proposal fields (False on failure)."""
+        try:
+            updates["updated_at"] = datetime.utcnow().isoformat()
+            async with self._limit:
+                await self._proposal_ref(proposal_id).update(updates)
+
+            logger.info(f"[Firestore] Updated proposal: {proposal_id}")
+            return True
+        except Exception as e:
+            logger.error(f"[Firestore] Failed to update proposal {proposal_id}: {e}")
+            return False
+
+    async def update_proposals(self, updates: Dict[str, Dict[str, Any]], batch=None) -> bool:
+        """Update several proposals with one batched write (see FirestoreService.update_proposals)."""
+        try:
+            batch = batch if batch is not None else self.db.batch()
+            updated_at = datetime.utcnow().isoformat()
+            for proposal_id, fields in updates.items():
+                fields["updated_at"] = updated_at
+                batch.update(self._proposal_ref(proposal_id), fields)
+            async with self._limit:
+                await batch.commit()
+
+            logger.info(f"[Firestore] Updated {len(updates)} proposals in one batch")
+            return True
+        except Exception as e:
+            logger.error(f"[Firestore] Failed to update proposals {list(updates)}: {e}")
+            return False
+
+    async def transition_proposals(
+        self, proposal_ids: List[str], plan: TransitionPlan
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Read proposals and write them in one transaction (see FirestoreService.transition_proposals)."""
+        refs = [self._proposal_ref(pid) for pid in dict.fromkeys(proposal_ids)]
+
+        @firestore.async_transactional
+        async def run(transaction):
+            documents = {s.id: s.to_dict() async for s in await transaction.get_all(refs) if s.exists}
+            _queue_writes(transaction, self.db.collection("proposals"), documents, plan(transaction, documents))
+            return documents
+
+        try:
+            async with self._limit:
+                documents = await run(self.db.transaction())
+            logger.info(f"[Firestore] Wrote proposals {proposal_ids} in one transaction")
+            return documents
+        except Exception as e:
+            logger.error(f"[Firestore] Failed to update proposals {proposal_ids}: {e}")
+            return None
+
+
+# One async service per event loop (TestClient and the approval queue run their own)
+_async_firestore_services: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncFirestoreService]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_firestore_service(project_id: Optional[str] = None) -> AsyncFirestoreService:
+    """
+    Get or create the async Firestore service of the running event loop.
+
+    Args:
+        project_id: GCP project ID
+
+    Returns:
+        AsyncFirestoreService instance (must be called from a coroutine)
+    """
+    loop = asyncio.get_running_loop()
+    service = _async_firestore_services.get(loop)
+    if service is None:
+        service = AsyncFirestoreService(project_id=project_id)
+        _async_firestore_services[loop] = service
+    return service
+
+
+def reset_async_firestore_service():
+    """Reset async Firestore services (for testing)"""
+    _async_firestore_services.clear()
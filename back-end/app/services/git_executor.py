@@ -0,0 +1,272 @@
+"""
+Git Executor - Non-blocking, repository-serialized git operations
+
+GitPython calls are blocking and two concurrent writers on the same
+repository race for .git/index.lock. The executor runs git work off the
+request path with:
+
+- One serialized queue per repository (parallelism across repositories)
+- A per-repository lock that synchronous callers share, so direct calls and
+  queued jobs never interleave on the same index
+- Per-job timeouts and cancellation (queued jobs are dropped; running jobs
+  are abandoned and their git subprocesses are bounded by
+  GIT_COMMAND_TIMEOUT via GitPython's kill_after_timeout)
+- Job ids and status streaming through the job registry (app.services.jobs)
+
+The executor runs its own event loop in a daemon thread, so it can be used
+from async handlers, sync handlers and agents alike.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.services.jobs import Job, JobStatus, get_job_registry
+
+logger = logging.getLogger(__name__)
+
+# Max seconds a single git subprocess may run before it is killed
+GIT_COMMAND_TIMEOUT = float(os.getenv("GIT_COMMAND_TIMEOUT", "120"))
+# Default max seconds for a whole git job (commit + history + push, ...)
+GIT_JOB_TIMEOUT = float(os.getenv("GIT_JOB_TIMEOUT", "300"))
+# Threads available for git work (= repositories that can run in parallel)
+GIT_EXECUTOR_WORKERS = int(os.getenv("GIT_EXECUTOR_WORKERS", "4"))
+
+
+class GitJobTimeout(Exception):
+    """Raised when a git job exceeds its timeout."""
+
+
+class GitJobCancelled(Exception):
+    """Raised when a git job is cancelled."""
+
+
+class GitExecutor:
+    """Per-repository serialized executor for blocking git operations."""
+
+    def __init__(self, max_workers: int = GIT_EXECUTOR_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="git-exec")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._repo_locks: Dict[str, threading.RLock] = {}
+        self._repo_locks_guard = threading.Lock()
+        self.registry = get_job_registry()
+
+        # Touched only from the executor loop
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._running: Dict[str, asyncio.Future] = {}
+
+        # Result futures for submitted jobs (thread-safe)
+        self._futures: Dict[str, concurrent.futures.Future] = {}
+
+    # ------------------------------------------------------------------
+    # Locks / loop
+    # ------------------------------------------------------------------
+
+    def repo_lock(self, repo_key: str) -> threading.RLock:
+        """Return the lock serializing all git work on a repository."""
+        with self._repo_locks_guard:
+            lock = self._repo_locks.get(repo_key)
+            if lock is None:
+                lock = threading.RLock()
+                self._repo_locks[repo_key] = lock
+            return lock
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="git-executor-loop", daemon=True
+                )
+                thread.start()
+                self._loop = loop
+                self._thread = thread
+                logger.info("[GitExecutor] Started executor loop")
+            return self._loop
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+
+    def _submit(
+        self,
+        repo_key: str,
+        fn: Callable[[], Any],
+        kind: str,
+        workspace_id: Optional[str],
+        timeout: Optional[float],
+        metadata: Optional[dict],
+    ) -> Tuple[Job, concurrent.futures.Future]:
+        job = self.registry.create(kind, workspace_id=workspace_id, metadata=metadata)
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        self._futures[job.id] = future
+        loop = self._ensure_loop()
+        loop.call_soon_threadsafe(self._enqueue, repo_key, job, fn, timeout)
+        return job, future
+
+    def submit(
+        self,
+        repo_key: str,
+        fn: Callable[[], Any],
+        kind: str = "git",
+        workspace_id: Optional[str] = None,
+        timeout: Optional[float] = GIT_JOB_TIMEOUT,
+        metadata: Optional[dict] = None,
+    ) -> Job:
+        """
+        Queue a blocking git operation and return its job immediately.
+
+        Args:
+            repo_key: Repository identity (e.g. the .git directory)
+            fn: Zero-argument callable doing the git work
+            kind: Job kind (e.g. "commit", "push")
+            workspace_id: Workspace the job belongs to
+            timeout: Max seconds for the job (None = no limit)
+            metadata: Extra info exposed on the job
+
+        Returns:
+            Job (poll it through the job registry)
+        """
+        job, _ = self._submit(repo_key, fn, kind, workspace_id, timeout, metadata)
+        return job
+
+    async def run(
+        self,
+        repo_key: str,
+        fn: Callable[[], Any],
+        kind: str = "git",
+        workspace_id: Optional[str] = None,
+        timeout: Optional[float] = GIT_JOB_TIMEOUT,
+        metadata: Optional[dict] = None,
+    ) -> Any:
+        """Queue a git operation and await its result without blocking the caller's loop."""
+        _, future = self._submit(repo_key, fn, kind, workspace_id, timeout, metadata)
+        return await asyncio.wrap_future(future)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job.
+
+        Returns:
+            True if the job was still pending or running
+        """
+        job = self.registry.get(job_id)
+        if job is None or job.finished:
+            return False
+
+        job.cancel_requested = True
+        if job.status == JobStatus.QUEUED:
+            self._finish(job, JobStatus.CANCELLED, error="Cancelled before start")
+        elif self._loop is not None:
+            self._loop.call_soon_threadsafe(self._cancel_running, job_id)
+        return True
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop the executor loop (pending jobs are cancelled)."""
+        with self._start_lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._cancel_workers(), loop).result(timeout)
+            except Exception as e:
+                logger.warning(f"[GitExecutor] Error stopping workers: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            if self._thread is not None:
+                self._thread.join(timeout)
+            loop.close()
+            self._queues.clear()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _cancel_workers(self) -> None:
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # ------------------------------------------------------------------
+    # Executor loop internals
+    # ------------------------------------------------------------------
+
+    def _enqueue(self, repo_key: str, job: Job, fn: Callable[[], Any], timeout: Optional[float]) -> None:
+        queue = self._queues.get(repo_key)
+        if queue is None:
+            queue = asyncio.Queue()
+            self._queues[repo_key] = queue
+            self._loop.create_task(self._worker(repo_key, queue))
+        queue.put_nowait((job, fn, timeout))
+
+    def _cancel_running(self, job_id: str) -> None:
+        waiter = self._running.get(job_id)
+        if waiter is not None:
+            waiter.cancel()
+
+    def _call_locked(self, repo_key: str, fn: Callable[[], Any]) -> Any:
+        with self.repo_lock(repo_key):
+            return fn()
+
+    async def _worker(self, repo_key: str, queue: asyncio.Queue) -> None:
+        while True:
+            job, fn, timeout = await queue.get()
+            if job.cancel_requested:
+                self._finish(job, JobStatus.CANCELLED, error="Cancelled before start")
+                continue
+
+            self.registry.update(job, JobStatus.RUNNING)
+            call = self._loop.run_in_executor(self._pool, self._call_locked, repo_key, fn)
+            waiter = asyncio.ensure_future(asyncio.wait_for(call, timeout))
+            self._running[job.id] = waiter
+            try:
+                result = await waiter
+                self._finish(job, JobStatus.SUCCEEDED, result=result)
+            except asyncio.TimeoutError:
+                logger.warning(f"[GitExecutor] Job {job.id} timed out after {timeout}s")
+                self._finish(job, JobStatus.TIMEOUT, error=f"Timed out after {timeout}s")
+            except asyncio.CancelledError:
+                self._finish(job, JobStatus.CANCELLED, error="Cancelled while running")
+                if not job.cancel_requested:
+                    raise  # Executor is shutting down
+            except Exception as e:
+                logger.error(f"[GitExecutor] Job {job.id} failed: {e}")
+                self._finish(job, JobStatus.FAILED, error=str(e), exc=e)
+            finally:
+                self._running.pop(job.id, None)
+
+    def _finish(
+        self,
+        job: Job,
+        status: str,
+        result: Any = None,
+        error: Optional[str] = None,
+        exc: Optional[BaseException] = None,
+    ) -> None:
+        self.registry.update(job, status, result=result, error=error)
+        future = self._futures.pop(job.id, None)
+        if future is None or future.done():
+            return
+        if status == JobStatus.SUCCEEDED:
+            future.set_result(result)
+        elif status == JobStatus.TIMEOUT:
+            future.set_exception(GitJobTimeout(error))
+        elif status == JobStatus.CANCELLED:
+            future.set_exception(GitJobCancelled(error))
+        else:
+            future.set_exception(exc or RuntimeError(error))
+
+
+_git_executor: Optional[GitExecutor] = None
+_git_executor_lock = threading.Lock()
+
+
+def get_git_executor() -> GitExecutor:
+    """Get the process-wide git executor."""
+    global _git_executor
+    with _git_executor_lock:
+        if _git_executor is None:
+            _git_executor = GitExecutor()
+        return _git_executor
@@ -0,0 +1,385 @@
+"""
+Git Log Cache - Incremental, HEAD-keyed commit cache with rollups
+
+Serves get_git_log and get_temporal_context without running `git log` and
+rebuilding the by-date / by-author rollups on every call. The cache keeps:
+
+- The newest GIT_LOG_CACHE_MAX_COMMITS commits (sha + metadata), newest
+  first; older ones are dropped
+- The HEAD sha the cache was built against
+- Per-day, per-author and per-day-per-author commit counts of those commits
+  (days are UTC dates, so they compare with the UTC window cutoff)
+- A few sample messages per day (for the timeline)
+
+On refresh only `<cached HEAD>..HEAD` is fetched, at most the cap. If the
+cached HEAD is no longer an ancestor of HEAD (rebase, reset, branch switch)
+the cache is rebuilt from the newest commits. When HEAD has not moved no git
+subprocess is started at all.
+
+The cache is persisted inside the repository's git directory
+(.git/contextpilot/) so it survives restarts without being part of the
+workspace files that agents commit: a JSON snapshot, plus a segments file
+where every HEAD move appends one line with its new commits. Loading replays
+the segments that chain from the snapshot's HEAD; the snapshot is rewritten
+(and the segments dropped) after GIT_LOG_CACHE_MAX_SEGMENTS of them.
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from app.services.local_storage import atomic_write
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE = "git_log_cache.json"
+# Commits added since the snapshot, one JSON line per HEAD move
+SEGMENTS_FILE = "git_log_cache.segments"
+# Subdirectory of the git directory holding the cache
+CACHE_DIR = "contextpilot"
+CACHE_VERSION = 2
+
+# Commits kept (get_temporal_context reads up to 100, get_git_log 50)
+GIT_LOG_CACHE_MAX_COMMITS = int(os.getenv("GIT_LOG_CACHE_MAX_COMMITS", "100"))
+# Segments appended before the snapshot is rewritten
+GIT_LOG_CACHE_MAX_SEGMENTS = int(os.getenv("GIT_LOG_CACHE_MAX_SEGMENTS", "50"))
+
+# Sample messages kept per day for the timeline view
+SAMPLES_PER_DAY = 3
+
+# Unit/record separators never appear in author names or subjects
+_FIELD_SEP = "\x1f"
+_LOG_FORMAT = _FIELD_SEP.join(["%H", "%an", "%ae", "%aI", "%s"])
+
+
+def _parse_commit_line(line: str) -> Optional[Dict[str, Any]]:
+    """Parse a single `git log` line produced with _LOG_FORMAT."""
+    parts = line.split(_FIELD_SEP, 4)
+    if len(parts) < 5:
+        return None
+
+    commit_hash, author_name, author_email, commit_date, message = parts
+    try:
+        dt = datetime.fromisoformat(commit_date)
+        date_str = dt.strftime("%Y-%m-%d")
+        time_str = dt.strftime("%H:%M:%S")
+        timestamp = dt.isoformat()
+        epoch = dt.timestamp()
+        day = dt.astimezone(timezone.utc).strftime("%Y-%m-%d")
+    except ValueError:
+        logger.warning(f"[GitLogCache] Failed to parse commit date: {commit_date}")
+        date_str = commit_date[:10]
+        time_str = ""
+        timestamp = commit_date
+        epoch = 0.0
+        day = date_str
+
+    return {
+        "commit": commit_hash,
+        "author": author_name,
+        "email": author_email,
+        "date": commit_date,
+        "date_formatted": date_str,
+        "time": time_str,
+        "message": message,
+        "timestamp": timestamp,
+        "epoch": epoch,
+        "day": day,
+    }
+
+
+_INTERNAL_FIELDS = ("epoch", "day")
+
+
+def _public(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Strip internal fields from a cached commit record."""
+    return {k: v for k, v in record.items() if k not in _INTERNAL_FIELDS}
+
+
+def _decrement(counts: Dict[str, int], key: str) -> int:
+    """Decrement a rollup count, dropping the key at zero; returns the new count."""
+    counts[key] -= 1
+    if counts[key] <= 0:
+        del counts[key]
+        return 0
+    return counts[key]
+
+
+class GitLogCache:
+    """
+    Persistent commit cache for one git repository.
+
+    Thread-safe; one instance is meant to be shared by a Git_Context_Manager.
+    """
+
+    def __init__(self, repo, cache_dir: Optional[str] = None):
+        """
+        Args:
+            repo: git.Repo instance
+            cache_dir: Directory where the cache file is persisted
+                (default: CACHE_DIR in the repository's git directory)
+        """
+        self.repo = repo
+        cache_dir = cache_dir or os.path.join(repo.git_dir, CACHE_DIR)
+        self.cache_path = os.path.join(cache_dir, CACHE_FILE)
+        self.segments_path = os.path.join(cache_dir, SEGMENTS_FILE)
+        self._segments = 0
+        self._lock = threading.RLock()
+        self._reset()
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _reset(self) -> None:
+        self.head: Optional[str] = None
+        self.commits: List[Dict[str, Any]] = []  # newest first
+        self.by_day: Dict[str, int] = {}
+        self.by_author: Dict[str, int] = {}
+        self.by_day_author: Dict[str, Dict[str, int]] = {}
+        self.samples_by_day: Dict[str, List[str]] = {}
+
+    def _load(self) -> None:
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != CACHE_VERSION:
+                return
+            self.head = data.get("head")
+            self.commits = data.get("commits", [])
+            self.by_day = data.get("by_day", {})
+            self.by_author = data.get("by_author", {})
+            self.by_day_author = data.get("by_day_author", {})
+            self.samples_by_day = data.get("samples_by_day", {})
+        except Exception as e:
+            logger.warning(f"[GitLogCache] Ignoring unreadable cache {self.cache_path}: {e}")
+            self._reset()
+            return
+        self._replay()
+        logger.info(
+            f"[GitLogCache] Loaded {len(self.commits)} cached commits (HEAD {str(self.head)[:8]})"
+        )
+
+    def _replay(self) -> None:
+        """Apply the appended segments that chain from the snapshot's HEAD."""
+        if not os.path.exists(self.segments_path):
+            return
+        with open(self.segments_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    segment = json.loads(line)
+                except ValueError:
+                    continue  # Torn last line
+                self._segments += 1
+                # Segments of other processes that moved from another HEAD don't apply
+                if segment.get("parent") == self.head:
+                    self._add(segment["commits"])
+                    self.head = segment["head"]
+
+    def _save(self) -> None:
+        data = {
+            "version": CACHE_VERSION,
+            "head": self.head,
+            "commits": self.commits,
+            "by_day": self.by_day,
+            "by_author": self.by_author,
+            "by_day_author": self.by_day_author,
+            "samples_by_day": self.samples_by_day,
+        }
+        try:
+            # Managers of several workspaces may share the repository's cache
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            atomic_write(self.cache_path, json.dumps(data))
+            if os.path.exists(self.segments_path):
+                os.remove(self.segments_path)
+            self._segments = 0
+        except OSError as e:
+            logger.warning(f"[GitLogCache] Could not persist cache: {e}")
+
+    def _append(self, parent: str, new_commits: List[Dict[str, Any]]) -> None:
+        """Persist a HEAD move from `parent` as one segment line."""
+        if self._segments >= GIT_LOG_CACHE_MAX_SEGMENTS:
+            self._save()
+            return
+        line = json.dumps({"parent": parent, "head": self.head, "commits": new_commits})
+        try:
+            os.makedirs(os.path.dirname(self.segments_path), exist_ok=True)
+            with open(self.segments_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self._segments += 1
+        except OSError as e:
+            logger.warning(f"[GitLogCache] Could not persist cache: {e}")
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def _current_head(self) -> Optional[str]:
+        try:
+            return self.repo.head.commit.hexsha
+        except (ValueError, TypeError):
+            # Empty repository / unborn branch
+            return None
+
+    def _is_ancestor(self, old: str, new: str) -> bool:
+        try:
+            self.repo.git.merge_base("--is-ancestor", old, new)
+            return True
+        except Exception:
+            return False
+
+    def _fetch(self, rev_range: str) -> List[Dict[str, Any]]:
+        output = self.repo.git.log(
+            f"--pretty=format:{_LOG_FORMAT}", f"--max-count={GIT_LOG_CACHE_MAX_COMMITS}", rev_range
+        )
+        records = []
+        for line in output.splitlines():
+            record = _parse_commit_line(line) if line else None
+            if record:
+                records.append(record)
+        return records
+
+    def _add_to_rollups(self, new_commits: List[Dict[str, Any]]) -> None:
+        # new_commits are newest first; walk oldest first so samples stay newest-first
+        for record in reversed(new_commits):
+            day = record["day"]
+            author = record["author"]
+            self.by_day[day] = self.by_day.get(day, 0) + 1
+            self.by_author[author] = self.by_author.get(author, 0) + 1
+            day_authors = self.by_day_author.setdefault(day, {})
+            day_authors[author] = day_authors.get(author, 0) + 1
+            samples = self.samples_by_day.setdefault(day, [])
+            samples.insert(0, record["message"])
+            del samples[SAMPLES_PER_DAY:]
+
+    def _remove_from_rollups(self, old_commits: List[Dict[str, Any]]) -> None:
+        for record in old_commits:
+            day = record["day"]
+            _decrement(self.by_author, record["author"])
+            _decrement(self.by_day_author[day], record["author"])
+            left = _decrement(self.by_day, day)
+            if not left:
+                self.by_day_author.pop(day, None)
+                self.samples_by_day.pop(day, None)
+            else:
+                # Dropped commits are the day's oldest; samples are newest first
+                del self.samples_by_day[day][left:]
+
+    def _add(self, new_commits: List[Dict[str, Any]]) -> None:
+        """Prepend new commits (newest first) and drop the ones over the cap."""
+        self.commits = new_commits + self.commits
+        self._add_to_rollups(new_commits)
+        dropped = self.commits[GIT_LOG_CACHE_MAX_COMMITS:]
+        del self.commits[GIT_LOG_CACHE_MAX_COMMITS:]
+        self._remove_from_rollups(dropped)
+
+    def refresh(self) -> bool:
+        """
+        Bring the cache up to date with HEAD.
+
+        Returns:
+            True if HEAD has any commits, False for an empty repository
+        """
+        with self._lock:
+            head = self._current_head()
+            if head is None:
+                if self.head is not None:
+                    self._reset()
+                    self._save()
+                return False
+            if head == self.head:
+                return True
+
+            parent = self.head
+            if parent and self._is_ancestor(parent, head):
+                new_commits = self._fetch(f"{parent}..{head}")
+                logger.info(f"[GitLogCache] Fetched {len(new_commits)} new commits")
+            else:
+                if parent:
+                    logger.info("[GitLogCache] Cached HEAD is not an ancestor of HEAD, rebuilding")
+                    parent = None
+                self._reset()
+                new_commits = self._fetch(head)
+                logger.info(f"[GitLogCache] Built cache with {len(new_commits)} commits")
+
+            self._add(new_commits)
+            self.head = head
+            if parent:
+                self._append(parent, new_commits)
+            else:
+                self._save()
+            return True
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _cutoff(since_days: Optional[int]) -> Optional[datetime]:
+        if not since_days:
+            return None
+        return datetime.now(timezone.utc) - timedelta(days=since_days)
+
+    def commits_since(
+        self, since_days: Optional[int] = None, max_commits: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Return cached commits (newest first), like `git log --since -N`."""
+        with self._lock:
+            if not self.refresh():
+                return []
+            cutoff = self._cutoff(since_days)
+            cutoff_epoch = cutoff.timestamp() if cutoff else None
+
+            results = []
+            for record in self.commits:
+                if cutoff_epoch is not None and record.get("epoch", 0) < cutoff_epoch:
+                    continue
+                results.append(_public(record))
+                if max_commits and len(results) >= max_commits:
+                    break
+            return results
+
+    def window(self, since_days: Optional[int] = None, recent: int = 10) -> Dict[str, Any]:
+        """
+        Aggregate activity for the last `since_days` days from the rollups.
+
+        Returns:
+            Dict with by_day, by_author, samples_by_day and the `recent`
+            newest commits in the window (days are UTC dates)
+        """
+        with self._lock:
+            if not self.refresh():
+                return {"by_day": {}, "by_author": {}, "samples_by_day": {}, "recent": []}
+
+            cutoff = self._cutoff(since_days)
+            cutoff_day = cutoff.strftime("%Y-%m-%d") if cutoff else ""
+
+            by_day = {day: n for day, n in self.by_day.items() if day >= cutoff_day}
+            by_author: Dict[str, int] = {}
+            if not cutoff_day:
+                by_author.update(self.by_author)
+            else:
+                for day in by_day:
+                    for author, n in self.by_day_author.get(day, {}).items():
+                        by_author[author] = by_author.get(author, 0) + n
+
+            wanted = min(recent, sum(by_day.values()))
+            recent_commits = []
+            for record in self.commits:
+                if len(recent_commits) >= wanted:
+                    break
+                if record["day"] >= cutoff_day:
+                    recent_commits.append(_public(record))
+
+            return {
+                "by_day": by_day,
+                "by_author": by_author,
+                "samples_by_day": {day: list(self.samples_by_day.get(day, [])) for day in by_day},
+                "recent": recent_commits,
+            }
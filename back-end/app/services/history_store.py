@@ -0,0 +1,446 @@
+"""
+History Store - Append-only commit history for workspaces
+
+Stores a workspace's history as an append-only JSONL log plus two sidecar
+indexes, so an append never loads or rewrites the existing entries:
+
+- history.jsonl: One JSON entry per line, never rewritten on append
+- history.idx: Fixed-width (8 byte) byte offsets, one per entry, so entry N
+  and the last N entries can be read with a single seek
+- history.buckets: One "YYYY-MM-DD<TAB>seq" line per day, pointing at the
+  first entry of that day, used for time range queries
+
+Appends are O(1). Tail and range queries only touch the entries they return.
+Old entries can be rotated into archive segments to keep the active log small;
+`read_all` and `tail` read through them, so rotation never hides history.
+Writers of several processes are serialized by the workspace directory's
+WorkspaceLock (see local_storage).
+
+Legacy workspaces are migrated automatically: if history.json exists and no
+JSONL log has been created yet, its entries are imported on first use. The
+legacy file is left untouched.
+"""
+
+import bisect
+import json
+import logging
+import os
+import struct
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from app.services.local_storage import get_workspace_lock
+
+logger = logging.getLogger(__name__)
+
+DATA_FILE = "history.jsonl"
+INDEX_FILE = "history.idx"
+BUCKETS_FILE = "history.buckets"
+LEGACY_FILE = "history.json"
+ARCHIVE_DIR = "history-archive"
+
+_OFFSET = struct.Struct("<Q")
+
+# Rotate automatically once the active log holds this many entries
+DEFAULT_MAX_ENTRIES = int(os.getenv("HISTORY_MAX_ENTRIES", "5000"))
+
+
+def _entry_day(entry: Dict[str, Any]) -> str:
+    """Return the YYYY-MM-DD bucket key for an entry."""
+    timestamp = entry.get("timestamp") or ""
+    return str(timestamp)[:10]
+
+
+def _to_iso(value: Union[str, datetime, None]) -> Optional[str]:
+    """Normalize a datetime or ISO string into a comparable ISO string."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc).isoformat()
+    return str(value)
+
+
+def _segment_number(name: str) -> int:
+    """Rotation counter at the end of an archive segment name (history-...-0003.jsonl)."""
+    try:
+        return int(name.rsplit(".", 1)[0].rsplit("-", 1)[1])
+    except (IndexError, ValueError):
+        return -1
+
+
+class HistoryStore:
+    """
+    Append-only history log for a single workspace.
+
+    Thread- and process-safe (WorkspaceLock on the workspace directory).
+    Readers never block on the full file: every query resolves entry
+    positions through the offset index.
+    """
+
+    def __init__(self, workspace_dir: str, max_entries: Optional[int] = None):
+        """
+        Open (and if needed create or migrate) the history log.
+
+        Args:
+            workspace_dir: Workspace directory holding the history files
+            max_entries: Auto-rotate threshold for the active log (0 disables)
+        """
+        self.workspace_dir = workspace_dir
+        self.data_path = os.path.join(workspace_dir, DATA_FILE)
+        self.index_path = os.path.join(workspace_dir, INDEX_FILE)
+        self.buckets_path = os.path.join(workspace_dir, BUCKETS_FILE)
+        self.legacy_path = os.path.join(workspace_dir, LEGACY_FILE)
+        self.max_entries = DEFAULT_MAX_ENTRIES if max_entries is None else max_entries
+
+        self._lock = get_workspace_lock(workspace_dir)
+        self._offsets: List[int] = []
+        self._bucket_days: List[str] = []
+        self._bucket_seqs: List[int] = []
+        self._stamp: Optional[Tuple[int, int]] = None
+
+        os.makedirs(workspace_dir, exist_ok=True)
+        with self._lock:
+            if not os.path.exists(self.data_path):
+                self._migrate_legacy()
+            self._load_indexes()
+
+    # ------------------------------------------------------------------
+    # Loading / recovery
+    # ------------------------------------------------------------------
+
+    def _migrate_legacy(self) -> None:
+        """Import entries from history.json into a fresh JSONL log."""
+        entries: List[Dict[str, Any]] = []
+        if os.path.exists(self.legacy_path):
+            try:
+                with open(self.legacy_path, "r", encoding="utf-8") as f:
+                    loaded = json.load(f)
+                if isinstance(loaded, list):
+                    entries = [e for e in loaded if isinstance(e, dict)]
+            except Exception as e:
+                logger.warning(f"[HistoryStore] Could not read legacy history: {e}")
+
+        self._rewrite(entries)
+        if entries:
+            logger.info(
+                f"[HistoryStore] Migrated {len(entries)} entries from {self.legacy_path}"
+            )
+
+    def _load_indexes(self) -> None:
+        """Load offset and bucket indexes, repairing them if they are stale."""
+        if not os.path.exists(self.data_path):
+            open(self.data_path, "ab").close()
+
+        offsets: List[int] = []
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                raw = f.read()
+            usable = len(raw) - (len(raw) % _OFFSET.size)
+            offsets = [o for (o,) in _OFFSET.iter_unpack(raw[:usable])]
+
+        data_size = os.path.getsize(self.data_path)
+
+        # Drop offsets that point past the end of the data (torn write)
+        while offsets and offsets[-1] >= data_size:
+            offsets.pop()
+
+        # Index any lines appended after the last indexed entry
+        scan_from = 0
+        if offsets:
+            with open(self.data_path, "rb") as f:
+                f.seek(offsets[-1])
+                f.readline()
+                scan_from = f.tell()
+        if scan_from < data_size:
+            offsets.extend(self._scan_offsets(scan_from))
+            self._write_index(offsets)
+            logger.info(f"[HistoryStore] Repaired offset index ({len(offsets)} entries)")
+
+        self._offsets = offsets
+        self._load_buckets()
+        self._stamp = self._file_stamp()
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.data_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_size)
+
+    def _sync(self) -> None:
+        """Reload the indexes if another writer changed the log since we last looked."""
+        if self._file_stamp() != self._stamp:
+            self._load_indexes()
+
+    def _scan_offsets(self, start: int) -> List[int]:
+        """Return offsets of complete lines starting at byte `start`."""
+        found = []
+        torn_at = None
+        with open(self.data_path, "rb") as f:
+            f.seek(start)
+            while True:
+                pos = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                if not line.endswith(b"\n"):
+                    torn_at = pos
+                    break
+                if line.strip():
+                    found.append(pos)
+        if torn_at is not None:
+            # Partial trailing write from a crash: drop it
+            with open(self.data_path, "r+b") as f:
+                f.truncate(torn_at)
+        return found
+
+    def _write_index(self, offsets: List[int]) -> None:
+        with open(self.index_path, "wb") as f:
+            f.write(b"".join(_OFFSET.pack(o) for o in offsets))
+
+    def _load_buckets(self) -> None:
+        days: List[str] = []
+        seqs: List[int] = []
+        if os.path.exists(self.buckets_path):
+            with open(self.buckets_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    day, _, seq = line.rstrip("\n").partition("\t")
+                    if day and seq.isdigit() and int(seq) < len(self._offsets):
+                        days.append(day)
+                        seqs.append(int(seq))
+
+        # Catch up on days started after the last recorded bucket
+        known = len(days)
+        last_seq = seqs[-1] if seqs else -1
+        for seq in range(last_seq + 1, len(self._offsets)):
+            day = _entry_day(self._read_at(seq))
+            if not days or day > days[-1]:
+                days.append(day)
+                seqs.append(seq)
+        if len(days) != known:
+            with open(self.buckets_path, "w", encoding="utf-8") as f:
+                f.writelines(f"{d}\t{s}\n" for d, s in zip(days, seqs))
+
+        self._bucket_days = days
+        self._bucket_seqs = seqs
+
+    def _rewrite(self, entries: List[Dict[str, Any]]) -> None:
+        """Replace the active log and rebuild both indexes."""
+        offsets: List[int] = []
+        buckets: List[Tuple[str, int]] = []
+        tmp_path = self.data_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            for seq, entry in enumerate(entries):
+                offsets.append(f.tell())
+                f.write(self._encode(entry))
+                day = _entry_day(entry)
+                if not buckets or day > buckets[-1][0]:
+                    buckets.append((day, seq))
+        os.replace(tmp_path, self.data_path)
+        self._write_index(offsets)
+        with open(self.buckets_path, "w", encoding="utf-8") as f:
+            f.writelines(f"{d}\t{s}\n" for d, s in buckets)
+        self._offsets = offsets
+        self._bucket_days = [d for d, _ in buckets]
+        self._bucket_seqs = [s for _, s in buckets]
+        self._stamp = self._file_stamp()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _encode(entry: Dict[str, Any]) -> bytes:
+        return (json.dumps(entry, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+    def append(self, entry: Dict[str, Any]) -> int:
+        """
+        Append one entry to the log.
+
+        Args:
+            entry: History entry (should include an ISO 'timestamp')
+
+        Returns:
+            Sequence number of the new entry
+        """
+        payload = self._encode(entry)
+        with self._lock:
+            self._sync()
+            with open(self.data_path, "ab") as f:
+                offset = f.tell()
+                f.write(payload)
+            if self._stamp is not None:
+                self._stamp = (self._stamp[0], offset + len(payload))
+            with open(self.index_path, "ab") as f:
+                f.write(_OFFSET.pack(offset))
+
+            seq = len(self._offsets)
+            self._offsets.append(offset)
+
+            day = _entry_day(entry)
+            if not self._bucket_days or day > self._bucket_days[-1]:
+                with open(self.buckets_path, "a", encoding="utf-8") as f:
+                    f.write(f"{day}\t{seq}\n")
+                self._bucket_days.append(day)
+                self._bucket_seqs.append(seq)
+
+            if self.max_entries and len(self._offsets) > self.max_entries:
+                self.rotate(keep_last=self.max_entries // 2)
+                seq = len(self._offsets) - 1
+
+        return seq
+
+    def rotate(self, keep_last: int) -> Optional[str]:
+        """
+        Move all but the newest `keep_last` entries into an archive segment.
+
+        Args:
+            keep_last: Number of entries to keep in the active log
+
+        Returns:
+            Path of the archive segment, or None if nothing was rotated
+        """
+        with self._lock:
+            total = len(self._offsets)
+            cut = total - max(keep_last, 0)
+            if cut <= 0:
+                return None
+
+            archived = list(self.iter_entries(0, cut))
+            kept = list(self.iter_entries(cut))
+
+            archive_dir = os.path.join(self.workspace_dir, ARCHIVE_DIR)
+            os.makedirs(archive_dir, exist_ok=True)
+            first_day = _entry_day(archived[0]) or "unknown"
+            last_day = _entry_day(archived[-1]) or "unknown"
+            archive_path = os.path.join(
+                archive_dir, f"history-{first_day}-{last_day}-{len(os.listdir(archive_dir)):04d}.jsonl"
+            )
+            with open(archive_path, "wb") as f:
+                for entry in archived:
+                    f.write(self._encode(entry))
+
+            self._rewrite(kept)
+            logger.info(
+                f"[HistoryStore] Rotated {len(archived)} entries to {archive_path}"
+            )
+            return archive_path
+
+    def compact(self, keep_last: Optional[int] = None) -> Optional[str]:
+        """Rotate down to half of max_entries (or `keep_last`) entries."""
+        target = keep_last if keep_last is not None else (self.max_entries or 0) // 2
+        return self.rotate(keep_last=target)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._sync()
+            return len(self._offsets)
+
+    def _read_at(self, seq: int) -> Dict[str, Any]:
+        with open(self.data_path, "rb") as f:
+            f.seek(self._offsets[seq])
+            return json.loads(f.readline())
+
+    def get(self, seq: int) -> Optional[Dict[str, Any]]:
+        """Return entry by sequence number (negative indexes allowed)."""
+        with self._lock:
+            self._sync()
+            try:
+                self._offsets[seq]
+            except IndexError:
+                return None
+            return self._read_at(seq)
+
+    def iter_entries(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Iterate entries in [start, stop) in log order."""
+        with self._lock:
+            self._sync()
+            total = len(self._offsets)
+            stop = total if stop is None else min(stop, total)
+            if start >= stop:
+                return
+            # Open under the lock so a concurrent rotation can't swap the file
+            f = open(self.data_path, "rb")
+            f.seek(self._offsets[start])
+
+        with f:
+            for _ in range(stop - start):
+                line = f.readline()
+                if not line:
+                    break
+                yield json.loads(line)
+
+    def archive_paths(self) -> List[str]:
+        """Return the archive segments, oldest first."""
+        archive_dir = os.path.join(self.workspace_dir, ARCHIVE_DIR)
+        try:
+            names = [n for n in os.listdir(archive_dir) if n.endswith(".jsonl")]
+        except FileNotFoundError:
+            return []
+        return [os.path.join(archive_dir, n) for n in sorted(names, key=_segment_number)]
+
+    @staticmethod
+    def _read_segment(path: str) -> List[Dict[str, Any]]:
+        with open(path, "rb") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def tail(self, n: int) -> List[Dict[str, Any]]:
+        """Return the last `n` entries in log order (oldest first), archives included."""
+        if n <= 0:
+            return []
+        with self._lock:
+            entries = list(self.iter_entries(max(len(self) - n, 0)))
+            for path in reversed(self.archive_paths()):
+                if len(entries) >= n:
+                    break
+                entries = self._read_segment(path)[-(n - len(entries)):] + entries
+        return entries
+
+    def last(self) -> Optional[Dict[str, Any]]:
+        """Return the most recent entry, if any."""
+        return self.get(-1)
+
+    def range(
+        self,
+        since: Union[str, datetime, None] = None,
+        until: Union[str, datetime, None] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return entries with since <= timestamp < until.
+
+        Uses the day bucket index to seek straight to the first candidate entry.
+        """
+        since_iso = _to_iso(since)
+        until_iso = _to_iso(until)
+
+        start = 0
+        if since_iso:
+            with self._lock:
+                self._sync()
+                pos = bisect.bisect_right(self._bucket_days, since_iso[:10]) - 1
+                start = self._bucket_seqs[pos] if pos >= 0 else 0
+
+        results = []
+        for entry in self.iter_entries(start):
+            timestamp = _to_iso(entry.get("timestamp")) or ""
+            if since_iso and timestamp < since_iso:
+                continue
+            if until_iso and timestamp >= until_iso:
+                break
+            results.append(entry)
+        return results
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        """Return every entry, archived segments first (compatibility reader)."""
+        with self._lock:
+            entries: List[Dict[str, Any]] = []
+            for path in self.archive_paths():
+                entries.extend(self._read_segment(path))
+            entries.extend(self.iter_entries())
+        return entries
@@ -0,0 +1,193 @@
+"""
+Jobs - In-process registry for background operations
+
+Long-running operations (git commits, pushes, ...) are submitted as jobs so
+request handlers can return a job id immediately. Clients poll
+`GET /jobs/{id}` or stream status changes from `GET /jobs/{id}/stream`.
+
+Only the most recent MAX_FINISHED_JOBS finished jobs are retained.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_FINISHED_JOBS = int(os.getenv("JOBS_MAX_FINISHED", "500"))
+
+
+class JobStatus:
+    """Job lifecycle states"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    TIMEOUT = "timeout"
+
+    FINISHED = {SUCCEEDED, FAILED, CANCELLED, TIMEOUT}
+
+
+def new_job_id() -> str:
+    return f"job-{uuid.uuid4().hex[:16]}"
+
+
+class Job:
+    """A single background operation and its outcome."""
+
+    def __init__(
+        self,
+        kind: str,
+        workspace_id: Optional[str] = None,
+        metadata: Optional[dict] = None,
+        job_id: Optional[str] = None,
+    ):
+        self.id = job_id or new_job_id()
+        self.kind = kind
+        self.workspace_id = workspace_id
+        self.metadata = metadata or {}
+        self.status = JobStatus.QUEUED
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now(timezone.utc).isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.cancel_requested = False
+
+    @property
+    def finished(self) -> bool:
+        return self.status in JobStatus.FINISHED
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "workspace_id": self.workspace_id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "metadata": self.metadata,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobRegistry:
+    """
+    Thread-safe registry of jobs with change notifications.
+
+    Status updates may come from worker threads; subscribers are asyncio
+    queues and are notified on their own event loop.
+    """
+
+    def __init__(self, max_finished: int = MAX_FINISHED_JOBS):
+        self.max_finished = max_finished
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._subscribers: Dict[str, List[tuple]] = {}
+        self._lock = threading.Lock()
+
+    def create(
+        self,
+        kind: str,
+        workspace_id: Optional[str] = None,
+        metadata: Optional[dict] = None,
+        job_id: Optional[str] = None,
+    ) -> Job:
+        job = Job(kind, workspace_id=workspace_id, metadata=metadata, job_id=job_id)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        logger.info(f"[JobRegistry] Created {job.kind} job {job.id}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, workspace_id: Optional[str] = None, limit: int = 50) -> List[Job]:
+        with self._lock:
+            jobs = [j for j in reversed(self._jobs.values()) if workspace_id in (None, j.workspace_id)]
+        return jobs[:limit]
+
+    def update(self, job: Job, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        """Move a job to a new status and notify subscribers."""
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            if job.finished:
+                return
+            job.status = status
+            if status == JobStatus.RUNNING:
+                job.started_at = now
+            if status in JobStatus.FINISHED:
+                job.finished_at = now
+                job.result = result
+                job.error = error
+        logger.info(f"[JobRegistry] Job {job.id} -> {status}")
+        self._notify(job)
+
+    def progress(self, job: Job, **metadata: Any) -> None:
+        """Merge progress info into a running job's metadata and notify subscribers."""
+        with self._lock:
+            if job.finished:
+                return
+            job.metadata.update(metadata)
+        self._notify(job)
+
+    def _notify(self, job: Job) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(job.id, []))
+            snapshot = job.to_dict()
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, snapshot)
+            except RuntimeError:
+                # Subscriber loop already closed
+                pass
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job_id]
+
+    async def stream(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the job's current state, then every change until it finishes."""
+        job = self.get(job_id)
+        if job is None:
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+        entry = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.setdefault(job_id, []).append(entry)
+            snapshot = job.to_dict()
+        try:
+            yield snapshot
+            while snapshot["status"] not in JobStatus.FINISHED:
+                snapshot = await queue.get()
+                yield snapshot
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(job_id, [])
+                if entry in subscribers:
+                    subscribers.remove(entry)
+                if not subscribers:
+                    self._subscribers.pop(job_id, None)
+
+
+_job_registry: Optional[JobRegistry] = None
+
+
+def get_job_registry() -> JobRegistry:
+    """Get the process-wide job registry."""
+    global _job_registry
+    if _job_registry is None:
+        _job_registry = JobRegistry()
+    return _job_registry
@@ -0,0 +1,680 @@
+"""
+Local Proposal Store - Indexed access to a workspace's proposals/ directory
+
+Local mode keeps one JSON file (plus an optional Markdown summary) per
+proposal. So that listings don't glob, parse and sort every file, the store
+keeps a SQLite index next to the files (proposals/.index.sqlite3)
+with the fields queries need (id, status, agent, user, created_at, title),
+the list-view diff stats (see proposal_summary) and where each body lives
+(file name, size, mtime):
+
+- Filters, sorting, pagination and counts run on the index only; bodies are
+  read just for the rows a query returns; summary pages read no bodies
+- The index follows the directory: when its mtime changes, files are
+  stat-ed and only new or modified ones are parsed (agents keep writing
+  plain JSON files). In-place rewrites should go through `save` (or
+  `save_many` for batches), which write through a local transaction
+  (workspace lock, journal, atomic renames; see local_storage) and update
+  the index once the files are on disk
+- Existing workspaces are indexed automatically on first use; the index can
+  be deleted at any time and is rebuilt from the files
+- Diff fingerprints and MinHash bands are indexed for duplicate lookups
+  (see diff_fingerprint)
+- Triggers keep per-day stats counters (proposal_stats) in step with the
+  index, so `stats` reads O(days) rows (see proposal_counters)
+- Committed index changes (saves and files picked up by `refresh`) are
+  recorded in the proposal change feed (see proposal_feed)
+- Triggers also bump a persistent index sequence; `version` (random epoch
+  of the index + sequence) changes whenever any proposal does and is used
+  for ETags (see response_cache)
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from app.services.diff_fingerprint import (
+    BANDS_KEY,
+    FINGERPRINT_KEY,
+    MINHASH_KEY,
+    best_match,
+    fingerprint_fields,
+)
+from app.services.local_storage import local_transaction, recover
+from app.services.proposal_counters import aggregate, reviewed_at
+from app.services.proposal_feed import ChangeType, get_proposal_feed
+from app.services.proposal_summary import compute_summary_stats
+from app.utils.pagination import decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = ".index.sqlite3"
+SCHEMA_VERSION = 6
+
+SORTABLE_FIELDS = ("created_at", "title", "status", "agent_id")
+
+# Signed counter upsert for the OLD/NEW row of a trigger
+_STATS_UPSERT = """
+INSERT INTO proposal_stats (day, user_id, status, agent_id, total, review_seconds, reviewed)
+VALUES (
+    substr(coalesce({row}.created_at, ''), 1, 10),
+    coalesce({row}.user_id, ''),
+    coalesce({row}.status, 'pending'),
+    coalesce({row}.agent_id, 'unknown'),
+    {sign}1,
+    {sign}coalesce(CASE WHEN coalesce({row}.status, 'pending') != 'pending' THEN
+        max(strftime('%s', {row}.reviewed_at) - strftime('%s', {row}.created_at), 0) END, 0),
+    {sign}(coalesce({row}.status, 'pending') != 'pending' AND
+        strftime('%s', {row}.reviewed_at) IS NOT NULL AND strftime('%s', {row}.created_at) IS NOT NULL)
+)
+ON CONFLICT (day, user_id, status, agent_id) DO UPDATE SET
+    total = total + excluded.total,
+    review_seconds = review_seconds + excluded.review_seconds,
+    reviewed = reviewed + excluded.reviewed;
+"""
+_ADD_NEW = _STATS_UPSERT.format(row="NEW", sign="+")
+_REMOVE_OLD = (
+    _STATS_UPSERT.format(row="OLD", sign="-")
+    + "DELETE FROM proposal_stats WHERE total = 0 AND reviewed = 0;"
+)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS proposals (
+    file TEXT PRIMARY KEY,
+    id TEXT NOT NULL,
+    status TEXT,
+    agent_id TEXT,
+    user_id TEXT,
+    workspace_id TEXT,
+    created_at TEXT,
+    reviewed_at TEXT,
+    title TEXT,
+    file_count INTEGER NOT NULL DEFAULT 0,
+    additions INTEGER NOT NULL DEFAULT 0,
+    deletions INTEGER NOT NULL DEFAULT 0,
+    diff_fingerprint TEXT,
+    minhash TEXT,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    markdown INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_proposals_id ON proposals (id);
+CREATE INDEX IF NOT EXISTS idx_proposals_created ON proposals (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_proposals_status_created ON proposals (status, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_proposals_agent_created ON proposals (agent_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_proposals_fingerprint ON proposals (diff_fingerprint);
+
+CREATE TABLE IF NOT EXISTS proposal_bands (
+    band TEXT NOT NULL,
+    file TEXT NOT NULL,
+    PRIMARY KEY (band, file)
+);
+CREATE INDEX IF NOT EXISTS idx_proposal_bands_file ON proposal_bands (file);
+CREATE TRIGGER IF NOT EXISTS proposals_bands_delete AFTER DELETE ON proposals BEGIN
+DELETE FROM proposal_bands WHERE file = OLD.file;
+END;
+
+CREATE TABLE IF NOT EXISTS proposal_stats (
+    day TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    agent_id TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    review_seconds REAL NOT NULL DEFAULT 0,
+    reviewed INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, user_id, status, agent_id)
+);
+CREATE TRIGGER IF NOT EXISTS proposals_stats_insert AFTER INSERT ON proposals BEGIN
+{_ADD_NEW}
+END;
+CREATE TRIGGER IF NOT EXISTS proposals_stats_delete AFTER DELETE ON proposals BEGIN
+{_REMOVE_OLD}
+END;
+CREATE TRIGGER IF NOT EXISTS proposals_stats_update
+AFTER UPDATE OF status, agent_id, user_id, created_at, reviewed_at ON proposals BEGIN
+{_REMOVE_OLD}
+{_ADD_NEW}
+END;
+
+CREATE TABLE IF NOT EXISTS proposal_version (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    epoch TEXT NOT NULL,
+    seq INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO proposal_version VALUES (0, lower(hex(randomblob(8))), 0);
+CREATE TRIGGER IF NOT EXISTS proposals_version_insert AFTER INSERT ON proposals BEGIN
+UPDATE proposal_version SET seq = seq + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS proposals_version_update AFTER UPDATE ON proposals BEGIN
+UPDATE proposal_version SET seq = seq + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS proposals_version_delete AFTER DELETE ON proposals BEGIN
+UPDATE proposal_version SET seq = seq + 1;
+END;
+"""
+
+_SUMMARY_COLUMNS = (
+    "id",
+    "status",
+    "agent_id",
+    "user_id",
+    "workspace_id",
+    "created_at",
+    "title",
+    "file_count",
+    "additions",
+    "deletions",
+)
+
+
+class LocalProposalStore:
+    """SQLite-indexed store over proposals/*.json for one workspace."""
+
+    def __init__(self, proposals_dir: Union[str, Path]):
+        """
+        Open (and if needed build) the index for a proposals directory.
+
+        Args:
+            proposals_dir: Workspace proposals/ directory
+        """
+        self.proposals_dir = str(proposals_dir)
+        self.index_path = os.path.join(self.proposals_dir, INDEX_FILE)
+        os.makedirs(self.proposals_dir, exist_ok=True)
+        # Finish writes a crashed process left in the journal before indexing
+        recover(self.proposals_dir)
+
+        self._lock = threading.RLock()
+        self._dir_mtime: Optional[int] = None
+        # (proposal, previous status, change type) awaiting commit; the
+        # initial indexing of a directory is not a change
+        self._changes: List[tuple] = []
+        self._loaded = False
+        self._conn = sqlite3.connect(self.index_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            # WAL keeps the journal file in place, so commits don't touch the dir mtime
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                self._conn.executescript(
+                    "DROP TABLE IF EXISTS proposals; DROP TABLE IF EXISTS proposal_stats; "
+                    "DROP TABLE IF EXISTS proposal_bands; DROP TABLE IF EXISTS proposal_version;"
+                )
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+        self.refresh()
+        self._loaded = True
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        Bring the index up to date with the directory.
+
+        Args:
+            force: Rescan even if the directory mtime is unchanged (picks up
+                in-place edits made without `save`)
+        """
+        with self._lock:
+            try:
+                dir_mtime = os.stat(self.proposals_dir).st_mtime_ns
+            except FileNotFoundError:
+                return
+            if not force and dir_mtime == self._dir_mtime:
+                return
+
+            indexed = {
+                row["file"]: (row["size"], row["mtime_ns"], row["markdown"])
+                for row in self._conn.execute("SELECT file, size, mtime_ns, markdown FROM proposals")
+            }
+            seen = set()
+            markdown = set()
+            stats = {}
+            with os.scandir(self.proposals_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".md"):
+                        markdown.add(entry.name[:-3])
+                    elif entry.name.endswith(".json") and entry.is_file():
+                        st = entry.stat()
+                        stats[entry.name] = (st.st_size, st.st_mtime_ns)
+
+            parsed = 0
+            for name, (size, mtime_ns) in stats.items():
+                seen.add(name)
+                has_md = int(name[:-5] in markdown)
+                current = indexed.get(name)
+                if current is not None and current[:2] == (size, mtime_ns):
+                    if current[2] != has_md:
+                        self._conn.execute(
+                            "UPDATE proposals SET markdown = ? WHERE file = ?", (has_md, name)
+                        )
+                    continue
+                proposal = self._read_file(name)
+                if proposal is None:
+                    continue
+                self._upsert(name, proposal, size, mtime_ns, has_md)
+                parsed += 1
+
+            removed = [name for name in indexed if name not in seen]
+            if removed and self._loaded:
+                for name in removed:
+                    row = self._conn.execute(
+                        "SELECT id, status, workspace_id FROM proposals WHERE file = ?", (name,)
+                    ).fetchone()
+                    self._changes.append((dict(row), row["status"], ChangeType.DELETED))
+            self._conn.executemany("DELETE FROM proposals WHERE file = ?", [(n,) for n in removed])
+            self._commit()
+            self._dir_mtime = dir_mtime
+            if parsed or removed:
+                logger.info(
+                    f"[LocalProposalStore] Indexed {parsed} proposals, dropped {len(removed)} "
+                    f"in {self.proposals_dir}"
+                )
+
+    def _read_file(self, name: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self.proposals_dir, name), "r", encoding="utf-8") as f:
+                proposal = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"[LocalProposalStore] Error reading proposal {name}: {e}")
+            return None
+        return proposal if isinstance(proposal, dict) else None
+
+    def _upsert(self, name: str, proposal: Dict[str, Any], size: int, mtime_ns: int, markdown: int) -> None:
+        stats = compute_summary_stats(proposal)
+        reviewed = reviewed_at(proposal)
+        fingerprint = fingerprint_fields(proposal)
+        if self._loaded:
+            row = self._conn.execute("SELECT status FROM proposals WHERE file = ?", (name,)).fetchone()
+            previous = (row["status"] or "pending") if row else None
+            self._changes.append((proposal, previous, None))
+        # Upsert (not REPLACE) so the stats triggers see it as an UPDATE
+        self._conn.execute(
+            "INSERT INTO proposals "
+            "(file, id, status, agent_id, user_id, workspace_id, created_at, reviewed_at, title, "
+            "file_count, additions, deletions, diff_fingerprint, minhash, size, mtime_ns, markdown) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (file) DO UPDATE SET id = excluded.id, status = excluded.status, "
+            "agent_id = excluded.agent_id, user_id = excluded.user_id, "
+            "workspace_id = excluded.workspace_id, created_at = excluded.created_at, "
+            "reviewed_at = excluded.reviewed_at, title = excluded.title, "
+            "file_count = excluded.file_count, additions = excluded.additions, "
+            "deletions = excluded.deletions, diff_fingerprint = excluded.diff_fingerprint, "
+            "minhash = excluded.minhash, size = excluded.size, "
+            "mtime_ns = excluded.mtime_ns, markdown = excluded.markdown",
+            (
+                name,
+                str(proposal.get("id") or name[:-5]),
+                proposal.get("status"),
+                proposal.get("agent_id"),
+                proposal.get("user_id"),
+                proposal.get("workspace_id"),
+                str(proposal.get("created_at") or ""),
+                reviewed.isoformat() if reviewed else None,
+                proposal.get("title"),
+                stats["file_count"],
+                stats["additions"],
+                stats["deletions"],
+                fingerprint.get(FINGERPRINT_KEY),
+                json.dumps(fingerprint[MINHASH_KEY]) if fingerprint.get(MINHASH_KEY) else None,
+                size,
+                mtime_ns,
+                markdown,
+            ),
+        )
+        self._conn.execute("DELETE FROM proposal_bands WHERE file = ?", (name,))
+        if fingerprint.get(MINHASH_KEY):
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO proposal_bands (band, file) VALUES (?, ?)",
+                [(band, name) for band in fingerprint[BANDS_KEY]],
+            )
+
+    def version(self) -> str:
+        """Version of the whole directory: changes whenever any proposal does."""
+        self.refresh()
+        with self._lock:
+            row = self._conn.execute("SELECT epoch, seq FROM proposal_version").fetchone()
+        return f"{row['epoch']}.{row['seq']}"
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _where(filters: Dict[str, Optional[str]]) -> tuple:
+        clauses, params = [], []
+        for column, value in filters.items():
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(
+        self,
+        status: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        order_by: str = "created_at",
+        descending: bool = True,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after: Optional[Tuple[str, str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Query the index (no proposal bodies are read).
+
+        Args:
+            status: Filter by status
+            agent_id: Filter by agent
+            user_id: Filter by user
+            order_by: One of SORTABLE_FIELDS
+            descending: Sort direction
+            limit: Max rows (None = all)
+            offset: Rows to skip
+            after: (created_at, id) keyset position; only rows past it in
+                the sort order are returned (requires order_by="created_at")
+
+        Returns:
+            Index rows: _SUMMARY_COLUMNS plus file
+        """
+        if order_by not in SORTABLE_FIELDS:
+            raise ValueError(f"Cannot sort proposals by {order_by!r}")
+        self.refresh()
+        where, params = self._where({"status": status, "agent_id": agent_id, "user_id": user_id})
+        direction = "DESC" if descending else "ASC"
+        if after is not None:
+            if order_by != "created_at":
+                raise ValueError("Keyset pagination requires order_by='created_at'")
+            op = "<" if descending else ">"
+            where += (" AND " if where else " WHERE ") + f"(created_at, id) {op} (?, ?)"
+            params += [str(after[0]), str(after[1])]
+        sql = (
+            f"SELECT {', '.join(_SUMMARY_COLUMNS)}, file FROM proposals{where} "
+            f"ORDER BY {order_by} {direction}, id {direction} LIMIT ? OFFSET ?"
+        )
+        params += [-1 if limit is None else limit, offset]
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def count(
+        self,
+        status: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> int:
+        """Count proposals matching the filters (index only)."""
+        self.refresh()
+        where, params = self._where({"status": status, "agent_id": agent_id, "user_id": user_id})
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM proposals{where}", params).fetchone()[0]
+
+    def list(self, **query: Any) -> List[Dict[str, Any]]:
+        """Query the index, then read the bodies of the returned rows only."""
+        proposals = []
+        for row in self.query(**query):
+            proposal = self._read_file(row["file"])
+            if proposal is not None:
+                proposals.append(proposal)
+        return proposals
+
+    def page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of proposal bodies, newest first.
+
+        Args:
+            limit: Page size
+            cursor: Token from the previous page (None = first page)
+            status: Filter by status
+            agent_id: Filter by agent
+            user_id: Filter by user
+
+        Returns:
+            (proposals, next_cursor); next_cursor is None on the last page
+
+        Raises:
+            InvalidCursor: If the cursor is malformed or issued for other filters
+        """
+        rows, next_cursor = self._page_rows(limit, cursor, status, agent_id, user_id)
+        proposals = []
+        for row in rows:
+            proposal = self._read_file(row["file"])
+            if proposal is not None:
+                proposals.append(proposal)
+        return proposals, next_cursor
+
+    def summary_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of proposal summaries, newest first (index only, no bodies).
+
+        Same arguments, cursors and errors as `page`.
+
+        Returns:
+            (summaries, next_cursor); summaries have the ProposalSummary fields
+        """
+        rows, next_cursor = self._page_rows(limit, cursor, status, agent_id, user_id)
+        return [self._summary(row) for row in rows], next_cursor
+
+    def summaries(self, **query: Any) -> List[Dict[str, Any]]:
+        """Query the index and return summaries (same arguments as `query`)."""
+        return [self._summary(row) for row in self.query(**query)]
+
+    @staticmethod
+    def _summary(row: Dict[str, Any]) -> Dict[str, Any]:
+        summary = {column: row[column] for column in _SUMMARY_COLUMNS}
+        summary["status"] = summary["status"] or "pending"
+        summary["title"] = summary["title"] or ""
+        summary["agent_id"] = summary["agent_id"] or ""
+        summary["created_at"] = summary["created_at"] or None
+        return summary
+
+    def _page_rows(
+        self,
+        limit: int,
+        cursor: Optional[str],
+        status: Optional[str],
+        agent_id: Optional[str],
+        user_id: Optional[str],
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        filters = {"status": status, "agent_id": agent_id, "user_id": user_id}
+        after = decode_cursor(cursor, filters) if cursor else None
+        rows = self.query(limit=limit + 1, after=after, **filters)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"], filters)
+        return rows, next_cursor
+
+    def stats(self, user_id: Optional[str] = None, since: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Aggregated stats counters (no proposal rows or bodies are read).
+
+        Args:
+            user_id: Only proposals of this user
+            since: Only proposals created on or after this day (YYYY-MM-DD)
+
+        Returns:
+            Totals (total, by_status, by_agent, review_seconds, reviewed), as
+            proposal_counters.aggregate
+        """
+        self.refresh()
+        where, params = self._where({"user_id": user_id})
+        if since is not None:
+            where += (" AND " if where else " WHERE ") + "day >= ?"
+            params.append(since)
+        sql = (
+            "SELECT status, agent_id, SUM(total) AS total, SUM(review_seconds) AS review_seconds, "
+            f"SUM(reviewed) AS reviewed FROM proposal_stats{where} GROUP BY status, agent_id"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return aggregate(
+            {
+                "total": row["total"],
+                "by_status": {row["status"]: row["total"]},
+                "by_agent": {row["agent_id"]: row["total"]},
+                "review_seconds": row["review_seconds"],
+                "reviewed": row["reviewed"],
+            }
+            for row in rows
+        )
+
+    def find_duplicate(
+        self,
+        proposal: Dict[str, Any],
+        status: Optional[str] = "pending",
+        near_threshold: Optional[float] = None,
+    ) -> Optional[str]:
+        """
+        Find an indexed proposal making the same change (see diff_fingerprint).
+
+        Args:
+            proposal: New proposal
+            status: Only match proposals with this status (None = any)
+            near_threshold: Also match near-duplicates with at least this
+                estimated similarity (None = exact matches only)
+
+        Returns:
+            ID of the existing proposal, or None
+        """
+        fields = fingerprint_fields(proposal)
+        if not fields:
+            return None
+        self.refresh()
+        where, params = self._where({"diff_fingerprint": fields[FINGERPRINT_KEY], "status": status})
+        with self._lock:
+            row = self._conn.execute(f"SELECT id FROM proposals{where} LIMIT 1", params).fetchone()
+            if row or near_threshold is None:
+                return row["id"] if row else None
+
+            band_marks = ", ".join("?" for _ in fields[BANDS_KEY])
+            where, params = self._where({"p.status": status})
+            where += (" AND " if where else " WHERE ") + f"b.band IN ({band_marks})"
+            rows = self._conn.execute(
+                "SELECT DISTINCT p.id, p.minhash FROM proposal_bands b "
+                f"JOIN proposals p ON p.file = b.file{where}",
+                params + fields[BANDS_KEY],
+            ).fetchall()
+        candidates = [{"id": r["id"], MINHASH_KEY: json.loads(r["minhash"] or "[]")} for r in rows]
+        match = best_match(fields[MINHASH_KEY], candidates, near_threshold)
+        return match[0]["id"] if match else None
+
+    def get(self, proposal_id: str) -> Optional[Dict[str, Any]]:
+        """Read one proposal body by id."""
+        self.refresh()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file FROM proposals WHERE id = ? LIMIT 1", (proposal_id,)
+            ).fetchone()
+        name = row["file"] if row else f"{proposal_id}.json"
+        return self._read_file(name)
+
+    def save(self, proposal: Dict[str, Any]) -> str:
+        """
+        Write a proposal body atomically and update the index.
+
+        Args:
+            proposal: Proposal dict (must include 'id')
+
+        Returns:
+            Path of the JSON file
+        """
+        return self.save_many([proposal])[0]
+
+    def save_many(self, proposals: List[Dict[str, Any]]) -> List[str]:
+        """
+        Write several proposal bodies in one local transaction and index them.
+
+        Either all files are written or none is. Inside an open
+        local_transaction on the directory, the files are written (and
+        indexed) when that transaction commits.
+
+        Args:
+            proposals: Proposal dicts (each must include 'id')
+
+        Returns:
+            Paths of the JSON files
+        """
+        with local_transaction(self.proposals_dir) as tx:
+            staged = [(self._file_name(proposal["id"]), proposal) for proposal in proposals]
+            for name, proposal in staged:
+                tx.write(os.path.join(self.proposals_dir, name), json.dumps(proposal, indent=2))
+            tx.after_commit(lambda: self._index_saved(staged))
+        return [os.path.join(self.proposals_dir, name) for name, _ in staged]
+
+    def _commit(self) -> None:
+        """Commit the index and publish the committed changes to the feed."""
+        self._conn.commit()
+        changes, self._changes = self._changes, []
+        feed = get_proposal_feed()
+        for proposal, previous, change_type in changes:
+            feed.record(proposal, previous_status=previous, change_type=change_type)
+
+    def _file_name(self, proposal_id: str) -> str:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file FROM proposals WHERE id = ? LIMIT 1", (proposal_id,)
+            ).fetchone()
+        return row["file"] if row else f"{proposal_id}.json"
+
+    def _index_saved(self, staged: List[Tuple[str, Dict[str, Any]]]) -> None:
+        with self._lock:
+            for name, proposal in staged:
+                st = os.stat(os.path.join(self.proposals_dir, name))
+                row = self._conn.execute(
+                    "SELECT size, mtime_ns FROM proposals WHERE file = ?", (name,)
+                ).fetchone()
+                if row is not None and (row["size"], row["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+                    continue  # Already picked up by a refresh
+                has_md = int(os.path.exists(os.path.join(self.proposals_dir, name[:-5] + ".md")))
+                self._upsert(name, proposal, st.st_size, st.st_mtime_ns, has_md)
+            self._commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_stores: Dict[str, LocalProposalStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_local_proposal_store(proposals_dir: Union[str, Path]) -> LocalProposalStore:
+    """Get the (cached) store for a proposals directory."""
+    key = os.path.abspath(str(proposals_dir))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = LocalProposalStore(key)
+            _stores[key] = store
+        return store
+
+
+def reset_local_proposal_stores():
+    """Close and forget cached stores (for testing)"""
+    with _stores_lock:
+        for store in _stores.values():
+            store.close()
+        _stores.clear()
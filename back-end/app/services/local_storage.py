@@ -0,0 +1,306 @@
+"""
+Local Storage - Crash-safe writes to a workspace's proposal files
+
+Local mode reads, modifies and rewrites proposals/<id>.json, the legacy
+proposals.json and the .md summaries from request handlers, the approval
+queue and agents, possibly in several uvicorn workers. Writes go through
+a transaction on the proposals/ directory:
+
+- A per-workspace lock (fcntl.flock on proposals/.lock, plus a thread lock
+  so it is reentrant within a process) serializes read-modify-write cycles
+  across threads and processes; reads done under it see the latest state
+- Writes are staged and applied when the outermost transaction exits:
+  first recorded in a write-ahead journal (proposals/.journal, fsynced),
+  then each file is written to a temp file, fsynced and renamed over the
+  target, then the journal is cleared
+- A journal left by a crash is replayed by the next transaction (or store)
+  opened on the directory; a torn journal entry was never applied and is
+  dropped. Readers never see half-written files
+
+Nested transactions on the same directory (same thread) join the outer
+one, so helpers can open their own without breaking atomicity.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+LOCAL_LOCK_TIMEOUT = float(os.getenv("LOCAL_LOCK_TIMEOUT", "30"))
+LOCAL_FSYNC = os.getenv("LOCAL_FSYNC", "true").lower() == "true"
+
+LOCK_FILE = ".lock"
+JOURNAL_FILE = ".journal"
+
+PathLike = Union[str, os.PathLike]
+
+
+def _fsync_dir(directory: str) -> None:
+    if not LOCAL_FSYNC:
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: PathLike, text: str) -> None:
+    """Write a text file atomically (temp file in the same directory, fsync, rename)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            if LOCAL_FSYNC:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(directory)
+
+
+class WorkspaceLock:
+    """Reentrant lock shared by threads (RLock) and processes (flock) on one directory."""
+
+    def __init__(self, directory: PathLike):
+        self.path = os.path.join(str(directory), LOCK_FILE)
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd: Optional[int] = None
+
+    def acquire(self, timeout: float = LOCAL_LOCK_TIMEOUT) -> None:
+        """
+        Acquire the lock.
+
+        Raises:
+            TimeoutError: If it could not be acquired within timeout seconds
+        """
+        deadline = time.monotonic() + timeout
+        if not self._thread_lock.acquire(timeout=timeout):
+            raise TimeoutError(f"Timed out waiting for {self.path}")
+        if self._depth == 0:
+            try:
+                self._fd = self._lock_file(deadline)
+            except BaseException:
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def _lock_file(self, deadline: float) -> int:
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise TimeoutError(f"Timed out waiting for {self.path} (held by another process)")
+                time.sleep(0.01)
+
+    def release(self) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+    @property
+    def held(self) -> bool:
+        """Held by this process (any thread)."""
+        return self._depth > 0
+
+    def __enter__(self) -> "WorkspaceLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+_locks: Dict[str, WorkspaceLock] = {}
+_locks_lock = threading.Lock()
+
+
+def get_workspace_lock(directory: PathLike) -> WorkspaceLock:
+    """Get the lock of a proposals directory (one per directory and process)."""
+    key = os.path.abspath(str(directory))
+    with _locks_lock:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = WorkspaceLock(key)
+            _locks[key] = lock
+        return lock
+
+
+class WriteJournal:
+    """Write-ahead journal of the pending transaction of a directory."""
+
+    def __init__(self, directory: PathLike):
+        self.directory = os.path.abspath(str(directory))
+        self.path = os.path.join(self.directory, JOURNAL_FILE)
+
+    def apply(self, writes: Dict[str, str]) -> None:
+        """Journal writes, apply them, then clear the journal (caller holds the lock)."""
+        entry = {
+            "writes": [[os.path.relpath(path, self.directory), text] for path, text in writes.items()],
+        }
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            if LOCAL_FSYNC:
+                os.fsync(f.fileno())
+        _fsync_dir(self.directory)
+        for path, text in writes.items():
+            atomic_write(path, text)
+        self._clear()
+
+    def recover(self) -> int:
+        """
+        Replay the journal left by an interrupted transaction (caller holds the lock).
+
+        Returns:
+            Number of files rewritten
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                content = f.read()
+        except FileNotFoundError:
+            return 0
+        if not content:
+            return 0
+        try:
+            if not content.endswith("\n"):
+                raise ValueError("torn entry")
+            writes = json.loads(content)["writes"]
+        except (ValueError, KeyError, TypeError) as e:
+            # Never fsynced completely, so none of its writes were applied
+            logger.warning(f"[LocalStorage] Dropping incomplete journal in {self.directory}: {e}")
+            self._clear()
+            return 0
+        for relative, text in writes:
+            atomic_write(os.path.join(self.directory, relative), text)
+        self._clear()
+        logger.warning(f"[LocalStorage] Replayed {len(writes)} journaled writes in {self.directory}")
+        return len(writes)
+
+    def _clear(self) -> None:
+        with open(self.path, "w", encoding="utf-8") as f:
+            if LOCAL_FSYNC:
+                os.fsync(f.fileno())
+
+
+class LocalTransaction:
+    """Staged writes to files of one workspace, applied together on commit."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._writes: Dict[str, str] = {}
+        self._callbacks: List[Callable[[], None]] = []
+
+    def read(self, path: PathLike) -> Optional[str]:
+        """Current content of a file, including writes staged in this transaction (None if missing)."""
+        key = os.path.abspath(str(path))
+        if key in self._writes:
+            return self._writes[key]
+        try:
+            return Path(key).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def write(self, path: PathLike, text: str) -> None:
+        """Stage the new content of a file."""
+        self._writes[os.path.abspath(str(path))] = text
+
+    def append(self, path: PathLike, text: str, create: bool = False) -> bool:
+        """
+        Stage text appended to a file.
+
+        Args:
+            path: File path
+            text: Text to append
+            create: Create the file if missing (otherwise it is left alone)
+
+        Returns:
+            True if the append was staged
+        """
+        current = self.read(path)
+        if current is None and not create:
+            return False
+        self.write(path, (current or "") + text)
+        return True
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Run callback once the writes are on disk (still under the lock)."""
+        self._callbacks.append(callback)
+
+    def _commit(self) -> None:
+        if self._writes:
+            WriteJournal(self.directory).apply(self._writes)
+        for callback in self._callbacks:
+            callback()
+
+
+_current = threading.local()
+
+
+@contextmanager
+def local_transaction(directory: PathLike) -> Iterator[LocalTransaction]:
+    """
+    Lock a proposals directory and stage writes to its workspace's files.
+
+    The writes are applied atomically when the block exits without an
+    exception and discarded otherwise. Inside an open transaction on the
+    same directory, joins it.
+
+    Args:
+        directory: Workspace proposals/ directory (holds the lock and journal)
+
+    Raises:
+        TimeoutError: If the lock could not be acquired within LOCAL_LOCK_TIMEOUT
+    """
+    key = os.path.abspath(str(directory))
+    open_transactions = getattr(_current, "transactions", None)
+    if open_transactions is None:
+        open_transactions = _current.transactions = {}
+    if key in open_transactions:
+        yield open_transactions[key]
+        return
+
+    os.makedirs(key, exist_ok=True)
+    with get_workspace_lock(key):
+        WriteJournal(key).recover()
+        transaction = LocalTransaction(key)
+        open_transactions[key] = transaction
+        try:
+            yield transaction
+        finally:
+            del open_transactions[key]
+        transaction._commit()
+
+
+def recover(directory: PathLike) -> int:
+    """Replay an interrupted transaction of a proposals directory, if any."""
+    key = os.path.abspath(str(directory))
+    if not os.path.exists(os.path.join(key, JOURNAL_FILE)):
+        return 0
+    with get_workspace_lock(key):
+        return WriteJournal(key).recover()
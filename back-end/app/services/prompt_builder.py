@@ -0,0 +1,328 @@
+"""
+Prompt Builder - Token-budgeted prompt assembly
+
+Embedding the full checkpoint, the entire history and whole diffs would
+hit model context limits on mature workspaces, with latency growing with the
+size of the project. This module keeps prompts under a token budget:
+
+- estimate_tokens: tiktoken when installed, ~4 chars/token otherwise
+- PromptBuilder: priority-ordered sections; low-priority sections are
+  truncated or dropped when the budget runs out
+- format_history: newest entries verbatim, older entries rolled up
+- DiffSummarizer: map-reduce summaries of large diffs, with per-chunk
+  results cached by content hash
+"""
+
+import hashlib
+import logging
+import math
+import os
+import re
+from typing import Callable, Dict, List, Optional
+
+from app.utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+try:  # Optional: exact token counts
+    import tiktoken
+
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # ImportError, or encoding files unavailable offline
+    _ENCODING = None
+
+# Token budgets (prompt side)
+PROMPT_TOKEN_BUDGET = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "6000"))
+DIFF_TOKEN_BUDGET = int(os.getenv("LLM_DIFF_TOKEN_BUDGET", "6000"))
+DIFF_CHUNK_TOKENS = int(os.getenv("LLM_DIFF_CHUNK_TOKENS", "2500"))
+
+# Completion caps of the map (per chunk) and reduce (per group) steps
+MAP_SUMMARY_TOKENS = 150
+REDUCE_SUMMARY_TOKENS = 300
+
+TRUNCATION_MARKER = "\n…[truncated]"
+
+# Chunk summaries shared by every workspace in the process
+_chunk_summary_cache: LRUCache = LRUCache(maxsize=int(os.getenv("LLM_DIFF_CACHE_SIZE", "2048")))
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in `text`."""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, marker: str = TRUNCATION_MARKER) -> str:
+    """Cut `text` (keeping the beginning) so it fits in `max_tokens`."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    budget = max_tokens - estimate_tokens(marker)
+    if budget <= 0:
+        return ""
+    if _ENCODING is not None:
+        tokens = _ENCODING.encode(text, disallowed_special=())
+        return _ENCODING.decode(tokens[:budget]) + marker
+    return text[: budget * 4] + marker
+
+
+class PromptSection:
+    """A named block of prompt text with a priority (0 = most important)."""
+
+    def __init__(self, name: str, content: str, priority: int = 10, required: bool = False):
+        self.name = name
+        self.content = content
+        self.priority = priority
+        self.required = required
+        self.tokens = estimate_tokens(content)
+
+
+class PromptBuilder:
+    """
+    Assemble sections into a prompt that fits a token budget.
+
+    Sections are admitted in priority order (required sections first); a
+    section that does not fit is truncated to the remaining budget, and
+    anything left after the budget is spent is dropped. The final prompt
+    keeps the order in which sections were added.
+    """
+
+    def __init__(self, budget_tokens: int = PROMPT_TOKEN_BUDGET, separator: str = "\n\n"):
+        self.budget_tokens = budget_tokens
+        self.separator = separator
+        self.sections: List[PromptSection] = []
+        self.report: Dict[str, str] = {}
+
+    def add(self, name: str, content: str, priority: int = 10, required: bool = False) -> "PromptBuilder":
+        if content:
+            self.sections.append(PromptSection(name, content, priority, required))
+        return self
+
+    def remaining(self) -> int:
+        """Budget left after all sections added so far (ignores truncation)."""
+        return self.budget_tokens - sum(s.tokens for s in self.sections)
+
+    def build(self) -> str:
+        separator_tokens = estimate_tokens(self.separator)
+        remaining = self.budget_tokens
+        rendered: Dict[int, str] = {}
+        self.report = {}
+
+        order = sorted(
+            range(len(self.sections)),
+            key=lambda i: (not self.sections[i].required, self.sections[i].priority, i),
+        )
+        for index in order:
+            section = self.sections[index]
+            cost = section.tokens + separator_tokens
+            if cost <= remaining or section.required:
+                rendered[index] = section.content
+                remaining -= cost
+                self.report[section.name] = "full"
+            elif remaining > separator_tokens + 16:
+                rendered[index] = truncate_to_tokens(section.content, remaining - separator_tokens)
+                remaining = 0
+                self.report[section.name] = "truncated"
+            else:
+                self.report[section.name] = "dropped"
+
+        if any(state != "full" for state in self.report.values()):
+            logger.info(f"[PromptBuilder] Budget {self.budget_tokens} tokens: {self.report}")
+        return self.separator.join(rendered[i] for i in sorted(rendered))
+
+
+def format_history_entry(entry: dict) -> str:
+    """One-line rendering of a history entry."""
+    summary = entry.get("summary") or (entry.get("message") or "").splitlines()[0:1]
+    if isinstance(summary, list):
+        summary = summary[0] if summary else ""
+    commit = (entry.get("commit") or "")[:7]
+    return f"- {str(entry.get('timestamp', ''))[:16]} [{entry.get('agent', '?')}] {summary} ({commit})"
+
+
+def format_history(
+    entries: List[dict],
+    budget_tokens: int,
+    total_count: Optional[int] = None,
+    first_timestamp: Optional[str] = None,
+) -> str:
+    """
+    Render history newest-first within a token budget.
+
+    The newest entries are listed one per line; whatever does not fit (plus
+    any entries not passed in at all) is rolled up into a one-line summary
+    with the entry count, date range and per-agent counts.
+
+    Args:
+        entries: History entries in log order (oldest first)
+        budget_tokens: Token budget for the rendered history
+        total_count: Total entries in the log (if `entries` is only the tail)
+        first_timestamp: Timestamp of the oldest entry in the log
+    """
+    total_count = len(entries) if total_count is None else total_count
+    lines: List[str] = []
+    used = 0
+    # Reserve room for the rollup line
+    reserve = 60
+    shown = 0
+    for entry in reversed(entries):
+        line = format_history_entry(entry)
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget_tokens - reserve:
+            break
+        lines.append(line)
+        used += cost
+        shown += 1
+
+    older = total_count - shown
+    if older > 0:
+        omitted = entries[: len(entries) - shown]
+        by_agent: Dict[str, int] = {}
+        for entry in omitted:
+            agent = entry.get("agent", "?")
+            by_agent[agent] = by_agent.get(agent, 0) + 1
+        start = str(first_timestamp or (omitted[0].get("timestamp") if omitted else ""))[:10]
+        end = str(omitted[-1].get("timestamp", ""))[:10] if omitted else ""
+        agents = ", ".join(f"{a}: {n}" for a, n in sorted(by_agent.items(), key=lambda x: -x[1]))
+        rollup = f"- … {older} older entries"
+        if start or end:
+            rollup += f" ({start} → {end})" if end else f" (since {start})"
+        if agents:
+            rollup += f"; by agent (sample): {agents}"
+        lines.append(rollup)
+
+    return "\n".join(lines)
+
+
+# ========== Diff map-reduce ==========
+
+_FILE_SPLIT = re.compile(r"(?m)^(?=diff --git )")
+_HUNK_SPLIT = re.compile(r"(?m)^(?=@@ )")
+
+
+def split_diff(diff: str, max_tokens: int = DIFF_CHUNK_TOKENS) -> List[str]:
+    """
+    Split a diff into chunks of at most `max_tokens`.
+
+    Splits on file boundaries first, then on hunks, then on lines. Small
+    consecutive pieces are packed together.
+    """
+    pieces: List[str] = []
+    for file_part in filter(None, _FILE_SPLIT.split(diff)):
+        if estimate_tokens(file_part) <= max_tokens:
+            pieces.append(file_part)
+            continue
+        hunks = [h for h in _HUNK_SPLIT.split(file_part) if h]
+        header = hunks[0] if hunks and not hunks[0].startswith("@@ ") else ""
+        for hunk in hunks[1:] if header else hunks:
+            part = header + hunk
+            if estimate_tokens(part) <= max_tokens:
+                pieces.append(part)
+                continue
+            # Hard split very large hunks by lines
+            current: List[str] = []
+            current_tokens = estimate_tokens(header)
+            for line in hunk.splitlines(keepends=True):
+                cost = estimate_tokens(line)
+                if current and current_tokens + cost > max_tokens:
+                    pieces.append(header + "".join(current))
+                    current, current_tokens = [], estimate_tokens(header)
+                current.append(truncate_to_tokens(line, max_tokens // 2))
+                current_tokens += cost
+            if current:
+                pieces.append(header + "".join(current))
+
+    # Pack small neighbours together
+    chunks: List[str] = []
+    for piece in pieces:
+        if chunks and estimate_tokens(chunks[-1]) + estimate_tokens(piece) <= max_tokens:
+            chunks[-1] += piece
+        else:
+            chunks.append(piece)
+    return chunks
+
+
+class DiffSummarizer:
+    """
+    Summarize diffs of any size with a completion function.
+
+    Diffs that fit DIFF_TOKEN_BUDGET are summarized in one call. Larger diffs
+    are split into chunks (map), each chunk is summarized once and cached by
+    sha256 of its prompt, and the chunk summaries are combined (reduce, with
+    REDUCE_PROMPT and its own token cap), recursively if needed.
+    """
+
+    MAP_PROMPT = (
+        "Summarize the following part of a Git diff in at most 3 short bullet points. "
+        "Focus on what changed and why it matters.\n\n{chunk}\n\nSummary:"
+    )
+    REDUCE_PROMPT = (
+        "Combine these partial summaries of one Git diff into at most 6 short bullet points, "
+        "removing repetition.\n\n{summaries}\n\nCombined summary:"
+    )
+
+    def __init__(
+        self,
+        complete: Callable[[str, int], str],
+        budget_tokens: int = DIFF_TOKEN_BUDGET,
+        chunk_tokens: int = DIFF_CHUNK_TOKENS,
+        cache: Optional[LRUCache] = None,
+    ):
+        """
+        Args:
+            complete: Function (prompt, max_tokens) -> completion text
+            budget_tokens: Max diff tokens sent in a single prompt
+            chunk_tokens: Max tokens per map chunk
+            cache: Chunk summary cache (defaults to the process-wide cache)
+        """
+        self.complete = complete
+        self.budget_tokens = budget_tokens
+        self.chunk_tokens = chunk_tokens
+        self.cache = _chunk_summary_cache if cache is None else cache
+
+    def fits(self, diff: str) -> bool:
+        return estimate_tokens(diff) <= self.budget_tokens
+
+    def _complete_cached(self, prompt: str, max_tokens: int) -> str:
+        key = hashlib.sha256(f"{max_tokens}\0{prompt}".encode("utf-8")).hexdigest()
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        summary = self.complete(prompt, max_tokens).strip()
+        self.cache.set(key, summary)
+        return summary
+
+    def _summarize_chunk(self, chunk: str) -> str:
+        return self._complete_cached(self.MAP_PROMPT.format(chunk=chunk), MAP_SUMMARY_TOKENS)
+
+    def _combine(self, summaries: List[str]) -> str:
+        return self._complete_cached(
+            self.REDUCE_PROMPT.format(summaries="\n".join(summaries)), REDUCE_SUMMARY_TOKENS
+        )
+
+    def condense(self, diff: str) -> str:
+        """
+        Return `diff` itself if it fits the budget, otherwise a combined
+        summary of its chunks that does.
+        """
+        if self.fits(diff):
+            return diff
+
+        chunks = split_diff(diff, self.chunk_tokens)
+        logger.info(f"[DiffSummarizer] Summarizing diff in {len(chunks)} chunks")
+        summaries = [self._summarize_chunk(chunk) for chunk in chunks]
+
+        # Reduce until the combined summaries fit
+        while estimate_tokens("\n".join(summaries)) > self.budget_tokens and len(summaries) > 1:
+            groups: List[List[str]] = [[]]
+            for summary in summaries:
+                if groups[-1] and estimate_tokens("\n".join(groups[-1] + [summary])) > self.chunk_tokens:
+                    groups.append([])
+                groups[-1].append(summary)
+            if len(groups) == len(summaries):
+                break  # Nothing left to merge
+            summaries = [self._combine(group) for group in groups]
+
+        return truncate_to_tokens("\n".join(summaries), self.budget_tokens)
@@ -0,0 +1,350 @@
+"""
+Proposal Codec - Diff-only storage for proposal file contents
+
+A ProposedChange carries `before`, `after` and `diff`, and the proposal
+repeats every diff in its overall `diff`, so stored as-is each changed file
+would be kept three or four times. In "diff" storage mode
+(PROPOSAL_STORAGE_MODE):
+
+- `after` is dropped; it is rebuilt by applying `diff` to the base content
+- `before` is dropped when the base content can be found again later (the
+  file is empty/new, or it is the file's blob in the workspace's HEAD commit,
+  which gc won't prune - a loose object from `git add` could be);
+  otherwise it moves to the blob store (see blob_store) when it is larger
+  than BLOB_INLINE_MAX_BYTES, and stays inline when it is small
+- Contents of changes whose diff can't be verified go to the blob store the
+  same way (`before_blob` / `after_blob` hold the digests)
+- The overall diff is dropped when it is derivable from the per-file diffs
+
+Documents are only compacted when the round trip is verified at encode
+time, and `decode_proposal` restores the original shape, so the API is
+unchanged. List endpoints decode without file contents.
+"""
+
+import binascii
+import hashlib
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+from app.agents.patch_applier import PatchError, apply_to_text, parse_patch
+from app.services.blob_store import BLOB_INLINE_MAX_BYTES, BlobStore, get_blob_store
+from app.utils.workspace_manager import get_workspace_path
+
+logger = logging.getLogger(__name__)
+
+# "diff" (compact) or "full" (store documents unchanged)
+PROPOSAL_STORAGE_MODE = os.getenv("PROPOSAL_STORAGE_MODE", "diff").lower()
+
+STORAGE_KEY = "storage"
+STORAGE_VERSION = 1
+_CHANGE_KEYS = ("after_sha256", "base_sha256", "base_oid")
+_BLOB_KEYS = {"before": "before_blob", "after": "after_blob"}
+
+
+def sha256_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+_EMPTY_SHA256 = sha256_text("")
+
+
+def git_blob_id(text: str) -> str:
+    """Git object id of `text` stored as a blob."""
+    data = text.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def build_overall_diff(changes: List[Dict[str, Any]]) -> str:
+    """Overall proposal diff in the format the development agent emits."""
+    diff_content = ""
+    for change in changes:
+        if change.get("diff"):
+            diff_content += f"--- {change['file_path']}\n"
+            diff_content += f"+++ {change['file_path']}\n"
+            diff_content += change["diff"] + "\n\n"
+    return diff_content.strip()
+
+
+class BaseResolver:
+    """Finds base file contents by hash in a workspace (files, then git objects)."""
+
+    def __init__(self, workspace_path: Optional[str]):
+        self.workspace_path = workspace_path
+        self._repo = None
+        self._repo_loaded = False
+
+    @property
+    def repo(self):
+        if not self._repo_loaded:
+            self._repo_loaded = True
+            if self.workspace_path and os.path.isdir(self.workspace_path):
+                try:
+                    import git
+
+                    self._repo = git.Repo(self.workspace_path, search_parent_directories=True)
+                except Exception:
+                    self._repo = None
+        return self._repo
+
+    def has_object(self, oid: str) -> bool:
+        repo = self.repo
+        if repo is None:
+            return False
+        try:
+            return repo.odb.has_object(binascii.unhexlify(oid))
+        except Exception:
+            return False
+
+    def in_head(self, file_path: str, oid: str) -> bool:
+        """True if `oid` is the blob of `file_path` in HEAD (reachable, never pruned)."""
+        repo = self.repo
+        if repo is None or not self.workspace_path:
+            return False
+        try:
+            path = os.path.relpath(os.path.join(self.workspace_path, file_path), repo.working_tree_dir)
+            return repo.head.commit.tree[path.replace(os.sep, "/")].hexsha == oid
+        except Exception:
+            return False
+
+    def resolve(self, file_path: str, base_sha256: str, base_oid: Optional[str]) -> Optional[str]:
+        if self.workspace_path:
+            full_path = os.path.join(self.workspace_path, file_path)
+            try:
+                with open(full_path, "r", encoding="utf-8", newline="") as f:
+                    content = f.read()
+                if sha256_text(content) == base_sha256:
+                    return content
+            except (OSError, UnicodeDecodeError):
+                pass
+        if base_oid and self.has_object(base_oid):
+            try:
+                data = self.repo.odb.stream(binascii.unhexlify(base_oid)).read()
+                content = data.decode("utf-8")
+                if sha256_text(content) == base_sha256:
+                    return content
+            except Exception as e:
+                logger.warning(f"[ProposalCodec] Could not read git object {base_oid}: {e}")
+        return None
+
+
+def _apply(base: str, diff: str) -> Optional[str]:
+    try:
+        file_patches = parse_patch(diff)
+    except PatchError:
+        return None
+    if len(file_patches) != 1:
+        return None
+    text, result = apply_to_text(base, file_patches[0], fuzz=0, max_offset=0)
+    return text if result.applied else None
+
+
+class _BlobWriter:
+    """Moves large contents to the blob store (opened on first use)."""
+
+    def __init__(self, store: Optional[BlobStore]):
+        self._store = store
+        self._failed = False
+
+    def offload(self, change: Dict[str, Any], key: str) -> Dict[str, Any]:
+        text = change.get(key)
+        if self._failed or not isinstance(text, str) or len(text) <= BLOB_INLINE_MAX_BYTES:
+            return change
+        try:
+            if self._store is None:
+                self._store = get_blob_store()
+            digest = self._store.put(text)
+        except Exception as e:
+            logger.warning(f"[ProposalCodec] Blob store unavailable, keeping contents inline: {e}")
+            self._failed = True
+            return change
+        change = {k: v for k, v in change.items() if k != key}
+        change[_BLOB_KEYS[key]] = digest
+        return change
+
+
+def _encode_change(
+    change: Dict[str, Any], resolver: BaseResolver, blobs: _BlobWriter
+) -> Dict[str, Any]:
+    after = change.get("after")
+    diff = change.get("diff")
+    if not isinstance(after, str) or not diff:
+        return change
+
+    before = change.get("before")
+    base = before or ""
+    if _apply(base, diff) != after:
+        # Diff doesn't reproduce `after`; keep the full contents (as blobs)
+        return blobs.offload(blobs.offload(change, "before"), "after")
+
+    compact = {k: v for k, v in change.items() if k != "after"}
+    compact["after_sha256"] = sha256_text(after)
+    if before is not None:
+        compact["base_sha256"] = sha256_text(before)
+        if before:
+            oid = git_blob_id(before)
+            compact["base_oid"] = oid
+            if resolver.in_head(change.get("file_path") or "", oid):
+                del compact["before"]
+            else:
+                compact = blobs.offload(compact, "before")
+        else:
+            del compact["before"]
+    return compact
+
+
+def encode_proposal(
+    proposal: Dict[str, Any],
+    workspace_path: Optional[str] = None,
+    mode: Optional[str] = None,
+    blob_store: Optional[BlobStore] = None,
+) -> Dict[str, Any]:
+    """
+    Return the document to persist for `proposal` (input is not modified).
+
+    Args:
+        proposal: Full proposal dict (e.g. ChangeProposal.model_dump())
+        workspace_path: Workspace whose git objects can back `before` contents
+            (defaults to the proposal's workspace)
+        mode: Storage mode override ("diff" or "full")
+        blob_store: Store for large contents (defaults to get_blob_store())
+    """
+    mode = (mode or PROPOSAL_STORAGE_MODE).lower()
+    if mode != "diff" or proposal.get(STORAGE_KEY):
+        return proposal
+
+    resolver = BaseResolver(workspace_path or _workspace_path(proposal.get("workspace_id")))
+    blobs = _BlobWriter(blob_store)
+    changes = proposal.get("proposed_changes") or []
+    encoded = dict(proposal)
+    encoded["proposed_changes"] = [
+        _encode_change(c, resolver, blobs) if isinstance(c, dict) else c for c in changes
+    ]
+
+    overall = proposal.get("diff")
+    if isinstance(overall, dict) and overall.get("content"):
+        content = overall["content"]
+        derived = None
+        if len(changes) == 1 and content == changes[0].get("diff"):
+            derived = "single"
+        elif content == build_overall_diff(changes):
+            derived = "concat"
+        if derived:
+            encoded["diff"] = {k: v for k, v in overall.items() if k != "content"}
+            encoded["diff"]["derived"] = derived
+
+    encoded[STORAGE_KEY] = {"mode": "diff", "version": STORAGE_VERSION}
+    return encoded
+
+
+def decode_proposal(
+    proposal: Dict[str, Any],
+    workspace_path: Optional[str] = None,
+    with_contents: bool = True,
+    blob_store: Optional[BlobStore] = None,
+) -> Dict[str, Any]:
+    """
+    Restore a stored document to the full proposal shape.
+
+    Args:
+        proposal: Stored document
+        workspace_path: Workspace used to find base contents (defaults to
+            the proposal's workspace)
+        with_contents: Rebuild `before`/`after` (detail views); list views
+            pass False and only get the overall diff back
+        blob_store: Store for large contents (defaults to get_blob_store())
+    """
+    if not isinstance(proposal, dict) or not proposal.get(STORAGE_KEY):
+        return proposal
+
+    decoded = {k: v for k, v in proposal.items() if k != STORAGE_KEY}
+    changes = [dict(c) if isinstance(c, dict) else c for c in proposal.get("proposed_changes") or []]
+
+    overall = proposal.get("diff")
+    if isinstance(overall, dict) and overall.get("derived"):
+        restored = {k: v for k, v in overall.items() if k != "derived"}
+        if overall["derived"] == "single" and changes:
+            restored["content"] = changes[0].get("diff") or ""
+        else:
+            restored["content"] = build_overall_diff(changes)
+        decoded["diff"] = restored
+
+    resolver = None
+    if with_contents:
+        resolver = BaseResolver(workspace_path or _workspace_path(proposal.get("workspace_id")))
+    for change in changes:
+        if not isinstance(change, dict):
+            continue
+        if any(key in change for key in _BLOB_KEYS.values()):
+            if with_contents:
+                blob_store = blob_store or get_blob_store()
+            _read_blobs(change, blob_store if with_contents else None)
+        if "after_sha256" not in change:
+            continue
+        if with_contents:
+            _decode_change(change, resolver)
+        for key in _CHANGE_KEYS:
+            change.pop(key, None)
+    decoded["proposed_changes"] = changes
+    return decoded
+
+
+def _decode_change(change: Dict[str, Any], resolver: BaseResolver) -> None:
+    base_sha256 = change.get("base_sha256")
+    if change.get("before") is not None:
+        base = change["before"]
+    elif base_sha256 is None or base_sha256 == _EMPTY_SHA256:
+        base = ""
+        if base_sha256 is not None:
+            change["before"] = ""
+    else:
+        base = resolver.resolve(change.get("file_path", ""), base_sha256, change.get("base_oid"))
+        if base is None:
+            logger.warning(
+                f"[ProposalCodec] Base content for {change.get('file_path')} not found; "
+                "returning diff only"
+            )
+            change["before"] = None
+            change["after"] = None
+            return
+        change["before"] = base
+
+    after = _apply(base, change.get("diff") or "")
+    if after is None or sha256_text(after) != change["after_sha256"]:
+        logger.warning(f"[ProposalCodec] Could not rebuild {change.get('file_path')} from diff")
+        after = None
+    change["after"] = after
+
+
+def _read_blobs(change: Dict[str, Any], blob_store: Optional[BlobStore]) -> None:
+    for key, blob_key in _BLOB_KEYS.items():
+        digest = change.pop(blob_key, None)
+        if digest is None or blob_store is None:
+            continue
+        text = None
+        try:
+            text = blob_store.get_text(digest)
+        except Exception as e:
+            logger.warning(f"[ProposalCodec] Could not read blob {digest[:12]}: {e}")
+        if text is None:
+            logger.warning(f"[ProposalCodec] Blob for {change.get('file_path')} {key} not found")
+        change[key] = text
+
+
+def blob_refs(document: Dict[str, Any]) -> List[str]:
+    """Blob digests referenced by a stored document (released on delete)."""
+    refs = []
+    for change in (document or {}).get("proposed_changes") or []:
+        if isinstance(change, dict):
+            refs.extend(change[k] for k in _BLOB_KEYS.values() if change.get(k))
+    return refs
+
+
+def _workspace_path(workspace_id: Optional[str]) -> Optional[str]:
+    if not workspace_id:
+        return None
+    try:
+        path = str(get_workspace_path(workspace_id))
+        return path if os.path.isdir(path) else None
+    except Exception:
+        return None
@@ -0,0 +1,332 @@
+"""
+Proposal Counters - Materialized proposal statistics
+
+Stats are served from counters rather than by reading every proposal in
+the window: every create, approve, reject and delete applies the
+*difference* between the proposal's contribution before and after the
+transition to a set of counter buckets:
+
+- One bucket per (workspace, user, day the proposal was created) plus an
+  all-time bucket, each also rolled up for all users (`*`)
+- A bucket holds totals by status and by agent, and the review-time sum and
+  count of reviewed proposals
+- Stats for the last N days read N+1 daily buckets (or the all-time one), so
+  they cost O(buckets) whatever the number of proposals
+
+In Firestore buckets are sharded counters (`proposal_counters/{bucket}/
+shards/{n}`, PROPOSAL_COUNTER_SHARDS shards): writes increment one random
+shard and reads sum them. The local index keeps the same counters in SQLite
+(see LocalProposalStore.stats).
+
+Counters written before this module existed can be rebuilt with
+`python -m app.services.proposal_counters rebuild <workspace_id>`.
+"""
+
+import logging
+import os
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+COUNTERS_COLLECTION = "proposal_counters"
+PROPOSAL_COUNTER_SHARDS = int(os.getenv("PROPOSAL_COUNTER_SHARDS", "4"))
+
+ALL_TIME = "all"
+ANY_USER = "*"
+
+# Nested counter maps (status/agent -> count)
+_MAPS = ("by_status", "by_agent")
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Timezone-aware datetime from a stored timestamp (datetime or ISO string)."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def reviewed_at(proposal: Dict[str, Any]) -> Optional[datetime]:
+    """When a proposal was approved or rejected (None while pending)."""
+    for field in ("reviewed_at", "approved_at", "rejected_at"):
+        value = parse_timestamp(proposal.get(field))
+        if value is not None:
+            return value
+    return None
+
+
+def bucket_id(workspace_id: str, user_id: Optional[str], day: str) -> str:
+    return f"{workspace_id}|{user_id or ANY_USER}|{day}"
+
+
+def _empty() -> Dict[str, Any]:
+    return {"total": 0, "by_status": {}, "by_agent": {}, "review_seconds": 0.0, "reviewed": 0}
+
+
+def _add(target: Dict[str, Any], delta: Dict[str, Any], sign: int = 1) -> None:
+    for key, value in delta.items():
+        if key in _MAPS:
+            counts = target.setdefault(key, {})
+            for name, n in value.items():
+                counts[name] = counts.get(name, 0) + sign * n
+        else:
+            target[key] = target.get(key, 0) + sign * value
+
+
+def contribution(proposal: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Counter increments a stored proposal accounts for.
+
+    Args:
+        proposal: Proposal dict (workspace_id, user_id, status, agent_id,
+            created_at and, once reviewed, reviewed_at)
+
+    Returns:
+        {bucket_id: counters}
+    """
+    workspace_id = proposal.get("workspace_id") or "default"
+    status = proposal.get("status") or "pending"
+    counters = {
+        "total": 1,
+        "by_status": {status: 1},
+        "by_agent": {proposal.get("agent_id") or "unknown": 1},
+        "review_seconds": 0.0,
+        "reviewed": 0,
+    }
+    created = parse_timestamp(proposal.get("created_at"))
+    reviewed = reviewed_at(proposal)
+    if status != "pending" and created is not None and reviewed is not None:
+        counters["review_seconds"] = max((reviewed - created).total_seconds(), 0.0)
+        counters["reviewed"] = 1
+
+    days = [ALL_TIME]
+    if created is not None:
+        days.append(created.astimezone(timezone.utc).date().isoformat())
+    users = [None]
+    if proposal.get("user_id"):
+        users.append(proposal["user_id"])
+    return {bucket_id(workspace_id, user, day): counters for user in users for day in days}
+
+
+def transition_deltas(
+    before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Counter changes for a transition.
+
+    Args:
+        before: Proposal before the change (None on create)
+        after: Proposal after the change (None on delete)
+
+    Returns:
+        {bucket_id: counter deltas}, zero deltas left out
+    """
+    return batch_deltas([(before, after)])
+
+
+def batch_deltas(
+    transitions: Iterable[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Combined counter changes for several transitions (see transition_deltas).
+
+    Transitions touching the same bucket are summed, so a bulk update writes
+    each bucket once.
+    """
+    deltas: Dict[str, Dict[str, Any]] = {}
+    for before, after in transitions:
+        for proposal, sign in ((before, -1), (after, 1)):
+            if proposal is None:
+                continue
+            for bucket, counters in contribution(proposal).items():
+                _add(deltas.setdefault(bucket, {}), counters, sign)
+
+    cleaned = {}
+    for bucket, delta in deltas.items():
+        delta = {
+            key: ({k: v for k, v in value.items() if v} if key in _MAPS else value)
+            for key, value in delta.items()
+        }
+        delta = {key: value for key, value in delta.items() if value}
+        if delta:
+            cleaned[bucket] = delta
+    return cleaned
+
+
+def window_buckets(
+    workspace_id: str,
+    user_id: Optional[str] = None,
+    days: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> List[str]:
+    """
+    Buckets covering proposals created in the last `days` days.
+
+    Windows have day granularity: they start at 00:00 UTC `days` days ago.
+    days=None reads the all-time bucket.
+    """
+    if days is None:
+        return [bucket_id(workspace_id, user_id, ALL_TIME)]
+    today = (now or datetime.now(timezone.utc)).astimezone(timezone.utc).date()
+    return [
+        bucket_id(workspace_id, user_id, (today - timedelta(days=n)).isoformat())
+        for n in range(days + 1)
+    ]
+
+
+def aggregate(counters: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum counter documents (shards and/or buckets)."""
+    totals = _empty()
+    for document in counters:
+        _add(totals, {k: v for k, v in document.items() if k in totals})
+    return totals
+
+
+def stats_from_totals(totals: Dict[str, Any]) -> Dict[str, Any]:
+    """ProposalStats fields from aggregated counters."""
+    by_status = {k: v for k, v in totals.get("by_status", {}).items() if v}
+    approved = by_status.get("approved", 0)
+    rejected = by_status.get("rejected", 0)
+    reviewed = totals.get("reviewed", 0)
+    return {
+        "total": totals.get("total", 0),
+        "pending": by_status.get("pending", 0),
+        "approved": approved,
+        "rejected": rejected,
+        "by_status": by_status,
+        "by_agent": {k: v for k, v in totals.get("by_agent", {}).items() if v},
+        "approval_rate": approved / (approved + rejected) if approved + rejected else 0.0,
+        "avg_time_to_review_minutes": (
+            totals.get("review_seconds", 0) / reviewed / 60 if reviewed else 0.0
+        ),
+    }
+
+
+class ProposalCounters:
+    """Sharded Firestore counters (works with the sync and the async client)."""
+
+    def __init__(self, db, shards: int = PROPOSAL_COUNTER_SHARDS):
+        """
+        Args:
+            db: firestore.Client or firestore.AsyncClient
+            shards: Shards per bucket (write throughput vs read cost)
+        """
+        self.db = db
+        self.shards = max(1, shards)
+
+    def _shard_ref(self, bucket: str, shard: int):
+        return self.db.collection(COUNTERS_COLLECTION).document(bucket).collection("shards").document(str(shard))
+
+    def _batch(self, deltas: Dict[str, Dict[str, Any]]):
+        return self.add_to_batch(self.db.batch(), deltas)
+
+    def add_to_batch(self, batch, deltas: Dict[str, Dict[str, Any]]):
+        """
+        Add counter increments to a write batch (committed by the caller).
+
+        Args:
+            batch: WriteBatch of this client, e.g. holding the proposal writes
+                the deltas belong to
+            deltas: {bucket_id: counter deltas} (see transition_deltas/batch_deltas)
+
+        Returns:
+            The batch
+        """
+        from google.cloud import firestore
+
+        for bucket, delta in deltas.items():
+            payload = {
+                key: (
+                    {name: firestore.Increment(n) for name, n in value.items()}
+                    if key in _MAPS
+                    else firestore.Increment(value)
+                )
+                for key, value in delta.items()
+            }
+            batch.set(self._shard_ref(bucket, random.randrange(self.shards)), payload, merge=True)
+        return batch
+
+    def apply(self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> None:
+        """Apply a transition (see transition_deltas) with the sync client."""
+        deltas = transition_deltas(before, after)
+        if deltas:
+            self._batch(deltas).commit()
+
+    async def apply_async(self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> None:
+        """Apply a transition with the async client."""
+        deltas = transition_deltas(before, after)
+        if deltas:
+            await self._batch(deltas).commit()
+
+    def _refs(self, buckets: List[str]) -> list:
+        return [self._shard_ref(bucket, shard) for bucket in buckets for shard in range(self.shards)]
+
+    def stats(self, workspace_id: str, user_id: Optional[str] = None, days: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Aggregated counters of a workspace with the sync client.
+
+        Args:
+            workspace_id: Workspace ID
+            user_id: Only proposals of this user (None = all users)
+            days: Only proposals created in the last N days (None = all time)
+
+        Returns:
+            Totals (total, by_status, by_agent, review_seconds, reviewed)
+        """
+        refs = self._refs(window_buckets(workspace_id, user_id, days))
+        return aggregate(s.to_dict() for s in self.db.get_all(refs) if s.exists)
+
+    async def stats_async(
+        self, workspace_id: str, user_id: Optional[str] = None, days: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Aggregated counters with the async client (same arguments as `stats`)."""
+        refs = self._refs(window_buckets(workspace_id, user_id, days))
+        return aggregate([s.to_dict() async for s in self.db.get_all(refs) if s.exists])
+
+    def rebuild(self, workspace_id: str) -> int:
+        """
+        Recompute a workspace's counters from its proposals (sync client).
+
+        Streams the workspace's proposals once; run it while no proposals of
+        the workspace are being written.
+
+        Returns:
+            Number of proposals counted
+        """
+        fields = ["workspace_id", "user_id", "status", "agent_id", "created_at",
+                  "reviewed_at", "approved_at", "rejected_at"]
+        query = self.db.collection("proposals").where("workspace_id", "==", workspace_id).select(fields)
+        buckets: Dict[str, Dict[str, Any]] = {}
+        count = 0
+        for snapshot in query.stream():
+            for bucket, counters in contribution(snapshot.to_dict()).items():
+                _add(buckets.setdefault(bucket, _empty()), counters)
+            count += 1
+
+        prefix = f"{workspace_id}|"
+        for bucket_ref in self.db.collection(COUNTERS_COLLECTION).list_documents():
+            if bucket_ref.id.startswith(prefix):
+                for shard_ref in bucket_ref.collection("shards").list_documents():
+                    shard_ref.delete()
+        for bucket, totals in buckets.items():
+            self._shard_ref(bucket, 0).set(totals)
+        logger.info(f"[ProposalCounters] Rebuilt {len(buckets)} buckets from {count} proposals")
+        return count
+
+
+if __name__ == "__main__":
+    # python -m app.services.proposal_counters rebuild <workspace_id>
+    if len(sys.argv) != 3 or sys.argv[1] != "rebuild":
+        print("usage: python -m app.services.proposal_counters rebuild <workspace_id>")
+        sys.exit(2)
+    from app.services.firestore_service import get_firestore_service
+
+    counted = ProposalCounters(get_firestore_service().db).rebuild(sys.argv[2])
+    print(f"Counted {counted} proposals")
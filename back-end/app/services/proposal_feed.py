@@ -0,0 +1,345 @@
+"""
+Proposal Feed - Change feed of proposal creations, updates and status changes
+
+Lets clients follow new proposals without polling and re-listing
+`/proposals`. The feed keeps the most recent PROPOSAL_FEED_SIZE changes in
+memory, each with a monotonically increasing sequence number, and pushes new
+ones to subscribers:
+
+- The stores record their own writes: LocalProposalStore (server writes and
+  agent files picked up by `refresh`) and ProposalRepository
+- `proposal.*` bus events fill in changes made elsewhere (e.g. agents in
+  another process); an event already reflected by a store write is dropped
+- In Firestore mode a snapshot listener (PROPOSAL_FEED_LISTENER=true) sees
+  writes from every instance; it then replaces the repository's own records
+- Clients resume from a sequence number (SSE Last-Event-ID) or a timestamp.
+  When the requested point is no longer retained, or predates a restart,
+  the response says `reset` and clients should re-list `/proposals`
+
+Each change carries the proposal summary (see proposal_summary), never the
+diff.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.services.event_bus import EventTypes
+from app.services.proposal_summary import to_summary
+from app.utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+PROPOSAL_FEED_SIZE = int(os.getenv("PROPOSAL_FEED_SIZE", "1000"))
+PROPOSAL_FEED_LISTENER = os.getenv("PROPOSAL_FEED_LISTENER", "false").lower() == "true"
+# Stream keep-alive interval; local streams also rescan proposals/ this often
+PROPOSAL_FEED_POLL_SECONDS = float(os.getenv("PROPOSAL_FEED_POLL_SECONDS", "2"))
+
+# Last known status per proposal, used to classify and de-duplicate changes
+KNOWN_PROPOSALS = 10000
+
+_UNKNOWN = object()
+
+_EVENT_STATUS = {
+    EventTypes.PROPOSAL_CREATED.value: "pending",
+    EventTypes.PROPOSAL_APPROVED.value: "approved",
+    EventTypes.PROPOSAL_REJECTED.value: "rejected",
+}
+
+
+class ChangeType:
+    """Kinds of proposal changes"""
+
+    CREATED = "created"
+    UPDATED = "updated"
+    STATUS_CHANGED = "status_changed"
+    DELETED = "deleted"
+
+
+class ProposalFeed:
+    """
+    In-memory, sequence-numbered log of proposal changes.
+
+    Changes may be recorded from worker threads; subscribers are asyncio
+    queues and are notified on their own event loop.
+    """
+
+    def __init__(self, size: int = PROPOSAL_FEED_SIZE):
+        self.size = size
+        self._changes: deque = deque(maxlen=size)
+        self._seq = 0
+        self._known: LRUCache = LRUCache(maxsize=KNOWN_PROPOSALS)
+        self._subscribers: List[tuple] = []
+        self._lock = threading.Lock()
+        self._watch = None
+        # Sequence numbers restart with the process
+        self.epoch = uuid.uuid4().hex[:8]
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    @property
+    def version(self) -> str:
+        """Changes whenever a change is recorded (used for ETags)."""
+        return f"{self.epoch}.{self._seq}"
+
+    @property
+    def watching(self) -> bool:
+        """True while a Firestore snapshot listener feeds the log."""
+        return self._watch is not None
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record(
+        self,
+        proposal: Dict[str, Any],
+        previous_status: Any = _UNKNOWN,
+        dedupe: bool = False,
+        change_type: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Append a change and notify subscribers.
+
+        Args:
+            proposal: Proposal (or stored document) after the change; must
+                include 'id'
+            previous_status: Status before the change (None = new proposal);
+                defaults to the last status the feed saw
+            dedupe: Skip the change if the feed already saw this status
+                (for events that may repeat a store write)
+            change_type: Force a ChangeType (e.g. DELETED)
+
+        Returns:
+            The recorded change, or None if it was skipped
+        """
+        proposal_id = proposal.get("id")
+        if not proposal_id:
+            return None
+        status = proposal.get("status") or "pending"
+        with self._lock:
+            known = self._known.get(proposal_id, _UNKNOWN)
+            if dedupe and known == status:
+                return None
+            if previous_status is _UNKNOWN:
+                previous_status = None if known is _UNKNOWN else known
+            if change_type is None:
+                if previous_status is None:
+                    change_type = ChangeType.CREATED
+                elif previous_status != status:
+                    change_type = ChangeType.STATUS_CHANGED
+                else:
+                    change_type = ChangeType.UPDATED
+            if change_type == ChangeType.DELETED:
+                self._known.pop(proposal_id)
+            else:
+                self._known.set(proposal_id, status)
+
+            self._seq += 1
+            change = {
+                "seq": self._seq,
+                "type": change_type,
+                "proposal_id": proposal_id,
+                "workspace_id": proposal.get("workspace_id"),
+                "status": status,
+                "previous_status": previous_status,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "proposal": to_summary(proposal),
+            }
+            self._changes.append(change)
+            subscribers = list(self._subscribers)
+
+        for loop, queue, workspace_id in subscribers:
+            if workspace_id not in (None, change["workspace_id"]):
+                continue
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, change)
+            except RuntimeError:
+                # Subscriber loop already closed
+                pass
+        return change
+
+    def seed(self, proposals: List[Dict[str, Any]]) -> None:
+        """Remember current statuses without recording changes."""
+        with self._lock:
+            for proposal in proposals:
+                if proposal.get("id"):
+                    self._known.set(proposal["id"], proposal.get("status") or "pending")
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _is_gap(self, after_seq: Optional[int], since: Optional[datetime]) -> bool:
+        """True if changes after the requested point were not retained."""
+        if after_seq is not None:
+            oldest = self._changes[0]["seq"] if self._changes else self._seq + 1
+            # A seq ahead of ours was issued before a restart
+            return after_seq > self._seq or after_seq < oldest - 1
+        if since is not None and self._changes and self._changes[0]["seq"] > 1:
+            return since < datetime.fromisoformat(self._changes[0]["timestamp"])
+        return False
+
+    def changes(
+        self,
+        after_seq: Optional[int] = None,
+        since: Optional[datetime] = None,
+        workspace_id: Optional[str] = None,
+        limit: int = 500,
+    ) -> Dict[str, Any]:
+        """
+        Changes after a sequence number or timestamp, oldest first.
+
+        Args:
+            after_seq: Return changes with a greater seq
+            since: Return changes recorded after this time (ignored if
+                after_seq is given)
+            workspace_id: Only changes of this workspace (None = all)
+            limit: Maximum number of changes
+
+        Returns:
+            {"changes", "last_seq" (pass back as after_seq), "has_more",
+            "reset" (True if changes were missed: re-list and resume from
+            last_seq)}
+        """
+        if since is not None and since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        with self._lock:
+            if self._is_gap(after_seq, since):
+                return {"changes": [], "last_seq": self._seq, "has_more": False, "reset": True}
+            selected = []
+            has_more = False
+            for change in self._changes:
+                if after_seq is not None:
+                    if change["seq"] <= after_seq:
+                        continue
+                elif since is not None and datetime.fromisoformat(change["timestamp"]) <= since:
+                    continue
+                if workspace_id not in (None, change["workspace_id"]):
+                    continue
+                if len(selected) == limit:
+                    has_more = True
+                    break
+                selected.append(change)
+            last_seq = selected[-1]["seq"] if has_more else self._seq
+        return {"changes": selected, "last_seq": last_seq, "has_more": has_more, "reset": False}
+
+    async def stream(
+        self,
+        after_seq: Optional[int] = None,
+        since: Optional[datetime] = None,
+        workspace_id: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield retained changes after the given point, then new ones as they
+        are recorded.
+
+        A {"type": "reset", "last_seq"} item is yielded first if changes
+        were missed. None is yielded when `timeout` seconds pass without a
+        change (lets callers send keep-alives or poll).
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        entry = (asyncio.get_running_loop(), queue, workspace_id)
+        with self._lock:
+            self._subscribers.append(entry)
+        try:
+            backlog = self.changes(after_seq, since, workspace_id, limit=self.size)
+            if backlog["reset"]:
+                yield {"type": "reset", "last_seq": backlog["last_seq"]}
+            last_seq = backlog["last_seq"]
+            for change in backlog["changes"]:
+                yield change
+            while True:
+                try:
+                    change = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                # Changes recorded between subscribing and reading the backlog
+                if change["seq"] > last_seq:
+                    yield change
+        finally:
+            with self._lock:
+                if entry in self._subscribers:
+                    self._subscribers.remove(entry)
+
+    # ------------------------------------------------------------------
+    # Sources
+    # ------------------------------------------------------------------
+
+    async def _on_event(self, event_type: str, data: Dict[str, Any]) -> None:
+        proposal = dict(data.get("proposal") or {})
+        proposal.setdefault("id", data.get("proposal_id"))
+        for field in ("workspace_id", "agent_id", "title"):
+            if data.get(field) is not None:
+                proposal.setdefault(field, data[field])
+        proposal["status"] = _EVENT_STATUS[event_type]
+        if event_type == EventTypes.PROPOSAL_CREATED.value:
+            self.record(proposal, previous_status=None, dedupe=True)
+        else:
+            self.record(proposal, dedupe=True, change_type=ChangeType.STATUS_CHANGED)
+
+    def attach(self, bus) -> None:
+        """Record `proposal.*` events published on an event bus."""
+        for event_type in _EVENT_STATUS:
+            bus.subscribe(event_type, self._on_event)
+
+    def watch_firestore(self, firestore) -> None:
+        """
+        Record changes from a Firestore snapshot listener on the proposals
+        collection (covers writes made by other instances).
+        """
+        if self._watch is not None:
+            return
+        initial = threading.Event()
+
+        def on_snapshot(snapshot, changes, read_time):
+            if not initial.is_set():
+                # The first snapshot lists every proposal as ADDED
+                self.seed([doc.to_dict() or {} for doc in snapshot])
+                initial.set()
+                return
+            for change in changes:
+                document = change.document.to_dict() or {}
+                document.setdefault("id", change.document.id)
+                if change.type.name == "REMOVED":
+                    self.record(document, change_type=ChangeType.DELETED)
+                elif change.type.name == "ADDED":
+                    self.record(document, previous_status=None)
+                else:
+                    self.record(document)
+
+        self._watch = firestore.watch_proposals(on_snapshot)
+        logger.info("[ProposalFeed] Watching Firestore proposals")
+
+    def close(self) -> None:
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+
+
+_proposal_feed: Optional[ProposalFeed] = None
+
+
+def get_proposal_feed() -> ProposalFeed:
+    """Get the process-wide proposal feed."""
+    global _proposal_feed
+    if _proposal_feed is None:
+        _proposal_feed = ProposalFeed()
+    return _proposal_feed
+
+
+def reset_proposal_feed() -> None:
+    """Drop the proposal feed (for testing)"""
+    global _proposal_feed
+    if _proposal_feed is not None:
+        _proposal_feed.close()
+        _proposal_feed = None
@@ -0,0 +1,101 @@
+"""
+Proposal Summary - List-view projection of proposals
+
+List views only show titles, statuses and a few counts, so they don't
+load proposal bodies (contents and diffs). The diff stats are computed once,
+when a proposal is stored, and kept in the document's `summary` field:
+
+- Firestore lists read only SUMMARY_FIELDS (field mask)
+- The local index keeps the same stats in its columns
+- Documents stored before summaries existed are summarized from their
+  body once and backfilled
+
+Mutable fields (status, title, ...) stay top-level and are read from there.
+"""
+
+from typing import Any, Dict, List, Optional
+
+SUMMARY_KEY = "summary"
+
+# Top-level fields a summary is built from (Firestore field mask)
+SUMMARY_FIELDS: List[str] = [
+    "id",
+    "agent_id",
+    "workspace_id",
+    "user_id",
+    "title",
+    "status",
+    "created_at",
+    SUMMARY_KEY,
+]
+
+
+def _count_lines(diff: Optional[str]) -> Dict[str, int]:
+    additions = deletions = 0
+    for line in (diff or "").splitlines():
+        if line.startswith("+") and not line.startswith("+++"):
+            additions += 1
+        elif line.startswith("-") and not line.startswith("---"):
+            deletions += 1
+    return {"additions": additions, "deletions": deletions}
+
+
+def compute_summary_stats(proposal: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Diff stats of a full proposal.
+
+    Args:
+        proposal: Proposal dict with proposed_changes (and/or an overall diff)
+
+    Returns:
+        {"file_count", "additions", "deletions"}
+    """
+    changes = [c for c in proposal.get("proposed_changes") or [] if isinstance(c, dict)]
+    additions = deletions = 0
+    if changes:
+        for change in changes:
+            counts = _count_lines(change.get("diff"))
+            additions += counts["additions"]
+            deletions += counts["deletions"]
+    else:
+        overall = proposal.get("diff")
+        content = overall.get("content") if isinstance(overall, dict) else overall
+        counts = _count_lines(content if isinstance(content, str) else None)
+        additions, deletions = counts["additions"], counts["deletions"]
+    return {"file_count": len(changes), "additions": additions, "deletions": deletions}
+
+
+def with_summary(document: Dict[str, Any], source: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Return `document` with its `summary` field set.
+
+    Args:
+        document: Document about to be stored
+        source: Full proposal the stats are computed from (defaults to
+            `document`; pass the original when `document` is encoded)
+    """
+    document = dict(document)
+    document[SUMMARY_KEY] = compute_summary_stats(source if source is not None else document)
+    return document
+
+
+def to_summary(proposal: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the summary of a stored document or full proposal.
+
+    Uses the stored `summary` stats when present, otherwise computes them
+    from the proposal body.
+    """
+    stats = proposal.get(SUMMARY_KEY)
+    if not isinstance(stats, dict):
+        stats = compute_summary_stats(proposal)
+    summary = {field: proposal.get(field) for field in SUMMARY_FIELDS if field != SUMMARY_KEY}
+    summary["status"] = summary.get("status") or "pending"
+    summary["title"] = summary.get("title") or ""
+    summary["agent_id"] = summary.get("agent_id") or ""
+    summary.update(
+        file_count=int(stats.get("file_count") or 0),
+        additions=int(stats.get("additions") or 0),
+        deletions=int(stats.get("deletions") or 0),
+    )
+    return summary
@@ -0,0 +1,153 @@
+"""
+Response Cache - ETags and conditional GETs for polled read endpoints
+
+The extension polls list and context endpoints. Instead of rebuilding and
+re-serializing their whole payload on every call, such endpoints compute a
+cheap version of their inputs first (local index sequence, file stats,
+change-feed sequence), without reading any bodies:
+
+- The ETag is a hash of the path, the query and that version
+- A request whose If-None-Match matches gets 304 before anything is built
+- Otherwise the serialized body is cached per path + query and served
+  again while the version is unchanged (RESPONSE_CACHE_SIZE entries, LRU)
+- Payloads reporting an error are neither cached nor tagged
+"""
+
+import hashlib
+import inspect
+import logging
+import os
+from typing import Any, Awaitable, Callable, Optional, Union
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+
+
+def file_version(*paths: Union[str, os.PathLike]) -> str:
+    """Version of a set of files from their stats (missing files count too)."""
+    parts = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            parts.append("-")
+            continue
+        parts.append(f"{st.st_mtime_ns}.{st.st_size}")
+    return ":".join(parts)
+
+
+def dir_version(path: Union[str, os.PathLike], suffix: str = "") -> str:
+    """Version of the files in a directory (names and stats, not contents)."""
+    try:
+        with os.scandir(path) as entries:
+            stats = sorted(
+                (entry.name, st.st_mtime_ns, st.st_size)
+                for entry in entries
+                if entry.name.endswith(suffix) and entry.is_file()
+                for st in (entry.stat(),)
+            )
+    except OSError:
+        return "-"
+    return hashlib.sha1(repr(stats).encode("utf-8")).hexdigest()
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _is_error(payload: Any) -> bool:
+    return isinstance(payload, dict) and "error" in payload
+
+
+class ResponseCache:
+    """Serialized JSON responses keyed by request, validated by version."""
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE):
+        self._cache: LRUCache = LRUCache(maxsize=maxsize)
+
+    @staticmethod
+    def request_key(request: Request) -> str:
+        query = urlencode(sorted(request.query_params.multi_items()))
+        return f"{request.url.path}?{query}"
+
+    @staticmethod
+    def etag(key: str, version: str) -> str:
+        return '"' + hashlib.sha1(f"{key}|{version}".encode("utf-8")).hexdigest()[:20] + '"'
+
+    async def respond(
+        self,
+        request: Request,
+        version: Optional[str],
+        build: Callable[[], Union[Any, Awaitable[Any]]],
+    ) -> Any:
+        """
+        Answer a GET with 304, a cached body or a freshly built one.
+
+        Args:
+            request: Incoming request (If-None-Match, path and query)
+            version: Version of everything the payload is built from (None =
+                unknown: build and return the payload without an ETag)
+            build: Builds the payload (sync or async), only called on a miss
+
+        Returns:
+            A Response, or the payload itself when version is None
+        """
+        if version is None:
+            payload = build()
+            return await payload if inspect.isawaitable(payload) else payload
+
+        key = self.request_key(request)
+        etag = self.etag(key, version)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == etag:
+            return Response(cached[1], media_type="application/json", headers=headers)
+
+        payload = build()
+        if inspect.isawaitable(payload):
+            payload = await payload
+        if isinstance(payload, Response):
+            return payload
+        response = JSONResponse(jsonable_encoder(payload))
+        if _is_error(payload):
+            return response
+        self._cache.set(key, (etag, response.body))
+        response.headers.update(headers)
+        return response
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
+
+
+def reset_response_cache() -> None:
+    """Drop the response cache (for testing)"""
+    global _response_cache
+    _response_cache = None
@@ -0,0 +1,425 @@
+"""
+Search Index - Full-text search over a workspace's proposals, retrospectives and docs
+
+Lets users search proposals and retrospectives instead of paging through
+list endpoints. Each workspace keeps a persistent inverted index (SQLite
+FTS5, <workspace>/.search.sqlite3, kept out of commits like other workspace
+state) ranked with BM25, titles weighing SEARCH_TITLE_WEIGHT times the body:
+
+- proposal: title, description, issue, changed files and diffs
+  (proposals/*.json; Firestore proposals are indexed from proposal events)
+- retrospective: topic, insights, action items and summary
+  (retrospectives/*.json)
+- doc: the workspace's top-level Markdown artifacts (README.md, ...)
+
+The index is incremental: each source is stored with its file version
+(mtime, size), so a sync before each search only parses new or modified
+files and drops deleted ones. The proposals/ and retrospectives/ listings
+are skipped while their directory mtime is unchanged (writes go through
+atomic renames, see local_storage); `proposal.*` and retrospective events
+mark them stale so the next search rescans.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from app.services.event_bus import EventTypes
+
+logger = logging.getLogger(__name__)
+
+SEARCH_INDEX_FILE = ".search.sqlite3"
+SEARCH_SCHEMA_VERSION = 1
+SEARCH_TITLE_WEIGHT = float(os.getenv("SEARCH_TITLE_WEIGHT", "5"))
+SEARCH_MAX_BODY = int(os.getenv("SEARCH_MAX_BODY", "200000"))
+SEARCH_MAX_RESULTS = 100
+
+KINDS = ("proposal", "retrospective", "doc")
+
+# (kind, directory relative to the workspace, file suffix)
+_SOURCE_DIRS = (
+    ("proposal", "proposals", ".json"),
+    ("retrospective", "retrospectives", ".json"),
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    rowid INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    source_id TEXT NOT NULL,
+    path TEXT,
+    version TEXT,
+    meta TEXT,
+    UNIQUE (kind, source_id)
+);
+CREATE INDEX IF NOT EXISTS sources_path ON sources (kind, path);
+CREATE VIRTUAL TABLE IF NOT EXISTS search USING fts5(title, body, tokenize = 'porter unicode61');
+"""
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _text(value: Any) -> Iterable[str]:
+    """Strings found in a (nested) JSON value."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _text(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _text(item)
+
+
+def _join(parts: Iterable[str]) -> str:
+    return "\n".join(p for p in parts if p)[:SEARCH_MAX_BODY]
+
+
+def proposal_document(proposal: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any]]:
+    """(title, body, meta) indexed for a proposal."""
+    parts = [proposal.get("description"), (proposal.get("diff") or {}).get("content")]
+    parts += _text(proposal.get("issue") or {})
+    for change in proposal.get("proposed_changes") or []:
+        parts += [change.get("file_path"), change.get("description"), change.get("diff")]
+    meta = {
+        "status": proposal.get("status") or "pending",
+        "agent_id": proposal.get("agent_id"),
+        "created_at": proposal.get("created_at"),
+    }
+    return proposal.get("title") or "", _join(parts), meta
+
+
+def retrospective_document(retrospective: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any]]:
+    """(title, body, meta) indexed for a retrospective."""
+    title = f"Retrospective {retrospective.get('retrospective_id', '')}"
+    if retrospective.get("topic"):
+        title += f": {retrospective['topic']}"
+    parts = list(_text(retrospective.get("insights") or []))
+    parts += _text(retrospective.get("action_items") or [])
+    parts += _text(retrospective.get("llm_summary") or [])
+    meta = {"timestamp": retrospective.get("timestamp"), "trigger": retrospective.get("trigger")}
+    return title, _join(parts), meta
+
+
+def doc_document(name: str, text: str) -> Tuple[str, str, Dict[str, Any]]:
+    """(title, body, meta) indexed for a Markdown artifact (title = first heading)."""
+    heading = next((line.lstrip("#").strip() for line in text.splitlines() if line.startswith("#")), "")
+    return heading or name, text[:SEARCH_MAX_BODY], {}
+
+
+def fts_query(query: str) -> Optional[str]:
+    """
+    FTS5 query for free text: any of its words (BM25 ranks documents
+    matching more of them first), the last one as a prefix.
+    """
+    tokens = _TOKEN_RE.findall(query.lower())
+    if not tokens:
+        return None
+    terms = [f'"{t}"' for t in tokens[:-1]] + [f'"{tokens[-1]}"*']
+    return " OR ".join(terms)
+
+
+class SearchIndex:
+    """Persistent BM25 index of one workspace."""
+
+    def __init__(self, workspace_path: Union[str, Path]):
+        """
+        Open (and if needed create) the index of a workspace.
+
+        Args:
+            workspace_path: Workspace directory
+        """
+        self.workspace_path = str(workspace_path)
+        self.index_path = os.path.join(self.workspace_path, SEARCH_INDEX_FILE)
+        self._lock = threading.RLock()
+        self._dir_mtimes: Dict[str, Optional[int]] = {}
+        self._conn = sqlite3.connect(self.index_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SEARCH_SCHEMA_VERSION:
+                self._conn.executescript("DROP TABLE IF EXISTS sources; DROP TABLE IF EXISTS search;")
+                self._conn.execute(f"PRAGMA user_version = {SEARCH_SCHEMA_VERSION}")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def put(
+        self,
+        kind: str,
+        source_id: str,
+        title: str,
+        body: str,
+        meta: Optional[Dict[str, Any]] = None,
+        path: Optional[str] = None,
+        version: Optional[str] = None,
+    ) -> None:
+        """Index (or re-index) one document."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT rowid FROM sources WHERE kind = ? AND source_id = ?", (kind, source_id)
+            ).fetchone()
+            if row is None:
+                rowid = self._conn.execute(
+                    "INSERT INTO sources (kind, source_id, path, version, meta) VALUES (?, ?, ?, ?, ?)",
+                    (kind, source_id, path, version, json.dumps(meta or {})),
+                ).lastrowid
+            else:
+                rowid = row["rowid"]
+                self._conn.execute(
+                    "UPDATE sources SET path = ?, version = ?, meta = ? WHERE rowid = ?",
+                    (path, version, json.dumps(meta or {}), rowid),
+                )
+                self._conn.execute("DELETE FROM search WHERE rowid = ?", (rowid,))
+            self._conn.execute("INSERT INTO search (rowid, title, body) VALUES (?, ?, ?)", (rowid, title, body))
+            self._conn.commit()
+
+    def index_proposal(self, proposal: Dict[str, Any]) -> None:
+        """Index a proposal that has no file (e.g. read from Firestore)."""
+        if proposal.get("id"):
+            self.put("proposal", proposal["id"], *proposal_document(proposal))
+
+    def remove(self, kind: str, source_id: str) -> None:
+        """Drop one document."""
+        with self._lock:
+            self._delete_rows(
+                self._conn.execute(
+                    "SELECT rowid FROM sources WHERE kind = ? AND source_id = ?", (kind, source_id)
+                ).fetchall()
+            )
+            self._conn.commit()
+
+    def _delete_rows(self, rows: List[sqlite3.Row]) -> None:
+        for row in rows:
+            self._conn.execute("DELETE FROM search WHERE rowid = ?", (row["rowid"],))
+            self._conn.execute("DELETE FROM sources WHERE rowid = ?", (row["rowid"],))
+
+    def mark_stale(self) -> None:
+        """Rescan the proposals/ and retrospectives/ directories on the next sync."""
+        with self._lock:
+            self._dir_mtimes.clear()
+
+    def sync(self, force: bool = False) -> int:
+        """
+        Bring the index up to date with the workspace files.
+
+        Args:
+            force: Rescan directories even if their mtime is unchanged
+
+        Returns:
+            Number of documents (re-)indexed or dropped
+        """
+        with self._lock:
+            changed = 0
+            for kind, directory, suffix in _SOURCE_DIRS:
+                path = os.path.join(self.workspace_path, directory)
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except FileNotFoundError:
+                    mtime = None
+                if not force and path in self._dir_mtimes and self._dir_mtimes[path] == mtime:
+                    continue
+                changed += self._sync_files(kind, self._scan(path, suffix, directory))
+                self._dir_mtimes[path] = mtime
+            # Docs are edited in place (no directory mtime change): stat them every time
+            changed += self._sync_files("doc", self._scan(self.workspace_path, ".md", ""))
+            if changed:
+                self._conn.commit()
+                logger.info(f"[SearchIndex] Indexed {changed} changes in {self.workspace_path}")
+            return changed
+
+    def _scan(self, path: str, suffix: str, relative: str) -> Dict[str, str]:
+        files = {}
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name.endswith(suffix) and not entry.name.startswith(".") and entry.is_file():
+                        st = entry.stat()
+                        files[os.path.join(relative, entry.name)] = f"{st.st_mtime_ns}.{st.st_size}"
+        except FileNotFoundError:
+            pass
+        return files
+
+    def _sync_files(self, kind: str, files: Dict[str, str]) -> int:
+        indexed = {
+            row["path"]: (row["rowid"], row["version"])
+            for row in self._conn.execute(
+                "SELECT rowid, path, version FROM sources WHERE kind = ? AND path IS NOT NULL", (kind,)
+            )
+        }
+        changed = 0
+        for path, version in files.items():
+            current = indexed.get(path)
+            if current is not None and current[1] == version:
+                continue
+            document = self._read(kind, path)
+            if document is None:
+                continue
+            source_id, title, body, meta = document
+            # One document per source id (a file may have been renamed)
+            self._delete_rows(
+                self._conn.execute(
+                    "SELECT rowid FROM sources WHERE kind = ? AND (source_id = ? OR path = ?)",
+                    (kind, source_id, path),
+                ).fetchall()
+            )
+            rowid = self._conn.execute(
+                "INSERT INTO sources (kind, source_id, path, version, meta) VALUES (?, ?, ?, ?, ?)",
+                (kind, source_id, path, version, json.dumps(meta)),
+            ).lastrowid
+            self._conn.execute("INSERT INTO search (rowid, title, body) VALUES (?, ?, ?)", (rowid, title, body))
+            changed += 1
+        removed = [{"rowid": rowid} for path, (rowid, _) in indexed.items() if path not in files]
+        self._delete_rows(removed)
+        return changed + len(removed)
+
+    def _read(self, kind: str, path: str) -> Optional[Tuple[str, str, str, Dict[str, Any]]]:
+        full_path = os.path.join(self.workspace_path, path)
+        try:
+            with open(full_path, "r", encoding="utf-8") as f:
+                if kind == "doc":
+                    return (path, *doc_document(path, f.read()))
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"[SearchIndex] Error reading {full_path}: {e}")
+            return None
+        if not isinstance(data, dict):
+            return None
+        if kind == "proposal":
+            return (data.get("id") or Path(path).stem, *proposal_document(data))
+        return (data.get("retrospective_id") or Path(path).stem, *retrospective_document(data))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        query: str,
+        kinds: Optional[List[str]] = None,
+        limit: int = 20,
+        sync: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank documents matching a free-text query (BM25).
+
+        Args:
+            query: Words to look for (the last one also matches as a prefix)
+            kinds: Only these kinds (proposal, retrospective, doc); None = all
+            limit: Max results (at most SEARCH_MAX_RESULTS)
+            sync: Pick up changed files first
+
+        Returns:
+            Results, best first: kind, id, title, snippet, score, path and
+            kind-specific fields (status, agent_id, timestamp, ...)
+        """
+        match = fts_query(query)
+        if match is None:
+            return []
+        if sync:
+            self.sync()
+        sql = (
+            "SELECT sources.kind, sources.source_id, sources.path, sources.meta, search.title, "
+            "bm25(search, ?, 1.0) AS rank, "
+            "snippet(search, 1, '[', ']', '…', 16) AS snippet "
+            "FROM search JOIN sources ON sources.rowid = search.rowid "
+            "WHERE search MATCH ?"
+        )
+        params: List[Any] = [SEARCH_TITLE_WEIGHT, match]
+        if kinds:
+            sql += f" AND sources.kind IN ({', '.join('?' * len(kinds))})"
+            params += list(kinds)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(max(1, min(limit, SEARCH_MAX_RESULTS)))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {
+                "kind": row["kind"],
+                "id": row["source_id"],
+                "title": row["title"],
+                "snippet": row["snippet"],
+                "score": round(-row["rank"], 4),
+                "path": row["path"],
+                **json.loads(row["meta"] or "{}"),
+            }
+            for row in rows
+        ]
+
+    def count(self) -> Dict[str, int]:
+        """Indexed documents per kind."""
+        with self._lock:
+            rows = self._conn.execute("SELECT kind, COUNT(*) AS n FROM sources GROUP BY kind").fetchall()
+        return {row["kind"]: row["n"] for row in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_indexes: Dict[str, SearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(workspace_path: Union[str, Path]) -> SearchIndex:
+    """Get the (cached) search index of a workspace."""
+    key = os.path.abspath(str(workspace_path))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = SearchIndex(key)
+            _indexes[key] = index
+        return index
+
+
+def reset_search_indexes():
+    """Close and forget cached indexes (for testing)"""
+    with _indexes_lock:
+        for index in _indexes.values():
+            index.close()
+        _indexes.clear()
+
+
+async def _on_event(event_type: str, data: Dict[str, Any]) -> None:
+    from app.utils.workspace_manager import get_workspace_path
+
+    try:
+        index = get_search_index(get_workspace_path(data.get("workspace_id") or "default"))
+    except FileNotFoundError:
+        return
+    proposal_id = data.get("proposal_id")
+    if event_type.startswith("proposal.") and proposal_id and os.getenv("FIRESTORE_ENABLED", "false").lower() == "true":
+        from app.repositories.proposal_repository import get_proposal_repository
+
+        try:
+            proposal = await asyncio.to_thread(get_proposal_repository().get, proposal_id)
+        except Exception as e:
+            logger.warning(f"[SearchIndex] Could not index proposal {proposal_id}: {e}")
+            return
+        if proposal:
+            await asyncio.to_thread(index.index_proposal, proposal)
+        return
+    index.mark_stale()
+
+
+def attach_search_indexes(bus) -> None:
+    """Update workspace indexes from proposal and retrospective events."""
+    for event_type in (
+        EventTypes.PROPOSAL_CREATED.value,
+        EventTypes.PROPOSAL_APPROVED.value,
+        EventTypes.PROPOSAL_REJECTED.value,
+        EventTypes.RETROSPECTIVE_SUMMARY.value,
+    ):
+        bus.subscribe(event_type, _on_event)
@@ -0,0 +1,131 @@
+"""
+LRU Cache - Small thread-safe LRU cache with optional TTL
+
+Used for per-process caches of expensive objects (e.g. one
+Git_Context_Manager per workspace). Keeps hit/miss/eviction counters so
+callers can expose cache stats.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, List, Optional, TypeVar
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class LRUCache(Generic[V]):
+    """
+    Bounded LRU mapping.
+
+    Entries older than `ttl` seconds (if set) are treated as missing.
+    All operations are O(1) and guarded by a single lock.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        ttl: Optional[float] = None,
+        on_evict: Optional[Callable[[Hashable, V], None]] = None,
+    ):
+        """
+        Args:
+            maxsize: Maximum number of entries (oldest are evicted first)
+            ttl: Time-to-live in seconds (None = no expiry)
+            on_evict: Called with (key, value) when an entry is evicted or expires
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._data: "OrderedDict[Hashable, tuple[V, float]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and (time.monotonic() - stored_at) > self.ttl
+
+    def _evict(self, key: Hashable, value: V) -> None:
+        self.evictions += 1
+        if self.on_evict:
+            self.on_evict(key, value)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value and mark it as recently used."""
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            value, stored_at = item
+            if self._expired(stored_at):
+                del self._data[key]
+                self._evict(key, value)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        """Insert or replace a value, evicting the least recently used entry if full."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+            self._data[key] = (value, time.monotonic())
+            while self.maxsize and len(self._data) > self.maxsize:
+                old_key, (old_value, _) = self._data.popitem(last=False)
+                self._evict(old_key, old_value)
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], V]) -> V:
+        """Return the cached value, building it with `factory` on a miss."""
+        with self._lock:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+        # Build outside the lock; first writer wins if two threads race
+        built = factory()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and not self._expired(item[1]):
+                return item[0]
+            self.set(key, built)
+            return built
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a key and return its value."""
+        with self._lock:
+            item = self._data.pop(key, None)
+            return default if item is None else item[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def keys(self) -> List[Hashable]:
+        with self._lock:
+            return list(self._data.keys())
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            item = self._data.get(key)
+            return item is not None and not self._expired(item[1])
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit-rate counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
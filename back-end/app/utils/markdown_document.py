@@ -0,0 +1,428 @@
+"""
+Markdown Document - Section-indexed incremental writer for workspace docs
+
+context.md, timeline.md and task_history.md get a new entry for every
+history entry. Rather than reading, scanning and rewriting the whole file
+each time, MarkdownDocument keeps a byte-offset index of the level-2 ("## ")
+sections of a file, cached on the file's (mtime, size):
+
+- Appending into the last section (or creating a new one) is a plain append
+- Appending into an earlier section only rewrites the bytes after the
+  insertion point
+- Several appends can be batched into a single write with `batch()`
+
+Long-lived workspaces also get trimming policies so these files stop growing
+linearly:
+
+- trim_section: keep only the newest N "### " entries of a section
+- archive_sections: move the oldest matching sections into an archive file
+- rotate_if_larger: move the whole file aside once it passes a size limit
+"""
+
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SECTION_PREFIX = b"## "
+ENTRY_PREFIX = b"### "
+
+# Trimming policies for workspace docs (0 disables a policy)
+CONTEXT_RECENT_MAX_ENTRIES = int(os.getenv("MARKDOWN_CONTEXT_RECENT_ENTRIES", "50"))
+TIMELINE_MAX_DAYS = int(os.getenv("MARKDOWN_TIMELINE_MAX_DAYS", "90"))
+TASK_HISTORY_MAX_BYTES = int(os.getenv("MARKDOWN_TASK_HISTORY_MAX_BYTES", str(1024 * 1024)))
+
+_DATE_SECTION = re.compile(r"^## \d{4}-\d{2}-\d{2}$")
+
+
+class _Section:
+    __slots__ = ("title", "start", "end", "entries")
+
+    def __init__(self, title: str, start: int, end: int, entries: int = 0):
+        self.title = title  # Stripped header line, e.g. "## 2025-01-01"
+        self.start = start  # Offset of the header line
+        self.end = end  # Offset of the next section header (or EOF)
+        self.entries = entries  # Number of "### " entries in the section
+
+
+def _count_entries(data: bytes) -> int:
+    return (b"\n" + data).count(b"\n" + ENTRY_PREFIX)
+
+
+class MarkdownDocument:
+    """
+    A markdown file with a cached index of its level-2 sections.
+
+    Thread-safe within a process. Use get_document() to share one instance
+    (and therefore one index) per path.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._sections: List[_Section] = []
+        self._size = 0
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._pending: Optional[List[Tuple[Optional[str], str]]] = None
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _ensure_index(self) -> None:
+        stamp = self._file_stamp()
+        if stamp is not None and stamp == self._stamp:
+            return
+
+        self._sections = []
+        self._size = 0
+        if stamp is not None:
+            with open(self.path, "rb") as f:
+                offset = 0
+                for line in f:
+                    if line.startswith(SECTION_PREFIX):
+                        if self._sections:
+                            self._sections[-1].end = offset
+                        title = line.decode("utf-8", errors="replace").strip()
+                        self._sections.append(_Section(title, offset, offset))
+                    elif line.startswith(ENTRY_PREFIX) and self._sections:
+                        self._sections[-1].entries += 1
+                    offset += len(line)
+                self._size = offset
+            if self._sections:
+                self._sections[-1].end = self._size
+        self._stamp = stamp
+
+    def _find(self, title: str) -> Optional[_Section]:
+        for section in self._sections:
+            if section.title == title:
+                return section
+        return None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def section_titles(self) -> List[str]:
+        """Return section headers in file order."""
+        with self._lock:
+            self._ensure_index()
+            return [s.title for s in self._sections]
+
+    def read_section(self, title: str) -> Optional[str]:
+        """Return a section (header included), or None if it does not exist."""
+        with self._lock:
+            self._ensure_index()
+            section = self._find(title)
+            if section is None:
+                return None
+            with open(self.path, "rb") as f:
+                f.seek(section.start)
+                return f.read(section.end - section.start).decode("utf-8")
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def append_to_section(self, title: str, text: str) -> None:
+        """
+        Append text at the end of a section, creating the section if missing.
+
+        Args:
+            title: Section header line, e.g. "## 🚀 Atividade Recente"
+            text: Text to append (should end with a newline)
+        """
+        self._queue(title, text)
+
+    def append(self, text: str) -> None:
+        """Append text at the end of the file."""
+        self._queue(None, text)
+
+    def _queue(self, title: Optional[str], text: str) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((title, text))
+            else:
+                self._write([(title, text)])
+
+    @contextmanager
+    def batch(self):
+        """Collect appends and apply them with a single write on exit."""
+        with self._lock:
+            outer = self._pending is not None
+            if not outer:
+                self._pending = []
+            try:
+                yield self
+            finally:
+                if not outer:
+                    pending, self._pending = self._pending, None
+                    if pending:
+                        self._write(pending)
+
+    def flush(self) -> None:
+        """Apply appends queued so far in the current batch."""
+        with self._lock:
+            if self._pending:
+                pending, self._pending = self._pending, []
+                self._write(pending)
+
+    def _write(self, items: List[Tuple[Optional[str], str]]) -> None:
+        self._ensure_index()
+
+        # Appends into sections that end before EOF are spliced in at the
+        # section end; everything else (raw appends, the last section, new
+        # sections) becomes one block appended at EOF.
+        inserts: Dict[int, List[bytes]] = {}
+        groups: List[Tuple[Optional[str], List[bytes]]] = [(None, [])]
+        group_index: Dict[str, int] = {}
+        reindex = False
+        for title, text in items:
+            data = text.encode("utf-8")
+            if (b"\n" + data).find(b"\n" + SECTION_PREFIX) != -1:
+                reindex = True  # Text introduces its own headers
+
+            section = self._find(title) if title is not None else None
+            if section is not None:
+                section.entries += _count_entries(data)
+            if title is None:
+                groups[-1][1].append(data)
+                if len(groups) == 1 and self._sections:
+                    self._sections[-1].entries += _count_entries(data)
+            elif section is not None:
+                if section.end >= self._size:
+                    groups[0][1].append(data)
+                else:
+                    inserts.setdefault(section.end, []).append(data)
+            elif title in group_index:
+                groups[group_index[title]][1].append(data)
+            else:
+                group_index[title] = len(groups)
+                groups.append((title, [f"\n{title}\n".encode("utf-8"), data]))
+
+        if not inserts and not any(chunks for _, chunks in groups):
+            return
+
+        first = min(inserts) if inserts else self._size
+        mode = "r+b" if os.path.exists(self.path) else "w+b"
+        with open(self.path, mode) as f:
+            ends_mid_line = False
+            if self._size:
+                f.seek(self._size - 1)
+                ends_mid_line = f.read(1) != b"\n"
+            f.seek(first)
+            existing = f.read()
+
+            out: List[bytes] = []
+            cursor = first
+            for pos in sorted(inserts):
+                out.append(existing[cursor - first:pos - first])
+                out.extend(inserts[pos])
+                cursor = pos
+            out.append(existing[cursor - first:])
+
+            tail_start = first + sum(len(chunk) for chunk in out)
+            if ends_mid_line and (groups[0][1] or len(groups) > 1):
+                out.append(b"\n")
+                tail_start += 1
+
+            new_sections: List[_Section] = []
+            offset = tail_start
+            for index, (title, chunks) in enumerate(groups):
+                if index > 0:
+                    # Header chunk starts with the separating blank line
+                    entries = sum(_count_entries(chunk) for chunk in chunks)
+                    new_sections.append(_Section(title, offset + 1, offset + 1, entries))
+                out.extend(chunks)
+                offset += sum(len(chunk) for chunk in chunks)
+            for current, following in zip(new_sections, new_sections[1:]):
+                current.end = following.start
+            if new_sections:
+                new_sections[-1].end = offset
+
+            f.seek(first)
+            f.write(b"".join(out))
+            f.truncate()
+            self._size = offset
+
+        if reindex:
+            self._stamp = None
+            return
+        self._update_index(inserts, tail_start, new_sections)
+
+    def _update_index(
+        self, inserts: Dict[int, List[bytes]], tail_start: int, new_sections: List[_Section]
+    ) -> None:
+        """Shift cached offsets after a write instead of reparsing the file."""
+        shifts = sorted((pos, sum(len(d) for d in data)) for pos, data in inserts.items())
+
+        def shifted(offset: int) -> int:
+            return offset + sum(n for pos, n in shifts if pos <= offset)
+
+        for section in self._sections:
+            section.start = shifted(section.start)
+            section.end = shifted(section.end)
+        if self._sections:
+            # The former last section absorbs anything appended before the new sections
+            self._sections[-1].end = new_sections[0].start if new_sections else self._size
+        self._sections.extend(new_sections)
+        self._stamp = self._file_stamp()
+
+    # ------------------------------------------------------------------
+    # Trimming policies
+    # ------------------------------------------------------------------
+
+    def _rewrite_from(self, offset: int, data: bytes) -> None:
+        with open(self.path, "r+b") as f:
+            f.seek(offset)
+            f.write(data)
+            f.truncate()
+        self._stamp = None
+
+    def trim_section(self, title: str, max_entries: int, slack: float = 0.2) -> int:
+        """
+        Keep only the newest `max_entries` "### " entries of a section.
+
+        Trimming only happens once the section holds more than
+        max_entries * (1 + slack) entries, so the rewrite is amortized.
+
+        Returns:
+            Number of entries dropped
+        """
+        if max_entries <= 0:
+            return 0
+        with self._lock:
+            self._ensure_index()
+            section = self._find(title)
+            if section is None or section.entries <= int(max_entries * (1 + slack)):
+                return 0
+
+            with open(self.path, "rb") as f:
+                f.seek(section.start)
+                body = f.read(section.end - section.start)
+                rest = f.read()
+
+            lines = body.splitlines(keepends=True)
+            starts = [i for i, line in enumerate(lines) if line.startswith(ENTRY_PREFIX)]
+            if len(starts) <= int(max_entries * (1 + slack)):
+                return 0
+
+            dropped = len(starts) - max_entries
+            cut = starts[dropped]
+            # Keep the header and any text before the first entry
+            kept = lines[:starts[0]] + lines[cut:]
+            self._rewrite_from(section.start, b"".join(kept) + rest)
+            logger.info(f"[MarkdownDocument] Trimmed {dropped} entries from '{title}' in {self.path}")
+            return dropped
+
+    def archive_sections(
+        self,
+        predicate: Callable[[str], bool],
+        keep_last: int,
+        archive_path: str,
+        slack: float = 0.2,
+    ) -> int:
+        """
+        Move the oldest sections matching `predicate` into `archive_path`.
+
+        Sections are ordered by title, so date headers ("## YYYY-MM-DD")
+        archive oldest first. Runs once more than keep_last * (1 + slack)
+        sections match.
+
+        Returns:
+            Number of sections archived
+        """
+        if keep_last <= 0:
+            return 0
+        with self._lock:
+            self._ensure_index()
+            matching = [s for s in self._sections if predicate(s.title)]
+            if len(matching) <= int(keep_last * (1 + slack)):
+                return 0
+
+            ordered = sorted(matching, key=lambda s: (s.title, s.start))
+            to_archive = ordered[: len(matching) - keep_last]
+            archive_ids = {id(s) for s in to_archive}
+
+            first = min(s.start for s in to_archive)
+            with open(self.path, "rb") as f:
+                f.seek(first)
+                rest = f.read()
+
+            kept: List[bytes] = []
+            moved: List[bytes] = []
+            cursor = first
+            for section in self._sections:
+                if section.start < first:
+                    continue
+                chunk = rest[section.start - first:section.end - first]
+                (moved if id(section) in archive_ids else kept).append(chunk)
+                cursor = section.end
+            kept.append(rest[cursor - first:])
+
+            with open(archive_path, "ab") as f:
+                for chunk in sorted(moved):
+                    f.write(chunk if chunk.endswith(b"\n") else chunk + b"\n")
+            self._rewrite_from(first, b"".join(kept))
+            logger.info(
+                f"[MarkdownDocument] Archived {len(moved)} sections from {self.path} to {archive_path}"
+            )
+            return len(moved)
+
+    def rotate_if_larger(self, max_bytes: int, archive_dir: str, header: str = "") -> Optional[str]:
+        """
+        Move the file into `archive_dir` once it is larger than `max_bytes`.
+
+        The file is recreated with `header` so appends can continue.
+
+        Returns:
+            Path of the rotated file, or None if no rotation happened
+        """
+        if max_bytes <= 0:
+            return None
+        with self._lock:
+            stamp = self._file_stamp()
+            if stamp is None or stamp[1] <= max_bytes:
+                return None
+
+            os.makedirs(archive_dir, exist_ok=True)
+            base, ext = os.path.splitext(os.path.basename(self.path))
+            suffix = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+            rotated = os.path.join(archive_dir, f"{base}-{suffix}{ext}")
+            os.replace(self.path, rotated)
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(header)
+            self._stamp = None
+            logger.info(f"[MarkdownDocument] Rotated {self.path} to {rotated}")
+            return rotated
+
+
+def is_date_section(title: str) -> bool:
+    """True for "## YYYY-MM-DD" headers (timeline.md)."""
+    return bool(_DATE_SECTION.match(title))
+
+
+_documents: Dict[str, MarkdownDocument] = {}
+_documents_lock = threading.Lock()
+
+
+def get_document(path: str) -> MarkdownDocument:
+    """Return the shared MarkdownDocument for a path."""
+    path = os.path.abspath(path)
+    with _documents_lock:
+        doc = _documents.get(path)
+        if doc is None:
+            doc = MarkdownDocument(path)
+            _documents[path] = doc
+        return doc
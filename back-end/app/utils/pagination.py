@@ -0,0 +1,123 @@
+"""
+Pagination - Opaque keyset cursors for proposal listings
+
+Listings are ordered by (created_at, id), newest first. A cursor encodes
+the sort key of the last item on a page, so the next page starts right
+after it (`WHERE (created_at, id) < (cursor)`) and costs the same however
+many proposals come before it. Cursors also carry a fingerprint of the
+filters they were issued for and are rejected with other filters.
+"""
+
+import base64
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+CURSOR_VERSION = 1
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token is malformed or used with other filters."""
+
+
+def sort_key(proposal: Dict[str, Any]) -> Tuple[Any, str]:
+    """(created_at, id) of a proposal, as stored."""
+    return proposal.get("created_at") or "", str(proposal.get("id") or "")
+
+
+def _fingerprint(filters: Optional[Dict[str, Any]]) -> str:
+    canonical = json.dumps(
+        {k: v for k, v in (filters or {}).items() if v is not None}, sort_keys=True, default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:12]
+
+
+def encode_cursor(created_at: Any, proposal_id: str, filters: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build the cursor pointing after a proposal.
+
+    Args:
+        created_at: Stored created_at (ISO string or datetime)
+        proposal_id: Proposal ID (tie breaker)
+        filters: Filters of the listing the cursor belongs to
+
+    Returns:
+        URL-safe opaque token
+    """
+    if isinstance(created_at, datetime):
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        key = {"ts": created_at.isoformat()}
+    else:
+        key = {"s": str(created_at or "")}
+    payload = {"v": CURSOR_VERSION, "k": key, "id": proposal_id, "f": _fingerprint(filters)}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, filters: Optional[Dict[str, Any]] = None) -> Tuple[Any, str]:
+    """
+    Decode a cursor issued by `encode_cursor`.
+
+    Args:
+        token: Cursor token
+        filters: Filters of the current listing (must match the cursor's)
+
+    Returns:
+        (created_at, id) of the last item of the previous page
+
+    Raises:
+        InvalidCursor: If the token is malformed or was issued for other filters
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        key = payload["k"]
+        created_at = datetime.fromisoformat(key["ts"]) if "ts" in key else key["s"]
+        proposal_id = str(payload["id"])
+    except Exception as e:
+        raise InvalidCursor(f"Invalid cursor: {e}") from e
+    if payload.get("v") != CURSOR_VERSION:
+        raise InvalidCursor("Unsupported cursor version")
+    if payload.get("f") != _fingerprint(filters):
+        raise InvalidCursor("Cursor was issued for different filters")
+    return created_at, proposal_id
+
+
+def _comparable(key: Tuple[Any, str]) -> Tuple[str, str]:
+    created_at, proposal_id = key
+    if isinstance(created_at, datetime):
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        created_at = created_at.isoformat()
+    return str(created_at), proposal_id
+
+
+def paginate(
+    items: List[Dict[str, Any]],
+    limit: int,
+    cursor: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Keyset-paginate proposals held in memory (small legacy lists).
+
+    Args:
+        items: Proposals (already filtered)
+        limit: Page size
+        cursor: Token from the previous page
+        filters: Filters of the listing
+
+    Returns:
+        (page, next_cursor)
+    """
+    ordered = sorted(items, key=lambda p: _comparable(sort_key(p)), reverse=True)
+    if cursor:
+        after = _comparable(decode_cursor(cursor, filters))
+        ordered = [p for p in ordered if _comparable(sort_key(p)) < after]
+    page = ordered[:limit]
+    next_cursor = None
+    if len(ordered) > limit:
+        next_cursor = encode_cursor(*sort_key(page[-1]), filters)
+    return page, next_cursor
@@ -44,6 +44,10 @@ def _ensure_base_dir():
         logger.info(f"Base directory for workspaces: {BASE_DIR}")
     return BASE_DIR
 
+def get_base_dir() -> str:
+    """Retorna o diretório base dos workspaces."""
+    return _ensure_base_dir()
+
 def create_workspace(workspace_id: str, name: str) -> str:
     """Cria um novo workspace com ID específico e nome."""
     base_dir = _ensure_base_dir()
@@ -0,0 +1,83 @@
+"""
+Benchmark: diff_engine.unified_diff vs difflib.unified_diff
+
+Inputs are lockfile-like (highly repetitive) and source-like (mostly unique
+lines) files at several sizes and edit densities. Reports wall time for both
+engines, the speedup, and whether the output is byte-identical.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_diff_engine [max_lines]
+"""
+
+import difflib
+import random
+import sys
+import time
+
+from app.agents import diff_engine
+
+SIZES = [1_000, 10_000, 50_000]
+DENSITIES = [0.001, 0.01, 0.05]
+# difflib takes minutes on the largest dense inputs
+DIFFLIB_MAX_WORK = 50_000 * 0.01
+
+
+def _lockfile(lines: int, rng: random.Random) -> list:
+    out = []
+    for i in range(lines // 4):
+        out += [
+            f'"pkg-{i}": {{\n',
+            f'  "version": "1.{rng.randrange(9)}.0",\n',
+            '  "dev": false\n',
+            "},\n",
+        ]
+    return out
+
+
+def _source(lines: int, rng: random.Random) -> list:
+    return [f"    value_{i} = compute({rng.randrange(10 ** 6)})\n" for i in range(lines)]
+
+
+def _edit(lines: list, density: float, rng: random.Random) -> list:
+    edited = list(lines)
+    for _ in range(max(1, int(len(lines) * density))):
+        k = rng.randrange(len(edited))
+        choice = rng.random()
+        if choice < 0.5:
+            edited[k] = f'  "version": "2.{rng.randrange(9)}.0",\n'
+        elif choice < 0.75:
+            del edited[k]
+        else:
+            edited.insert(k, f"    inserted_{rng.randrange(10 ** 6)}()\n")
+    return edited
+
+
+def _time(fn, a, b) -> tuple:
+    start = time.perf_counter()
+    out = "".join(fn(a, b, "a/file", "b/file"))
+    return (time.perf_counter() - start) * 1000, out
+
+
+def main() -> None:
+    max_lines = int(sys.argv[1]) if len(sys.argv) > 1 else SIZES[-1]
+    rng = random.Random(42)
+
+    print(f"{'kind':<9} {'lines':>7} {'density':>8} {'engine':>10} {'difflib':>10} {'speedup':>8}  identical")
+    for kind, make in (("lockfile", _lockfile), ("source", _source)):
+        for size in (s for s in SIZES if s <= max_lines):
+            for density in DENSITIES:
+                a = make(size, rng)
+                b = _edit(a, density, rng)
+                engine_ms, engine_out = _time(diff_engine.unified_diff, a, b)
+                if size * density > DIFFLIB_MAX_WORK:
+                    print(f"{kind:<9} {size:>7} {density:>8} {engine_ms:>8.1f}ms {'skipped':>10}")
+                    continue
+                difflib_ms, difflib_out = _time(difflib.unified_diff, a, b)
+                print(
+                    f"{kind:<9} {size:>7} {density:>8} {engine_ms:>8.1f}ms {difflib_ms:>8.1f}ms "
+                    f"{difflib_ms / engine_ms:>7.1f}x  {engine_out == difflib_out}"
+                )
+
+
+if __name__ == "__main__":
+    main()
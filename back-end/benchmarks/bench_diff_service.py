@@ -0,0 +1,77 @@
+"""
+Benchmark: event-loop stalls while generating multi-file proposal diffs
+
+Diffs a batch of large generated files serially on the event loop (as the
+proposal builders used to) and through DiffService, while a ticker task
+measures how late the loop runs it. Also times small files to check the
+inline threshold.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_diff_service
+"""
+
+import asyncio
+import random
+import time
+
+from app.agents.diff_generator import generate_unified_diff
+from app.services.compute_pool import get_compute_pool
+from app.services.diff_service import DiffService
+
+
+def _file(rng: random.Random, lines: int) -> tuple:
+    old = [f"    value_{i} = compute({rng.randrange(10**6)})\n" for i in range(lines)]
+    new = list(old)
+    for _ in range(lines // 50):
+        k = rng.randrange(len(new))
+        new[k] = f"    value_{k} = recompute({rng.randrange(10**6)})\n"
+        new.insert(rng.randrange(len(new)), f"    # note {rng.randrange(1000)}\n")
+    return "gen.py", "".join(old), "".join(new)
+
+
+async def _measure(label: str, work) -> None:
+    stalls = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            stalls.append(time.perf_counter() - start - 0.005)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.02)
+    start = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - start
+    done.set()
+    await task
+    print(f"  {label:<28} total {elapsed * 1000:>8.1f} ms   worst loop stall {max(stalls) * 1000:>8.1f} ms")
+
+
+async def main() -> None:
+    rng = random.Random(3)
+    large = [_file(rng, 20000) for _ in range(4)]
+    small = [_file(rng, 60) for _ in range(20)]
+    service = DiffService()
+    await service.pool.run(len, "warm-up")  # Start workers outside the timings
+
+    async def serial(files):
+        for f in files:
+            generate_unified_diff(*f)
+
+    print(f"4 files x {len(large[0][1]) // 1024} KiB")
+    await _measure("serial on event loop", lambda: serial(large))
+    await _measure("DiffService (process pool)", lambda: service.diff_many(large))
+
+    print(f"20 files x {len(small[0][1]) // 1024} KiB")
+    await _measure("serial on event loop", lambda: serial(small))
+    await _measure("DiffService (inline)", lambda: service.diff_many(small))
+    forced = DiffService(offload_min_bytes=0)
+    await _measure("DiffService (forced offload)", lambda: forced.diff_many(small))
+
+    get_compute_pool().shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""
+Benchmark: proposal reads on the event loop, sync vs async Firestore client
+
+Before: async handlers called FirestoreService (firestore.Client), so each
+read blocked the event loop and concurrent requests were served one by one.
+After: they await AsyncFirestoreService (firestore.AsyncClient, one client
+per loop, batched get_all, FIRESTORE_MAX_CONCURRENCY RPCs in flight).
+
+Each round runs CONCURRENCY simulated requests on one event loop, each
+reading one proposal and a page of PAGE_IDS proposals, and reports the
+per-request latency. Runs against the Firestore emulator only:
+
+    gcloud emulators firestore start --host-port=localhost:8080
+    export FIRESTORE_EMULATOR_HOST=localhost:8080
+
+Usage (from back-end/):
+    python -m benchmarks.bench_firestore_async [iterations]
+"""
+
+import asyncio
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+
+from app.services.firestore_service import AsyncFirestoreService, FirestoreService
+
+PROPOSALS = 200
+CONCURRENCY = 20
+PAGE_IDS = 20
+
+
+def _proposal(i: int) -> dict:
+    return {
+        "id": f"bench-async-{i}",
+        "workspace_id": "bench-async",
+        "agent_id": "spec",
+        "title": f"Proposal {i}",
+        "status": "pending",
+        "created_at": f"2025-01-{1 + i % 28:02d}T{i % 24:02d}:00:00",
+        "diff": {"format": "unified", "content": "-old\n+new\n" * 50},
+    }
+
+
+async def _sync_request(service: FirestoreService, ids: list) -> None:
+    service.get_proposal(ids[0])
+    service.get_proposals(ids)
+
+
+async def _async_request(service: AsyncFirestoreService, ids: list) -> None:
+    await service.get_proposal(ids[0])
+    await service.get_proposals(ids)
+
+
+async def _round(request, service, rng: random.Random) -> list:
+    # All requests arrive together: latency includes waiting for the loop
+    arrived = time.perf_counter()
+
+    async def timed(ids: list) -> float:
+        await request(service, ids)
+        return (time.perf_counter() - arrived) * 1000
+
+    pages = [[f"bench-async-{rng.randrange(PROPOSALS)}" for _ in range(PAGE_IDS)] for _ in range(CONCURRENCY)]
+    return await asyncio.gather(*(timed(ids) for ids in pages))
+
+
+def _measure(request, make_service, iterations: int) -> list:
+    async def run() -> list:
+        service = make_service()
+        rng = random.Random(42)
+        await _round(request, service, rng)  # warm up the connection
+        timings = []
+        for _ in range(iterations):
+            timings += await _round(request, service, rng)
+        return timings
+
+    return asyncio.run(run())
+
+
+def _report(label: str, timings: list) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{label:<28} mean={statistics.mean(timings):7.2f}ms "
+        f"p50={statistics.median(timings):7.2f}ms p95={p95:7.2f}ms"
+    )
+
+
+def main(iterations: int = 20) -> None:
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("FIRESTORE_EMULATOR_HOST is not set; start the Firestore emulator first")
+    os.environ.setdefault("GCP_PROJECT_ID", "bench-firestore-async")
+    logging.disable(logging.CRITICAL)
+
+    sync_service = FirestoreService()
+    for i in range(PROPOSALS):
+        sync_service.create_proposal(_proposal(i))
+
+    print(f"{CONCURRENCY} concurrent requests x {iterations} rounds (1 get + get_all of {PAGE_IDS})")
+    _report("sync client (blocking)", _measure(_sync_request, lambda: sync_service, iterations))
+    _report("async client", _measure(_async_request, AsyncFirestoreService, iterations))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
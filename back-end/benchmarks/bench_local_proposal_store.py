@@ -0,0 +1,68 @@
+"""
+Benchmark: listing local proposals, glob-and-parse vs the SQLite index
+
+Writes N retrospective/spec style proposals (with ~20 KiB diffs) to a temp
+proposals/ directory and times a full listing the old way (glob, parse,
+sort), the first indexed open (migration) and indexed page/count queries.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_local_proposal_store [count]
+"""
+
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.local_proposal_store import LocalProposalStore
+
+
+def _ms(fn, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def _glob_and_parse(directory: Path) -> list:
+    proposals = [json.loads(p.read_text()) for p in directory.glob("*.json")]
+    proposals.sort(key=lambda p: p.get("created_at", ""), reverse=True)
+    return proposals
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp) / "proposals"
+        directory.mkdir()
+        diff = "".join(f"+line {i}\n" for i in range(2000))
+        for i in range(count):
+            agent = "retrospective" if i % 3 else "spec"
+            proposal = {
+                "id": f"{agent}-{i}",
+                "agent_id": agent,
+                "status": "pending" if i % 4 else "approved",
+                "title": f"Proposal {i}",
+                "created_at": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}T{i % 24:02d}:00:{i % 60:02d}",
+                "diff": {"format": "unified", "content": diff},
+                "proposed_changes": [{"file_path": "docs/x.md", "diff": diff}],
+            }
+            (directory / f"{proposal['id']}.json").write_text(json.dumps(proposal))
+
+        print(f"{count} proposals")
+        print(f"  glob + parse + sort          {_ms(lambda: _glob_and_parse(directory), 3):>9.1f} ms")
+        start = time.perf_counter()
+        store = LocalProposalStore(directory)
+        print(f"  first open (build index)     {(time.perf_counter() - start) * 1000:>9.1f} ms")
+        print(f"  reopen (stat scan)           {_ms(lambda: LocalProposalStore(directory), 3):>9.1f} ms")
+        print(f"  page of 50 (bodies)          {_ms(lambda: store.list(limit=50)):>9.1f} ms")
+        print(f"  pending spec page of 50      {_ms(lambda: store.list(status='pending', agent_id='spec', limit=50)):>9.1f} ms")
+        print(f"  count(status=pending)        {_ms(lambda: store.count(status='pending')):>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
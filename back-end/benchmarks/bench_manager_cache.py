@@ -0,0 +1,62 @@
+"""
+Benchmark: /context and /coach latency with and without the manager cache
+
+Before: server.get_manager() built a new Git_Context_Manager per request.
+After: managers are reused from a per-workspace LRU.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_manager_cache [iterations]
+"""
+
+import logging
+import statistics
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+import app.server as server
+from app.git_context_manager import Git_Context_Manager, invalidate_git_context_manager
+
+WORKSPACE_ID = "bench-manager-cache"
+ENDPOINTS = ["/context", "/coach"]
+
+
+def _measure(client: TestClient, path: str, iterations: int) -> list:
+    timings = []
+    for _ in range(iterations):
+        # The benchmark shares one client IP; keep the rate limiter out of the numbers
+        server.rate_limit_store.clear()
+        start = time.perf_counter()
+        response = client.get(path, params={"workspace_id": WORKSPACE_ID})
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.text
+    return timings
+
+
+def _report(label: str, timings: list) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{label:<28} mean={statistics.mean(timings):7.2f}ms "
+        f"p50={statistics.median(timings):7.2f}ms p95={p95:7.2f}ms"
+    )
+
+
+def main(iterations: int = 50) -> None:
+    logging.disable(logging.CRITICAL)
+    client = TestClient(server.app)
+    cached_get_manager = server.get_manager
+
+    for path in ENDPOINTS:
+        server.get_manager = lambda workspace_id="default": Git_Context_Manager(workspace_id=workspace_id)
+        _report(f"{path} (uncached)", _measure(client, path, iterations))
+
+        server.get_manager = cached_get_manager
+        invalidate_git_context_manager()
+        _measure(client, path, 1)  # warm the cache
+        _report(f"{path} (cached)", _measure(client, path, iterations))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
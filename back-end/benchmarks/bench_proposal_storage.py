@@ -0,0 +1,117 @@
+"""
+Benchmark: proposal document size and latency, full vs diff-only storage
+
+Proposals are built the way DevelopmentAgent builds them (before/after/diff
+per file plus the overall diff), using this repository's own tracked source
+files as the "before" contents and a few edits per file. Local proposals
+from a workspace can be measured too.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_proposal_storage [workspace_proposals_dir]
+"""
+
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from app.agents.diff_generator import generate_unified_diff
+from app.services.proposal_codec import build_overall_diff, decode_proposal, encode_proposal
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SOURCE_FILES = sorted(
+    p for p in (REPO_ROOT / "back-end" / "app").rglob("*.py") if p.stat().st_size > 2000
+)[:40]
+
+
+def _edit(text: str, rng: random.Random) -> str:
+    lines = text.splitlines(keepends=True)
+    for _ in range(rng.randrange(1, 6)):
+        k = rng.randrange(len(lines))
+        lines.insert(k, f"    # TODO({rng.randrange(1000)}): revisit this block\n")
+    return "".join(lines)
+
+
+def _proposal(index: int, files: list, rng: random.Random) -> dict:
+    changes = []
+    for path in files:
+        before = path.read_text(encoding="utf-8")
+        after = _edit(before, rng)
+        rel = str(path.relative_to(REPO_ROOT))
+        changes.append(
+            {
+                "file_path": rel,
+                "change_type": "update",
+                "description": f"Update {rel}",
+                "before": before,
+                "after": after,
+                "diff": generate_unified_diff(rel, before, after),
+            }
+        )
+    return {
+        "id": f"dev-bench-{index}",
+        "workspace_id": "bench",
+        "agent_id": "development",
+        "title": f"Benchmark proposal {index}",
+        "description": "Generated for storage benchmark",
+        "diff": {"format": "unified", "content": build_overall_diff(changes)},
+        "proposed_changes": changes,
+        "status": "pending",
+    }
+
+
+def _ms(fn, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def _report(label: str, proposals: list, workspace_path: str) -> None:
+    full_docs = [json.dumps(p) for p in proposals]
+    stored = [encode_proposal(p, workspace_path=workspace_path, mode="diff") for p in proposals]
+    compact_docs = [json.dumps(p) for p in stored]
+
+    full_bytes = sum(map(len, full_docs))
+    compact_bytes = sum(map(len, compact_docs))
+    # Round-trip check
+    for original, doc in zip(proposals, stored):
+        assert decode_proposal(doc, workspace_path=workspace_path) == original
+
+    encode_ms = _ms(lambda: [encode_proposal(p, workspace_path=workspace_path, mode="diff") for p in proposals], 1)
+    list_full_ms = _ms(lambda: [json.loads(d) for d in full_docs])
+    list_compact_ms = _ms(
+        lambda: [decode_proposal(json.loads(d), with_contents=False) for d in compact_docs]
+    )
+    detail_full_ms = _ms(lambda: json.loads(full_docs[0]))
+    detail_compact_ms = _ms(
+        lambda: decode_proposal(json.loads(compact_docs[0]), workspace_path=workspace_path)
+    )
+
+    print(f"\n{label}: {len(proposals)} proposals")
+    print(f"  stored size     full {full_bytes / 1024:>9.1f} KiB   diff {compact_bytes / 1024:>9.1f} KiB   ({compact_bytes / full_bytes:.1%})")
+    print(f"  list (parse)    full {list_full_ms:>9.2f} ms    diff {list_compact_ms:>9.2f} ms")
+    print(f"  detail (1 doc)  full {detail_full_ms:>9.2f} ms    diff {detail_compact_ms:>9.2f} ms")
+    print(f"  encode all                               {encode_ms:>9.2f} ms")
+
+
+def main() -> None:
+    rng = random.Random(7)
+    proposals = [
+        _proposal(i, rng.sample(SOURCE_FILES, rng.randrange(1, 4)), rng) for i in range(50)
+    ]
+    _report("Development-agent style proposals on tracked files", proposals, str(REPO_ROOT))
+
+    if len(sys.argv) > 1:
+        local_dir = Path(sys.argv[1])
+        local = [json.loads(p.read_text()) for p in sorted(local_dir.glob("*.json"))]
+        if local:
+            _report(f"Local proposals in {local_dir}", local, str(local_dir.parent))
+
+
+if __name__ == "__main__":
+    main()
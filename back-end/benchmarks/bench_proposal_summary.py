@@ -0,0 +1,88 @@
+"""
+Benchmark: list payloads, full ChangeProposal models vs ProposalSummary
+
+Builds a page of proposals with realistic file contents and diffs and
+compares response size and build+serialize time of the old list response
+(ChangeProposal per item) with the summary projection, plus a local
+summary page served from the SQLite index.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_proposal_summary [page_size]
+"""
+
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.models.proposal import ChangeProposal, ProposalSummary
+from app.services.local_proposal_store import LocalProposalStore
+from app.services.proposal_summary import to_summary, with_summary
+
+
+def _ms(fn, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def _proposal(i: int) -> dict:
+    before = "".join(f"line {n}\n" for n in range(3000))
+    after = before.replace("line 1", "LINE 1")
+    diff = "".join(f"-line 1{n}\n+LINE 1{n}\n" for n in range(300))
+    return {
+        "id": f"spec-{i}",
+        "agent_id": "spec",
+        "workspace_id": "default",
+        "title": f"Proposal {i}",
+        "description": "Update docs",
+        "status": "pending",
+        "created_at": f"2025-01-{1 + i % 28:02d}T{i % 24:02d}:00:00",
+        "diff": {"format": "unified", "content": diff * 3},
+        "proposed_changes": [
+            {
+                "file_path": f"docs/file_{n}.md",
+                "change_type": "update",
+                "description": "Update",
+                "before": before,
+                "after": after,
+                "diff": diff,
+            }
+            for n in range(3)
+        ],
+    }
+
+
+def main() -> None:
+    page_size = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    documents = [with_summary(_proposal(i)) for i in range(page_size)]
+
+    full = lambda: json.dumps([ChangeProposal(**d).model_dump(mode="json") for d in documents])
+    summary = lambda: json.dumps(
+        [ProposalSummary(**to_summary(d)).model_dump(mode="json") for d in documents]
+    )
+    full_bytes, summary_bytes = len(full()), len(summary())
+
+    print(f"page of {page_size} proposals")
+    print(f"  ChangeProposal payload       {full_bytes / 1024:>9.1f} KiB  {_ms(full):>8.1f} ms")
+    print(f"  ProposalSummary payload      {summary_bytes / 1024:>9.1f} KiB  {_ms(summary):>8.1f} ms")
+    print(f"  size ratio                   {full_bytes / summary_bytes:>9.0f}x")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp) / "proposals"
+        directory.mkdir()
+        for document in documents:
+            (directory / f"{document['id']}.json").write_text(json.dumps(document))
+        store = LocalProposalStore(directory)
+        print(f"  local page (bodies)          {_ms(lambda: store.page(page_size)):>9.1f} ms")
+        print(f"  local summary page (index)   {_ms(lambda: store.summary_page(page_size)):>9.2f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+Unit tests for the durable approval queue
+
+Tests cover:
+- Per-workspace ordering, parallelism across workspaces
+- Retries with checkpointed state, failure after the last attempt
+- Resuming unfinished tasks after a restart
+- Queues of several processes sharing a database (claims, expired leases)
+- Cancelling queued tasks
+- Approve endpoint returning before the background commit
+- Approve endpoint refusing (and not enqueueing) a failed Firestore approval
+- Approving a diff-only proposal applies its change (blob-backed contents)
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+import git
+import pytest
+from fastapi.testclient import TestClient
+
+from app import server
+from app.agents import diff_engine
+from app.git_context_manager import invalidate_git_context_manager
+from app.services import proposal_codec
+from app.services.blob_store import LocalBlobStore
+from app.services.approval_queue import ApprovalQueue, approval_handler, reset_approval_queue
+from app.services.jobs import JobStatus
+from app.services.local_proposal_store import reset_local_proposal_stores
+
+events = []
+gates = {}
+
+
+@approval_handler("test.record")
+async def _record(task):
+    events.append(("start", task.payload["n"]))
+    gate = gates.get(task.payload["n"])
+    if gate is not None:
+        await asyncio.get_running_loop().run_in_executor(None, gate.wait, 5)
+    await asyncio.sleep(0.01)
+    events.append(("end", task.payload["n"]))
+    return task.payload["n"]
+
+
+@approval_handler("test.flaky")
+async def _flaky(task):
+    if "first" not in task.state:
+        task.state["first"] = task.attempt
+        task.checkpoint("first")
+    if task.attempt < task.payload["fail_until"]:
+        raise RuntimeError(f"attempt {task.attempt} failed")
+    return {"first_step_attempt": task.state["first"], "attempt": task.attempt}
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    events.clear()
+    gates.clear()
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = ApprovalQueue(str(tmp_path / "queue.sqlite3"), retry_delay=0.01)
+    yield queue
+    queue.shutdown()
+
+
+def _wait(queue, task_id, timeout=5):
+    deadline = time.time() + timeout
+    task = queue.get(task_id)
+    while task["status"] not in JobStatus.FINISHED and time.time() < deadline:
+        time.sleep(0.01)
+        task = queue.get(task_id)
+    return task
+
+
+def test_tasks_of_a_workspace_run_in_order(queue):
+    jobs = [queue.enqueue("test.record", "ws", {"n": n}) for n in range(4)]
+
+    for job in jobs:
+        assert _wait(queue, job.id)["status"] == JobStatus.SUCCEEDED
+    assert events == [(kind, n) for n in range(4) for kind in ("start", "end")]
+    assert queue.get(jobs[2].id)["result"] == 2
+
+
+def test_workspaces_run_concurrently(queue):
+    gates[0] = threading.Event()
+    blocked = queue.enqueue("test.record", "ws-a", {"n": 0})
+    other = queue.enqueue("test.record", "ws-b", {"n": 1})
+
+    # ws-b finishes while ws-a is still blocked
+    assert _wait(queue, other.id)["status"] == JobStatus.SUCCEEDED
+    assert queue.get(blocked.id)["status"] == JobStatus.RUNNING
+    gates[0].set()
+    assert _wait(queue, blocked.id)["status"] == JobStatus.SUCCEEDED
+
+
+def test_retries_keep_checkpointed_state(queue):
+    job = queue.enqueue("test.flaky", "ws", {"fail_until": 3})
+
+    task = _wait(queue, job.id)
+
+    assert task["status"] == JobStatus.SUCCEEDED
+    assert task["result"] == {"first_step_attempt": 1, "attempt": 3}
+    assert task["metadata"]["attempts"] == 3
+
+
+def test_task_fails_after_max_attempts(tmp_path):
+    queue = ApprovalQueue(str(tmp_path / "queue.sqlite3"), max_attempts=2, retry_delay=0.01)
+    try:
+        job = queue.enqueue("test.flaky", "ws", {"fail_until": 10})
+        unknown = queue.enqueue("test.unknown", "ws", {})
+
+        task = _wait(queue, job.id)
+        assert task["status"] == JobStatus.FAILED
+        assert task["error"] == "attempt 2 failed"
+        assert job.status == JobStatus.FAILED
+        assert _wait(queue, unknown.id)["status"] == JobStatus.FAILED
+    finally:
+        queue.shutdown()
+
+
+def test_unfinished_tasks_resume_after_restart(tmp_path):
+    path = str(tmp_path / "queue.sqlite3")
+    gates[0] = threading.Event()
+    first = ApprovalQueue(path)
+    running = first.enqueue("test.record", "ws", {"n": 0})
+    queued = first.enqueue("test.record", "ws", {"n": 1})
+    deadline = time.time() + 5
+    while first.get(running.id)["status"] != JobStatus.RUNNING and time.time() < deadline:
+        time.sleep(0.01)
+    first.shutdown(timeout=0.5)
+    gates[0].set()
+
+    second = ApprovalQueue(path)
+    try:
+        assert second.start() == 2
+        assert _wait(second, running.id)["status"] == JobStatus.SUCCEEDED
+        assert _wait(second, queued.id)["status"] == JobStatus.SUCCEEDED
+    finally:
+        second.shutdown()
+
+
+def test_processes_sharing_the_database_never_run_a_task_twice(tmp_path):
+    path = str(tmp_path / "queue.sqlite3")
+    gates[0] = threading.Event()
+    first = ApprovalQueue(path, lease=0.1, poll_interval=0.01)  # Renewed while running
+    second = ApprovalQueue(path, poll_interval=0.01)
+    try:
+        running = first.enqueue("test.record", "ws", {"n": 0})
+        deadline = time.time() + 5
+        while first.get(running.id)["status"] != JobStatus.RUNNING and time.time() < deadline:
+            time.sleep(0.01)
+        later = second.enqueue("test.record", "ws", {"n": 1})
+
+        # Another process starting up leaves the running task alone
+        assert second.start() == 1
+        time.sleep(0.3)
+        assert events == [("start", 0)]
+        assert first.get(running.id)["status"] == JobStatus.RUNNING
+
+        gates[0].set()
+        assert _wait(second, later.id)["status"] == JobStatus.SUCCEEDED
+        assert events == [("start", 0), ("end", 0), ("start", 1), ("end", 1)]
+        assert first.get(running.id)["status"] == JobStatus.SUCCEEDED
+    finally:
+        first.shutdown()
+        second.shutdown()
+
+
+def test_task_with_expired_lease_is_taken_over(tmp_path):
+    path = str(tmp_path / "queue.sqlite3")
+    queue = ApprovalQueue(path)
+    job = queue.enqueue("test.record", "ws", {"n": 0})
+    _wait(queue, job.id)
+    # A process died while running the task
+    queue._execute(
+        "UPDATE tasks SET status = ?, owner = ?, lease_until = ? WHERE id = ?",
+        (JobStatus.RUNNING, "dead", time.time() - 1, job.id),
+    )
+    queue.shutdown()
+    events.clear()
+
+    resumed = ApprovalQueue(path)
+    try:
+        assert resumed.start() == 1
+        assert _wait(resumed, job.id)["status"] == JobStatus.SUCCEEDED
+        assert events == [("start", 0), ("end", 0)]
+    finally:
+        resumed.shutdown()
+
+
+def test_cancel_queued_task(queue):
+    gates[0] = threading.Event()
+    blocked = queue.enqueue("test.record", "ws", {"n": 0})
+    waiting = queue.enqueue("test.record", "ws", {"n": 1})
+
+    assert queue.cancel(waiting.id)
+    gates[0].set()
+    assert _wait(queue, blocked.id)["status"] == JobStatus.SUCCEEDED
+    assert queue.get(waiting.id)["status"] == JobStatus.CANCELLED
+    assert ("start", 1) not in events
+    assert not queue.cancel(blocked.id)
+
+
+def test_approve_returns_before_the_commit(tmp_path, monkeypatch):
+    directory = tmp_path / "proposals"
+    directory.mkdir()
+    proposal = {"id": "p-1", "workspace_id": "ws", "agent_id": "spec", "title": "T", "status": "pending"}
+    (directory / "p-1.json").write_text(json.dumps(proposal))
+    monkeypatch.delenv("FIRESTORE_ENABLED", raising=False)
+    monkeypatch.setenv("APPROVAL_QUEUE_DB", str(tmp_path / "queue.sqlite3"))
+    monkeypatch.setenv("CONTEXTPILOT_AUTO_APPROVE_PROPOSALS", "true")
+    monkeypatch.setattr(
+        server, "_proposals_paths", lambda workspace_id: {"json": tmp_path / "proposals.json", "dir": directory}
+    )
+    release = threading.Event()
+
+    async def slow_commit(workspace_id, proposal_ids):
+        await asyncio.get_running_loop().run_in_executor(None, release.wait, 5)
+        return {"commit_hash": "abc123", "applied": proposal_ids, "files_changed": [], "github_triggered": False}
+
+    from app.agents import git_agent
+
+    monkeypatch.setattr(git_agent, "commit_batch_via_agent", slow_commit)
+    reset_local_proposal_stores()
+    reset_approval_queue()
+    try:
+        client = TestClient(server.app)
+        data = client.post("/proposals/p-1/approve", params={"workspace_id": "ws"}).json()
+
+        assert data["status"] == "approved"
+        assert json.loads((directory / "p-1.json").read_text())["status"] == "approved"
+        assert client.get(f"/jobs/{data['job_id']}").json()["status"] in (JobStatus.QUEUED, JobStatus.RUNNING)
+
+        release.set()
+        deadline = time.time() + 5
+        while client.get(f"/jobs/{data['job_id']}").json()["status"] != JobStatus.SUCCEEDED:
+            assert time.time() < deadline
+            time.sleep(0.01)
+        assert json.loads((directory / "p-1.json").read_text())["commit_hash"] == "abc123"
+    finally:
+        reset_approval_queue()
+        reset_local_proposal_stores()
+
+
+def test_failed_firestore_approval_is_not_enqueued(monkeypatch):
+    class Repository:
+        async def get(self, proposal_id):
+            return {"id": proposal_id, "workspace_id": "ws", "status": "pending"}
+
+        async def approve(self, proposal_id):
+            return False  # Deleted meanwhile
+
+    enqueued = []
+    monkeypatch.setenv("FIRESTORE_ENABLED", "true")
+    monkeypatch.setattr(server, "get_async_proposal_repository", Repository)
+    monkeypatch.setattr(server, "_enqueue_approval", lambda *args: enqueued.append(args))
+
+    response = TestClient(server.app).post("/proposals/p-1/approve", params={"workspace_id": "ws"})
+
+    assert response.status_code == 409
+    assert enqueued == []
+
+
+def test_approve_applies_blob_backed_proposal(tmp_path, monkeypatch):
+    from app.utils import workspace_manager
+
+    workspace = tmp_path / "ws"
+    workspace.mkdir()
+    repo = git.Repo.init(workspace)
+    before = "".join(f"line {i}\n" for i in range(80)) + "last line"  # No trailing newline
+    after = before.replace("line 40\n", "line forty\n") + " changed"
+    (workspace / "notes.txt").write_text(before)
+    repo.index.add(["notes.txt"])
+    repo.index.commit("init")
+
+    # difflib-style diff that can't be applied: contents go to the blob store
+    diff = "".join(
+        diff_engine.unified_diff(before.splitlines(True), after.splitlines(True), "a/notes.txt", "b/notes.txt")
+    )
+    change = {"file_path": "notes.txt", "change_type": "update", "before": before, "after": after, "diff": diff}
+    proposal = {
+        "id": "p-1",
+        "workspace_id": "ws",
+        "agent_id": "spec",
+        "title": "T",
+        "status": "pending",
+        "proposed_changes": [change],
+    }
+    store = LocalBlobStore(str(tmp_path / "blobs"))
+    monkeypatch.setattr(proposal_codec, "get_blob_store", lambda: store)
+    document = proposal_codec.encode_proposal(proposal, workspace_path=str(workspace), mode="diff")
+    assert "after" not in document["proposed_changes"][0] and "after_blob" in document["proposed_changes"][0]
+    (workspace / "proposals").mkdir()
+    (workspace / "proposals" / "p-1.json").write_text(json.dumps(document))
+
+    monkeypatch.setattr(workspace_manager, "BASE_DIR", str(tmp_path))
+    monkeypatch.chdir(workspace)  # The git root is found from the working directory
+    monkeypatch.delenv("FIRESTORE_ENABLED", raising=False)
+    monkeypatch.delenv("ENVIRONMENT", raising=False)
+    monkeypatch.delenv("USE_PUBSUB", raising=False)
+    monkeypatch.setenv("APPROVAL_QUEUE_DB", str(tmp_path / "queue.sqlite3"))
+    monkeypatch.setenv("CONTEXTPILOT_AUTO_APPROVE_PROPOSALS", "true")
+    invalidate_git_context_manager()
+    reset_local_proposal_stores()
+    reset_approval_queue()
+    try:
+        client = TestClient(server.app)
+        data = client.post("/proposals/p-1/approve", params={"workspace_id": "ws"}).json()
+
+        deadline = time.time() + 10
+        while client.get(f"/jobs/{data['job_id']}").json()["status"] not in JobStatus.FINISHED:
+            assert time.time() < deadline
+            time.sleep(0.01)
+        assert client.get(f"/jobs/{data['job_id']}").json()["status"] == JobStatus.SUCCEEDED
+        assert (workspace / "notes.txt").read_text() == after
+        [commit] = [c for c in repo.iter_commits() if "Proposal-ID: p-1" in c.message]
+        assert "notes.txt" in commit.stats.files
+    finally:
+        reset_approval_queue()
+        reset_local_proposal_stores()
+        invalidate_git_context_manager()
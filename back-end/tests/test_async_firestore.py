@@ -0,0 +1,189 @@
+"""
+Unit tests for the async Firestore path
+
+Tests cover:
+- Batched get_all reads with bounded concurrency
+- One AsyncFirestoreService per event loop
+- AsyncProposalRepository reads, reviews and bulk updates (sharing the sync
+  repository's cache and the change feed)
+- Handlers awaiting the async repository
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import server
+from app.repositories import proposal_repository
+from app.services import firestore_service
+from app.services.proposal_feed import get_proposal_feed, reset_proposal_feed
+
+
+def _proposal(proposal_id, status="pending"):
+    return {
+        "id": proposal_id,
+        "workspace_id": "ws",
+        "agent_id": "spec",
+        "title": f"Proposal {proposal_id}",
+        "status": status,
+        "created_at": "2025-01-09T10:00:00",
+    }
+
+
+class _FakeAsyncClient:
+    """Async client whose get_all reports how many calls overlap."""
+
+    def __init__(self, project=None):
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def collection(self, name):
+        return SimpleNamespace(document=lambda pid: SimpleNamespace(id=pid))
+
+    async def get_all(self, refs, field_paths=None):
+        self.calls.append([ref.id for ref in refs])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        for ref in refs:
+            exists = ref.id != "missing"
+            yield SimpleNamespace(id=ref.id, exists=exists, to_dict=lambda pid=ref.id: _proposal(pid))
+
+
+@pytest.fixture
+def async_client(monkeypatch):
+    monkeypatch.setenv("GCP_PROJECT_ID", "test")
+    monkeypatch.setattr(firestore_service.firestore, "AsyncClient", _FakeAsyncClient)
+    firestore_service.reset_async_firestore_service()
+    yield
+    firestore_service.reset_async_firestore_service()
+
+
+def test_get_proposals_batches_with_bounded_concurrency(async_client, monkeypatch):
+    monkeypatch.setattr(firestore_service, "FIRESTORE_GET_ALL_CHUNK", 2)
+    ids = [f"p-{i}" for i in range(6)] + ["missing", "p-0"]
+
+    async def read():
+        service = firestore_service.AsyncFirestoreService(max_concurrency=2)
+        return service, await service.get_proposals(ids)
+
+    service, found = asyncio.run(read())
+
+    assert sorted(found) == [f"p-{i}" for i in range(6)]
+    # Duplicates dropped, 7 documents in chunks of 2, at most 2 RPCs at once
+    assert [len(c) for c in service.db.calls] == [2, 2, 2, 1]
+    assert service.db.max_in_flight == 2
+
+
+def test_one_service_per_event_loop(async_client):
+    async def services():
+        return firestore_service.get_async_firestore_service(), firestore_service.get_async_firestore_service()
+
+    first, again = asyncio.run(services())
+    other, _ = asyncio.run(services())
+
+    assert first is again
+    assert other is not first
+
+
+@pytest.fixture
+def repos(monkeypatch):
+    documents = {"p-1": _proposal("p-1"), "p-2": _proposal("p-2")}
+    sync_firestore = MagicMock()
+    sync_firestore.get_proposal.side_effect = lambda pid: dict(documents[pid]) if pid in documents else None
+    async_firestore = AsyncMock()
+    async_firestore.get_proposal.side_effect = lambda pid: dict(documents[pid]) if pid in documents else None
+    async_firestore.get_proposals.side_effect = lambda ids, fields=None: {
+        pid: dict(documents[pid]) for pid in ids if pid in documents
+    }
+
+    def transition(ids, plan):
+        read = {pid: dict(documents[pid]) for pid in ids if pid in documents}
+        for pid, fields in plan(MagicMock(), read).items():
+            documents[pid].update(fields)
+        return read
+
+    async_firestore.transition_proposals.side_effect = transition
+    async_firestore.db = MagicMock()
+    monkeypatch.setattr(proposal_repository, "get_firestore_service", lambda project_id=None: sync_firestore)
+    monkeypatch.setattr(proposal_repository, "get_async_firestore_service", lambda project_id=None: async_firestore)
+    proposal_repository.reset_proposal_repository()
+    reset_proposal_feed()
+    yield SimpleNamespace(documents=documents, sync_firestore=sync_firestore, async_firestore=async_firestore)
+    proposal_repository.reset_proposal_repository()
+    reset_proposal_feed()
+
+
+def _async_repo():
+    repo = proposal_repository.AsyncProposalRepository()
+    repo.counters = MagicMock(apply_async=AsyncMock())
+    return repo
+
+
+def test_async_repository_shares_the_cache(repos):
+    sync_repo = proposal_repository.get_proposal_repository()
+
+    async def review():
+        repo = _async_repo()
+        cached = await repo.get("p-1")  # read by the sync repository below
+        approved = await repo.approve("p-1")
+        return repo, cached, approved
+
+    sync_repo.get("p-1")
+    repo, cached, approved = asyncio.run(review())
+
+    assert cached["status"] == "pending" and approved
+    repos.async_firestore.get_proposal.assert_not_awaited()  # the approve reads in its transaction
+    # The approval invalidated the shared cache
+    assert sync_repo.get("p-1")["status"] == "approved"
+    repos.async_firestore.transition_proposals.assert_awaited_once()
+    repo.counters.add_to_batch.assert_called_once()  # counted in the transaction
+    change = get_proposal_feed().changes()["changes"][0]
+    assert (change["proposal_id"], change["type"], change["previous_status"]) == ("p-1", "status_changed", "pending")
+
+
+def test_async_bulk_and_missing(repos):
+    async def run():
+        repo = _async_repo()
+        results = await repo.bulk_update_status(["p-1", "p-2", "p-3"], "rejected", reason="dup")
+        return results, await repo.get("p-3"), await repo.get("p-3")
+
+    results, missing, again = asyncio.run(run())
+
+    assert results == {"p-1": "rejected", "p-2": "rejected", "p-3": "not_found"}
+    assert repos.documents["p-2"]["rejection_reason"] == "dup"
+    assert missing is None and again is None
+    assert repos.async_firestore.get_proposal.await_count == 1
+    repos.async_firestore.transition_proposals.assert_awaited_once()
+
+
+def test_async_list_backfills_summaries_concurrently(repos):
+    repos.async_firestore.list_proposals_page.side_effect = None
+    repos.async_firestore.list_proposals_page.return_value = (
+        [{"id": "p-1", "title": "Proposal p-1", "status": "pending"}, {"id": "p-2", "title": "Proposal p-2"}],
+        "next",
+    )
+
+    summaries, cursor = asyncio.run(_async_repo().list_summaries(workspace_id="ws", limit=2))
+
+    assert cursor == "next" and [s["id"] for s in summaries] == ["p-1", "p-2"]
+    assert repos.async_firestore.set_proposal_summary.await_count == 2
+    assert repos.async_firestore.list_proposals_page.call_args.kwargs["limit"] == 2
+
+
+def test_handlers_await_the_async_repository(repos, monkeypatch):
+    monkeypatch.setenv("FIRESTORE_ENABLED", "true")
+    monkeypatch.setattr(server, "_enqueue_approval", lambda *args: "job-1")
+    client = TestClient(server.app)
+
+    assert client.get("/proposals/p-1", params={"workspace_id": "ws"}).json()["title"] == "Proposal p-1"
+    approved = client.post("/proposals/p-1/approve", params={"workspace_id": "ws"}).json()
+
+    assert approved["status"] == "approved" and approved["job_id"] == "job-1"
+    assert repos.documents["p-1"]["status"] == "approved"
+    repos.sync_firestore.get_proposal.assert_not_called()
@@ -0,0 +1,97 @@
+"""
+Unit tests for the content-addressed blob store
+
+Tests cover:
+- Deduplication and compression of stored contents
+- Reference counting and garbage collection with a grace period
+- Corrupt objects are not returned
+- No lost refcount updates across processes
+- Admin endpoint running the garbage collection
+"""
+
+import multiprocessing
+import os
+import zlib
+
+from fastapi.testclient import TestClient
+
+from app import server
+
+from app.services.blob_store import LocalBlobStore, blob_digest
+
+
+CONTENT = "".join(f"def handler_{i}():\n    return {i}\n\n" for i in range(200))
+
+
+def test_put_is_content_addressed_and_deduplicated(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+
+    digest = store.put(CONTENT)
+    assert digest == blob_digest(CONTENT.encode("utf-8"))
+    assert store.put(CONTENT) == digest
+    assert store.refcount(digest) == 2
+    assert store.get_text(digest) == CONTENT
+
+    stats = store.stats()
+    assert stats["blobs"] == 1 and stats["references"] == 2
+    assert stats["stored_bytes"] < len(CONTENT) / 4
+
+
+def test_refcounts_survive_reopen(tmp_path):
+    digest = LocalBlobStore(str(tmp_path)).put(CONTENT)
+    other = LocalBlobStore(str(tmp_path))
+    other.put(CONTENT)
+    assert LocalBlobStore(str(tmp_path)).refcount(digest) == 2
+
+
+def test_gc_removes_unreferenced_after_grace(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    kept = store.put("kept" * 200)
+    dropped = store.put(CONTENT)
+    store.decref(dropped)
+
+    assert store.gc(grace_seconds=3600) == 0  # Still within the grace period
+    assert store.gc(grace_seconds=0) == 1
+    assert not store.exists(dropped) and store.get(dropped) is None
+    assert store.get_text(kept) == "kept" * 200
+
+    # Decref of an unknown digest is a no-op
+    store.decref(dropped)
+    assert store.refcount(dropped) == 0
+
+
+def test_corrupt_object_is_not_returned(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    digest = store.put(CONTENT)
+    with open(os.path.join(str(tmp_path), "objects", digest[:2], digest[2:]), "wb") as f:
+        f.write(zlib.compress(b"tampered"))
+    assert store.get(digest) is None
+
+
+def _put_many(root: str, times: int) -> None:
+    store = LocalBlobStore(root)
+    for _ in range(times):
+        store.put(CONTENT)
+
+
+def test_no_lost_refcounts_across_processes(tmp_path):
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_put_many, args=(str(tmp_path), 25)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+
+    assert [w.exitcode for w in workers] == [0, 0, 0, 0]
+    assert LocalBlobStore(str(tmp_path)).refcount(blob_digest(CONTENT.encode("utf-8"))) == 100
+
+
+def test_gc_admin_endpoint(tmp_path, monkeypatch):
+    store = LocalBlobStore(str(tmp_path))
+    store.decref(store.put(CONTENT))
+    monkeypatch.setattr(server, "get_blob_store", lambda: store)
+    client = TestClient(server.app)
+
+    assert client.post("/admin/blob-store/gc").json()["removed"] == 0  # Default grace period
+    assert client.post("/admin/blob-store/gc", params={"grace_seconds": 0}).json()["removed"] == 1
+    assert client.get("/admin/blob-store").json()["blobs"] == 0
@@ -0,0 +1,202 @@
+"""
+Unit tests for bulk approve/reject
+
+Tests cover:
+- Combined counter deltas for several transitions
+- One Firestore transaction reading the proposals and writing status updates
+  and counters (deltas computed from the attempt that committed)
+- One local index transaction and a single background commit task from
+  POST /proposals/bulk
+"""
+
+import json
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import server
+from app.repositories import proposal_repository
+from app.services.approval_queue import reset_approval_queue
+from app.services.jobs import get_job_registry
+from app.services.local_proposal_store import reset_local_proposal_stores
+from app.services.proposal_counters import batch_deltas, bucket_id, transition_deltas
+
+
+def _proposal(proposal_id, status="pending", **extra):
+    proposal = {
+        "id": proposal_id,
+        "workspace_id": "ws",
+        "agent_id": "spec",
+        "title": f"Proposal {proposal_id}",
+        "status": status,
+        "created_at": "2025-01-09T10:00:00",
+    }
+    proposal.update(extra)
+    return proposal
+
+
+def test_batch_deltas_sum_transitions_per_bucket():
+    transitions = [(_proposal(f"p-{i}"), _proposal(f"p-{i}", status="approved")) for i in range(3)]
+
+    deltas = batch_deltas(transitions)
+
+    assert deltas[bucket_id("ws", None, "all")] == {"by_status": {"pending": -3, "approved": 3}}
+    assert batch_deltas([transitions[0]]) == transition_deltas(*transitions[0])
+
+
+class _Transactions:
+    """transition_proposals of a fake Firestore: each attempt reads the next snapshot of the documents."""
+
+    def __init__(self, *attempts):
+        self.attempts = list(attempts)
+        self.committed = None
+
+    def __call__(self, proposal_ids, plan):
+        for documents in self.attempts:
+            transaction = MagicMock()
+            read = {pid: dict(documents[pid]) for pid in proposal_ids if pid in documents}
+            updates = plan(transaction, read)
+        self.committed = (transaction, updates)
+        return read
+
+
+def test_repository_bulk_update_is_one_transaction(monkeypatch):
+    firestore = MagicMock()
+    firestore.transition_proposals.side_effect = transactions = _Transactions({
+        "p-1": _proposal("p-1"),
+        "p-2": _proposal("p-2"),
+        "p-3": _proposal("p-3", status="approved"),
+    })
+    monkeypatch.setattr(proposal_repository, "get_firestore_service", lambda project_id=None: firestore)
+    repo = proposal_repository.ProposalRepository()
+
+    results = repo.bulk_update_status(["p-1", "p-2", "p-3", "missing"], "approved", commit_hash="abc")
+
+    assert results == {"p-1": "approved", "p-2": "approved", "p-3": "unchanged", "missing": "not_found"}
+    firestore.transition_proposals.assert_called_once()
+    firestore.update_proposal.assert_not_called()
+    firestore.update_proposals.assert_not_called()
+    transaction, updates = transactions.committed
+    assert set(updates) == {"p-1", "p-2"}
+    assert updates["p-1"]["commit_hash"] == "abc"
+    # Counter increments ride in the same transaction as the status updates
+    assert transaction.set.call_count == 2  # all-time and daily bucket, written once each
+    transaction.commit.assert_not_called()
+
+
+def test_repository_bulk_update_raises_when_transaction_fails(monkeypatch):
+    firestore = MagicMock()
+    firestore.transition_proposals.return_value = None
+    monkeypatch.setattr(proposal_repository, "get_firestore_service", lambda project_id=None: firestore)
+    repo = proposal_repository.ProposalRepository()
+
+    with pytest.raises(RuntimeError):
+        repo.bulk_update_status(["p-1"], "rejected", reason="duplicate")
+
+
+def test_reviews_are_counted_from_the_committed_read(monkeypatch):
+    # The first attempt read p-1 as pending; another reviewer approved it and
+    # the transaction was retried with the fresh documents
+    stale = {"p-1": _proposal("p-1"), "p-2": _proposal("p-2")}
+    fresh = {"p-1": _proposal("p-1", status="approved"), "p-2": _proposal("p-2")}
+    firestore = MagicMock()
+    monkeypatch.setattr(proposal_repository, "get_firestore_service", lambda project_id=None: firestore)
+    repo = proposal_repository.ProposalRepository()
+    repo.counters.add_to_batch = MagicMock()
+    all_time = bucket_id("ws", None, "all")
+
+    firestore.transition_proposals.side_effect = transactions = _Transactions(stale, fresh)
+    assert repo.reject("p-1")
+    assert repo.counters.add_to_batch.call_args.args[0] is transactions.committed[0]
+    assert repo.counters.add_to_batch.call_args.args[1][all_time]["by_status"] == {"approved": -1, "rejected": 1}
+
+    firestore.transition_proposals.side_effect = _Transactions(stale, fresh)
+    results = repo.bulk_update_status(["p-1", "p-2"], "approved")
+    assert results == {"p-1": "unchanged", "p-2": "approved"}
+    assert repo.counters.add_to_batch.call_args.args[1][all_time]["by_status"] == {"pending": -1, "approved": 1}
+
+    firestore.transition_proposals.side_effect = _Transactions({})
+    assert not repo.approve("p-1")
+
+
+@pytest.fixture
+def local_workspace(tmp_path, monkeypatch):
+    directory = tmp_path / "proposals"
+    directory.mkdir()
+    for i in range(3):
+        (directory / f"p-{i}.json").write_text(json.dumps(_proposal(f"p-{i}")))
+    (directory / "p-0.md").write_text("# Proposal p-0\n")
+    monkeypatch.delenv("FIRESTORE_ENABLED", raising=False)
+    monkeypatch.setenv("APPROVAL_QUEUE_DB", str(tmp_path / "queue.sqlite3"))
+    monkeypatch.setattr(
+        server, "_proposals_paths", lambda workspace_id: {"json": tmp_path / "proposals.json", "dir": directory}
+    )
+    reset_local_proposal_stores()
+    reset_approval_queue()
+    yield directory
+    reset_approval_queue()
+    reset_local_proposal_stores()
+
+
+def _wait(job_id, timeout=5):
+    job = get_job_registry().get(job_id)
+    deadline = time.time() + timeout
+    while not job.finished and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_bulk_approve_local_queues_one_commit(local_workspace, monkeypatch):
+    calls = []
+
+    async def fake_commit_batch(workspace_id, proposal_ids):
+        calls.append(list(proposal_ids))
+        return {"commit_hash": "c0ffee", "applied": proposal_ids, "files_changed": [], "github_triggered": False}
+
+    from app.agents import git_agent
+
+    monkeypatch.setattr(git_agent, "commit_batch_via_agent", fake_commit_batch)
+    monkeypatch.setenv("CONTEXTPILOT_AUTO_APPROVE_PROPOSALS", "true")
+    client = TestClient(server.app)
+
+    response = client.post(
+        "/proposals/bulk", json={"ids": ["p-0", "p-1", "missing"], "action": "approve"}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["results"] == {"p-0": "approved", "p-1": "approved", "missing": "not_found"}
+    assert _wait(data["job_id"]).result["commit_hash"] == "c0ffee"
+    assert calls == [["p-0", "p-1"]]
+    stored = json.loads((local_workspace / "p-1.json").read_text())
+    assert stored["status"] == "approved" and stored["commit_hash"] == "c0ffee"
+    assert "**Commit:** c0ffee" in (local_workspace / "p-0.md").read_text()
+    assert json.loads((local_workspace / "p-2.json").read_text())["status"] == "pending"
+
+    again = client.post("/proposals/bulk", json={"ids": ["p-0"], "action": "approve"}).json()
+    assert again["results"] == {"p-0": "unchanged"}
+    assert again["job_id"] is None
+    assert len(calls) == 1
+
+
+def test_bulk_reject_local(local_workspace, monkeypatch):
+    monkeypatch.delenv("CONTEXTPILOT_AUTO_APPROVE_PROPOSALS", raising=False)
+    client = TestClient(server.app)
+
+    data = client.post(
+        "/proposals/bulk", json={"ids": ["p-1", "p-2"], "action": "reject", "reason": "stale"}
+    ).json()
+
+    assert data["results"] == {"p-1": "rejected", "p-2": "rejected"}
+    assert data["job_id"] is None
+    assert json.loads((local_workspace / "p-2.json").read_text())["reason"] == "stale"
+    counts = server.get_local_proposal_store(local_workspace).stats()["by_status"]
+    assert counts == {"pending": 1, "rejected": 2}
+
+
+def test_bulk_request_validation(local_workspace):
+    client = TestClient(server.app)
+    assert client.post("/proposals/bulk", json={"ids": [], "action": "approve"}).status_code == 422
+    assert client.post("/proposals/bulk", json={"ids": ["p-1"], "action": "merge"}).status_code == 422
@@ -0,0 +1,113 @@
+"""
+Unit tests for the line diff engine
+
+Tests cover:
+- Byte-identical unified output vs difflib on unambiguous edits
+- Opcodes always reconstruct the new sequence
+- Minimal edit scripts from the Myers path
+- Format edge cases (empty input, no trailing newline, lineterm)
+"""
+
+import difflib
+import random
+
+import pytest
+
+from app.agents import diff_engine
+from app.agents.diff_generator import generate_unified_diff
+
+
+def _apply(a, b, opcodes):
+    out = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == "equal":
+            assert a[i1:i2] == b[j1:j2]
+            out += a[i1:i2]
+        else:
+            out += b[j1:j2]
+    return out
+
+
+def _lcs(a, b):
+    table = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i, x in enumerate(a):
+        for j, y in enumerate(b):
+            table[i + 1][j + 1] = table[i][j] + 1 if x == y else max(table[i][j + 1], table[i + 1][j])
+    return table[-1][-1]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_identical_to_difflib_on_unique_lines(seed):
+    rng = random.Random(seed)
+    a = [f"line {i}\n" for i in range(300)]
+    b = list(a)
+    for k in sorted(rng.sample(range(len(b)), 8), reverse=True):
+        choice = rng.random()
+        if choice < 0.4:
+            b[k] = f"changed {k}\n"
+        elif choice < 0.7:
+            del b[k]
+        else:
+            b.insert(k, f"new {k}\n")
+
+    expected = "".join(difflib.unified_diff(a, b, "a/f.py", "b/f.py"))
+    assert "".join(diff_engine.unified_diff(a, b, "a/f.py", "b/f.py")) == expected
+
+
+def test_opcodes_reconstruct_random_inputs():
+    rng = random.Random(7)
+    for _ in range(500):
+        alphabet = rng.choice([2, 3, 10, 1000])
+        a = [rng.randrange(alphabet) for _ in range(rng.randrange(50))]
+        b = [rng.randrange(alphabet) for _ in range(rng.randrange(50))]
+        assert _apply(a, b, diff_engine.get_opcodes(a, b)) == b
+
+
+def test_myers_path_is_minimal(monkeypatch):
+    # Disable patience anchoring so every region goes through Myers
+    monkeypatch.setattr(diff_engine._Differ, "_patience_anchors", lambda self, *args: [])
+    rng = random.Random(3)
+    for _ in range(300):
+        a = [rng.randrange(3) for _ in range(rng.randrange(30))]
+        b = [rng.randrange(3) for _ in range(rng.randrange(30))]
+        edits = sum(
+            (i2 - i1) + (j2 - j1)
+            for tag, i1, i2, j1, j2 in diff_engine.get_opcodes(a, b)
+            if tag != "equal"
+        )
+        assert edits == len(a) + len(b) - 2 * _lcs(a, b)
+
+
+def test_cost_limit_still_produces_valid_diff():
+    rng = random.Random(11)
+    a = [rng.randrange(4) for _ in range(400)]
+    b = [rng.randrange(4) for _ in range(400)]
+    differ = diff_engine._Differ(a, b, max_cost=5)
+    blocks = differ.run() + [(len(a), len(b), 0)]
+    for i, j, size in blocks:
+        assert a[i:i + size] == b[j:j + size]
+
+
+@pytest.mark.parametrize(
+    "a,b",
+    [
+        ([], []),
+        ([], ["x\n"]),
+        (["x\n"], []),
+        (["x\n", "y\n"], ["x\n", "y\n"]),
+        (["x\n", "y"], ["x\n", "z"]),
+    ],
+)
+def test_format_edge_cases(a, b):
+    assert list(diff_engine.unified_diff(a, b, "a", "b")) == list(difflib.unified_diff(a, b, "a", "b"))
+    assert list(diff_engine.unified_diff(a, b, "a", "b", "d1", "d2", n=0, lineterm="")) == list(
+        difflib.unified_diff(a, b, "a", "b", "d1", "d2", n=0, lineterm="")
+    )
+
+
+def test_generate_unified_diff_uses_engine():
+    old = "".join(f'"pkg-{i}": "1.0.0",\n' for i in range(2000))
+    new = old.replace('"pkg-1000": "1.0.0"', '"pkg-1000": "2.0.0"')
+    diff = generate_unified_diff("package-lock.json", old, new)
+    assert diff.startswith("--- a/package-lock.json\n+++ b/package-lock.json\n@@ -998,7 +998,7 @@\n")
+    assert '-"pkg-1000": "1.0.0",\n+"pkg-1000": "2.0.0",\n' in diff
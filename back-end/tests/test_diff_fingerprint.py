@@ -0,0 +1,173 @@
+"""
+Unit tests for diff fingerprints and near-duplicate detection
+
+Tests cover:
+- Fingerprints ignore whitespace, context lines, hunk offsets and file order
+- Hunks parsed by line counts (changed lines starting with -- or ++ kept)
+- MinHash similarity separates near-duplicates from unrelated changes
+- Duplicate lookups in the local index and the repository (near-duplicate
+  candidates filtered by workspace and status in Firestore)
+"""
+
+import json
+from unittest.mock import MagicMock
+
+from app.repositories import proposal_repository
+from app.services.diff_fingerprint import (
+    BANDS_KEY,
+    FINGERPRINT_KEY,
+    MINHASH_KEY,
+    diff_fingerprint,
+    fingerprint_fields,
+    minhash_signature,
+    normalize_diff,
+    similarity,
+)
+from app.services.local_proposal_store import LocalProposalStore
+
+
+def _diff(path, lines, start=1, context="unchanged"):
+    body = "".join(f"+{line}\n" for line in lines)
+    return f"--- a/{path}\n+++ b/{path}\n@@ -{start},1 +{start},{len(lines) + 1} @@\n {context}\n{body}"
+
+
+def _proposal(proposal_id="p-1", files=None, status="pending"):
+    files = files or {"app.py": [f"value_{i} = {i}" for i in range(40)]}
+    return {
+        "id": proposal_id,
+        "workspace_id": "ws",
+        "status": status,
+        "created_at": "2025-01-01T00:00:00",
+        "proposed_changes": [
+            {"file_path": path, "change_type": "update", "diff": _diff(path, lines)}
+            for path, lines in files.items()
+        ],
+    }
+
+
+def test_fingerprint_is_whitespace_and_context_insensitive():
+    lines = ["def f(x):", "    return x + 1"]
+    base = {"proposed_changes": [{"file_path": "a.py", "diff": _diff("a.py", lines)}]}
+    reformatted = {
+        "proposed_changes": [
+            {
+                "file_path": "a.py",
+                "diff": _diff("a.py", ["def f( x ):", "\treturn x+1"], start=40, context="other"),
+            }
+        ]
+    }
+    assert diff_fingerprint(base) == diff_fingerprint(reformatted)
+
+    changed = {"proposed_changes": [{"file_path": "a.py", "diff": _diff("a.py", ["def f(x):", "return x + 2"])}]}
+    assert diff_fingerprint(base) != diff_fingerprint(changed)
+
+
+def test_changed_lines_that_look_like_headers_are_kept():
+    def removal(comment):
+        return {"proposed_changes": [{
+            "file_path": "q.sql",
+            "diff": f"--- a/q.sql\n+++ b/q.sql\n@@ -1,2 +1,1 @@\n-{comment}\n SELECT 1;\n",
+        }]}
+
+    assert normalize_diff(removal("-- old comment")["proposed_changes"][0]["diff"]) == ["---oldcomment"]
+    assert diff_fingerprint(removal("-- old comment")) is not None
+    assert diff_fingerprint(removal("-- old comment")) != diff_fingerprint(removal("-- other comment"))
+
+    added = "--- a/c.c\n+++ b/c.c\n@@ -1 +1,2 @@\n x = 1;\n+++x;\n\\ No newline at end of file\n"
+    assert normalize_diff(added) == ["+++x;"]
+
+
+def test_fingerprint_ignores_file_order_but_not_paths():
+    files = {"a.py": ["x = 1"], "b.py": ["y = 2"]}
+    reordered = dict(reversed(list(files.items())))
+    assert diff_fingerprint(_proposal(files=files)) == diff_fingerprint(_proposal(files=reordered))
+    assert diff_fingerprint(_proposal(files={"c.py": ["x = 1"], "b.py": ["y = 2"]})) != diff_fingerprint(
+        _proposal(files=files)
+    )
+
+
+def test_overall_diff_only_and_empty_proposals():
+    spec = {"proposed_changes": [{"file_path": "README.md"}], "diff": {"content": "+# Title\n"}}
+    assert diff_fingerprint(spec) is not None
+    assert diff_fingerprint({"proposed_changes": []}) is None
+    assert fingerprint_fields({"proposed_changes": []}) == {}
+
+
+def test_minhash_similarity():
+    lines = [f"value_{i} = {i}" for i in range(200)]
+    near = lines[:]
+    near[100] = "value_100 = -1"
+    unrelated = [f"other_{i} = {i * 7}" for i in range(200)]
+
+    base = minhash_signature(_proposal(files={"app.py": lines}))
+    assert similarity(base, minhash_signature(_proposal(files={"app.py": near}))) >= 0.8
+    assert similarity(base, minhash_signature(_proposal(files={"app.py": unrelated}))) < 0.2
+
+
+def test_local_store_finds_exact_and_near_duplicates(tmp_path):
+    directory = tmp_path / "proposals"
+    directory.mkdir()
+    lines = [f"value_{i} = {i}" for i in range(200)]
+    (directory / "p-1.json").write_text(json.dumps(_proposal("p-1", {"app.py": lines})))
+    (directory / "p-2.json").write_text(json.dumps(_proposal("p-2", {"lib.py": ["z = 0"]}, status="approved")))
+    store = LocalProposalStore(directory)
+
+    assert store.find_duplicate(_proposal("new", {"app.py": lines})) == "p-1"
+    # Only pending proposals match by default
+    assert store.find_duplicate(_proposal("new", {"lib.py": ["z = 0"]})) is None
+    assert store.find_duplicate(_proposal("new", {"lib.py": ["z = 0"]}), status=None) == "p-2"
+
+    near = lines[:]
+    near[50] = "value_50 = 'changed'"
+    assert store.find_duplicate(_proposal("new", {"app.py": near})) is None
+    assert store.find_duplicate(_proposal("new", {"app.py": near}), near_threshold=0.8) == "p-1"
+
+    (directory / "p-1.json").unlink()
+    assert store.find_duplicate(_proposal("new", {"app.py": near}), near_threshold=0.8) is None
+    store.close()
+
+
+def test_repository_find_duplicate_is_a_point_lookup(monkeypatch):
+    firestore = MagicMock()
+    firestore.find_proposals_by_fingerprint.return_value = [{"id": "p-1"}]
+    monkeypatch.setattr(proposal_repository, "get_firestore_service", lambda project_id=None: firestore)
+    repo = proposal_repository.ProposalRepository()
+
+    assert repo.find_duplicate(_proposal("new")) == "p-1"
+    args, kwargs = firestore.find_proposals_by_fingerprint.call_args
+    assert args == ("ws", diff_fingerprint(_proposal("new")))
+    assert kwargs["status"] == "pending"
+    firestore.list_proposals.assert_not_called()
+
+    firestore.find_proposals_by_fingerprint.return_value = []
+    assert repo.find_duplicate(_proposal("new")) is None
+    firestore.find_proposals_by_bands.assert_not_called()
+
+
+def test_repository_near_duplicates_are_queried_per_workspace_and_status(monkeypatch):
+    firestore = MagicMock()
+    firestore.find_proposals_by_fingerprint.return_value = []
+    existing = fingerprint_fields(_proposal("p-1"))
+    firestore.find_proposals_by_bands.return_value = [{"id": "p-1", MINHASH_KEY: existing[MINHASH_KEY]}]
+    monkeypatch.setattr(proposal_repository, "get_firestore_service", lambda project_id=None: firestore)
+    repo = proposal_repository.ProposalRepository()
+
+    assert repo.find_duplicate(_proposal("new"), near_threshold=0.8) == "p-1"
+    args, kwargs = firestore.find_proposals_by_bands.call_args
+    assert args == ("ws", existing[BANDS_KEY])
+    assert kwargs["status"] == "pending"
+
+
+def test_repository_create_stores_fingerprint(monkeypatch):
+    firestore = MagicMock()
+    monkeypatch.setattr(proposal_repository, "get_firestore_service", lambda project_id=None: firestore)
+    monkeypatch.setattr(proposal_repository.ProposalRepository, "_count", lambda self, before, after: None)
+    repo = proposal_repository.ProposalRepository()
+
+    proposal = _proposal("p-9")
+    proposal.update(agent_id="development", title="Add values")
+    repo.create(proposal)
+
+    document = firestore.create_proposal.call_args.args[0]
+    assert document[FINGERPRINT_KEY] == diff_fingerprint(_proposal("p-9"))
+    assert len(document["minhash_bands"]) == 16
@@ -0,0 +1,67 @@
+"""
+Unit tests for the compute pool and diff service
+
+Tests cover:
+- Pool work runs in worker processes, with a thread fallback
+- Inline vs offloaded diffs give identical results, in input order
+- Diff summaries
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from app.agents.diff_generator import generate_diff_summary, generate_line_diff, generate_unified_diff
+from app.services.compute_pool import ComputePool
+from app.services.diff_service import DiffService
+
+
+def _pid() -> int:
+    return os.getpid()
+
+
+def _source(n: int, tag: str = "") -> str:
+    return "".join(f"def f{i}():\n    return {i}{tag if i % 97 == 0 else ''}\n" for i in range(n))
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = ComputePool(max_workers=2)
+    yield pool
+    pool.shutdown()
+
+
+def test_pool_runs_in_worker_processes(pool):
+    assert asyncio.run(pool.run(_pid)) != os.getpid()
+    assert pool.submit(_pid).result(timeout=60) != os.getpid()
+
+
+def test_disabled_pool_falls_back_to_threads():
+    pool = ComputePool(max_workers=0)
+    assert not pool.uses_processes
+    assert asyncio.run(pool.run(_pid)) == os.getpid()
+    assert pool.submit(_pid).result() == os.getpid()
+
+
+def test_diff_many_matches_serial_diffs(pool):
+    service = DiffService(pool=pool, offload_min_bytes=10_000)
+    files = [
+        ("small.py", "a = 1\n", "a = 2\n"),
+        ("big.py", _source(2000), _source(2000, "  # changed")),
+        ("new.py", "", _source(1500)),
+    ]
+
+    diffs = asyncio.run(service.diff_many(files))
+
+    assert diffs == [generate_unified_diff(*f) for f in files]
+
+
+def test_diff_with_custom_function_and_summary(pool):
+    service = DiffService(pool=pool, offload_min_bytes=0, summary_offload_min_bytes=0)
+    old, new = _source(300), _source(300, "!")
+
+    diff = asyncio.run(service.diff("doc.md", old, new, diff_fn=generate_line_diff))
+
+    assert diff == generate_line_diff("doc.md", old, new)
+    assert asyncio.run(service.summarize(diff)) == generate_diff_summary(diff)
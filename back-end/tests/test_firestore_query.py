@@ -0,0 +1,135 @@
+"""
+Unit tests for the Firestore query planner
+
+Tests cover:
+- firestore.indexes.json matches the declared query shapes (including the
+  MinHash band queries)
+- Planning: declared shapes run server-side, others fall back
+- Missing-index fallback (client-side filter, sort, keyset and limit)
+- Planned queries against the Firestore emulator (FIRESTORE_EMULATOR_HOST)
+"""
+
+import json
+import os
+import uuid
+
+import pytest
+from google.api_core.exceptions import FailedPrecondition
+
+from app.services.firestore_query import (
+    ASCENDING,
+    INDEX_FILE,
+    PROPOSAL_ORDER,
+    FirestoreQueryPlanner,
+    generate_indexes,
+)
+
+
+DOCS = [
+    {"id": f"p-{i}", "workspace_id": "ws", "status": "pending" if i % 2 else "approved",
+     "agent_id": "spec", "created_at": f"2025-01-{i + 1:02d}"}
+    for i in range(9)
+]
+
+
+class _Snapshot:
+    def __init__(self, data):
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class _FakeQuery:
+    """Firestore query double that rejects ordered queries (no index deployed)."""
+
+    id = "proposals"
+
+    def __init__(self, docs, ordered=False, calls=None):
+        self.docs, self.ordered = docs, ordered
+        self.calls = calls if calls is not None else []
+
+    def where(self, filter):
+        field, value = filter.field_path, filter.value
+        self.calls.append(("where", field))
+        return _FakeQuery([d for d in self.docs if d.get(field) == value], self.ordered, self.calls)
+
+    def order_by(self, field, direction=ASCENDING):
+        return _FakeQuery(self.docs, True, self.calls)
+
+    def start_after(self, values):
+        return self
+
+    def limit(self, count):
+        return _FakeQuery(self.docs[:count], self.ordered, self.calls)
+
+    def stream(self):
+        if self.ordered:
+            raise FailedPrecondition("The query requires an index. You can create it here: ...")
+        return iter(_Snapshot(d) for d in self.docs)
+
+
+def test_index_file_matches_declared_shapes():
+    with open(INDEX_FILE, encoding="utf-8") as f:
+        assert json.load(f) == generate_indexes(), "Run: python -m app.services.firestore_query"
+
+
+def test_band_queries_have_a_composite_index():
+    indexes = generate_indexes()["indexes"]
+    for equality in (["workspace_id"], ["status", "workspace_id"]):
+        assert {
+            "collectionGroup": "proposals",
+            "queryScope": "COLLECTION",
+            "fields": [{"fieldPath": f, "order": ASCENDING} for f in equality]
+            + [{"fieldPath": "minhash_bands", "arrayConfig": "CONTAINS"}],
+        } in indexes
+
+
+def test_declared_shapes_run_server_side():
+    planner = FirestoreQueryPlanner()
+
+    plan = planner.plan("proposals", {"workspace_id": "ws", "status": "pending", "agent_id": None}, PROPOSAL_ORDER)
+    assert plan.fully_server_side
+    assert plan.server_filters == {"workspace_id": "ws", "status": "pending"}
+
+    plan = planner.plan("proposals", {"workspace_id": "ws", "status": "pending"}, (("title", ASCENDING),))
+    assert not plan.fully_server_side
+    assert plan.server_filters == {"workspace_id": "ws"}
+    assert plan.client_filters == {"status": "pending"}
+
+
+def test_missing_index_falls_back_to_client_side():
+    planner = FirestoreQueryPlanner()
+    collection = _FakeQuery(DOCS)
+    filters = {"workspace_id": "ws", "status": "pending"}
+
+    page = planner.stream(collection, filters, PROPOSAL_ORDER, limit=2)
+    assert [d["id"] for d in page] == ["p-7", "p-5"]
+
+    # The shape is remembered: next queries skip the failing attempt
+    collection.calls.clear()
+    page = planner.stream(collection, filters, PROPOSAL_ORDER, limit=2, start_after={"created_at": "2025-01-06", "id": "p-5"})
+    assert [d["id"] for d in page] == ["p-3", "p-1"]
+    assert collection.calls == [("where", "workspace_id")]
+
+
+@pytest.mark.skipif(not os.getenv("FIRESTORE_EMULATOR_HOST"), reason="Firestore emulator not running")
+def test_planned_queries_against_emulator():
+    from google.cloud import firestore
+
+    client = firestore.Client(project=os.getenv("GCP_PROJECT_ID", "contextpilot-test"))
+    collection = client.collection(f"proposals-{uuid.uuid4().hex[:8]}")
+    for doc in DOCS:
+        collection.document(doc["id"]).set(doc)
+    try:
+        planner = FirestoreQueryPlanner()
+        filters = {"workspace_id": "ws", "status": "pending"}
+        first = planner.stream(collection, filters, PROPOSAL_ORDER, limit=2)
+        rest = planner.stream(
+            collection, filters, PROPOSAL_ORDER,
+            start_after={"created_at": first[-1]["created_at"], "id": first[-1]["id"]},
+        )
+        assert [d["id"] for d in first + rest] == ["p-7", "p-5", "p-3", "p-1"]
+    finally:
+        for doc in DOCS:
+            collection.document(doc["id"]).delete()
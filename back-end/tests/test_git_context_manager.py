@@ -0,0 +1,89 @@
+"""
+Unit tests for Git_Context_Manager commits
+
+Tests cover:
+- Internal workspace state (indexes, locks, journals) listed in the workspace's
+  .gitignore and never committed, even when tracked before
+- Git log cache kept in the git directory (legacy workspace copy removed)
+"""
+
+import os
+
+import git
+import pytest
+
+from app.git_context_manager import WORKSPACE_STATE_FILES, Git_Context_Manager
+from app.services.local_proposal_store import LocalProposalStore
+from app.services.search_index import SearchIndex
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    from app.utils import workspace_manager
+
+    repo = git.Repo.init(tmp_path)
+    (tmp_path / "README.md").write_text("# Demo\n")
+    repo.index.add(["README.md"])
+    repo.index.commit("init")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(workspace_manager, "BASE_DIR", str(tmp_path / ".contextpilot" / "workspaces"))
+    monkeypatch.setenv("API_BASE_URL", "http://127.0.0.1:9")
+    monkeypatch.delenv("ENVIRONMENT", raising=False)
+    monkeypatch.delenv("USE_PUBSUB", raising=False)
+    return Git_Context_Manager(workspace_id="ws")
+
+
+def _committed(repo):
+    return {item.path for item in repo.head.commit.tree.traverse() if item.type == "blob"}
+
+
+def test_internal_state_is_not_committed(manager, tmp_path):
+    repo = manager.repo
+    workspace = os.path.relpath(manager.context_dir, tmp_path)
+    gitignore = (tmp_path / workspace / ".gitignore").read_text().splitlines()
+    assert all(pattern in gitignore for pattern in WORKSPACE_STATE_FILES)
+
+    legacy_cache = tmp_path / workspace / "git_log_cache.json"
+    legacy_cache.write_text("{}")
+    assert manager.get_git_log()[0]["message"] == "init"
+    assert not legacy_cache.exists()
+    (tmp_path / "foo.txt").write_text("foo\n")
+    store = LocalProposalStore(os.path.join(manager.context_dir, "proposals"))
+    store.save({"id": "p-1", "workspace_id": "ws", "agent_id": "spec", "title": "T", "status": "pending"})
+    index = SearchIndex(manager.context_dir)
+    assert index.search("T") and os.path.exists(index.index_path + "-wal")
+    manager.commit_changes("Add foo", agent="test", paths=["foo.txt"])
+    (tmp_path / "bar.txt").write_text("bar\n")
+    manager.commit_changes("Add bar", agent="test")
+
+    assert manager.get_git_log()[0]["commit"] == repo.head.commit.hexsha
+    assert not legacy_cache.exists()
+    committed = _committed(repo)
+    assert {"foo.txt", "bar.txt", f"{workspace}/history.jsonl", f"{workspace}/.gitignore"} <= committed
+    assert os.path.exists(manager.history.index_path)
+    assert f"{workspace}/proposals/p-1.json" in committed
+    assert os.path.exists(os.path.join(manager.context_dir, "proposals", ".journal"))
+    state = {
+        "history.idx",
+        "history.buckets",
+        ".index.sqlite3",
+        ".index.sqlite3-wal",
+        ".index.sqlite3-shm",
+        ".lock",
+        ".journal",
+        ".search.sqlite3",
+        ".search.sqlite3-wal",
+        ".search.sqlite3-shm",
+        "git_log_cache.json",
+    }
+    assert not {path for path in committed if os.path.basename(path) in state}
+
+    # Files committed before they were ignored are not updated either
+    repo.git.add("-f", f"{workspace}/history.idx")
+    tracked = repo.index.commit("Track the index")
+    manager.commit_changes("Again", agent="test", allow_empty=True)
+    changed = repo.git.diff(tracked.hexsha, "HEAD", "--name-only").splitlines()
+    assert f"{workspace}/context.md" in changed and f"{workspace}/history.idx" not in changed
+    assert f"{workspace}/history.idx" in repo.git.status("--short")
+    store.close()
+    index.close()
@@ -0,0 +1,109 @@
+"""
+Unit tests for the repository-serialized git executor
+
+Tests cover:
+- Serialization within a repository, parallelism across repositories
+- Timeouts
+- Cancellation of queued jobs
+- Job status streaming
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.git_executor import GitExecutor, GitJobTimeout
+from app.services.jobs import JobStatus, get_job_registry
+
+
+@pytest.fixture
+def executor():
+    executor = GitExecutor(max_workers=4)
+    yield executor
+    executor.shutdown()
+
+
+def _wait(job, timeout=5):
+    deadline = time.time() + timeout
+    while not job.finished and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_same_repo_is_serialized(executor):
+    active = []
+    overlaps = []
+    lock = threading.Lock()
+
+    def work():
+        with lock:
+            active.append(1)
+            overlaps.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.pop()
+        return "ok"
+
+    jobs = [executor.submit("repo-a", work, kind="test") for _ in range(3)]
+    for job in jobs:
+        assert _wait(job).status == JobStatus.SUCCEEDED
+    assert max(overlaps) == 1
+
+
+def test_different_repos_run_in_parallel(executor):
+    barrier = threading.Barrier(2, timeout=2)
+
+    def work():
+        barrier.wait()  # Deadlocks (and times out) unless both run at once
+        return True
+
+    jobs = [executor.submit(key, work, kind="test") for key in ("repo-a", "repo-b")]
+    for job in jobs:
+        assert _wait(job).status == JobStatus.SUCCEEDED
+
+
+def test_timeout(executor):
+    async def run():
+        with pytest.raises(GitJobTimeout):
+            await executor.run("repo-a", lambda: time.sleep(0.5), kind="test", timeout=0.05)
+
+    asyncio.run(run())
+
+
+def test_cancel_queued_job(executor):
+    release = threading.Event()
+    blocker = executor.submit("repo-a", release.wait, kind="test")
+    queued = executor.submit("repo-a", lambda: "never", kind="test")
+
+    assert executor.cancel(queued.id)
+    release.set()
+    _wait(blocker)
+    assert _wait(queued).status == JobStatus.CANCELLED
+    assert queued.result is None
+
+
+def test_failed_job_records_error(executor):
+    def boom():
+        raise RuntimeError("index.lock exists")
+
+    job = _wait(executor.submit("repo-a", boom, kind="test"))
+    assert job.status == JobStatus.FAILED
+    assert "index.lock" in job.error
+
+
+def test_stream_yields_until_finished(executor):
+    release = threading.Event()
+    job = executor.submit("repo-a", lambda: release.wait() and "done", kind="test")
+
+    async def collect():
+        statuses = []
+        async for snapshot in get_job_registry().stream(job.id):
+            statuses.append(snapshot["status"])
+            if len(statuses) == 1:
+                release.set()
+        return statuses
+
+    statuses = asyncio.run(collect())
+    assert statuses[-1] == JobStatus.SUCCEEDED
@@ -0,0 +1,165 @@
+"""
+Unit tests for the incremental git log cache
+
+Tests cover:
+- Initial build and rollups
+- Incremental refresh (only new commits fetched)
+- Rebuild when HEAD is rewritten
+- Persistence across instances (by default inside the git directory)
+- HEAD moves appended as segments instead of rewriting the snapshot
+- Stored commits capped, rollups following the dropped commits
+- Days bucketed in UTC whatever the author's timezone
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import git
+import pytest
+
+from app.services import git_log_cache
+from app.services.git_log_cache import GitLogCache
+
+
+def _commit(repo, message, when, author="Alice"):
+    path = f"{repo.working_tree_dir}/file.txt"
+    with open(path, "a") as f:
+        f.write(message + "\n")
+    repo.index.add(["file.txt"])
+    actor = git.Actor(author, f"{author.lower()}@example.com")
+    date = when.strftime("%Y-%m-%dT%H:%M:%S")
+    return repo.index.commit(
+        message, author=actor, committer=actor, author_date=date, commit_date=date
+    )
+
+
+@pytest.fixture
+def repo(tmp_path):
+    return git.Repo.init(tmp_path / "repo")
+
+
+@pytest.fixture
+def now():
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def test_build_and_window(repo, tmp_path, now):
+    _commit(repo, "old", now - timedelta(days=60))
+    _commit(repo, "a1", now - timedelta(days=2), author="Alice")
+    _commit(repo, "b1", now - timedelta(days=1), author="Bob")
+    _commit(repo, "a2", now, author="Alice")
+
+    cache = GitLogCache(repo, str(tmp_path))
+    window = cache.window(since_days=30)
+
+    assert sum(window["by_day"].values()) == 3
+    assert window["by_author"] == {"Alice": 2, "Bob": 1}
+    assert [c["message"] for c in window["recent"]] == ["a2", "b1", "a1"]
+    assert "epoch" not in window["recent"][0]
+
+    everything = cache.window(since_days=None)
+    assert sum(everything["by_day"].values()) == 4
+
+
+def test_incremental_refresh(repo, tmp_path, now, monkeypatch):
+    _commit(repo, "first", now - timedelta(days=1))
+    cache = GitLogCache(repo, str(tmp_path))
+    assert len(cache.commits_since()) == 1
+
+    fetched = []
+    original = cache._fetch
+    monkeypatch.setattr(cache, "_fetch", lambda rev: fetched.append(rev) or original(rev))
+
+    # HEAD unchanged: no git log at all
+    cache.commits_since()
+    assert fetched == []
+
+    _commit(repo, "second", now)
+    commits = cache.commits_since()
+    assert [c["message"] for c in commits] == ["second", "first"]
+    assert len(fetched) == 1 and ".." in fetched[0]
+
+
+def test_rebuild_on_rewritten_history(repo, tmp_path, now):
+    base = _commit(repo, "base", now - timedelta(days=1))
+    _commit(repo, "dropped", now)
+    cache = GitLogCache(repo, str(tmp_path))
+    assert len(cache.commits_since()) == 2
+
+    repo.head.reset(base, index=True, working_tree=True)
+    _commit(repo, "replacement", now)
+
+    messages = [c["message"] for c in cache.commits_since()]
+    assert messages == ["replacement", "base"]
+    assert sum(cache.by_day.values()) == 2
+
+
+def test_persisted_cache(repo, tmp_path, now):
+    _commit(repo, "one", now)
+    GitLogCache(repo, str(tmp_path)).refresh()
+
+    reloaded = GitLogCache(repo, str(tmp_path))
+    assert reloaded.head == repo.head.commit.hexsha
+    assert [c["message"] for c in reloaded.commits] == ["one"]
+
+
+def test_default_cache_lives_in_git_dir(repo, now):
+    _commit(repo, "one", now)
+    cache = GitLogCache(repo)
+    cache.refresh()
+
+    assert cache.cache_path == os.path.join(repo.git_dir, "contextpilot", "git_log_cache.json")
+    assert os.path.exists(cache.cache_path)
+    assert repo.untracked_files == []
+
+
+def test_head_moves_are_appended_as_segments(repo, tmp_path, now):
+    _commit(repo, "one", now - timedelta(days=1))
+    cache = GitLogCache(repo, str(tmp_path))
+    cache.refresh()
+    snapshot = open(cache.cache_path).read()
+
+    _commit(repo, "two", now)
+    cache.refresh()
+
+    assert open(cache.cache_path).read() == snapshot
+    assert len(open(cache.segments_path).readlines()) == 1
+    reloaded = GitLogCache(repo, str(tmp_path))
+    assert reloaded.head == repo.head.commit.hexsha
+    assert [c["message"] for c in reloaded.commits] == ["two", "one"]
+    assert reloaded.by_day == cache.by_day
+
+
+def test_stored_commits_are_capped(repo, tmp_path, now, monkeypatch):
+    monkeypatch.setattr(git_log_cache, "GIT_LOG_CACHE_MAX_COMMITS", 3)
+    _commit(repo, "a1", now - timedelta(days=3), author="Alice")
+    _commit(repo, "b1", now - timedelta(days=2), author="Bob")
+    _commit(repo, "a2", now - timedelta(days=2), author="Alice")
+    _commit(repo, "a3", now - timedelta(days=1), author="Alice")
+    cache = GitLogCache(repo, str(tmp_path))
+    assert [c["message"] for c in cache.commits_since()] == ["a3", "a2", "b1"]  # Initial fetch bounded
+
+    _commit(repo, "b2", now, author="Bob")
+    window = cache.window(since_days=None)
+
+    assert [c["message"] for c in cache.commits] == ["b2", "a3", "a2"]
+    assert window["by_author"] == {"Alice": 2, "Bob": 1}
+    assert sum(window["by_day"].values()) == 3
+    day = (now - timedelta(days=2)).strftime("%Y-%m-%d")
+    assert window["samples_by_day"][day] == ["a2"]
+    assert GitLogCache(repo, str(tmp_path)).by_day == cache.by_day
+
+
+def test_days_are_utc(repo, tmp_path):
+    path = f"{repo.working_tree_dir}/file.txt"
+    with open(path, "w") as f:
+        f.write("late\n")
+    repo.index.add(["file.txt"])
+    actor = git.Actor("Alice", "alice@example.com")
+    date = "1577939400 -0500"  # 2020-01-01 23:30 at -05:00, 2020-01-02 in UTC
+    repo.index.commit("late", author=actor, committer=actor, author_date=date, commit_date=date)
+
+    window = GitLogCache(repo, str(tmp_path)).window(since_days=None)
+
+    assert window["by_day"] == {"2020-01-02": 1}
+    assert window["recent"][0]["date_formatted"] == "2020-01-01"
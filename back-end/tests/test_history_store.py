@@ -0,0 +1,132 @@
+"""
+Unit tests for the append-only history store
+
+Tests cover:
+- Append / tail / get
+- Migration from legacy history.json
+- Index recovery after a torn write
+- Date range queries
+- Rotation into archive segments (still returned by read_all / tail)
+- No lost appends across processes
+"""
+
+import json
+import multiprocessing
+import os
+
+import pytest
+
+from app.services.history_store import HistoryStore
+
+
+def _entry(day: int, msg: str) -> dict:
+    return {
+        "timestamp": f"2025-01-{day:02d}T10:00:00",
+        "message": msg,
+        "agent": "test",
+        "commit": "abc1234",
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(str(tmp_path), max_entries=0)
+
+
+def test_append_and_tail(store):
+    for i in range(5):
+        assert store.append(_entry(1, f"m{i}")) == i
+
+    assert len(store) == 5
+    assert [e["message"] for e in store.tail(2)] == ["m3", "m4"]
+    assert store.last()["message"] == "m4"
+    assert store.get(0)["message"] == "m0"
+    assert store.get(99) is None
+
+
+def test_reopen_uses_index(tmp_path):
+    store = HistoryStore(str(tmp_path), max_entries=0)
+    for i in range(3):
+        store.append(_entry(1, f"m{i}"))
+
+    reopened = HistoryStore(str(tmp_path), max_entries=0)
+    assert len(reopened) == 3
+    assert reopened.read_all() == store.read_all()
+
+
+def test_migrates_legacy_json(tmp_path):
+    legacy = [_entry(1, "old-1"), _entry(2, "old-2")]
+    with open(tmp_path / "history.json", "w") as f:
+        json.dump(legacy, f)
+
+    store = HistoryStore(str(tmp_path), max_entries=0)
+    assert [e["message"] for e in store.read_all()] == ["old-1", "old-2"]
+    # Legacy file is left in place
+    assert os.path.exists(tmp_path / "history.json")
+
+
+def test_recovers_from_torn_write(tmp_path):
+    store = HistoryStore(str(tmp_path), max_entries=0)
+    store.append(_entry(1, "ok"))
+    with open(store.data_path, "ab") as f:
+        f.write(b'{"timestamp": "2025-01-0')
+
+    reopened = HistoryStore(str(tmp_path), max_entries=0)
+    assert len(reopened) == 1
+    reopened.append(_entry(2, "after"))
+    assert [e["message"] for e in reopened.read_all()] == ["ok", "after"]
+
+
+def test_range_by_date(store):
+    for day in (1, 2, 2, 3, 5):
+        store.append(_entry(day, f"d{day}"))
+
+    result = store.range(since="2025-01-02", until="2025-01-04")
+    assert [e["message"] for e in result] == ["d2", "d2", "d3"]
+
+
+def test_auto_rotation(tmp_path):
+    store = HistoryStore(str(tmp_path), max_entries=10)
+    for i in range(11):
+        store.append(_entry(1, f"m{i}"))
+
+    assert len(store) == 5
+    assert store.last()["message"] == "m10"
+    archive_dir = tmp_path / "history-archive"
+    archived = os.listdir(archive_dir)
+    assert len(archived) == 1
+    with open(archive_dir / archived[0]) as f:
+        assert len(f.readlines()) == 6
+
+
+def test_rotated_entries_are_still_read(tmp_path):
+    store = HistoryStore(str(tmp_path), max_entries=4)
+    for i in range(11):
+        store.append(_entry(1, f"m{i}"))
+
+    assert len(store) < 11
+    assert len(store.archive_paths()) == 3
+    assert [e["message"] for e in store.read_all()] == [f"m{i}" for i in range(11)]
+    assert [e["message"] for e in store.tail(6)] == [f"m{i}" for i in range(5, 11)]
+
+
+def _append_many(directory: str, worker: int, times: int) -> None:
+    store = HistoryStore(directory, max_entries=0)
+    for i in range(times):
+        store.append(_entry(1, f"w{worker}-{i}"))
+
+
+def test_no_lost_appends_across_processes(tmp_path):
+    HistoryStore(str(tmp_path), max_entries=0)
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_append_many, args=(str(tmp_path), w, 25)) for w in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+
+    assert [w.exitcode for w in workers] == [0, 0, 0, 0]
+    reopened = HistoryStore(str(tmp_path), max_entries=0)
+    assert len(reopened) == 100
+    assert len({e["message"] for e in reopened.read_all()}) == 100
+    assert [e["message"] for e in reopened.iter_entries()] == [e["message"] for e in reopened.read_all()]
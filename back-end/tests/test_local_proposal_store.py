@@ -0,0 +1,82 @@
+"""
+Unit tests for the indexed local proposal store
+
+Tests cover:
+- Automatic indexing of existing proposal files (with Markdown summaries)
+- Filtered, sorted and paginated queries read only the returned bodies
+- Files added or removed by other writers, and atomic saves
+"""
+
+import json
+import os
+
+import pytest
+
+from app.services.local_proposal_store import INDEX_FILE, LocalProposalStore
+
+
+def _write(directory, proposal_id, status="pending", agent_id="spec", day=1):
+    proposal = {
+        "id": proposal_id,
+        "status": status,
+        "agent_id": agent_id,
+        "title": f"Proposal {proposal_id}",
+        "created_at": f"2025-01-{day:02d}T00:00:00",
+        "diff": {"format": "unified", "content": "x" * 1000},
+    }
+    (directory / f"{proposal_id}.json").write_text(json.dumps(proposal))
+    return proposal
+
+
+@pytest.fixture
+def proposals_dir(tmp_path):
+    directory = tmp_path / "proposals"
+    directory.mkdir()
+    for day in range(1, 11):
+        _write(directory, f"spec-{day}", status="pending" if day % 2 else "approved", day=day)
+    _write(directory, "retro-1", agent_id="retrospective", day=11)
+    (directory / "retro-1.md").write_text("# Retro")
+    return directory
+
+
+def test_existing_files_are_indexed(proposals_dir):
+    store = LocalProposalStore(proposals_dir)
+
+    assert os.path.exists(proposals_dir / INDEX_FILE)
+    assert store.count() == 11
+    assert store.count(status="approved") == 5
+    assert [r["id"] for r in store.query(limit=3)] == ["retro-1", "spec-10", "spec-9"]
+
+
+def test_queries_read_only_returned_bodies(proposals_dir, monkeypatch):
+    store = LocalProposalStore(proposals_dir)
+    reads = []
+    original = store._read_file
+    monkeypatch.setattr(store, "_read_file", lambda name: reads.append(name) or original(name))
+
+    page = store.list(status="pending", agent_id="spec", descending=False, limit=2, offset=1)
+
+    assert [p["id"] for p in page] == ["spec-3", "spec-5"]
+    assert reads == ["spec-3.json", "spec-5.json"]
+
+    with pytest.raises(ValueError):
+        store.query(order_by="diff")
+
+
+def test_index_follows_directory_and_saves(proposals_dir):
+    store = LocalProposalStore(proposals_dir)
+
+    _write(proposals_dir, "spec-new", day=20)
+    os.remove(proposals_dir / "spec-1.json")
+    assert store.query(limit=1)[0]["id"] == "spec-new"
+    assert store.get("spec-1") is None
+    assert store.count() == 11
+
+    proposal = store.get("spec-3")
+    proposal["status"] = "approved"
+    store.save(proposal)
+    assert json.loads((proposals_dir / "spec-3.json").read_text())["status"] == "approved"
+    assert store.count(status="approved") == 6
+
+    # A new store (e.g. after restart) reuses the index
+    assert LocalProposalStore(proposals_dir).count(status="approved") == 6
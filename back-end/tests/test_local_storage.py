@@ -0,0 +1,157 @@
+"""
+Unit tests for crash-safe local writes
+
+Tests cover:
+- Atomic writes and transactions (all or nothing, nested transactions)
+- Replay of an interrupted transaction from the journal, torn entries
+- Workspace lock held across processes (no lost updates)
+- Concurrent local updates of proposals.json and .md summaries
+"""
+
+import fcntl
+import json
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+from app import server
+from app.services import local_storage
+from app.services.local_proposal_store import LocalProposalStore, reset_local_proposal_stores
+from app.services.local_storage import JOURNAL_FILE, LOCK_FILE, WorkspaceLock, atomic_write, local_transaction
+
+
+def test_atomic_write_replaces_without_leftovers(tmp_path):
+    target = tmp_path / "a.json"
+    atomic_write(target, "old")
+    atomic_write(target, "new")
+
+    assert target.read_text() == "new"
+    assert os.listdir(tmp_path) == ["a.json"]
+
+
+def test_transaction_is_all_or_nothing(tmp_path):
+    (tmp_path / "p-1.md").write_text("# P1\n")
+
+    with pytest.raises(RuntimeError):
+        with local_transaction(tmp_path) as tx:
+            tx.write(tmp_path / "p-1.json", "{}")
+            raise RuntimeError("boom")
+    assert not (tmp_path / "p-1.json").exists()
+
+    with local_transaction(tmp_path) as tx:
+        tx.write(tmp_path / "p-1.json", "{}")
+        with local_transaction(tmp_path) as inner:
+            assert inner is tx
+            assert inner.append(tmp_path / "p-1.md", "approved\n")
+            assert not inner.append(tmp_path / "p-2.md", "approved\n")  # missing: left alone
+        assert not (tmp_path / "p-1.json").exists()  # applied by the outer transaction
+        assert tx.read(tmp_path / "p-1.json") == "{}"
+
+    assert (tmp_path / "p-1.json").read_text() == "{}"
+    assert (tmp_path / "p-1.md").read_text() == "# P1\napproved\n"
+    assert not (tmp_path / "p-2.md").exists()
+    assert (tmp_path / JOURNAL_FILE).read_text() == ""
+
+
+def test_interrupted_transaction_is_replayed(tmp_path, monkeypatch):
+    (tmp_path / "p-1.json").write_text(json.dumps({"id": "p-1", "status": "pending"}))
+    calls = []
+
+    def crash(path, text):
+        calls.append(path)
+        if len(calls) == 2:
+            raise SystemExit("killed")
+        original(path, text)
+
+    original = local_storage.atomic_write
+    monkeypatch.setattr(local_storage, "atomic_write", crash)
+    with pytest.raises(SystemExit):
+        with local_transaction(tmp_path) as tx:
+            tx.write(tmp_path / "p-1.json", json.dumps({"id": "p-1", "status": "approved"}))
+            tx.write(tmp_path / "p-1.md", "approved\n")
+    monkeypatch.setattr(local_storage, "atomic_write", original)
+    assert not (tmp_path / "p-1.md").exists()
+
+    # The next process opening the directory finishes the transaction
+    store = LocalProposalStore(tmp_path)
+    assert store.get("p-1")["status"] == "approved"
+    assert (tmp_path / "p-1.md").read_text() == "approved\n"
+    store.close()
+
+
+def test_torn_journal_entry_is_dropped(tmp_path):
+    (tmp_path / JOURNAL_FILE).write_text('{"writes": [["p-1.json", "{}"]')
+
+    with local_transaction(tmp_path):
+        pass
+
+    assert not (tmp_path / "p-1.json").exists()
+    assert (tmp_path / JOURNAL_FILE).read_text() == ""
+
+
+def test_lock_is_held_against_other_processes(tmp_path):
+    # flock conflicts between open file descriptions, as with another process
+    fd = os.open(tmp_path / LOCK_FILE, os.O_RDWR | os.O_CREAT)
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        with pytest.raises(TimeoutError):
+            WorkspaceLock(tmp_path).acquire(timeout=0.05)
+    finally:
+        os.close(fd)
+
+    lock = WorkspaceLock(tmp_path)
+    with lock:
+        with lock:  # reentrant
+            assert lock.held
+    assert not lock.held
+
+
+def _increment(directory: str, times: int) -> None:
+    for _ in range(times):
+        with local_transaction(directory) as tx:
+            counter = json.loads(tx.read(os.path.join(directory, "counter.json")))
+            tx.write(os.path.join(directory, "counter.json"), json.dumps({"n": counter["n"] + 1}))
+
+
+def test_no_lost_updates_across_processes(tmp_path):
+    (tmp_path / "counter.json").write_text('{"n": 0}')
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_increment, args=(str(tmp_path), 25)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+
+    assert [w.exitcode for w in workers] == [0, 0, 0, 0]
+    assert json.loads((tmp_path / "counter.json").read_text()) == {"n": 100}
+
+
+def test_concurrent_commit_records_keep_every_update(tmp_path, monkeypatch):
+    directory = tmp_path / "proposals"
+    directory.mkdir()
+    ids = [f"p-{i}" for i in range(8)]
+    (tmp_path / "proposals.json").write_text(json.dumps([{"id": pid, "status": "approved"} for pid in ids]))
+    (directory / "p-0.md").write_text("# p-0\n")
+    monkeypatch.setattr(
+        server, "_proposals_paths", lambda workspace_id: {"json": tmp_path / "proposals.json", "dir": directory}
+    )
+    reset_local_proposal_stores()
+    try:
+        threads = [
+            threading.Thread(target=server._record_commit, args=("ws", "local", [pid], f"c-{pid}"))
+            for pid in ids
+        ]
+        threads.append(threading.Thread(target=server._record_commit, args=("ws", "local", ["p-0"], "c-again")))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        reset_local_proposal_stores()
+
+    proposals = json.loads((tmp_path / "proposals.json").read_text())
+    assert all(p["commit_hash"] in (f"c-{p['id']}", "c-again") for p in proposals)
+    appendix = (directory / "p-0.md").read_text()
+    assert "**Commit:** c-p-0" in appendix and "**Commit:** c-again" in appendix
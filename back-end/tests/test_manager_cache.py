@@ -0,0 +1,83 @@
+"""
+Unit tests for the Git_Context_Manager cache
+
+Tests cover:
+- LRUCache eviction, TTL and stats
+- Manager reuse per workspace
+- Revalidation and explicit invalidation
+"""
+
+import shutil
+
+import pytest
+
+from app.git_context_manager import (
+    get_git_context_manager,
+    invalidate_git_context_manager,
+)
+from app.utils.lru_cache import LRUCache
+
+
+def test_lru_eviction_and_stats():
+    evicted = []
+    cache = LRUCache(maxsize=2, on_evict=lambda k, v: evicted.append(k))
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert evicted == ["b"]
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["evictions"] == 1
+
+
+def test_lru_ttl(monkeypatch):
+    import app.utils.lru_cache as lru_module
+
+    now = [100.0]
+    monkeypatch.setattr(lru_module.time, "monotonic", lambda: now[0])
+    cache = LRUCache(maxsize=4, ttl=10)
+    cache.set("a", 1)
+    now[0] += 5
+    assert cache.get("a") == 1
+    now[0] += 20
+    assert cache.get("a") is None
+    assert "a" not in cache
+
+
+@pytest.fixture
+def workspace_id():
+    workspace_id = "test-manager-cache"
+    invalidate_git_context_manager()
+    yield workspace_id
+    manager = get_git_context_manager(workspace_id)
+    invalidate_git_context_manager()
+    shutil.rmtree(manager.context_dir, ignore_errors=True)
+
+
+def test_manager_is_reused(workspace_id):
+    first = get_git_context_manager(workspace_id)
+    assert get_git_context_manager(workspace_id) is first
+
+    invalidate_git_context_manager(workspace_id)
+    assert get_git_context_manager(workspace_id) is not first
+
+
+def test_stale_manager_is_rebuilt(workspace_id):
+    first = get_git_context_manager(workspace_id)
+    shutil.rmtree(first.context_dir)
+
+    second = get_git_context_manager(workspace_id)
+    assert second is not first
+    assert second.is_valid()
+
+
+def test_repo_handle_is_shared(workspace_id):
+    first = get_git_context_manager(workspace_id)
+    other = get_git_context_manager(workspace_id + "-other")
+    try:
+        if first.repo is not None:
+            assert other.repo is first.repo
+    finally:
+        shutil.rmtree(other.context_dir, ignore_errors=True)
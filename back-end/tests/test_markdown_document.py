@@ -0,0 +1,110 @@
+"""
+Unit tests for the section-indexed markdown writer
+
+Tests cover:
+- Appending into the last / a middle / a new section
+- Batched appends
+- Index reuse and external edits
+- Trimming, archiving and rotation policies
+"""
+
+import os
+
+import pytest
+
+from app.utils.markdown_document import MarkdownDocument, is_date_section
+
+
+BASE = "# Title\n\nintro\n\n## A\n- a1\n\n## B\n- b1\n"
+
+
+@pytest.fixture
+def doc(tmp_path):
+    path = tmp_path / "doc.md"
+    path.write_text(BASE, encoding="utf-8")
+    return MarkdownDocument(str(path))
+
+
+def _read(doc):
+    with open(doc.path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_append_to_last_section(doc):
+    doc.append_to_section("## B", "- b2\n")
+    assert _read(doc) == BASE + "- b2\n"
+
+
+def test_append_to_middle_section(doc):
+    doc.append_to_section("## A", "- a2\n")
+    assert _read(doc) == "# Title\n\nintro\n\n## A\n- a1\n\n- a2\n## B\n- b1\n"
+    # Cached index was shifted, not invalidated
+    assert doc.read_section("## B") == "## B\n- b1\n"
+
+
+def test_new_section_is_appended(doc):
+    doc.append_to_section("## C", "- c1\n")
+    assert _read(doc) == BASE + "\n## C\n- c1\n"
+    assert doc.section_titles() == ["## A", "## B", "## C"]
+    doc.append_to_section("## B", "- b2\n")
+    assert doc.read_section("## B") == "## B\n- b1\n\n- b2\n"
+
+
+def test_batch_single_write(doc, monkeypatch):
+    writes = []
+    original = doc._write
+    monkeypatch.setattr(doc, "_write", lambda items: writes.append(items) or original(items))
+
+    with doc.batch():
+        doc.append_to_section("## A", "- a2\n")
+        doc.append_to_section("## B", "- b2\n")
+        doc.append_to_section("## C", "- c1\n")
+        doc.append_to_section("## A", "- a3\n")
+
+    assert len(writes) == 1
+    assert doc.read_section("## A") == "## A\n- a1\n\n- a2\n- a3\n"
+    assert doc.read_section("## B") == "## B\n- b1\n- b2\n\n"
+    assert doc.read_section("## C") == "## C\n- c1\n"
+
+
+def test_external_edit_refreshes_index(doc):
+    doc.section_titles()
+    with open(doc.path, "a", encoding="utf-8") as f:
+        f.write("\n## Z\n- z1\n")
+    assert doc.section_titles()[-1] == "## Z"
+
+
+def test_trim_section(doc):
+    for i in range(10):
+        doc.append_to_section("## B", f"\n### entry {i}\n- item\n")
+
+    assert doc.trim_section("## B", max_entries=4) == 6
+    section = doc.read_section("## B")
+    assert "### entry 5" not in section
+    assert [l for l in section.splitlines() if l.startswith("### ")] == [
+        f"### entry {i}" for i in range(6, 10)
+    ]
+    assert section.startswith("## B\n- b1\n")
+    # Below the slack threshold nothing happens
+    assert doc.trim_section("## B", max_entries=4) == 0
+
+
+def test_archive_date_sections(tmp_path):
+    path = tmp_path / "timeline.md"
+    days = [f"## 2025-01-{d:02d}\n- day {d}\n\n" for d in range(1, 7)]
+    path.write_text("# Timeline\n\n" + "".join(days) + "## Próximos dias\n- later\n")
+    doc = MarkdownDocument(str(path))
+    archive = tmp_path / "timeline-archive.md"
+
+    assert doc.archive_sections(is_date_section, keep_last=2, archive_path=str(archive)) == 4
+    assert doc.section_titles() == ["## 2025-01-05", "## 2025-01-06", "## Próximos dias"]
+    assert archive.read_text().count("## 2025-01-0") == 4
+
+
+def test_rotate_if_larger(doc, tmp_path):
+    assert doc.rotate_if_larger(10 ** 6, str(tmp_path / "archive")) is None
+    rotated = doc.rotate_if_larger(10, str(tmp_path / "archive"), header="# New\n")
+    assert rotated and os.path.exists(rotated)
+    assert _read(doc) == "# New\n"
+    doc.append("more\n")
+    assert _read(doc) == "# New\nmore\n"
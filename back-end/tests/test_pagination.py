@@ -0,0 +1,74 @@
+"""
+Unit tests for keyset pagination
+
+Tests cover:
+- Cursor round trips, filter binding and malformed tokens
+- Walking every page yields each proposal once, in order (in-memory and
+  local store), including created_at ties
+"""
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services.local_proposal_store import LocalProposalStore
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor, paginate
+
+
+def _proposals(count):
+    # Every other pair shares a created_at to exercise the id tie breaker
+    return [
+        {"id": f"p-{i:03d}", "status": "pending" if i % 3 else "approved",
+         "created_at": f"2025-01-01T00:00:{i // 2:02d}"}
+        for i in range(count)
+    ]
+
+
+def _walk(fetch):
+    items, cursor, pages = [], None, 0
+    while True:
+        page, cursor = fetch(cursor)
+        items.extend(page)
+        pages += 1
+        if cursor is None:
+            return items, pages
+
+
+def test_cursor_round_trip_and_filters():
+    filters = {"status": "pending", "agent_id": None}
+    token = encode_cursor("2025-01-01T00:00:00", "p-1", filters)
+    assert decode_cursor(token, {"status": "pending"}) == ("2025-01-01T00:00:00", "p-1")
+
+    stamp = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(stamp, "p-2")) == (stamp, "p-2")
+
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token, {"status": "approved"})
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor")
+
+
+def test_paginate_in_memory_visits_each_item_once():
+    proposals = _proposals(23)
+    expected = sorted(proposals, key=lambda p: (p["created_at"], p["id"]), reverse=True)
+
+    items, pages = _walk(lambda cursor: paginate(proposals, 5, cursor))
+
+    assert items == expected
+    assert pages == 5
+
+
+def test_local_store_pages(tmp_path):
+    for proposal in _proposals(23):
+        (tmp_path / f"{proposal['id']}.json").write_text(json.dumps(proposal))
+    store = LocalProposalStore(tmp_path)
+
+    items, _ = _walk(lambda cursor: store.page(5, cursor=cursor, status="pending"))
+
+    assert [p["id"] for p in items] == [r["id"] for r in store.query(status="pending")]
+    assert len(items) == store.count(status="pending")
+
+    _, cursor = store.page(5, status="pending")
+    with pytest.raises(InvalidCursor):
+        store.page(5, cursor=cursor, status="approved")
@@ -0,0 +1,149 @@
+"""
+Unit tests for the hunk-based patch applier
+
+Tests cover:
+- Round-trips of generated diffs (including partial-context hunks)
+- Offset search and fuzz when the file has drifted
+- Multi-file patches with creation and deletion
+- "No newline at end of file" markers
+- Lines split on "\n" only ("\r" and form feeds kept inside lines)
+- Atomic writes when a hunk fails
+"""
+
+import random
+
+from app.agents.diff_generator import apply_patch, generate_unified_diff
+from app.agents.patch_applier import (
+    apply_patch_to_workspace,
+    apply_to_text,
+    parse_patch,
+)
+
+
+def _lines(n, prefix="line"):
+    return "".join(f"{prefix} {i}\n" for i in range(n))
+
+
+def test_round_trip_random_edits():
+    rng = random.Random(5)
+    for _ in range(100):
+        old = [f"l{rng.randrange(20)}\n" for _ in range(rng.randrange(1, 80))]
+        new = list(old)
+        for _ in range(rng.randrange(1, 6)):
+            k = rng.randrange(len(new) + 1)
+            if rng.random() < 0.5 and k < len(new):
+                del new[k]
+            else:
+                new.insert(k, f"new {rng.randrange(100)}\n")
+        old_text, new_text = "".join(old), "".join(new)
+        patch = generate_unified_diff("f.txt", old_text, new_text, context_lines=rng.choice([0, 1, 3]))
+        if not patch:
+            continue
+        result_text, result = apply_to_text(old_text, parse_patch(patch)[0], fuzz=0)
+        assert result.applied
+        assert result_text == new_text
+
+
+def test_apply_patch_keeps_unchanged_lines(tmp_path):
+    old = _lines(200)
+    new = old.replace("line 100\n", "line one hundred\n")
+    (tmp_path / "big.txt").write_text(old)
+
+    ok, error = apply_patch("big.txt", generate_unified_diff("big.txt", old, new), str(tmp_path))
+
+    assert ok, error
+    assert (tmp_path / "big.txt").read_text() == new
+
+
+def test_offset_and_fuzz():
+    old = _lines(50)
+    new = old.replace("line 30\n", "line thirty\n")
+    file_patch = parse_patch(generate_unified_diff("f.txt", old, new))[0]
+
+    # File drifted: 5 lines inserted above the hunk
+    drifted = "extra\n" * 5 + old
+    text, result = apply_to_text(drifted, file_patch, fuzz=0)
+    assert result.applied and result.hunks[0].offset == 5
+    assert text == "extra\n" * 5 + new
+
+    # Context line changed: only applies with fuzz
+    edited = old.replace("line 28\n", "line 28 (edited)\n")
+    _, result = apply_to_text(edited, file_patch, fuzz=0)
+    assert not result.applied
+    text, result = apply_to_text(edited, file_patch, fuzz=2)
+    assert result.applied and result.hunks[0].fuzz == 2
+    assert text == new.replace("line 28\n", "line 28 (edited)\n")
+
+
+def test_multi_file_patch(tmp_path):
+    (tmp_path / "keep.py").write_text("a\nb\nc\n")
+    (tmp_path / "old.py").write_text("gone\n")
+    patch = (
+        "diff --git a/keep.py b/keep.py\n"
+        "index 111..222 100644\n"
+        "--- a/keep.py\n+++ b/keep.py\n"
+        "@@ -1,3 +1,3 @@\n a\n-b\n+B\n c\n"
+        "diff --git a/new.py b/new.py\n"
+        "new file mode 100644\n"
+        "--- /dev/null\n+++ b/new.py\n"
+        "@@ -0,0 +1,2 @@\n+x = 1\n+y = 2\n"
+        "diff --git a/old.py b/old.py\n"
+        "deleted file mode 100644\n"
+        "--- a/old.py\n+++ /dev/null\n"
+        "@@ -1 +0,0 @@\n-gone\n"
+    )
+
+    results = apply_patch_to_workspace(patch, str(tmp_path))
+
+    assert [r.path for r in results] == ["keep.py", "new.py", "old.py"]
+    assert all(r.applied for r in results)
+    assert (tmp_path / "keep.py").read_text() == "a\nB\nc\n"
+    assert (tmp_path / "new.py").read_text() == "x = 1\ny = 2\n"
+    assert not (tmp_path / "old.py").exists()
+
+
+def test_no_newline_at_end_of_file():
+    patch = (
+        "--- a/f\n+++ b/f\n"
+        "@@ -1,2 +1,2 @@\n a\n-b\n\\ No newline at end of file\n+c\n\\ No newline at end of file\n"
+    )
+    text, result = apply_to_text("a\nb", parse_patch(patch)[0])
+    assert result.applied
+    assert text == "a\nc"
+
+
+def test_round_trip_keeps_carriage_returns_and_form_feeds():
+    old = "a\r\nb\x0cc\nd\re\nlast\r"
+    new = "a\r\nb\x0cC\nd\re\nlast\rx"
+    patch = generate_unified_diff("f.txt", old, new, context_lines=1)
+
+    file_patch = parse_patch(patch)[0]
+    text, result = apply_to_text(old, file_patch, fuzz=0)
+
+    assert result.applied
+    assert text == new
+    assert "-b\x0cc\n+b\x0cC\n" in patch
+
+
+def test_failed_hunk_leaves_file_untouched(tmp_path):
+    original = _lines(20)
+    (tmp_path / "f.txt").write_text(original)
+    patch = (
+        "--- a/f.txt\n+++ b/f.txt\n"
+        "@@ -2,1 +2,1 @@\n-line 1\n+LINE 1\n"
+        "@@ -10,1 +10,1 @@\n-not in file\n+whatever\n"
+    )
+
+    results = apply_patch_to_workspace(patch, str(tmp_path), fuzz=0)
+
+    assert not results[0].applied
+    assert [h.applied for h in results[0].hunks] == [True, False]
+    assert (tmp_path / "f.txt").read_text() == original
+    assert list(tmp_path.iterdir()) == [tmp_path / "f.txt"]
+
+
+def test_path_outside_workspace_rejected(tmp_path):
+    patch = "--- /dev/null\n+++ b/../escape.txt\n@@ -0,0 +1 @@\n+x\n"
+    results = apply_patch_to_workspace(patch, str(tmp_path))
+    assert not results[0].applied
+    assert not (tmp_path.parent / "escape.txt").exists()
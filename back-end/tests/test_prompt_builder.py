@@ -0,0 +1,145 @@
+"""
+Unit tests for token-budgeted prompt assembly
+
+Tests cover:
+- Priority-ordered admission, truncation and dropping of sections
+- History rendering with rollup of older entries
+- Diff splitting on file/hunk boundaries
+- Map-reduce diff summaries with per-chunk caching; reduce rounds send
+  REDUCE_PROMPT itself
+"""
+
+from app.services.prompt_builder import (
+    MAP_SUMMARY_TOKENS,
+    REDUCE_SUMMARY_TOKENS,
+    DiffSummarizer,
+    PromptBuilder,
+    estimate_tokens,
+    format_history,
+    split_diff,
+    truncate_to_tokens,
+)
+from app.utils.lru_cache import LRUCache
+
+
+def _file_diff(name: str, lines: int) -> str:
+    body = "".join(f"+line {i} of {name} with some padding text\n" for i in range(lines))
+    return (
+        f"diff --git a/{name} b/{name}\n--- a/{name}\n+++ b/{name}\n"
+        f"@@ -0,0 +1,{lines} @@\n{body}"
+    )
+
+
+def test_truncate_to_tokens():
+    text = "word " * 1000
+    cut = truncate_to_tokens(text, 50)
+    assert estimate_tokens(cut) <= 50
+    assert cut.endswith("[truncated]")
+    assert truncate_to_tokens("short", 50) == "short"
+
+
+def test_builder_keeps_order_and_budget():
+    builder = PromptBuilder(budget_tokens=300)
+    builder.add("intro", "Instructions.", priority=0, required=True)
+    builder.add("history", "h " * 2000, priority=2)
+    builder.add("checkpoint", "c " * 100, priority=1)
+    builder.add("extra", "x " * 100, priority=3)
+
+    prompt = builder.build()
+
+    assert estimate_tokens(prompt) <= 300
+    assert prompt.startswith("Instructions.")
+    # Insertion order is kept even though checkpoint was admitted first
+    assert prompt.index("h h") < prompt.index("c c")
+    assert builder.report == {
+        "intro": "full",
+        "checkpoint": "full",
+        "history": "truncated",
+        "extra": "dropped",
+    }
+
+
+def test_format_history_rolls_up_older_entries():
+    entries = [
+        {"timestamp": f"2025-01-{i % 28 + 1:02d}T10:00:00", "agent": "a" if i % 2 else "b",
+         "summary": f"change {i}", "commit": f"{i:040d}"}
+        for i in range(500)
+    ]
+    text = format_history(entries, budget_tokens=400)
+
+    assert estimate_tokens(text) <= 400
+    lines = text.splitlines()
+    assert "change 499" in lines[0]
+    assert "older entries" in lines[-1]
+
+    # Entries not passed in are counted too
+    text = format_history(entries[-3:], 2000, total_count=500, first_timestamp="2024-12-01")
+    assert text.splitlines()[-1].startswith("- … 497 older entries (since 2024-12-01)")
+
+
+def test_split_diff_by_file_and_hunk():
+    diff = _file_diff("a.py", 5) + _file_diff("b.py", 400)
+    chunks = split_diff(diff, max_tokens=500)
+
+    assert len(chunks) > 2
+    assert all(estimate_tokens(c) <= 500 for c in chunks)
+    # Small file stays whole, large file chunks keep their header
+    assert chunks[0].startswith("diff --git a/a.py")
+    assert all(c.startswith("diff --git") for c in chunks)
+    assert sum(c.count("+line") for c in chunks) == 405
+
+
+def test_diff_summarizer_map_reduce_and_cache():
+    calls = []
+
+    def complete(prompt, max_tokens):
+        calls.append(prompt)
+        return f"- summary {len(calls)}"
+
+    cache = LRUCache(maxsize=100)
+    summarizer = DiffSummarizer(complete, budget_tokens=1000, chunk_tokens=400, cache=cache)
+    small = _file_diff("small.py", 3)
+    assert summarizer.condense(small) == small
+    assert calls == []
+
+    diff = "".join(_file_diff(f"f{i}.py", 40) for i in range(10))
+    summary = summarizer.condense(diff)
+    first_calls = len(calls)
+    assert first_calls >= 10
+    assert "summary" in summary
+
+    # Same diff again: every chunk summary comes from the cache
+    assert summarizer.condense(diff) == summary
+    assert len(calls) == first_calls
+
+    # Changing one file only re-summarizes the affected chunk
+    changed = diff.replace("+line 0 of f3.py", "+line 0 of f3.py (edited)")
+    summarizer.condense(changed)
+    assert len(calls) == first_calls + 1
+
+
+def test_diff_summarizer_reduce_sends_reduce_prompt():
+    calls, map_summaries = [], []
+
+    def complete(prompt, max_tokens):
+        calls.append((prompt, max_tokens))
+        if prompt.startswith("Combine"):
+            return f"- combined {len(calls)}"
+        map_summaries.append(f"- summary {len(calls)} " + "detail " * 60)
+        return map_summaries[-1]
+
+    summarizer = DiffSummarizer(complete, budget_tokens=1000, chunk_tokens=400, cache=LRUCache(maxsize=100))
+    diff = "".join(_file_diff(f"f{i}.py", 40) for i in range(10))
+    summary = summarizer.condense(diff)
+
+    reduces = calls[len(map_summaries):]
+    assert len(map_summaries) >= 10 and reduces
+    assert all(n == MAP_SUMMARY_TOKENS for _, n in calls[: len(map_summaries)])
+    prompt, max_tokens = reduces[0]
+    assert max_tokens == REDUCE_SUMMARY_TOKENS
+    grouped = prompt.count("- summary")
+    assert prompt == DiffSummarizer.REDUCE_PROMPT.format(
+        summaries="\n".join(s.strip() for s in map_summaries[:grouped])
+    )
+    assert "Summarize the following part" not in prompt
+    assert "- combined" in summary
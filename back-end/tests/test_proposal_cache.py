@@ -0,0 +1,150 @@
+"""
+Unit tests for the ProposalRepository read-through cache
+
+Tests cover:
+- Repeated gets served from the cache (as independent copies)
+- Negative caching of missing proposals
+- Invalidation on create, status changes, commits and deletes
+- TTL expiry and hit-rate stats
+- Invalidation through proposal.* bus events, across instances
+"""
+
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.repositories import proposal_repository
+from app.services.event_bus import EventTypes, InMemoryEventBus
+from app.services.proposal_feed import reset_proposal_feed
+
+
+def _proposal(proposal_id, status="pending"):
+    return {
+        "id": proposal_id,
+        "workspace_id": "ws",
+        "agent_id": "spec",
+        "title": f"Proposal {proposal_id}",
+        "status": status,
+        "created_at": "2025-01-09T10:00:00",
+    }
+
+
+@pytest.fixture
+def firestore(monkeypatch):
+    firestore = MagicMock()
+    documents = {"p-1": _proposal("p-1")}
+    firestore.get_proposal.side_effect = lambda pid: dict(documents[pid]) if pid in documents else None
+    firestore.get_proposals.side_effect = lambda ids, fields=None: {
+        pid: dict(documents[pid]) for pid in ids if pid in documents
+    }
+    firestore.documents = documents
+    monkeypatch.setattr(proposal_repository, "get_firestore_service", lambda project_id=None: firestore)
+    reset_proposal_feed()
+    yield firestore
+    reset_proposal_feed()
+
+
+def test_repeated_gets_hit_the_cache(firestore):
+    repo = proposal_repository.ProposalRepository()
+
+    first = repo.get("p-1")
+    first["status"] = "mutated"
+    second = repo.get("p-1")
+
+    assert second["status"] == "pending"
+    assert firestore.get_proposal.call_count == 1
+    stats = repo.cache_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 0.5
+
+
+def test_misses_are_cached_until_created(firestore):
+    repo = proposal_repository.ProposalRepository()
+
+    assert repo.get("p-2") is None
+    assert repo.get("p-2") is None
+    assert firestore.get_proposal.call_count == 1
+    assert repo.cache_stats()["negative"]["hits"] == 1
+
+    firestore.create_proposal.side_effect = lambda document: firestore.documents.setdefault(
+        document["id"], document
+    )["id"]
+    repo.create(_proposal("p-2"))
+
+    assert repo.get("p-2")["id"] == "p-2"
+
+
+def test_writes_invalidate(firestore):
+    repo = proposal_repository.ProposalRepository()
+    firestore.documents["p-2"] = _proposal("p-2")
+
+    def update(pid, updates):
+        firestore.documents[pid].update(updates)
+        return True
+
+    def transition(ids, plan):
+        read = {pid: dict(firestore.documents[pid]) for pid in ids if pid in firestore.documents}
+        for pid, fields in plan(MagicMock(), read).items():
+            update(pid, fields)
+        return read
+
+    firestore.transition_proposals.side_effect = transition
+    firestore.update_proposals.side_effect = lambda updates, batch=None: all(
+        update(pid, fields) for pid, fields in updates.items()
+    )
+    repo.get("p-1")
+    repo.approve("p-1")
+    assert repo.get("p-1")["status"] == "approved"
+
+    repo.get("p-2")
+    repo.bulk_update_status(["p-2"], "rejected")
+    assert repo.get("p-2")["status"] == "rejected"
+
+    repo.record_commit(["p-1"], "abc")
+    assert repo.get("p-1")["commit_hash"] == "abc"
+
+    del firestore.documents["p-1"]
+    repo.delete("p-1")
+    assert repo.get("p-1") is None
+    # Each get above followed a write; delete reads the document too
+    assert firestore.get_proposal.call_count == 7
+
+
+def test_entries_expire(firestore):
+    repo = proposal_repository.ProposalRepository()
+    repo._cache.ttl = 0.01
+
+    repo.get("p-1")
+    time.sleep(0.02)
+    repo.get("p-1")
+
+    assert firestore.get_proposal.call_count == 2
+
+
+def test_bus_events_invalidate_across_instances(firestore, monkeypatch):
+    monkeypatch.setattr(proposal_repository, "PROPOSAL_CACHE_BROADCAST", True)
+    bus = InMemoryEventBus()
+    writer = proposal_repository.ProposalRepository()
+    reader = proposal_repository.ProposalRepository()
+    writer.attach(bus)
+    reader.attach(bus)
+
+    reader.get("p-1")
+    firestore.documents["p-1"]["status"] = "approved"
+    # Another instance approved it: only the broadcast event tells the reader
+    writer.approve("p-1")
+    assert reader.get("p-1")["status"] == "approved"
+    assert bus.get_event_log()[-1]["data"]["origin"] == writer.instance_id
+
+    # Events published by agents invalidate too
+    firestore.documents["p-1"]["status"] = "rejected"
+    asyncio.run(
+        bus.publish(
+            topic="proposals-events",
+            event_type=EventTypes.PROPOSAL_REJECTED.value,
+            source="test",
+            data={"proposal_id": "p-1"},
+        )
+    )
+    assert reader.get("p-1")["status"] == "rejected"
@@ -0,0 +1,188 @@
+"""
+Unit tests for diff-only proposal storage
+
+Tests cover:
+- Round trips for updates backed by git objects, untracked bases and creations
+- Bases only in the object database (staged, not in HEAD) kept in the blob store
+- Files without a trailing newline (diff stored, then applied)
+- Derived overall diffs
+- List decoding without file contents
+- Fallbacks (unverifiable diffs, missing bases, "full" mode)
+- Large untracked contents moved to the blob store
+"""
+
+import git
+import pytest
+
+from app.agents.diff_generator import apply_patch, generate_unified_diff
+from app.services import proposal_codec
+from app.services.blob_store import LocalBlobStore
+from app.services.proposal_codec import (
+    STORAGE_KEY,
+    blob_refs,
+    build_overall_diff,
+    decode_proposal,
+    encode_proposal,
+)
+
+
+BEFORE = "".join(f"line {i}\n" for i in range(100))
+AFTER = BEFORE.replace("line 50\n", "line fifty\n")
+
+
+@pytest.fixture(autouse=True)
+def blob_store(tmp_path_factory, monkeypatch):
+    store = LocalBlobStore(str(tmp_path_factory.mktemp("blobs")))
+    monkeypatch.setattr(proposal_codec, "get_blob_store", lambda: store)
+    return store
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    repo = git.Repo.init(tmp_path)
+    (tmp_path / "app.py").write_text(BEFORE)
+    repo.index.add(["app.py"])
+    repo.index.commit("init")
+    return tmp_path
+
+
+def _change(path, before, after, change_type="update"):
+    change = {
+        "file_path": path,
+        "change_type": change_type,
+        "description": f"Update {path}",
+        "after": after,
+        "diff": generate_unified_diff(path, before or "", after),
+    }
+    if before is not None:
+        change["before"] = before
+    return change
+
+
+def _proposal(changes, overall=None):
+    return {
+        "id": "dev-1",
+        "workspace_id": "missing-workspace",
+        "agent_id": "development",
+        "title": "t",
+        "proposed_changes": changes,
+        "diff": {"format": "unified", "content": overall or build_overall_diff(changes)},
+    }
+
+
+def test_round_trip_with_git_backed_base(workspace):
+    proposal = _proposal([_change("app.py", BEFORE, AFTER)])
+    stored = encode_proposal(proposal, workspace_path=str(workspace), mode="diff")
+
+    change = stored["proposed_changes"][0]
+    assert "before" not in change and "after" not in change
+    assert "content" not in stored["diff"]
+    assert len(str(stored)) < len(str(proposal)) / 3
+
+    # The working file may change afterwards: the base comes from git objects
+    (workspace / "app.py").write_text("rewritten\n")
+    assert decode_proposal(stored, workspace_path=str(workspace)) == proposal
+
+
+def test_untracked_base_goes_to_blob_store(tmp_path):
+    proposal = _proposal([_change("notes.md", BEFORE, AFTER)])
+    stored = encode_proposal(proposal, workspace_path=str(tmp_path), mode="diff")
+
+    change = stored["proposed_changes"][0]
+    assert "before" not in change and "after" not in change
+    assert blob_refs(stored) == [change["before_blob"]]
+    assert decode_proposal(stored, workspace_path=str(tmp_path)) == proposal
+
+    listed = decode_proposal(stored, with_contents=False)["proposed_changes"][0]
+    assert "before" not in listed and "before_blob" not in listed
+
+
+def test_base_not_in_head_goes_to_blob_store(workspace):
+    staged = BEFORE.replace("line 10\n", "line ten\n")
+    (workspace / "app.py").write_text(staged)
+    git.Repo(workspace).index.add(["app.py"])  # Loose object, prunable until committed
+    proposal = _proposal([_change("app.py", staged, AFTER)])
+
+    stored = encode_proposal(proposal, workspace_path=str(workspace), mode="diff")
+
+    change = stored["proposed_changes"][0]
+    assert blob_refs(stored) == [change["before_blob"]]
+    assert decode_proposal(stored, workspace_path=str(workspace)) == proposal
+
+
+def test_small_untracked_base_stays_inline(tmp_path):
+    proposal = _proposal([_change("notes.md", "a\nb\n", "a\nc\n")])
+    stored = encode_proposal(proposal, workspace_path=str(tmp_path), mode="diff")
+
+    change = stored["proposed_changes"][0]
+    assert change["before"] == "a\nb\n"
+    assert blob_refs(stored) == []
+    assert decode_proposal(stored, workspace_path=str(tmp_path)) == proposal
+
+
+def test_created_file_round_trip():
+    # Retrospective-style: no `before`, single change equals the overall diff
+    change = _change("docs/plan.md", None, "# Plan\n\n- item\n", change_type="create")
+    proposal = _proposal([change], overall=change["diff"])
+    stored = encode_proposal(proposal, mode="diff")
+
+    assert stored["diff"]["derived"] == "single"
+    assert "after" not in stored["proposed_changes"][0]
+    assert decode_proposal(stored) == proposal
+
+
+def test_list_decode_skips_contents(workspace):
+    proposal = _proposal([_change("app.py", BEFORE, AFTER)])
+    stored = encode_proposal(proposal, workspace_path=str(workspace), mode="diff")
+
+    listed = decode_proposal(stored, with_contents=False)
+
+    assert STORAGE_KEY not in listed
+    assert listed["diff"] == proposal["diff"]
+    assert set(listed["proposed_changes"][0]) == {"file_path", "change_type", "description", "diff"}
+
+
+def test_file_without_trailing_newline_round_trip(workspace):
+    before = BEFORE + "last line"  # Larger than BLOB_INLINE_MAX_BYTES
+    after = before.replace("line 50\n", "line fifty\n") + " changed"
+    (workspace / "tail.txt").write_text(before)
+    proposal = _proposal([_change("tail.txt", before, after)])
+    stored = encode_proposal(proposal, workspace_path=str(workspace), mode="diff")
+
+    change = stored["proposed_changes"][0]
+    assert "after" not in change and "after_blob" not in change
+    assert decode_proposal(stored, workspace_path=str(workspace)) == proposal
+
+    success, error = apply_patch("tail.txt", change["diff"], str(workspace))
+    assert (success, error) == (True, None)
+    assert (workspace / "tail.txt").read_text() == after
+
+
+def test_unverifiable_diff_kept_in_full():
+    change = dict(_change("a.txt", "a\nb\n", "a\nc\n"), diff="--- a/a.txt\n+++ b/a.txt\n@@ -1 +1 @@\n-x\n+y\n")
+    proposal = _proposal([change])
+    stored = encode_proposal(proposal, mode="diff")
+    assert stored["proposed_changes"][0] == change
+    assert decode_proposal(stored) == proposal
+
+    large = dict(_change("b.txt", BEFORE, AFTER), diff=generate_unified_diff("b.txt", BEFORE, BEFORE + "z\n"))
+    proposal = _proposal([large])
+    stored = encode_proposal(proposal, mode="diff")
+    assert len(blob_refs(stored)) == 2
+    assert decode_proposal(stored) == proposal
+
+
+def test_missing_base_returns_diff_only(workspace, tmp_path_factory):
+    proposal = _proposal([_change("app.py", BEFORE, AFTER)])
+    stored = encode_proposal(proposal, workspace_path=str(workspace), mode="diff")
+
+    other = tmp_path_factory.mktemp("elsewhere")
+    change = decode_proposal(stored, workspace_path=str(other))["proposed_changes"][0]
+    assert change["before"] is None and change["after"] is None
+    assert change["diff"] == proposal["proposed_changes"][0]["diff"]
+
+
+def test_full_mode_is_passthrough():
+    proposal = _proposal([_change("a.txt", BEFORE, AFTER)])
+    assert encode_proposal(proposal, mode="full") is proposal
+    assert decode_proposal(proposal) is proposal
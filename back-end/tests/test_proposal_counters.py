@@ -0,0 +1,193 @@
+"""
+Unit tests for materialized proposal counters
+
+Tests cover:
+- Transition deltas (create, approve, delete) and daily/all-time buckets
+- Sharded Firestore counters (in-memory client double)
+- Stats counters kept by the local index triggers
+"""
+
+import json
+from datetime import datetime, timezone
+
+from app.services.local_proposal_store import LocalProposalStore
+from app.services.proposal_counters import (
+    ProposalCounters,
+    aggregate,
+    bucket_id,
+    stats_from_totals,
+    transition_deltas,
+    window_buckets,
+)
+
+NOW = datetime(2025, 1, 10, 12, 0, tzinfo=timezone.utc)
+
+
+def _proposal(proposal_id="p-1", status="pending", day=9, user_id="alice", agent_id="spec", **extra):
+    proposal = {
+        "id": proposal_id,
+        "workspace_id": "ws",
+        "user_id": user_id,
+        "agent_id": agent_id,
+        "status": status,
+        "created_at": f"2025-01-{day:02d}T10:00:00",
+    }
+    proposal.update(extra)
+    return proposal
+
+
+# ========== In-memory Firestore double ==========
+
+
+class _Snapshot:
+    def __init__(self, data):
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self):
+        return self._data
+
+
+class _Ref:
+    def __init__(self, db, path):
+        self.db, self.path = db, path
+
+    def collection(self, name):
+        return _Ref(self.db, self.path + (name,))
+
+    def document(self, name):
+        return _Ref(self.db, self.path + (name,))
+
+
+class _Batch:
+    def __init__(self, db):
+        self.db, self.writes = db, []
+
+    def set(self, ref, payload, merge=False):
+        self.writes.append((ref.path, payload))
+
+    def commit(self):
+        for path, payload in self.writes:
+            doc = self.db.docs.setdefault(path, {})
+            for key, value in payload.items():
+                if isinstance(value, dict):
+                    counts = doc.setdefault(key, {})
+                    for name, inc in value.items():
+                        counts[name] = counts.get(name, 0) + inc.value
+                else:
+                    doc[key] = doc.get(key, 0) + value.value
+
+
+class _FakeDb:
+    def __init__(self):
+        self.docs = {}
+        self.reads = 0
+
+    def collection(self, name):
+        return _Ref(self, (name,))
+
+    def batch(self):
+        return _Batch(self)
+
+    def get_all(self, refs):
+        refs = list(refs)
+        self.reads += len(refs)
+        return [_Snapshot(self.docs.get(ref.path)) for ref in refs]
+
+
+# ========== Tests ==========
+
+
+def test_create_counts_daily_and_all_time_buckets_per_user():
+    deltas = transition_deltas(None, _proposal())
+
+    assert set(deltas) == {
+        bucket_id("ws", None, "all"),
+        bucket_id("ws", None, "2025-01-09"),
+        bucket_id("ws", "alice", "all"),
+        bucket_id("ws", "alice", "2025-01-09"),
+    }
+    assert deltas[bucket_id("ws", None, "all")] == {
+        "total": 1,
+        "by_status": {"pending": 1},
+        "by_agent": {"spec": 1},
+    }
+
+
+def test_approve_moves_status_and_adds_review_time():
+    before = _proposal()
+    after = {**before, "status": "approved", "reviewed_at": "2025-01-09T11:30:00+00:00"}
+
+    delta = transition_deltas(before, after)[bucket_id("ws", None, "all")]
+
+    assert delta == {
+        "by_status": {"pending": -1, "approved": 1},
+        "review_seconds": 5400.0,
+        "reviewed": 1,
+    }
+
+
+def test_delete_reverts_create():
+    proposal = _proposal(status="rejected", reviewed_at="2025-01-09T11:00:00")
+    created = transition_deltas(None, proposal)
+    deleted = transition_deltas(proposal, None)
+
+    totals = aggregate(list(created.values()) + list(deleted.values()))
+    assert stats_from_totals(totals)["total"] == 0
+    assert transition_deltas(proposal, proposal) == {}
+
+
+def test_window_buckets_are_daily():
+    buckets = window_buckets("ws", days=2, now=NOW)
+    assert buckets == [
+        bucket_id("ws", None, "2025-01-10"),
+        bucket_id("ws", None, "2025-01-09"),
+        bucket_id("ws", None, "2025-01-08"),
+    ]
+    assert window_buckets("ws", "alice") == [bucket_id("ws", "alice", "all")]
+
+
+def test_sharded_counters_sum_shards():
+    db = _FakeDb()
+    counters = ProposalCounters(db, shards=3)
+    for i in range(20):
+        counters.apply(None, _proposal(f"p-{i}", agent_id="spec" if i % 2 else "retro"))
+    first = _proposal("p-0", agent_id="retro")
+    counters.apply(first, {**first, "status": "approved", "reviewed_at": "2025-01-09T10:30:00"})
+    counters.apply(_proposal("p-1"), None)
+
+    stats = stats_from_totals(counters.stats("ws"))
+
+    assert stats["total"] == 19
+    assert stats["by_status"] == {"pending": 18, "approved": 1}
+    assert stats["by_agent"] == {"retro": 10, "spec": 9}
+    assert stats["approval_rate"] == 1.0
+    assert stats["avg_time_to_review_minutes"] == 30.0
+    shards_used = {path[3] for path in db.docs if path[1] == bucket_id("ws", None, "all")}
+    assert len(shards_used) > 1
+
+    db.reads = 0
+    counters.stats("ws", user_id="alice", days=7)
+    assert db.reads == 8 * 3
+
+
+def test_local_index_maintains_stats(tmp_path):
+    directory = tmp_path / "proposals"
+    directory.mkdir()
+    for i in range(6):
+        proposal = _proposal(f"p-{i}", day=1 + i, user_id="alice" if i < 3 else None)
+        (directory / f"p-{i}.json").write_text(json.dumps(proposal))
+    store = LocalProposalStore(directory)
+
+    proposal = store.get("p-5")
+    proposal.update(status="approved", reviewed_at="2025-01-06T11:00:00")
+    store.save(proposal)
+    (directory / "p-0.json").unlink()
+
+    stats = stats_from_totals(store.stats())
+    assert stats["total"] == 5
+    assert stats["by_status"] == {"pending": 4, "approved": 1}
+    assert stats["avg_time_to_review_minutes"] == 60.0
+    assert store.stats(user_id="alice")["total"] == 2
+    assert store.stats(since="2025-01-05")["total"] == 2
+    store.close()
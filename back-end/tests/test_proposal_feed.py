@@ -0,0 +1,289 @@
+"""
+Unit tests for the proposal change feed
+
+Tests cover:
+- Change classification (created, status_changed, updated, deleted) and
+  de-duplication of bus events
+- Resuming by sequence number or timestamp, reset on gaps
+- Changes recorded by LocalProposalStore and ProposalRepository
+- Firestore snapshot listener and SSE-style streaming
+- GET /proposals/changes
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import server
+from app.repositories import proposal_repository
+from app.services.event_bus import EventTypes, InMemoryEventBus
+from app.services.local_proposal_store import LocalProposalStore, reset_local_proposal_stores
+from app.services.proposal_feed import ChangeType, ProposalFeed, get_proposal_feed, reset_proposal_feed
+
+
+def _proposal(proposal_id, status="pending", workspace_id="ws", **extra):
+    proposal = {
+        "id": proposal_id,
+        "workspace_id": workspace_id,
+        "agent_id": "spec",
+        "title": f"Proposal {proposal_id}",
+        "status": status,
+        "created_at": "2025-01-09T10:00:00",
+    }
+    proposal.update(extra)
+    return proposal
+
+
+@pytest.fixture(autouse=True)
+def _reset_feed():
+    reset_proposal_feed()
+    yield
+    reset_proposal_feed()
+
+
+def _types(changes):
+    return [(c["proposal_id"], c["type"]) for c in changes]
+
+
+def test_changes_are_classified():
+    feed = ProposalFeed()
+
+    feed.record(_proposal("p-1"))
+    feed.record(_proposal("p-1", status="approved"))
+    feed.record(_proposal("p-1", status="approved", commit_hash="abc"))
+    feed.record(_proposal("p-1", status="approved"), change_type=ChangeType.DELETED)
+
+    changes = feed.changes()["changes"]
+    assert _types(changes) == [
+        ("p-1", "created"),
+        ("p-1", "status_changed"),
+        ("p-1", "updated"),
+        ("p-1", "deleted"),
+    ]
+    assert changes[1]["previous_status"] == "pending"
+    assert [c["seq"] for c in changes] == [1, 2, 3, 4]
+    assert "diff" not in changes[0]["proposal"] and changes[0]["proposal"]["title"] == "Proposal p-1"
+
+
+def test_bus_events_fill_in_missing_changes_only():
+    feed = ProposalFeed()
+    bus = InMemoryEventBus()
+    feed.attach(bus)
+    feed.record(_proposal("p-1", status="approved"), previous_status="pending")
+
+    async def publish():
+        for event_type, proposal_id in (
+            (EventTypes.PROPOSAL_APPROVED.value, "p-1"),  # already recorded by the store
+            (EventTypes.PROPOSAL_CREATED.value, "p-2"),
+            (EventTypes.PROPOSAL_REJECTED.value, "p-3"),
+        ):
+            await bus.publish(
+                topic="proposals-events",
+                event_type=event_type,
+                source="test",
+                data={"proposal_id": proposal_id, "workspace_id": "ws"},
+            )
+
+    asyncio.run(publish())
+
+    assert _types(feed.changes(after_seq=1)["changes"]) == [("p-2", "created"), ("p-3", "status_changed")]
+
+
+def test_resume_by_seq_and_workspace():
+    feed = ProposalFeed()
+    for i in range(5):
+        feed.record(_proposal(f"p-{i}", workspace_id="ws" if i % 2 == 0 else "other"))
+
+    page = feed.changes(after_seq=0, workspace_id="ws", limit=2)
+    assert _types(page["changes"]) == [("p-0", "created"), ("p-2", "created")]
+    assert page["has_more"] and page["last_seq"] == 3
+
+    rest = feed.changes(after_seq=page["last_seq"], workspace_id="ws")
+    assert _types(rest["changes"]) == [("p-4", "created")]
+    assert not rest["has_more"] and rest["last_seq"] == 5
+    assert feed.changes(after_seq=5)["changes"] == []
+
+
+def test_reset_when_changes_were_missed():
+    feed = ProposalFeed(size=3)
+    for i in range(5):
+        feed.record(_proposal(f"p-{i}"))
+
+    assert feed.changes(after_seq=1)["reset"]  # seq 2 was dropped
+    assert not feed.changes(after_seq=2)["reset"]
+    assert feed.changes(after_seq=9)["reset"]  # issued before a restart
+    assert feed.changes(since=datetime.now(timezone.utc) - timedelta(hours=1))["reset"]
+    assert ProposalFeed().changes(after_seq=0) == {
+        "changes": [],
+        "last_seq": 0,
+        "has_more": False,
+        "reset": False,
+    }
+
+
+def test_resume_by_timestamp():
+    feed = ProposalFeed()
+    feed.record(_proposal("p-1"))
+    since = datetime.now(timezone.utc)
+    time.sleep(0.001)
+    feed.record(_proposal("p-2"))
+
+    assert _types(feed.changes(since=since)["changes"]) == [("p-2", "created")]
+    # Naive timestamps are taken as UTC
+    assert len(feed.changes(since=since.replace(tzinfo=None))["changes"]) == 1
+
+
+def test_local_store_records_committed_changes(tmp_path):
+    (tmp_path / "p-0.json").write_text(json.dumps(_proposal("p-0")))
+    store = LocalProposalStore(tmp_path)
+    feed = get_proposal_feed()
+    # Indexing an existing directory is not a change
+    assert feed.last_seq == 0
+
+    store.save(_proposal("p-1"))
+    store.save_many([_proposal("p-0", status="approved"), _proposal("p-1", status="rejected")])
+    (tmp_path / "p-2.json").write_text(json.dumps(_proposal("p-2")))
+    os.remove(tmp_path / "p-1.json")
+    store.refresh(force=True)
+    with pytest.raises(KeyError):
+        store.save_many([_proposal("p-3"), {"title": "no id"}])
+
+    changes = feed.changes()["changes"]
+    assert _types(changes) == [
+        ("p-1", "created"),
+        ("p-0", "status_changed"),
+        ("p-1", "status_changed"),
+        ("p-2", "created"),
+        ("p-1", "deleted"),
+    ]
+    assert changes[1]["previous_status"] == "pending"
+    assert changes[4]["workspace_id"] == "ws"
+    store.close()
+
+
+def test_repository_records_writes(monkeypatch):
+    firestore = MagicMock()
+    documents = {"p-1": _proposal("p-1"), "p-2": _proposal("p-2")}
+
+    def transition(ids, plan):
+        read = {pid: dict(documents[pid]) for pid in ids if pid in documents}
+        plan(MagicMock(), read)
+        return read
+
+    firestore.transition_proposals.side_effect = transition
+    monkeypatch.setattr(proposal_repository, "get_firestore_service", lambda project_id=None: firestore)
+    repo = proposal_repository.ProposalRepository()
+    feed = get_proposal_feed()
+
+    repo.approve("p-1")
+    repo.bulk_update_status(["p-2"], "rejected")
+    repo.record_commit(["p-1"], "abc", workspace_id="ws")
+
+    assert _types(feed.changes()["changes"]) == [
+        ("p-1", "status_changed"),
+        ("p-2", "status_changed"),
+        ("p-1", "updated"),
+    ]
+
+    # A snapshot listener records Firestore writes instead
+    feed._watch = MagicMock()
+    repo.reject("p-1")
+    assert feed.last_seq == 3
+
+
+def test_firestore_listener_records_changes():
+    feed = ProposalFeed()
+    firestore = MagicMock()
+    feed.watch_firestore(firestore)
+    on_snapshot = firestore.watch_proposals.call_args.args[0]
+
+    def doc(proposal):
+        return SimpleNamespace(id=proposal["id"], to_dict=lambda: proposal)
+
+    def change(kind, proposal):
+        return SimpleNamespace(type=SimpleNamespace(name=kind), document=doc(proposal))
+
+    existing = _proposal("p-1")
+    on_snapshot([doc(existing)], [change("ADDED", existing)], None)
+    on_snapshot(
+        [],
+        [
+            change("MODIFIED", _proposal("p-1", status="approved")),
+            change("ADDED", _proposal("p-2")),
+            change("REMOVED", _proposal("p-2")),
+        ],
+        None,
+    )
+
+    assert _types(feed.changes()["changes"]) == [
+        ("p-1", "status_changed"),
+        ("p-2", "created"),
+        ("p-2", "deleted"),
+    ]
+    assert feed.watching
+    feed.close()
+    firestore.watch_proposals.return_value.unsubscribe.assert_called_once()
+
+
+def test_stream_replays_then_follows():
+    feed = ProposalFeed()
+    feed.record(_proposal("p-1"))
+    feed.record(_proposal("p-2", workspace_id="other"))
+
+    async def consume():
+        received = []
+        stream = feed.stream(after_seq=0, workspace_id="ws", timeout=0.05)
+        received.append(await stream.__anext__())
+        threading.Thread(target=feed.record, args=(_proposal("p-3"),)).start()
+        received.append(await stream.__anext__())
+        received.append(await stream.__anext__())  # timeout -> None
+        await stream.aclose()
+        return received
+
+    received = asyncio.run(consume())
+
+    assert [c and c["proposal_id"] for c in received] == ["p-1", "p-3", None]
+    assert feed._subscribers == []
+
+
+def test_stream_signals_reset():
+    feed = ProposalFeed()
+
+    async def first():
+        stream = feed.stream(after_seq=7, timeout=0.01)
+        item = await stream.__anext__()
+        await stream.aclose()
+        return item
+
+    assert asyncio.run(first()) == {"type": "reset", "last_seq": 0}
+
+
+def test_changes_endpoint_local(tmp_path, monkeypatch):
+    directory = tmp_path / "proposals"
+    directory.mkdir()
+    monkeypatch.delenv("FIRESTORE_ENABLED", raising=False)
+    monkeypatch.setattr(
+        server, "_proposals_paths", lambda workspace_id: {"json": tmp_path / "proposals.json", "dir": directory}
+    )
+    reset_local_proposal_stores()
+    try:
+        client = TestClient(server.app)
+        start = client.get("/proposals/changes", params={"workspace_id": "ws"}).json()
+        # An agent writes a proposal file; the next call picks it up
+        (directory / "p-1.json").write_text(json.dumps(_proposal("p-1")))
+
+        data = client.get("/proposals/changes", params={"workspace_id": "ws", "seq": start["last_seq"]}).json()
+
+        assert _types(data["changes"]) == [("p-1", "created")]
+        assert data["last_seq"] == data["changes"][0]["seq"] and not data["reset"]
+        assert client.get("/proposals/changes", params={"since": "yesterday"}).status_code == 400
+    finally:
+        reset_local_proposal_stores()
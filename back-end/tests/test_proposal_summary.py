@@ -0,0 +1,118 @@
+"""
+Unit tests for proposal summaries (list-view projection)
+
+Tests cover:
+- Diff stats computed from per-file diffs or the overall diff
+- Stored stats are used as-is; missing ones are computed from the body
+- The local index serves summary pages without reading proposal bodies
+- Firestore listings read only the summary field mask and backfill old docs
+"""
+
+import json
+from unittest.mock import MagicMock
+
+from app.models.proposal import ProposalSummary
+from app.repositories import proposal_repository
+from app.services.local_proposal_store import LocalProposalStore
+from app.services.proposal_summary import (
+    SUMMARY_FIELDS,
+    SUMMARY_KEY,
+    compute_summary_stats,
+    to_summary,
+    with_summary,
+)
+
+DIFF = "--- a/app.py\n+++ b/app.py\n@@ -1,2 +1,3 @@\n context\n-old\n+new\n+more\n"
+
+
+def _proposal(proposal_id="p-1", day=1, **extra):
+    proposal = {
+        "id": proposal_id,
+        "agent_id": "spec",
+        "workspace_id": "ws",
+        "title": f"Proposal {proposal_id}",
+        "status": "pending",
+        "created_at": f"2025-01-{day:02d}T00:00:00",
+        "proposed_changes": [
+            {"file_path": "app.py", "change_type": "update", "before": "x" * 5000, "after": "y" * 5000, "diff": DIFF},
+            {"file_path": "NEW.md", "change_type": "create", "after": "hi\n", "diff": "+hi\n"},
+        ],
+    }
+    proposal.update(extra)
+    return proposal
+
+
+def test_compute_summary_stats_from_changes():
+    assert compute_summary_stats(_proposal()) == {"file_count": 2, "additions": 3, "deletions": 1}
+
+
+def test_compute_summary_stats_from_overall_diff():
+    proposal = {"diff": {"format": "unified", "content": DIFF}}
+    assert compute_summary_stats(proposal) == {"file_count": 0, "additions": 2, "deletions": 1}
+
+
+def test_to_summary_prefers_stored_stats():
+    document = _proposal(proposed_changes=[])
+    document[SUMMARY_KEY] = {"file_count": 7, "additions": 70, "deletions": 7}
+
+    summary = to_summary(document)
+
+    assert summary["file_count"] == 7
+    assert summary["additions"] == 70
+    assert "proposed_changes" not in summary
+    assert ProposalSummary(**summary).title == "Proposal p-1"
+
+
+def test_with_summary_uses_source_body():
+    document = with_summary({"id": "p-1", "proposed_changes": []}, source=_proposal())
+    assert document[SUMMARY_KEY] == {"file_count": 2, "additions": 3, "deletions": 1}
+
+
+def test_local_summary_page_reads_no_bodies(tmp_path, monkeypatch):
+    directory = tmp_path / "proposals"
+    directory.mkdir()
+    for day in range(1, 6):
+        (directory / f"p-{day}.json").write_text(json.dumps(_proposal(f"p-{day}", day)))
+    store = LocalProposalStore(directory)
+
+    reads = []
+    monkeypatch.setattr(store, "_read_file", lambda name: reads.append(name))
+    first, cursor = store.summary_page(3)
+    second, last = store.summary_page(3, cursor=cursor)
+
+    assert reads == []
+    assert [s["id"] for s in first + second] == ["p-5", "p-4", "p-3", "p-2", "p-1"]
+    assert last is None
+    assert first[0]["file_count"] == 2 and first[0]["additions"] == 3
+    assert first[0]["workspace_id"] == "ws"
+    ProposalSummary(**first[0])
+    store.close()
+
+
+def test_repository_summaries_use_field_mask_and_backfill(monkeypatch):
+    firestore = MagicMock()
+    stored = with_summary(_proposal("p-2", 2))
+    legacy = {k: v for k, v in _proposal("p-1", 1).items() if k in SUMMARY_FIELDS}
+    firestore.list_proposals_page.return_value = (
+        [{k: v for k, v in stored.items() if k in SUMMARY_FIELDS}, legacy],
+        None,
+    )
+    firestore.get_proposal.return_value = _proposal("p-1", 1)
+    monkeypatch.setattr(proposal_repository, "get_firestore_service", lambda project_id=None: firestore)
+    repo = proposal_repository.ProposalRepository()
+
+    summaries, next_cursor = repo.list_summaries(workspace_id="ws", limit=2)
+
+    assert firestore.list_proposals_page.call_args.kwargs["fields"] == SUMMARY_FIELDS
+    assert [s["id"] for s in summaries] == ["p-2", "p-1"]
+    assert summaries[1]["file_count"] == 2
+    firestore.get_proposal.assert_called_once_with("p-1")
+    firestore.set_proposal_summary.assert_called_once_with(
+        "p-1", {"file_count": 2, "additions": 3, "deletions": 1}
+    )
+    assert next_cursor is None
+
+
+def test_summary_payload_is_small():
+    summary = ProposalSummary(**to_summary(_proposal()))
+    assert len(summary.model_dump_json()) < 500
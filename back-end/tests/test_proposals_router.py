@@ -0,0 +1,118 @@
+"""
+Unit tests for the /proposals router writes
+
+Tests cover:
+- Reviews, creation and deletion written with their counter changes in one
+  transaction
+- Status checked on the transaction's read (a review racing another one
+  is refused and not counted)
+"""
+
+import importlib
+import sys
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services.proposal_counters import bucket_id
+
+
+def _proposal(proposal_id, status="pending"):
+    return {
+        "id": proposal_id,
+        "workspace_id": "ws",
+        "agent_id": "spec",
+        "user_id": "alice",
+        "title": f"Proposal {proposal_id}",
+        "description": "Test",
+        "proposed_changes": [],
+        "status": status,
+        "created_at": "2025-01-09T10:00:00",
+    }
+
+
+@pytest.fixture
+def router(monkeypatch):
+    from google.cloud import firestore
+
+    monkeypatch.setattr(firestore, "AsyncClient", MagicMock())
+    monkeypatch.delenv("USE_PUBSUB", raising=False)
+    sys.modules.pop("app.routers.proposals", None)
+    module = importlib.import_module("app.routers.proposals")
+
+    # `stale` is what the handler read first, `documents` what the transaction reads
+    stale, documents, counted = {}, {}, []
+
+    async def transition(ids, plan):
+        read = {pid: dict(documents[pid]) for pid in ids if pid in documents}
+        for pid, fields in plan(MagicMock(), read).items():
+            if fields is None:
+                documents.pop(pid, None)
+            else:
+                documents[pid] = {**documents.get(pid, {}), **fields}
+        return read
+
+    async def read_first(proposal_id):
+        data = stale.get(proposal_id)
+        return (MagicMock(), dict(data)) if data else (None, None)
+
+    service = SimpleNamespace(db=MagicMock(), transition_proposals=AsyncMock(side_effect=transition))
+    counters = MagicMock()
+    counters.return_value.add_to_batch.side_effect = lambda batch, deltas: counted.append(deltas)
+    monkeypatch.setattr(module, "get_async_firestore_service", lambda: service)
+    monkeypatch.setattr(module, "ProposalCounters", counters)
+    monkeypatch.setattr(module, "_get_proposal_doc_and_data_by_id", read_first)
+    monkeypatch.setattr(module, "proposals_col", MagicMock(document=lambda pid: SimpleNamespace(
+        get=AsyncMock(return_value=SimpleNamespace(exists=pid in stale, to_dict=lambda: dict(stale[pid]))),
+    )))
+    monkeypatch.setattr(module, "get_blob_store", MagicMock())
+
+    app = FastAPI()
+    app.include_router(module.router)
+    yield SimpleNamespace(
+        client=TestClient(app), stale=stale, documents=documents, counted=counted, service=service
+    )
+    sys.modules.pop("app.routers.proposals", None)
+
+
+ALL_TIME = bucket_id("ws", None, "all")
+
+
+def test_reject_counts_from_the_transaction_read(router):
+    router.stale["p-1"] = _proposal("p-1")
+    router.documents["p-1"] = _proposal("p-1", status="approved")  # approved meanwhile
+
+    response = router.client.post("/proposals/p-1/reject", json={"user_id": "alice", "reason": "dup"})
+
+    assert response.status_code == 200
+    assert router.documents["p-1"]["status"] == "rejected"
+    assert router.counted[-1][ALL_TIME]["by_status"] == {"approved": -1, "rejected": 1}
+
+
+def test_approve_racing_another_review_is_refused(router):
+    router.stale["p-1"] = _proposal("p-1")
+    router.documents["p-1"] = _proposal("p-1", status="rejected")
+
+    response = router.client.post("/proposals/p-1/approve", json={"user_id": "alice"})
+
+    assert response.status_code == 400
+    assert router.documents["p-1"]["status"] == "rejected"
+    assert router.counted == [{}]
+
+
+def test_create_and_delete_count_in_the_write(router):
+    created = router.client.post("/proposals/create", json=_proposal("p-2"))
+    assert created.status_code == 200
+    assert router.documents["p-2"]["status"] == "pending"
+    assert router.counted[-1][ALL_TIME] == {"total": 1, "by_status": {"pending": 1}, "by_agent": {"spec": 1}}
+
+    router.stale["p-2"] = router.documents["p-2"]
+    deleted = router.client.delete("/proposals/p-2", params={"user_id": "alice"})
+
+    assert deleted.status_code == 200
+    assert "p-2" not in router.documents
+    assert router.counted[-1][ALL_TIME] == {"total": -1, "by_status": {"pending": -1}, "by_agent": {"spec": -1}}
+    assert router.service.transition_proposals.await_count == 2
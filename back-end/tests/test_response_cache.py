@@ -0,0 +1,195 @@
+"""
+Unit tests for ETags and conditional GETs
+
+Tests cover:
+- 304 on a matching If-None-Match, cached bodies while the version holds
+- Error payloads and unknown versions bypass the cache
+- Local proposal index version (persistent, bumped by any change)
+- /proposals, /proposals/{id}, /context/summary and
+  /agents/retrospective/list
+"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app import server
+from app.services.local_proposal_store import LocalProposalStore, reset_local_proposal_stores
+from app.services.response_cache import ResponseCache, dir_version, file_version, reset_response_cache
+
+
+def _request(path="/items", query="", if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": query.encode(), "headers": headers})
+
+
+def _proposal(proposal_id, status="pending"):
+    return {
+        "id": proposal_id,
+        "workspace_id": "ws",
+        "agent_id": "spec",
+        "title": f"Proposal {proposal_id}",
+        "status": status,
+        "created_at": "2025-01-09T10:00:00",
+    }
+
+
+@pytest.fixture(autouse=True)
+def _reset_cache():
+    reset_response_cache()
+    yield
+    reset_response_cache()
+
+
+def test_conditional_get_and_cached_body():
+    cache = ResponseCache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {"items": [1, 2]}
+
+    first = asyncio.run(cache.respond(_request(query="b=2&a=1"), "v1", build))
+    etag = first.headers["etag"]
+    assert json.loads(first.body) == {"items": [1, 2]}
+
+    # Same query in another order, weak validator, list of candidates
+    not_modified = asyncio.run(cache.respond(_request(query="a=1&b=2", if_none_match=f'"x", W/{etag}'), "v1", build))
+    cached = asyncio.run(cache.respond(_request(query="a=1&b=2"), "v1", build))
+    changed = asyncio.run(cache.respond(_request(query="a=1&b=2", if_none_match=etag), "v2", build))
+
+    assert not_modified.status_code == 304 and not_modified.headers["etag"] == etag
+    assert cached.body == first.body
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert len(builds) == 2
+
+
+def test_errors_and_unknown_versions_are_not_cached():
+    cache = ResponseCache()
+
+    error = asyncio.run(cache.respond(_request(), "v1", lambda: {"error": "boom"}))
+    assert "etag" not in error.headers
+    assert cache.stats()["size"] == 0
+
+    async def build():
+        return {"ok": True}
+
+    assert asyncio.run(cache.respond(_request(), None, build)) == {"ok": True}
+
+
+def test_file_and_dir_versions(tmp_path):
+    missing = file_version(tmp_path / "a.json")
+    (tmp_path / "a.json").write_text("{}")
+    (tmp_path / "notes.txt").write_text("x")
+    created = file_version(tmp_path / "a.json")
+    listing = dir_version(tmp_path, ".json")
+
+    (tmp_path / "notes.txt").write_text("changed")
+    assert dir_version(tmp_path, ".json") == listing
+    (tmp_path / "a.json").write_text('{"a": 1}')
+
+    assert missing != created != file_version(tmp_path / "a.json")
+    assert dir_version(tmp_path, ".json") != listing
+    assert dir_version(tmp_path / "missing") == "-"
+
+
+def test_local_index_version(tmp_path):
+    store = LocalProposalStore(tmp_path)
+    empty = store.version()
+    assert store.version() == empty
+
+    store.save(_proposal("p-1"))
+    saved = store.version()
+    (tmp_path / "p-2.json").write_text(json.dumps(_proposal("p-2")))
+    store.refresh(force=True)
+    assert len({empty, saved, store.version()}) == 3
+
+    # Persistent across restarts, so old ETags stay valid
+    current = store.version()
+    store.close()
+    reopened = LocalProposalStore(tmp_path)
+    assert reopened.version() == current
+    reopened.close()
+
+
+@pytest.fixture
+def local_workspace(tmp_path, monkeypatch):
+    directory = tmp_path / "proposals"
+    directory.mkdir()
+    (directory / "p-1.json").write_text(json.dumps(_proposal("p-1")))
+    monkeypatch.delenv("FIRESTORE_ENABLED", raising=False)
+    monkeypatch.setattr(
+        server, "_proposals_paths", lambda workspace_id: {"json": tmp_path / "proposals.json", "dir": directory}
+    )
+    monkeypatch.setattr(server, "get_workspace_path", lambda workspace_id: str(tmp_path))
+    reset_local_proposal_stores()
+    yield tmp_path
+    reset_local_proposal_stores()
+
+
+def test_proposal_endpoints_honour_if_none_match(local_workspace, monkeypatch):
+    builds = []
+    list_proposals = server._list_proposals
+
+    def counting(*args):
+        builds.append(args)
+        return list_proposals(*args)
+
+    monkeypatch.setattr(server, "_list_proposals", counting)
+    client = TestClient(server.app)
+
+    first = client.get("/proposals", params={"workspace_id": "ws"})
+    etag = first.headers["etag"]
+    assert client.get("/proposals", params={"workspace_id": "ws"}, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/proposals", params={"workspace_id": "ws"}).json() == first.json()
+    assert len(builds) == 1
+
+    detail = client.get("/proposals/p-1", params={"workspace_id": "ws"})
+    assert detail.json()["id"] == "p-1"
+    assert detail.headers["etag"] != etag
+    assert (
+        client.get("/proposals/p-1", params={"workspace_id": "ws"}, headers={"If-None-Match": detail.headers["etag"]}).status_code
+        == 304
+    )
+
+    server.get_local_proposal_store(local_workspace / "proposals").save(_proposal("p-1", status="approved"))
+    changed = client.get("/proposals", params={"workspace_id": "ws"}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["proposals"][0]["status"] == "approved"
+    assert len(builds) == 2
+
+
+def test_retrospective_list_etag(local_workspace):
+    retro_dir = local_workspace / "retrospectives"
+    retro_dir.mkdir()
+    (retro_dir / "retro-1.json").write_text(json.dumps({"retrospective_id": "retro-1", "insights": ["a"]}))
+    client = TestClient(server.app)
+
+    first = client.get("/agents/retrospective/list")
+    etag = first.headers["etag"]
+    assert first.json()["retrospectives"][0]["insights_count"] == 1
+    assert client.get("/agents/retrospective/list", headers={"If-None-Match": etag}).status_code == 304
+
+    (retro_dir / "retro-2.json").write_text(json.dumps({"retrospective_id": "retro-2"}))
+    assert client.get("/agents/retrospective/list", headers={"If-None-Match": etag}).json()["count"] == 2
+
+
+def test_context_summary_regenerated_when_documents_change(local_workspace, monkeypatch):
+    from app.agents import base_agent
+
+    monkeypatch.setattr(base_agent, "get_workspace_path", lambda workspace_id: str(local_workspace))
+    client = TestClient(server.app)
+    (local_workspace / "README.md").write_text("# Old")
+
+    first = client.get("/context/summary", params={"workspace_id": "ws"})
+    assert "# Old" in first.json()["context"]
+    assert (
+        client.get("/context/summary", params={"workspace_id": "ws"}, headers={"If-None-Match": first.headers["etag"]}).status_code
+        == 304
+    )
+
+    (local_workspace / "README.md").write_text("# New readme")
+    assert "# New readme" in client.get("/context/summary", params={"workspace_id": "ws"}).json()["context"]
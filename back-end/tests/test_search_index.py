@@ -0,0 +1,149 @@
+"""
+Unit tests for the workspace search index
+
+Tests cover:
+- BM25 ranking (titles first), kind filters, prefixes and snippets
+- Incremental syncs (changed and deleted files), persistence across restarts
+- Free-text queries with FTS5 syntax characters
+- Updates from proposal events (local and Firestore)
+- GET /search
+"""
+
+import asyncio
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import server
+from app.services.event_bus import EventTypes, InMemoryEventBus
+from app.services.search_index import SearchIndex, attach_search_indexes, get_search_index, reset_search_indexes
+
+
+def _proposal(proposal_id, title, description="", status="pending"):
+    return {
+        "id": proposal_id,
+        "workspace_id": "ws",
+        "agent_id": "spec",
+        "title": title,
+        "description": description,
+        "status": status,
+        "diff": {"format": "unified", "content": "-old\n+new\n"},
+    }
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    (tmp_path / "proposals").mkdir()
+    (tmp_path / "retrospectives").mkdir()
+    _write(tmp_path / "proposals" / "p-1.json", _proposal("p-1", "Document the cache", "Explain eviction"))
+    _write(tmp_path / "proposals" / "p-2.json", _proposal("p-2", "Fix typo", "The cache section had a typo"))
+    _write(
+        tmp_path / "retrospectives" / "retro-1.json",
+        {"retrospective_id": "retro-1", "insights": ["Deploys were slow"], "action_items": [{"title": "Cache builds"}]},
+    )
+    (tmp_path / "README.md").write_text("# Demo\nHow to deploy the pipelines.\n")
+    reset_search_indexes()
+    yield tmp_path
+    reset_search_indexes()
+
+
+def _write(path, data):
+    path.write_text(json.dumps(data))
+
+
+def _ids(results):
+    return [(r["kind"], r["id"]) for r in results]
+
+
+def test_ranking_kinds_and_snippets(workspace):
+    index = SearchIndex(workspace)
+
+    results = index.search("cache")
+    assert _ids(results)[0] == ("proposal", "p-1")  # title match first
+    assert sorted(_ids(results)[1:]) == [("proposal", "p-2"), ("retrospective", "retro-1")]
+    snippets = {r["id"]: r["snippet"] for r in results}
+    assert snippets["p-2"] == "The [cache] section had a typo\n-old\n+new\n"
+    assert results[0]["status"] == "pending" and results[0]["path"] == os.path.join("proposals", "p-1.json")
+
+    assert sorted(_ids(index.search("deploy", kinds=["doc", "retrospective"]))) == [
+        ("doc", "README.md"),
+        ("retrospective", "retro-1"),
+    ]
+    assert _ids(index.search("pipel")) == [("doc", "README.md")]  # last word as a prefix
+    assert index.search("cache", limit=1)[0]["id"] == "p-1"
+    index.close()
+
+
+def test_incremental_sync_and_persistence(workspace):
+    index = SearchIndex(workspace)
+    assert index.sync() == 4
+    assert index.sync() == 0
+
+    _write(workspace / "proposals" / "p-2.json", _proposal("p-2", "Fix typo", "Rename the worker pool"))
+    os.remove(workspace / "proposals" / "p-1.json")
+    assert index.sync() == 2
+    assert _ids(index.search("worker")) == [("proposal", "p-2")]
+    assert index.search("eviction") == []
+
+    # Docs are edited in place
+    (workspace / "README.md").write_text("# Demo\nNow about observability.\n")
+    assert _ids(index.search("observability")) == [("doc", "README.md")]
+
+    index.close()
+    reopened = SearchIndex(workspace)
+    assert reopened.sync() == 0
+    assert reopened.count() == {"proposal": 1, "retrospective": 1, "doc": 1}
+    reopened.close()
+
+
+def test_free_text_queries(workspace):
+    index = SearchIndex(workspace)
+
+    assert _ids(index.search('"cache" AND (NOT typo*')) != []
+    assert index.search("  -- ") == []
+    assert _ids(index.search("explain eviction")) == [("proposal", "p-1")]
+    index.close()
+
+
+def test_events_update_the_index(workspace, monkeypatch):
+    from app.repositories import proposal_repository
+    from app.utils import workspace_manager
+
+    monkeypatch.delenv("FIRESTORE_ENABLED", raising=False)
+    monkeypatch.setattr(workspace_manager, "get_workspace_path", lambda workspace_id: str(workspace))
+    bus = InMemoryEventBus()
+    attach_search_indexes(bus)
+    index = get_search_index(workspace)
+    index.sync()
+
+    def publish(event_type, **data):
+        asyncio.run(bus.publish(topic="proposals-events", event_type=event_type, source="test", data=data))
+
+    # An in-place rewrite that keeps the directory mtime is picked up after an event
+    stat = os.stat(workspace / "proposals")
+    _write(workspace / "proposals" / "p-2.json", _proposal("p-2", "Fix typo", "Mention the scheduler", "approved"))
+    os.utime(workspace / "proposals", ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert index.search("scheduler") == []
+    publish(EventTypes.PROPOSAL_APPROVED.value, proposal_id="p-2", workspace_id="ws")
+    assert index.search("scheduler")[0]["status"] == "approved"
+
+    # With Firestore, proposals are read through the repository
+    monkeypatch.setenv("FIRESTORE_ENABLED", "true")
+    repository = type("Repo", (), {"get": lambda self, pid: _proposal(pid, "Stored in Firestore")})()
+    monkeypatch.setattr(proposal_repository, "get_proposal_repository", lambda project_id=None: repository)
+    publish(EventTypes.PROPOSAL_CREATED.value, proposal_id="fs-1", workspace_id="ws")
+    assert _ids(index.search("firestore")) == [("proposal", "fs-1")]
+
+
+def test_search_endpoint(workspace, monkeypatch):
+    monkeypatch.setattr(server, "get_workspace_path", lambda workspace_id: str(workspace))
+    client = TestClient(server.app)
+
+    data = client.get("/search", params={"q": "cache", "kind": "proposal", "limit": 5}).json()
+
+    assert [r["id"] for r in data["results"]] == ["p-1", "p-2"]
+    assert data["count"] == 2 and data["took_ms"] >= 0
+    assert client.get("/search", params={"q": "cache", "kind": "emails"}).status_code == 400
+    assert client.get("/search").status_code == 422
@@ -106,6 +106,18 @@ export async function approveProposal(
       vscode.window.showErrorMessage('Proposal not found');
       return;
     }
+
+    // Diff-only proposals come back without `after` when the backend can't
+    // rebuild it (base file not found): writing '' would empty the file
+    const unresolved = proposal.proposedChanges.filter(
+      (c: ProposedChange) => c.changeType !== 'delete' && typeof c.after !== 'string'
+    );
+    if (unresolved.length > 0) {
+      vscode.window.showErrorMessage(
+        `Cannot apply ${proposal.title}: new content unavailable for ${unresolved.map((c: ProposedChange) => c.filePath).join(', ')}`
+      );
+      return;
+    }
     
     // 3. Confirm approval
     const confirmed = await vscode.window.showWarningMessage(
@@ -167,7 +179,7 @@ export async function approveProposal(
           } else {
             // Create or update file
             await fs.promises.mkdir(path.dirname(filePath), { recursive: true });
-            const content = change.after || '';
+            const content = change.after as string;
             await fs.promises.writeFile(filePath, content, 'utf-8');
             console.log(`[approveProposal] ${change.changeType}: ${change.filePath}`);
           }
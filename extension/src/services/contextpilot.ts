@@ -25,6 +25,10 @@ export interface ChangeProposal {
   proposedChanges: Array<ProposedChange>;
   status: 'pending' | 'approved' | 'rejected';
   createdAt: string;
+  // Diff stats (list summaries carry these instead of proposedChanges)
+  fileCount?: number;
+  additions?: number;
+  deletions?: number;
   aiReview?: {
     model: string;
     verdict: 'approve' | 'reject' | 'needsChanges';
@@ -73,6 +77,9 @@ function convertChangeProposal(proposal: any): ChangeProposal {
     proposedChanges: (proposal.proposed_changes || proposal.proposedChanges || []).map(convertProposedChange),
     status: proposal.status,
     createdAt: proposal.created_at || proposal.createdAt,
+    fileCount: proposal.file_count ?? proposal.fileCount,
+    additions: proposal.additions,
+    deletions: proposal.deletions,
     aiReview: proposal.ai_review || proposal.aiReview ? {
       model: (proposal.ai_review || proposal.aiReview).model,
       verdict: (proposal.ai_review || proposal.aiReview).verdict === 'needs_changes' ? 'needsChanges' : (proposal.ai_review || proposal.aiReview).verdict,
@@ -230,7 +237,7 @@ export class ContextPilotService {
     }
   }
 
-  async approveProposal(proposalId: string): Promise<{ ok: boolean; autoCommitted: boolean; commitHash?: string }> {
+  async approveProposal(proposalId: string): Promise<{ ok: boolean; autoCommitted: boolean; commitHash?: string; jobId?: string }> {
     try {
       // Check if we're in CLOUD mode by checking health
       const health = await this.getHealth();
@@ -254,7 +261,9 @@ export class ContextPilotService {
       
       const autoCommitted = !!response.data?.auto_committed;
       const commitHash = response.data?.commit_hash;
-      return { ok: true, autoCommitted, commitHash };
+      // Commit and GitHub dispatch run in the background; poll /jobs/{jobId} for the result
+      const jobId = response.data?.job_id;
+      return { ok: true, autoCommitted, commitHash, jobId };
     } catch (error) {
       console.error('Failed to approve proposal:', error);
       return { ok: false, autoCommitted: false };
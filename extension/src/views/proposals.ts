@@ -111,9 +111,12 @@ class ProposalItem extends vscode.TreeItem {
     } else {
       // Proposal constructor
       this.proposal = proposalOrTitle;
-      const fileCount = proposalOrTitle.proposedChanges?.length || 0;
-      this.tooltip = `${proposalOrTitle.description}\n\n💡 Click ➕ to expand files\n💡 Right-click for actions (View Diff, Approve, Reject)`;
-      this.description = `by ${proposalOrTitle.agentId} • ${fileCount} file${fileCount !== 1 ? 's' : ''}`;
+      const fileCount = proposalOrTitle.fileCount ?? (proposalOrTitle.proposedChanges?.length || 0);
+      this.tooltip = `${proposalOrTitle.description || proposalOrTitle.title}\n\n💡 Click ➕ to expand files\n💡 Right-click for actions (View Diff, Approve, Reject)`;
+      const stats = proposalOrTitle.additions !== undefined
+        ? ` (+${proposalOrTitle.additions} -${proposalOrTitle.deletions ?? 0})`
+        : '';
+      this.description = `by ${proposalOrTitle.agentId} • ${fileCount} file${fileCount !== 1 ? 's' : ''}${stats}`;
       this.contextValue = 'proposal';
       this.iconPath = new vscode.ThemeIcon('git-pull-request');
     }
@@ -136,6 +136,46 @@ resource "google_firestore_database" "database" {
   depends_on = [google_project_service.required_apis]
 }
 
+# Composite indexes for the declared query shapes. The file is generated by
+# back-end/app/services/firestore_query.py; regenerate it, don't edit it.
+locals {
+  firestore_index_file      = jsondecode(file("${path.module}/../firestore.indexes.json"))
+  firestore_indexes         = local.firestore_index_file.indexes
+  firestore_field_overrides = local.firestore_index_file.fieldOverrides
+}
+
+resource "google_firestore_index" "composite" {
+  for_each = {
+    for index in local.firestore_indexes :
+    "${index.collectionGroup}:${join(",", [for f in index.fields : "${f.fieldPath}-${lookup(f, "order", lookup(f, "arrayConfig", ""))}"])}" => index
+  }
+  database    = google_firestore_database.database.name
+  collection  = each.value.collectionGroup
+  query_scope = each.value.queryScope
+
+  dynamic "fields" {
+    for_each = each.value.fields
+    content {
+      field_path   = fields.value.fieldPath
+      order        = lookup(fields.value, "order", null)
+      array_config = lookup(fields.value, "arrayConfig", null)
+    }
+  }
+}
+
+# Fields that are never queried: single-field indexing disabled
+resource "google_firestore_field" "unindexed" {
+  for_each = {
+    for override in local.firestore_field_overrides :
+    "${override.collectionGroup}.${override.fieldPath}" => override
+  }
+  database   = google_firestore_database.database.name
+  collection = each.value.collectionGroup
+  field      = each.value.fieldPath
+
+  index_config {}
+}
+
 # Cloud Run Service
 resource "google_cloud_run_service" "backend" {
   name     = "contextpilot-backend"
@@ -216,6 +256,9 @@ resource "google_cloud_run_service" "backend" {
       annotations = {
         "autoscaling.knative.dev/maxScale" = "10"
         "autoscaling.knative.dev/minScale" = "0"
+        # Approval side effects (git commit, GitHub dispatch) run in a background
+        # task after the response is sent; keep CPU allocated so they finish
+        "run.googleapis.com/cpu-throttling" = "false"
       }
     }
   }